@@ -17,10 +17,26 @@ from administration.admin_user_group import UserGroupManager
 from administration.admin_user_role import UserRoleManager
 from administration.admin_user_profile import UserProfileManager
 from administration.bank_profile_manager import BankProfileManager
+import db_executor
+import fitz  # PyMuPDF
+from datetime import datetime
+from openpyxl import Workbook
+from openpyxl.styles import Font
+from LoadingPopup import LoadingPopupClass
+from master_data_cache import cached_query, GROUP_USER
+from report.daily_summary import fetch_agent_kpi
 # from admin_user_Assignment import UserAssignmentManager
 
 logger.logger.info("[TransMatch_main] : Menu initiation")
 
+# ✅ KPI review columns (answered from TM_TRN_DAILY_SUMMARY, see report.daily_summary)
+KPI_COLUMNS = [
+    "Agent ID", "Agent Name", "User Group", "User Role", "Customers", "Banks",
+    "Transactions", "Credit Total", "Debit Total", "Blacklist Hits", "Suspicious Hits",
+    "Printed Status (Count)", "Not Printed (Count)"
+]
+KPI_AMOUNT_COLUMNS = ("Credit Total", "Debit Total")
+
 # Create a log file in the same directory as the EXE
 # if getattr(sys, 'frozen', False):
 #     base_dir = sys._MEIPASS
@@ -184,6 +200,7 @@ class TransMatchApp:
 
     def create_kpi_review_menu(self):
         kpi_window = tk.Toplevel(self.root)
+        self.kpi_window = kpi_window
         kpi_window.title("KPI Review")
         kpi_window.geometry("1920x1080")
         kpi_window.configure(bg="#f0f0f5")
@@ -239,9 +256,9 @@ class TransMatchApp:
         create_label_input(1, 2, "Data Entry Date To:",
                            self.data_entry_date_to_var)
 
-        self.printed_status_var = tk.StringVar()
-        create_label_input(2, 2, "Printed Status:", ttk.Entry(
-            filter_frame, textvariable=self.printed_status_var))
+        self.printed_status_var = tk.StringVar(value="All")
+        create_label_input(2, 2, "Printed Status:", ttk.Combobox(
+            filter_frame, textvariable=self.printed_status_var, values=["All", "Y", "N"], state="readonly"))
 
         # Buttons
         button_frame = tk.Frame(filter_frame, bg="#ffffff")
@@ -295,17 +312,15 @@ class TransMatchApp:
             search_window)).pack(pady=10)
 
     def perform_agent_search(self):
-        dummy_data = [
-            {"Agent ID": "A0001", "Agent Name": "John Doe"},
-            {"Agent ID": "A0002", "Agent Name": "Jane Smith"},
-        ]
-        search_results = [item for item in dummy_data if self.search_text_var.get(
-        ).lower() in item[self.search_by_var.get()].lower()]
+        agents = cached_query(
+            GROUP_USER, "SELECT VCH_LOGIN_ID, VCH_USER_NAME FROM TM_MST_USER WHERE CHR_ACTIVE_IND = 'Y' ORDER BY VCH_USER_NAME") or []
+        search_text = self.search_text_var.get().lower()
+        search_col = 0 if self.search_by_var.get() == "Agent Login ID" else 1
+        search_results = [row for row in agents if search_text in str(row[search_col] or "").lower()]
         for row in self.agent_results_table.get_children():
             self.agent_results_table.delete(row)
-        for result in search_results:
-            self.agent_results_table.insert("", tk.END, values=(
-                result["Agent ID"], result["Agent Name"]))
+        for login_id, user_name in search_results:
+            self.agent_results_table.insert("", tk.END, values=(login_id, user_name))
 
     def select_agent(self, window):
         selected_item = self.agent_results_table.selection()
@@ -318,15 +333,17 @@ class TransMatchApp:
         results_frame = tk.Frame(window, bg="#ffffff")
         results_frame.pack(pady=10, fill=tk.BOTH, expand=True, padx=20)
 
-        columns = ["Agent ID", "User Group",
-                   "User Role", "Printed Status (Count)"]
+        columns = KPI_COLUMNS
         self.results_table_kpi = ttk.Treeview(
             results_frame, columns=columns, show="headings")
         self.results_table_kpi.pack(fill=tk.BOTH, expand=True)
 
+        self.results_table_kpi.tag_configure("evenrow", background="#f5f5f5")
+        self.results_table_kpi.tag_configure("oddrow", background="#ffffff")
+
         for col in columns:
             self.results_table_kpi.heading(col, text=col, anchor="w")
-            self.results_table_kpi.column(col, anchor="w", width=200)
+            self.results_table_kpi.column(col, anchor="w", width=130)
 
         # Scrollbars
         y_scroll = ttk.Scrollbar(
@@ -364,7 +381,35 @@ class TransMatchApp:
         support_label.pack()
 
     def search_kpi(self):
-        messagebox.showinfo("Search", "KPI Search triggered.")
+        logger.logger.info("[TransMatch_main] : Executing the KPI SEARCH operation")
+
+        filters = {
+            "entry_date_from": self.data_entry_date_from_var.get_date() if self.data_entry_date_from_var.get() else None,
+            "entry_date_to":   self.data_entry_date_to_var.get_date() if self.data_entry_date_to_var.get() else None,
+            "agent_login_id":  self.agent_var.get().strip(),
+            "user_group":      self.user_group_var.get().strip(),
+            "user_role":       self.user_role_var.get().strip(),
+            "printed_status":  self.printed_status_var.get(),
+        }
+        loading = LoadingPopupClass(self.kpi_window, message="Searching... Please wait.")
+
+        def update_ui(rows):
+            loading.close()
+            self.results_table_kpi.delete(*self.results_table_kpi.get_children())
+            if not rows:
+                messagebox.showinfo("No Record", "No KPI data found for the selected criteria.")
+                return
+            for idx, row in enumerate(rows):
+                values = [format_currency(v) if col in KPI_AMOUNT_COLUMNS else ("" if v is None else v)
+                          for col, v in zip(KPI_COLUMNS, row)]
+                tag = "evenrow" if idx % 2 == 0 else "oddrow"
+                self.results_table_kpi.insert("", tk.END, values=values, tags=(tag,))
+
+        def on_error(e):
+            loading.close()
+            messagebox.showerror("Error", f"An error occurred during KPI search:\n{str(e)}")
+
+        db_executor.submit(self.kpi_window, fetch_agent_kpi, filters, on_success=update_ui, on_error=on_error)
 
     def reset_kpi_filters(self):
         self.user_group_var.set("")
@@ -372,13 +417,75 @@ class TransMatchApp:
         self.agent_var.set("")
         self.data_entry_date_from_var.set("")
         self.data_entry_date_to_var.set("")
-        self.printed_status_var.set("")
+        self.printed_status_var.set("All")
+        self.results_table_kpi.delete(*self.results_table_kpi.get_children())
+
+    def kpi_rows(self):
+        return [self.results_table_kpi.item(item, "values") for item in self.results_table_kpi.get_children()]
+
+    def kpi_export_path(self, extension):
+        filename = f"KPI_Review_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+        return os.path.join(os.path.expanduser("~"), "Downloads", filename)
 
     def export_to_excel(self):
-        messagebox.showinfo("Export", "Export to Excel triggered.")
+        logger.logger.info("[TransMatch_main] : Executing the KPI EXPORT operation into Excel")
+        rows = self.kpi_rows()
+        if not rows:
+            messagebox.showinfo("No Data", "No KPI results available to export.")
+            return
+
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "KPI Review"
+        ws.append(KPI_COLUMNS)
+        for cell in ws[ws.max_row]:
+            cell.font = Font(bold=True)
+        for row in rows:
+            ws.append(list(row))
+
+        filepath = self.kpi_export_path("xlsx")
+        try:
+            wb.save(filepath)
+            messagebox.showinfo("Success", f"Excel exported to:\n{filepath}")
+        except Exception as e:
+            messagebox.showerror("Export Failed", f"Could not export Excel:\n{e}")
 
     def export_to_pdf(self):
-        messagebox.showinfo("Export", "Export to PDF triggered.")
+        logger.logger.info("[TransMatch_main] : Executing the KPI EXPORT operation into PDF")
+        rows = self.kpi_rows()
+        if not rows:
+            messagebox.showinfo("No Data", "No KPI results available to export.")
+            return
+
+        # A4 landscape, one line per agent, columns at fixed offsets
+        page_width, page_height, margin, line_height = 842, 595, 30, 16
+        col_width = (page_width - 2 * margin) / len(KPI_COLUMNS)
+        doc = fitz.open()
+        page, y = None, page_height
+
+        def write_line(values, fontname="helv"):
+            for idx, value in enumerate(values):
+                text = str(value)[:22]
+                page.insert_text((margin + idx * col_width, y), text, fontsize=7, fontname=fontname)
+
+        for row in rows:
+            if y > page_height - margin:
+                page = doc.new_page(width=page_width, height=page_height)
+                page.insert_text((margin, margin), f"KPI Review - {datetime.now().strftime('%d-%b-%Y %H:%M')}", fontsize=12, fontname="hebo")
+                y = margin + 2 * line_height
+                write_line(KPI_COLUMNS, fontname="hebo")
+                y += line_height
+            write_line(row)
+            y += line_height
+
+        filepath = self.kpi_export_path("pdf")
+        try:
+            doc.save(filepath)
+            messagebox.showinfo("Success", f"PDF exported to:\n{filepath}")
+        except Exception as e:
+            messagebox.showerror("Export Failed", f"Could not export PDF:\n{e}")
+        finally:
+            doc.close()
 
     def create_user_group_menu(self):
         user_group_window = tk.Toplevel(self.root)
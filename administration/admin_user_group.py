@@ -4,6 +4,8 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import logger
 from db_manager import executionWithRs_query, execute_query, commit
+import db_executor
+from master_data_cache import invalidate, GROUP_ROLE
 
 logger.logger.info("[admin_user_group] : Menu initiation")
 
@@ -124,16 +126,18 @@ class UserGroupManager:
 
         sql += " ORDER BY VCH_GROUP_NAME"
 
-        rows = executionWithRs_query(sql, tuple(params))
-        self.group_tree.delete(*self.group_tree.get_children())
+        def update_ui(rows):
+            self.group_tree.delete(*self.group_tree.get_children())
 
-        if not rows:
-            logger.logger.info("[admin_user_group] : [Search] No matching user group found")
-            messagebox.showinfo("No Records", "No matching user group found.")
-            return
+            if not rows:
+                logger.logger.info("[admin_user_group] : [Search] No matching user group found")
+                messagebox.showinfo("No Records", "No matching user group found.")
+                return
+
+            for row in rows:
+                self.group_tree.insert("", tk.END, values=row)
 
-        for row in rows:
-            self.group_tree.insert("", tk.END, values=row)
+        db_executor.run_query(self.group_window, sql, tuple(params), on_success=update_ui)
 
     def reset_filters(self):
         logger.logger.info("[admin_user_group] : Executing the RESET operation, for filter section only")
@@ -179,6 +183,7 @@ class UserGroupManager:
 
         if conn:
             commit(conn)
+            invalidate(GROUP_ROLE)
 
         self.reset_entries()
         self.load_groups()
@@ -221,6 +226,7 @@ class UserGroupManager:
         conn = execute_query(sql, (group_id,), None)
         if conn:
             commit(conn)
+            invalidate(GROUP_ROLE)
 
         messagebox.showinfo("Success", "Group deleted permanently.")
         logger.logger.info(f"[admin_user_group] : Group ID[{group_id}] has been deleted permanently.")
@@ -245,6 +251,7 @@ class UserGroupManager:
         conn = execute_query(sql, (status, 1, group_id), None)
         if conn:
             commit(conn)
+            invalidate(GROUP_ROLE)
 
         action = "activated" if status == 'Y' else "deactivated"
         messagebox.showinfo("Success", f"Group has been {action}.")
@@ -1,13 +1,15 @@
 # flake8: noqa: E501
 
 # admin_user_profile.py
-import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter import simpledialog
 from LoadingPopup import LoadingPopupClass
 import logger
 from db_manager import commit, execute_query, executionWithRs_query, executionWithRs_queryWithCommit, hash_password
+import db_executor
+from master_data_cache import cached_query, invalidate, GROUP_ROLE, GROUP_STATEMENT, GROUP_USER, SQL_ACTIVE_GROUPS, SQL_ACTIVE_ROLES, SQL_ACTIVE_USERS
+from virtual_grid import VirtualGrid
 
 logger.logger.info("[admin_user_profile] : Menu initiation")
 
@@ -150,18 +152,20 @@ class UserProfileManager:
     #     self.filter_group_combo['values'] = list(self.group_dict.keys())
 
     def populate_group_dropdowns(self):
-        query = "SELECT NUM_GROUP_ID, VCH_GROUP_NAME FROM TM_MST_GROUP WHERE CHR_ACTIVE_IND = 'Y' ORDER BY VCH_GROUP_NAME"
-        rows = executionWithRs_query(query)
-        self.group_dict = {name: gid for gid, name in rows}
+        self.group_dict = {}
 
-        self.filter_group_combo['values'] = list(self.group_dict.keys())
-        self.entry_group_combo['values'] = list(self.group_dict.keys())
+        def apply(rows):
+            self.group_dict = {name: gid for gid, name in rows or []}
+            self.filter_group_combo['values'] = list(self.group_dict.keys())
+            self.entry_group_combo['values'] = list(self.group_dict.keys())
+
+        db_executor.submit(self.user_prof_window, cached_query, GROUP_ROLE, SQL_ACTIVE_GROUPS, on_success=apply)
 
     def populate_roles_dropdown(self):
-        query = "SELECT VCH_ROLE_NAME FROM TM_MST_ROLE WHERE CHR_ACTIVE_IND = 'Y' ORDER BY VCH_ROLE_NAME"
-        rows = executionWithRs_query(query)
-        role_names = [r[0] for r in rows]
-        self.filter_role_combo['values'] = role_names
+        def apply(rows):
+            self.filter_role_combo['values'] = [r[0] for r in rows or []]
+
+        db_executor.submit(self.user_prof_window, cached_query, GROUP_ROLE, SQL_ACTIVE_ROLES, on_success=apply)
 
     def update_filter_roles(self, event=None):
         # Only apply to entry group and role
@@ -176,23 +180,24 @@ class UserProfileManager:
                 SELECT VCH_ROLE_NAME FROM TM_MST_ROLE
                 WHERE NUM_GROUP_ID = %s AND CHR_ACTIVE_IND = 'Y' ORDER BY VCH_ROLE_NAME
             """
-            rows = executionWithRs_query(query, (group_id,))
-            self.entry_role_combo['values'] = [r[0] for r in rows]
+            db_executor.submit(self.user_prof_window, cached_query, GROUP_ROLE, query, (group_id,),
+                               on_success=lambda rows: self.entry_role_combo.configure(values=[r[0] for r in rows or []]))
 
     def populate_supervisors(self):
-        query = "SELECT NUM_USER_ID, VCH_USER_NAME FROM TM_MST_USER WHERE CHR_ACTIVE_IND = 'Y' ORDER BY VCH_USER_NAME"
-        rows = executionWithRs_query(query)
         self.supervisor_dict = {"None": None}
-        self.supervisor_dict.update({name: uid for uid, name in rows})
-        self.entry_supervisor_combo['values'] = list(self.supervisor_dict.keys())
         self.entry_supervisor_var.set("None")
 
+        def apply(rows):
+            self.supervisor_dict.update({name: uid for uid, name in rows or []})
+            self.entry_supervisor_combo['values'] = list(self.supervisor_dict.keys())
+
+        db_executor.submit(self.user_prof_window, cached_query, GROUP_USER, SQL_ACTIVE_USERS, on_success=apply)
+
     def search_users(self):
         self.loading_popup = LoadingPopupClass(self.user_prof_window, "Searching users... Please wait.")
         self.user_prof_window.update_idletasks()
 
-        thread = threading.Thread(target=self._execute_user_search)
-        thread.start()
+        self._execute_user_search()
 
     def _execute_user_search(self):
         try:
@@ -227,26 +232,24 @@ class UserProfileManager:
             sql += " ORDER BY usr.VCH_USER_NAME"
             # logger.logger.info("[admin_user_profile] : sql = " + sql)
 
-            rows = executionWithRs_query(sql, tuple(params))
-
-            def update_ui():
+            def update_ui(rows):
                 self.loading_popup.close()
-                self.result_table.delete(*self.result_table.get_children())
+                self.result_grid.set_rows(rows or [], autofit=False)
                 if not rows:
                     logger.logger.info(f"[admin_user_profile] : Search process, No matching user found with condition = [{conditions}]|[group={group},role={role},name={staff_name}]")
                     messagebox.showinfo("No Record", "No matching user found.")
                     return
-                for row in rows:
-                    self.result_table.insert("", tk.END, values=row)
 
-            self.user_prof_window.after(0, update_ui)
+            def on_error(e):
+                self.loading_popup.close()
+                messagebox.showerror("Error", f"Error occurred during search:\n{str(e)}")
+
+            db_executor.run_query(self.user_prof_window, sql, tuple(params), on_success=update_ui, on_error=on_error)
 
         except Exception as e:
             logger.logger.info(f"[admin_user_profile][Search function][Exception] : {str(e)}")
-            self.user_prof_window.after(0, lambda: [
-                self.loading_popup.close(),
-                messagebox.showerror("Error", f"Error occurred during search:\n{str(e)}")
-            ])
+            self.loading_popup.close()
+            messagebox.showerror("Error", f"Error occurred during search:\n{str(e)}")
 
     def clean_filters(self):
         self.filter_group_var.set("")
@@ -263,21 +266,16 @@ class UserProfileManager:
         result_frame = tk.LabelFrame(self.user_prof_window, text="Search Results", font=("Helvetica", 12, "bold"), bg="white", bd=2)
         result_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
 
-        self.result_table = ttk.Treeview(result_frame, columns=columns, show="headings")
-        for col in columns:
-            self.result_table.heading(col, text=col)
-            self.result_table.column(col, anchor="w", width=130)
-
-        self.result_table.pack(fill=tk.BOTH, expand=True)
-
-        y_scroll = ttk.Scrollbar(result_frame, orient="vertical", command=self.result_table.yview)
-        self.result_table.configure(yscrollcommand=y_scroll.set)
-        y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        # ✅ Virtualized grid: only the visible rows exist as Treeview items (vertical scrollbar included)
+        self.result_grid = VirtualGrid(result_frame, columns, bg="white")
+        self.result_table = self.result_grid.tree
 
         x_scroll = ttk.Scrollbar(result_frame, orient="horizontal", command=self.result_table.xview)
         self.result_table.configure(xscrollcommand=x_scroll.set)
         x_scroll.pack(side=tk.BOTTOM, fill=tk.X)
 
+        self.result_grid.pack(fill=tk.BOTH, expand=True)
+
         self.adjust_column_width()
         self.refresh_result_grid()
 
@@ -293,10 +291,11 @@ class UserProfileManager:
             WHERE usr.CHR_ACTIVE_IND = 'Y'
             ORDER BY usr.VCH_USER_NAME
         """
-        rows = executionWithRs_query(sql)
-        self.result_table.delete(*self.result_table.get_children())
-        for row in rows:
-            self.result_table.insert("", tk.END, values=row)
+
+        def update_ui(rows):
+            self.result_grid.set_rows(rows or [], autofit=False)
+
+        db_executor.run_query(self.user_prof_window, sql, on_success=update_ui)
 
     def layer2_add_user(self):
         group = self.entry_group_var.get()
@@ -361,19 +360,20 @@ class UserProfileManager:
         conn = execute_query(insert_assignment_sql, (user_id, role_id, group_id), conn)
         if conn:
             commit(conn)
+            invalidate(GROUP_USER, GROUP_STATEMENT)
             messagebox.showinfo("Success", "User successfully added.")
             logger.logger.info(f"[admin_user_profile][ADD/EDIT fucntion] Success - User successfully added for name:{name} & group:{group} & role:{role}.")
         self.layer2_clean_entry_fields()
         self.search_users()
 
     def layer2_edit_user(self):
-        selected = self.result_table.selection()
-        logger.logger.info(f"[admin_user_profile][EDIT fucntion] record selected for {selected}")
+        selected = self.result_grid.selected_rows()
+        logger.logger.info(f"[admin_user_profile][EDIT fucntion] record selected for {[row[0] for row in selected]}")
 
         if not selected:
             messagebox.showwarning("No Selection", "Please select a record to edit.")
             return
-        values = self.result_table.item(selected[0], 'values')
+        values = selected[0]
         self.entry_name_var.set(values[1])
         self.entry_login_id_var.set(values[2])
         self.entry_group_var.set(values[3])
@@ -388,15 +388,15 @@ class UserProfileManager:
 
     def layer2_delete_user(self, global_info):
         conn = None
-        selected = self.result_table.selection()
-        logger.logger.info(f"[admin_user_profile][DELETE fucntion] record selected for {selected}")
+        selected = self.result_grid.selected_rows()
+        logger.logger.info(f"[admin_user_profile][DELETE fucntion] record selected for {[row[0] for row in selected]}")
 
         if not selected:
             messagebox.showwarning("No Selection", "Please select a record to delete.")
             return
 
-        user_id = self.result_table.item(selected[0], 'values')[0]
-        login_id = self.result_table.item(selected[0], 'values')[2]
+        user_id = selected[0][0]
+        login_id = selected[0][2]
 
         # Check if attempting to delete current login user
         if login_id == global_info["gb_login_id"]:
@@ -415,11 +415,11 @@ class UserProfileManager:
 
         confirm = messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this user?")
         if confirm:
-            user_id = self.result_table.item(selected[0], 'values')[0]
             query = "UPDATE TM_MST_USER SET CHR_ACTIVE_IND = 'N' WHERE NUM_USER_ID = %s"
             conn = execute_query(query, (user_id,), conn)
             if conn:
                 commit(conn)
+                invalidate(GROUP_USER, GROUP_STATEMENT)
                 messagebox.showinfo("Deleted", "User has been deactivated.")
                 logger.logger.info("[admin_user_profile][DELETE fucntion] Success - User successfully deactivated")
             self.refresh_result_grid()
@@ -440,12 +440,12 @@ class UserProfileManager:
 
     def reset_password_dialog(self):
         conn = None
-        selected = self.result_table.selection()
+        selected = self.result_grid.selected_rows()
         if not selected:
             messagebox.showwarning("No Selection", "Please select a user record from the table.")
             return
 
-        selected_item = self.result_table.item(selected[0], 'values')
+        selected_item = selected[0]
         user_id = selected_item[0]
         login_id = selected_item[2]
         logger.logger.info(f"[admin_user_profile] : To perform password reset for user_id={user_id}, login_id={login_id}")
@@ -460,6 +460,7 @@ class UserProfileManager:
         conn = execute_query(sql, (hashed_pw, user_id), conn)
         if conn:
             commit(conn)
+            invalidate(GROUP_USER, GROUP_STATEMENT)
             messagebox.showinfo("Success", f"Password for user '{login_id}' has been reset.")
             logger.logger.info(f"[admin_user_profile] : Password reset for user_id={user_id}, login_id={login_id}")
 
@@ -4,6 +4,8 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import logger
 from db_manager import executionWithRs_query, execute_query, commit
+import db_executor
+from master_data_cache import cached_query, invalidate, GROUP_ROLE, SQL_ACTIVE_GROUPS
 
 logger.logger.info("[admin_user_role] : Menu initiation")
 
@@ -38,8 +40,12 @@ class UserRoleManager:
         logger.logger.info("[admin_user_role] : Screen established completely")
 
     def load_group_options(self):
-        results = executionWithRs_query("SELECT NUM_GROUP_ID, VCH_GROUP_NAME FROM TM_MST_GROUP WHERE CHR_ACTIVE_IND = 'Y' ORDER BY VCH_GROUP_NAME")
-        self.group_options = [(str(r[0]), r[1]) for r in results] if results else []
+        self.group_options = []
+
+        def apply(results):
+            self.group_options = [(str(r[0]), r[1]) for r in results] if results else []
+
+        db_executor.submit(self.role_window, cached_query, GROUP_ROLE, SQL_ACTIVE_GROUPS, on_success=apply)
 
     def create_filter_section(self):
         logger.logger.info("[admin_user_role] : Layer 1 - Deploying searching criteria section")
@@ -63,19 +69,19 @@ class UserRoleManager:
         self.role_desc_text = tk.Text(frame, height=3, width=40)  # Multi-line Text widget
         self.group_map = {}  # Mapping of group name to ID
 
-        # Load group list (active only)
-        group_rows = executionWithRs_query("SELECT NUM_GROUP_ID, VCH_GROUP_NAME FROM TM_MST_GROUP WHERE CHR_ACTIVE_IND = 'Y'")
-        group_names = []
-        if group_rows:
-            for gid, gname in group_rows:
-                group_names.append(gname)
-                self.group_map[gname] = gid
-
         # Group Dropdown
         ttk.Label(frame, text="Group:").grid(row=0, column=0, padx=5, pady=2, sticky='e')
-        self.group_dropdown = ttk.Combobox(frame, textvariable=self.group_name_var, values=group_names, state='readonly', width=38)
+        self.group_dropdown = ttk.Combobox(frame, textvariable=self.group_name_var, values=[], state='readonly', width=38)
         self.group_dropdown.grid(row=0, column=1, padx=5, pady=2)
 
+        # Load group list (active only)
+        def apply(group_rows):
+            for gid, gname in group_rows or []:
+                self.group_map[gname] = gid
+            self.group_dropdown['values'] = list(self.group_map.keys())
+
+        db_executor.submit(self.role_window, cached_query, GROUP_ROLE, SQL_ACTIVE_GROUPS, on_success=apply)
+
         # Role Name Entry
         ttk.Label(frame, text="Role Name:").grid(row=0, column=2, padx=5, pady=2, sticky='e')
         ttk.Entry(frame, textvariable=self.role_name_var, width=40).grid(row=0, column=3, padx=5, pady=2)
@@ -140,14 +146,16 @@ class UserRoleManager:
             params.append(f"%{keyword}%")
         sql += " ORDER BY R.VCH_ROLE_NAME"
 
-        rows = executionWithRs_query(sql, tuple(params))
-        self.role_tree.delete(*self.role_tree.get_children())
+        def update_ui(rows):
+            self.role_tree.delete(*self.role_tree.get_children())
+
+            if not rows:
+                return  # No data or error, just return safely
 
-        if not rows:
-            return  # No data or error, just return safely
+            for row in rows:
+                self.role_tree.insert("", tk.END, values=row)
 
-        for row in rows:
-            self.role_tree.insert("", tk.END, values=row)
+        db_executor.run_query(self.role_window, sql, tuple(params), on_success=update_ui)
 
     def reset_filters(self):
         self.filter_name_var.set("")
@@ -206,6 +214,7 @@ class UserRoleManager:
 
         if conn:
             commit(conn)
+            invalidate(GROUP_ROLE)
 
         self.reset_entries()
         self.load_roles()
@@ -247,6 +256,7 @@ class UserRoleManager:
         conn = execute_query(sql, (values[1],))
         if conn:
             commit(conn)
+            invalidate(GROUP_ROLE)
         self.load_roles()
 
     def toggle_active_status(self, status):
@@ -265,4 +275,5 @@ class UserRoleManager:
         conn = execute_query(sql, (status, values[1]))
         if conn:
             commit(conn)
+            invalidate(GROUP_ROLE)
         self.load_roles()
@@ -3,7 +3,9 @@
 import tkinter as tk
 import logger
 from tkinter import ttk, messagebox
-from db_manager import commit, execute_query, executionWithRs_query
+from db_manager import commit, execute_query
+import db_executor
+from master_data_cache import invalidate, GROUP_BANK, GROUP_STATEMENT
 
 
 class BankProfileManager:
@@ -134,7 +136,6 @@ class BankProfileManager:
     def load_bank_profiles(self):
         logger.logger.info("[BankProfileManager] Loading bank profile records")
 
-        self.grid_table.delete(*self.grid_table.get_children())
         name_filter = self.search_bank_name_var.get().strip()
         sql = """
             SELECT NUM_BANK_ID, VCH_BANK_NAME, VCH_BANK_DISPLAY_NM, VCH_BANK_REG_NO, VCH_ADDRESS,
@@ -145,14 +146,17 @@ class BankProfileManager:
             WHERE (%s = '' OR VCH_BANK_NAME ILIKE %s)
             ORDER BY NUM_BANK_ID
         """
-        rows = executionWithRs_query(sql, (name_filter, f"%{name_filter}%"))
-        logger.logger.info(f"[BankProfileManager] Loaded {len(rows or [])} records")
 
-        for row in rows or []:
-            self.grid_table.insert("", tk.END, values=(
-                row[0], row[1], row[2], row[3], row[4], row[5],
-                row[6], row[7], row[8], row[9]
-            ))
+        def update_ui(rows):
+            logger.logger.info(f"[BankProfileManager] Loaded {len(rows)} records")
+            self.grid_table.delete(*self.grid_table.get_children())
+            for row in rows:
+                self.grid_table.insert("", tk.END, values=(
+                    row[0], row[1], row[2], row[3], row[4], row[5],
+                    row[6], row[7], row[8], row[9]
+                ))
+
+        db_executor.run_query(self.bank_profile_window, sql, (name_filter, f"%{name_filter}%"), on_success=update_ui)
 
     def reset_filters(self):
         self.search_bank_name_var.set("")
@@ -195,6 +199,7 @@ class BankProfileManager:
         try:
             logger.logger.warning(f"[BankProfileManager] Attempting to delete bank ID: {self.selected_bank_id}")
             execute_query(sql, (self.selected_bank_id,))
+            invalidate(GROUP_BANK, GROUP_STATEMENT)
             messagebox.showinfo("Success", "Bank deleted successfully.")
             self.load_bank_profiles()
             self.reset_entry_fields()
@@ -248,6 +253,7 @@ class BankProfileManager:
             conn = execute_query(sql, data, conn)
             if conn:
                 commit(conn)
+                invalidate(GROUP_BANK, GROUP_STATEMENT)
             messagebox.showinfo("Success", "Bank saved successfully.")
             self.load_bank_profiles()
             self.reset_entry_fields()
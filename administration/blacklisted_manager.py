@@ -4,14 +4,17 @@ import tkinter as tk
 import shutil
 import sys
 import os
-import openpyxl
 import logger
 from datetime import datetime
-from db_manager import execute_query, commit, executionWithRs_query
+from db_manager import execute_query, commit
+import db_executor
+from report.screening_hits import rescreen_for_names
+from administration.screening_list_import import bulk_import, LIST_BLACKLISTED
 from tkinter import ttk
 from tkinter import messagebox
 from tkinter import filedialog
 from LoadingPopup import LoadingPopupClass
+from virtual_grid import VirtualGrid
 
 logger.logger.info("[blacklisted_manager] : Menu initiation")
 
@@ -106,7 +109,6 @@ class BlacklistedManager:
         logger.logger.info("[blacklisted_manager] : Executing the SEARCH operation")
 
         search_text = self.bl_filter_var.get().strip()
-        self.bl_tree.delete(*self.bl_tree.get_children())
 
         query = """
             SELECT 
@@ -126,13 +128,12 @@ class BlacklistedManager:
 
         query += " ORDER BY VCH_BLACKLISTED_NAME"
 
-        try:
-            results = executionWithRs_query(query, tuple(params)) or []
-            for idx, row in enumerate(results):
-                tag = "evenrow" if idx % 2 == 0 else "oddrow"
-                self.bl_tree.insert("", tk.END, values=row, tags=(tag,))
-        except Exception as e:
-            messagebox.showerror("Search Error", f"An error occurred:\n{e}")
+        db_executor.run_query(self.blacklist_window, query, tuple(params), on_success=self._populate_grid,
+                              on_error=lambda e: messagebox.showerror("Search Error", f"An error occurred:\n{e}"))
+
+    def _populate_grid(self, results):
+        # ✅ Only the visible window is materialised in the Treeview
+        self.bl_grid.set_rows(results, autofit=False)
 
         # Footer to show the total number of record
         self.total_label.config(text=f"Total Records: {len(results)}")
@@ -179,70 +180,48 @@ class BlacklistedManager:
 
     def import_excel(self):
         logger.logger.info("[blacklisted_manager] : Executing the excel IMPORT operation")
-        # self.loading_popup = LoadingPopupClass(self.blacklist_window, "Importing Excel... Please wait.")
-        # self.blacklist_window.update_idletasks()  # Forces update to show the popup
-        # self.blacklist_window.update()
-        self.loading_popup = LoadingPopupClass(self.root, "Importing Excel... Please wait.")
-        self.root.update_idletasks()  # Forces update to show the popup
 
         fn = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx;*.xls")])
         if not fn:
-            self.loading_popup.close()
-            self.load_blacklisted_from_db()  # ✅ Refresh table
             return
 
-        try:
-            wb = openpyxl.load_workbook(fn)
-            ws = wb.active
-
-            today = datetime.now()
-            conn = None
-            inserted = 0
-
-            for row in ws.iter_rows(min_row=2, values_only=True):
-                name = row[0] if row and row[0] else ""
-                if not name:
-                    continue
-
-                query = """
-                    INSERT INTO TM_MST_BLACKLISTED (
-                        VCH_BLACKLISTED_NAME, VCH_REMARK_1, VCH_REMARK_2,
-                        CHR_ACTIVE_IND, NUM_CREATED_BY, DTT_CREATED_AT
-                    ) VALUES (%s, %s, %s, %s, %s, %s)
-                """
-                params = (name.strip(), "", "", "Y", 1, today)
-                conn = execute_query(query, params, conn)
-                inserted += 1
-
-            if conn:
-                commit(conn)
-
-            messagebox.showinfo("Success", f"{inserted} rows imported successfully.") 
+        self.loading_popup = LoadingPopupClass(self.blacklist_window, "Importing Excel... Please wait.")
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to import Excel:\n{e}")
+        def on_done(result):
+            self.loading_popup.close()
+            messagebox.showinfo(
+                "Success",
+                f"{result['inserted']} rows imported successfully.\n"
+                f"{result['duplicates']} duplicate rows skipped.\n"
+                f"{result['invalid']} invalid rows skipped.")
+            self._rescreen(added=result["names"])
+            self.load_blacklisted_from_db()  # ✅ Refresh table
 
-        finally:
+        def on_error(e):
             self.loading_popup.close()
+            messagebox.showerror("Error", f"Failed to import Excel:\n{e}")
             self.load_blacklisted_from_db()  # ✅ Refresh table
 
+        # ✅ Streamed read, in-memory dedup, COPY into staging and one merge INSERT (off the UI thread)
+        db_executor.submit(self.blacklist_window, bulk_import, fn, LIST_BLACKLISTED, on_success=on_done, on_error=on_error)
+
     def edit_blacklisted(self):
         logger.logger.info("[blacklisted_manager] : Executing the EDIT operation")
 
-        sel = self.bl_tree.selection()
+        sel = self.bl_grid.selected_rows()
         if not sel:
             messagebox.showwarning("No Selection", "Select a row to edit.")
             return
 
         # ✅ Extract selected row values
-        values = self.bl_tree.item(sel[0], "values")
+        values = sel[0]
         self.bl_name_var.set(values[0])          # Set name to input box
         self.selected_edit_id = values[0]         # Store the original name for update reference
 
     def delete_blacklisted(self):
         logger.logger.info("[blacklisted_manager] : Executing the DELETE operation")
 
-        selected_items = self.bl_tree.selection()
+        selected_items = self.bl_grid.selected_rows()
         if not selected_items:
             messagebox.showwarning("No Selection", "Please select record(s) to delete.")
             return
@@ -262,18 +241,20 @@ class BlacklistedManager:
 
         conn = None
         deleted = 0
+        deleted_names = []
 
-        for row_id in selected_items:
-            values = self.bl_tree.item(row_id, "values")
+        for values in selected_items:
             name = values[0]
             try:
                 conn = execute_query(delete_query, (name,), conn)
                 deleted += 1
+                deleted_names.append(name)
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete '{name}': {e}")
 
         if conn:
             commit(conn)
+            self._rescreen(removed=deleted_names)
 
         messagebox.showinfo("Deleted", f"{deleted} record(s) deleted.")
         self.load_blacklisted_from_db()
@@ -288,25 +269,15 @@ class BlacklistedManager:
 
         cols = ("Blacklisted Name", "Created Date", "Created By",
                 "Modified Date", "Modified By")
-        self.bl_tree = ttk.Treeview(frame, columns=cols,
-                                    show="headings", height=20)
-        for c in cols:
-            self.bl_tree.heading(c, text=c)
-            anchor = "w" if c == "Blacklisted Name" else "center"
-            self.bl_tree.column(c, anchor=anchor, width=140)
-        self.bl_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-        # ── Zebra striping tags ─────────────────────────
+        # ── Row height (zebra striping is applied by the grid) ──
         style = ttk.Style()
         style.configure("Treeview", rowheight=25)
-        self.bl_tree.tag_configure("evenrow", background="#f5f5f5")
-        self.bl_tree.tag_configure("oddrow",  background="#ffffff")
-        # ─────────────────────────────────────────────────
 
-        vsb = ttk.Scrollbar(frame, orient="vertical",
-                            command=self.bl_tree.yview)
-        self.bl_tree.configure(yscroll=vsb.set)
-        vsb.pack(side=tk.RIGHT, fill=tk.Y)
+        self.bl_grid = VirtualGrid(frame, cols, height=20, bg="#f0f0f5")
+        for c in cols:
+            anchor = "w" if c == "Blacklisted Name" else "center"
+            self.bl_grid.tree.column(c, anchor=anchor, width=140)
+        self.bl_grid.pack(fill=tk.BOTH, expand=True)
 
         # --- Total Count Label ---
         self.total_label = tk.Label(self.scrollable_frame, text="Total Records: 0", anchor="e", font=("Arial", 10), bg="#f0f0f5")
@@ -340,6 +311,7 @@ class BlacklistedManager:
             try:
                 conn = execute_query(update_query, params, conn)
                 commit(conn)
+                self._rescreen(added=[name], removed=[self.selected_edit_id])
                 messagebox.showinfo("Success", f"'{name}' updated successfully.")
             except Exception as e:
                 messagebox.showerror("Error", f"Update failed: {e}")
@@ -356,6 +328,7 @@ class BlacklistedManager:
             try:
                 conn = execute_query(insert_query, params, conn)
                 commit(conn)
+                self._rescreen(added=[name])
                 messagebox.showinfo("Success", f"'{name}' inserted successfully.")
             except Exception as e:
                 messagebox.showerror("Error", f"Insert failed: {e}")
@@ -363,6 +336,11 @@ class BlacklistedManager:
         self.bl_name_var.set("")               # Clear input box
         self.load_blacklisted_from_db()        # Refresh grid
 
+    def _rescreen(self, added=(), removed=()):
+        """Refresh the stored screening hits of the affected transactions in the background"""
+        logger.logger.info(f"[blacklisted_manager] : Re-screening transactions for {len(added)} added / {len(removed)} removed name(s)")
+        db_executor.submit(self.blacklist_window, rescreen_for_names, added=list(added), removed=list(removed))
+
     def download_template(self):
         logger.logger.info("[blacklisted_manager] : Executing the template DOWNLOAD operation")
 
@@ -391,8 +369,6 @@ class BlacklistedManager:
     def load_blacklisted_from_db(self):
         logger.logger.info("[blacklisted_manager] : Extract and Load all blacklisted data into grid table")
 
-        self.bl_tree.delete(*self.bl_tree.get_children())
-
         query = """
             SELECT 
                 VCH_BLACKLISTED_NAME,
@@ -404,11 +380,4 @@ class BlacklistedManager:
             WHERE CHR_ACTIVE_IND = 'Y'
             ORDER BY TO_CHAR(DTT_CREATED_AT, 'YYYY-MM-DD HH24:MI:SS') DESC, VCH_BLACKLISTED_NAME
         """
-        results = executionWithRs_query(query) or []
-
-        for idx, row in enumerate(results):
-            tag = "evenrow" if idx % 2 == 0 else "oddrow"
-            self.bl_tree.insert("", tk.END, values=row, tags=(tag,))
-
-        # Footer to show the total number of record
-        self.total_label.config(text=f"Total Records: {len(results)}")
+        db_executor.run_query(self.blacklist_window, query, on_success=self._populate_grid)
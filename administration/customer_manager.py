@@ -5,8 +5,11 @@ from tkinter import messagebox
 import logger
 from tkinter import ttk
 from db_manager import commit, rollback, execute_query, executionWithRs_query
+import db_executor
+from master_data_cache import invalidate, GROUP_CUSTOMER
 from administration.contact_country_code import CountryCodePhoneEntry
 from administration.customer_remark_popup import RemarkPopup
+from virtual_grid import VirtualGrid
 
 
 logger.logger.info("[customer_manager] : Menu initiation")
@@ -176,8 +179,9 @@ class CustomerManager:
             "Customer Email", "Customer Contact", "Customer Address",
             "Created Date", "Created By", "Modified Date", "Modified By"
         )
-        self.customer_tree = ttk.Treeview(
-            frame, columns=cols, show="headings", height=18)
+        # ✅ Virtualized grid: only the visible rows exist as Treeview items
+        self.customer_grid = VirtualGrid(frame, cols, height=18, bg="#f0f0f5")
+        self.customer_tree = self.customer_grid.tree
 
         self.customer_tree.bind("<Double-1>", self.open_remark_popup)
 
@@ -189,42 +193,30 @@ class CustomerManager:
         #     self.customer_tree.column(c, anchor=anchor, width=140)
         # self.customer_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-        # Apply heading text
-        for c in cols:
-            self.customer_tree.heading(c, text=c)
-
         # 💡 Fix widths and alignment
         self.adjust_column_width()
 
-        # Scroll and pack
-        self.customer_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        # Scroll and pack (zebra striping is applied by the grid)
+        self.customer_grid.pack(fill=tk.BOTH, expand=True)
 
-        # zebra striping
         style = ttk.Style()
         style.configure("Treeview", rowheight=25)
-        self.customer_tree.tag_configure("evenrow", background="#f5f5f5")
-        self.customer_tree.tag_configure("oddrow",  background="#ffffff")
-
-        vsb = ttk.Scrollbar(frame, orient="vertical",
-                            command=self.customer_tree.yview)
-        self.customer_tree.configure(yscroll=vsb.set)
-        vsb.pack(side=tk.RIGHT, fill=tk.Y)
 
         self.load_customers()
 
     def open_remark_popup(self, event):
-        selected = self.customer_tree.selection()
+        selected = self.customer_grid.selected_rows()
         if not selected:
             return
-        item = self.customer_tree.item(selected[0])
-        cust_id = item["values"][0]
+        cust_id = selected[0][0]
 
         # Query remark value from DB
         sql = "SELECT VCH_REMARK FROM TM_MST_CUSTOMER WHERE NUM_CUST_ID = %s"
-        result = executionWithRs_query(sql, (cust_id,))
-        remark = result[0][0] if result else ""
+        def open_popup(result):
+            remark = result[0][0] if result else ""
+            RemarkPopup(self.customerprofile_window, cust_id, remark, self.load_customers)
 
-        RemarkPopup(self.customerprofile_window, cust_id, remark, self.load_customers)
+        db_executor.run_query(self.customerprofile_window, sql, (cust_id,), on_success=open_popup)
 
     def load_customers(self, code=None, name=None):
         logger.logger.info("[customer_manager] : Extract and Load all customer data into grid table")
@@ -269,12 +261,10 @@ class CustomerManager:
         base_sql += " ORDER BY VCH_CUST_CODE"
 
         # 4) Execute and refresh tree
-        rows = executionWithRs_query(base_sql, tuple(params)) or []
-        self.customer_tree.delete(*self.customer_tree.get_children())
+        def update_ui(rows):
+            self.customer_grid.set_rows(rows, autofit=False)
 
-        for idx, row in enumerate(rows):
-            tag = "evenrow" if idx % 2 == 0 else "oddrow"
-            self.customer_tree.insert("", tk.END, values=row, tags=(tag,))
+        db_executor.run_query(self.customerprofile_window, base_sql, tuple(params), on_success=update_ui)
 
     def search_customers(self):
         logger.logger.info("[customer_manager] : Executing the SEARCH operation")
@@ -331,6 +321,7 @@ class CustomerManager:
             conn = execute_query(update_sql, (cust_code, cust_name, email, contact, address, staff_id, self.selected_customer_id))
             if conn:
                 commit(conn)
+                invalidate(GROUP_CUSTOMER)
                 messagebox.showinfo("Success", "Customer updated successfully.")
         else:  # Perform INSERT
             insert_sql = """
@@ -343,6 +334,7 @@ class CustomerManager:
             conn = execute_query(insert_sql, (cust_code, cust_name, email, contact, address, staff_id))
             if conn:
                 commit(conn)
+                invalidate(GROUP_CUSTOMER)
                 messagebox.showinfo("Success", "Customer added successfully.")
 
         self.reset_data_entry()
@@ -351,12 +343,12 @@ class CustomerManager:
     def edit_customer(self):
         logger.logger.info("[customer_manager] : Triggering edit_customer()")
 
-        selected = self.customer_tree.selection()
+        selected = self.customer_grid.selected_rows()
         if not selected:
             messagebox.showwarning("No Selection", "Please select a customer to edit.")
             return
 
-        values = self.customer_tree.item(selected[0])['values']
+        values = selected[0]
         self.selected_customer_id = values[0]  # NUM_CUST_ID
 
         self.customer_code_var.set(values[1])
@@ -369,7 +361,7 @@ class CustomerManager:
         logger.logger.info("[customer_manager] : Executing DELETE operation")
         conn = None
 
-        selected_items = self.customer_tree.selection()
+        selected_items = self.customer_grid.selected_rows()
         if not selected_items:
             messagebox.showwarning("No Selection", "Please select at least one customer to delete.")
             return
@@ -384,8 +376,7 @@ class CustomerManager:
 
         success = True
         try:
-            for item in selected_items:
-                values = self.customer_tree.item(item)['values']
+            for values in selected_items:
                 customer_id = values[0]
                 delete_sql = "DELETE FROM TM_MST_CUSTOMER WHERE NUM_CUST_ID = %s"
                 conn = execute_query(delete_sql, (customer_id,), conn)
@@ -397,6 +388,7 @@ class CustomerManager:
             if success:
                 if conn:
                     commit(conn)
+                    invalidate(GROUP_CUSTOMER)
                     logger.logger.info("[customer_manager] : Deletion comitted successfully.")
                 logger.logger.info(f"[customer_manager] : Deleted {len(selected_items)} customer(s) successfully.")
                 messagebox.showinfo("Deleted", f"Deleted {len(selected_items)} customer(s) successfully.")
@@ -0,0 +1,87 @@
+# flake8: noqa: E501
+
+# screening_list_import.py
+import re
+import openpyxl
+import logger
+from datetime import datetime
+from db_manager import execute_query, execute_query_fetch, copy_rows, commit, rollback
+
+logger.logger.info("[screening_list_import] : Menu initiation")
+
+# ✅ Target table / name column per screening list
+LIST_BLACKLISTED = ("TM_MST_BLACKLISTED", "VCH_BLACKLISTED_NAME")
+LIST_SUSPICIOUS = ("TM_MST_SUSPICIOUS", "VCH_SUSPICIOUS_NAME")
+
+MAX_NAME_LENGTH = 255
+_HAS_ALNUM = re.compile(r"\w")
+
+
+def read_names(file_path):
+    """
+    Stream the first column of the workbook (header row skipped) in read-only mode.
+    Returns (unique names in file order, duplicates within the file, invalid entries).
+    """
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    names = {}
+    duplicates = 0
+    invalid = 0
+    try:
+        ws = wb.active
+        for row in ws.iter_rows(min_row=2, max_col=1, values_only=True):
+            value = row[0] if row else None
+            if value is None or not str(value).strip():
+                continue  # blank line
+
+            name = " ".join(str(value).split())  # trim and collapse inner blanks
+            if len(name) > MAX_NAME_LENGTH or not _HAS_ALNUM.search(name):
+                invalid += 1
+                continue
+
+            key = name.lower()
+            if key in names:
+                duplicates += 1
+            else:
+                names[key] = name
+    finally:
+        wb.close()
+
+    return list(names.values()), duplicates, invalid
+
+
+def bulk_import(file_path, target, created_by=1):
+    """
+    Import a name list: read → normalize/deduplicate → COPY into a staging table →
+    single INSERT ... ON CONFLICT DO NOTHING into the target list.
+    Returns {"inserted", "duplicates", "invalid", "names"} where names are the newly inserted ones.
+    """
+    table, column = target
+    names, duplicates, invalid = read_names(file_path)
+    if not names:
+        return {"inserted": 0, "duplicates": duplicates, "invalid": invalid, "names": []}
+
+    conn = None
+    try:
+        conn = execute_query("CREATE TEMP TABLE TM_STG_SCREENING_NAME (VCH_NAME VARCHAR(255)) ON COMMIT DROP", conn=conn)
+        conn = copy_rows("TM_STG_SCREENING_NAME", ["VCH_NAME"], [(n,) for n in names], conn)
+
+        merge_query = f"""
+            INSERT INTO {table} (
+                {column}, VCH_REMARK_1, VCH_REMARK_2,
+                CHR_ACTIVE_IND, NUM_CREATED_BY, DTT_CREATED_AT
+            )
+            SELECT s.VCH_NAME, '', '', 'Y', %s, %s
+            FROM TM_STG_SCREENING_NAME s
+            ON CONFLICT DO NOTHING
+            RETURNING {column}
+        """
+        inserted_rows, conn = execute_query_fetch(merge_query, (created_by, datetime.now()), conn)
+        commit(conn)
+    except Exception:
+        rollback(conn)
+        raise
+
+    inserted = [row[0] for row in inserted_rows]
+    duplicates += len(names) - len(inserted)  # already in the list
+    logger.logger.info(f"[screening_list_import] : ✅ {table} import: {len(inserted)} inserted, {duplicates} duplicate(s), {invalid} invalid")
+    return {"inserted": len(inserted), "duplicates": duplicates, "invalid": invalid, "names": inserted}
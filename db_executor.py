@@ -0,0 +1,71 @@
+# flake8: noqa: E501
+
+# db_executor.py
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+import logger
+from db_manager import executionWithRs_query
+from master_data_cache import cached_query
+
+logger.logger.info("[db_executor] : Menu initiation")
+
+# ✅ Kept below the connection pool size (maxconn=10) so UI queries never starve the pool
+MAX_WORKERS = 4
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="TransMatchDB")
+
+
+def _deliver(widget, callback, *args):
+    """Run callback on the Tk thread, skipping it if the window has been closed meanwhile"""
+    def _run():
+        try:
+            if not widget.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        callback(*args)
+
+    try:
+        widget.after(0, _run)
+    except (tk.TclError, RuntimeError) as e:
+        logger.logger.info(f"[db_executor] : Result dropped, window no longer available ({e})")
+
+
+def submit(widget, func, *args, on_success=None, on_error=None, **kwargs):
+    """
+    Run func(*args, **kwargs) on the DB worker pool and return its Future.
+    on_success(result) / on_error(exception) are invoked on the Tk thread of widget via after().
+    """
+    future = _executor.submit(func, *args, **kwargs)
+
+    def _done(f):
+        try:
+            result = f.result()
+        except Exception as e:
+            logger.logger.exception(f"[db_executor][Exception] : {getattr(func, '__name__', func)} : {e}")
+            if on_error:
+                _deliver(widget, on_error, e)
+            return
+        if on_success:
+            _deliver(widget, on_success, result)
+
+    future.add_done_callback(_done)
+    return future
+
+
+def run_query(widget, query, params=None, on_success=None, on_error=None):
+    """Background executionWithRs_query; on_success receives the rows ([] when none or on SQL error)"""
+    return submit(widget, lambda: executionWithRs_query(query, params) or [], on_success=on_success, on_error=on_error)
+
+
+def fill_combobox(widget, combobox, group, query, params=None, leading=()):
+    """Load combobox values (first column) through the master-data cache without blocking the UI"""
+    def apply(rows):
+        combobox['values'] = list(leading) + [row[0] for row in rows or []]
+
+    return submit(widget, cached_query, group, query, params, on_success=apply)
+
+
+def shutdown(wait=False):
+    """Stop accepting new work on the DB worker pool"""
+    _executor.shutdown(wait=wait)
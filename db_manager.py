@@ -5,11 +5,22 @@
 
 
 import psycopg2
-from psycopg2 import pool
+from psycopg2 import pool, extensions, extras, errors
 import bcrypt
+import io
 import os
+import re
 import sys
+import csv
+import json
+import time
+import zlib
+import bisect
+import atexit
+import threading
 import logger
+from collections import OrderedDict
+from contextlib import contextmanager
 from dotenv import load_dotenv
 from datetime import datetime, date
 
@@ -33,10 +44,27 @@ load_dotenv(dotenv_path=env_path)
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# ✅ Queries slower than this (milliseconds) are logged with their SQL
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
 
-# ✅ Create a connection pool
+# ✅ Upper bounds (milliseconds) of the per-query-name latency histogram buckets
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# ✅ PREPAREd statements kept per session; the least recently used one is DEALLOCATEd beyond this
+MAX_PREPARED_STATEMENTS = int(os.getenv("MAX_PREPARED_STATEMENTS", "50"))
+
+
+class TransMatchConnection(extensions.connection):
+    """Pooled connection that remembers which named statements are PREPAREd on its session (least recently used first)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = OrderedDict()
+
+
+# ✅ Create a connection pool (threaded: screens query from the DB executor workers)
 try:
-    db_pool = pool.SimpleConnectionPool(
+    db_pool = pool.ThreadedConnectionPool(
         minconn=1,  # Minimum 1 connection open
         maxconn=10,  # Maximum 10 connections allowed
         # dsn=DATABASE_URL
@@ -44,7 +72,8 @@ try:
         password=os.getenv("password"),
         host=os.getenv("host"),
         port=os.getenv("port"),
-        dbname=os.getenv("dbname")
+        dbname=os.getenv("dbname"),
+        connection_factory=TransMatchConnection
     )
 
     logger.logger.info("[db_manager] : ✅ Database connection pool created successfully.")
@@ -67,12 +96,164 @@ def connect_db():
 
 
 def release_connection(conn):
-    """Return the connection to the pool"""
+    """Return the connection to the pool (an open transaction is rolled back by the pool)"""
     if db_pool and conn:
         db_pool.putconn(conn)
 
 
-def executionWithRs_query(query, params=None):
+# ==========================================================
+# Query timing and named (prepared) statements
+# ==========================================================
+_stats_lock = threading.Lock()
+_query_stats = {}
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s|%s|%%")
+_TABLE_REF = re.compile(r"\b(?:FROM|INTO|UPDATE)\s+([A-Za-z_][\w.]*)", re.IGNORECASE)
+
+
+def _query_name(query):
+    """Default statement name for timing, e.g. 'SELECT TM_MST_BANK'"""
+    tokens = query.split()
+    verb = tokens[0].upper() if tokens else "UNKNOWN"
+    table = _TABLE_REF.search(query)
+    return f"{verb} {table.group(1).upper()}" if table else verb
+
+
+def _record_timing(name, elapsed_ms, query):
+    with _stats_lock:
+        stat = _query_stats.get(name)
+        if stat is None:
+            stat = _query_stats[name] = {
+                "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "buckets": [0] * (len(HISTOGRAM_BUCKETS_MS) + 1),
+                "sql": " ".join(query.split())[:1000]
+            }
+        stat["count"] += 1
+        stat["total_ms"] += elapsed_ms
+        stat["max_ms"] = max(stat["max_ms"], elapsed_ms)
+        stat["buckets"][bisect.bisect_left(HISTOGRAM_BUCKETS_MS, elapsed_ms)] += 1
+
+    if elapsed_ms >= SLOW_QUERY_MS:
+        logger.logger.warning(f"[db_manager][SLOW QUERY] : {name} took {elapsed_ms:.1f} ms => {' '.join(query.split())[:1000]}")
+
+
+@contextmanager
+def _timed(name, query):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record_timing(name or _query_name(query), (time.perf_counter() - start) * 1000, query)
+
+
+def _to_prepared_sql(query):
+    """Convert psycopg2 placeholders (%s / %(key)s) into PREPARE placeholders ($1..$n)"""
+    keys = []
+    positional = [0]
+
+    def repl(match):
+        token = match.group(0)
+        if token == "%%":
+            return "%"
+        if token == "%s":
+            positional[0] += 1
+            return f"${positional[0]}"
+        if match.group(1) not in keys:
+            keys.append(match.group(1))
+        return f"${keys.index(match.group(1)) + 1}"
+
+    return _PLACEHOLDER.sub(repl, query), keys
+
+
+def _session_holds(cursor, stmt):
+    cursor.execute("SELECT 1 FROM pg_prepared_statements WHERE name = %s", (stmt,))
+    return cursor.fetchone() is not None
+
+
+def _execute(cursor, query, params, name, prepared):
+    """
+    Execute on cursor, timed under name; prepared=True uses a per-session PREPAREd statement.
+    A session keeps at most MAX_PREPARED_STATEMENTS of them (e.g. one per report filter variant),
+    the least recently used is DEALLOCATEd to make room.
+    """
+    prepared_set = getattr(cursor.connection, "prepared_statements", None)
+    if not prepared or prepared_set is None:
+        with _timed(name, query):
+            cursor.execute(query, params or ())
+        return
+
+    # Statement name includes a checksum so dynamic SQL (e.g. report filters) gets one plan per variant
+    slug = re.sub(r"\W+", "_", (name or _query_name(query)).lower())[:40]
+    stmt = f"tm_{slug}_{zlib.crc32(query.encode('utf-8')):08x}"
+    sql, keys = _to_prepared_sql(query)
+    values = [params[k] for k in keys] if keys else list(params or ())
+
+    with _timed(name, query):
+        if stmt in prepared_set:
+            prepared_set.move_to_end(stmt)
+        else:
+            while len(prepared_set) >= MAX_PREPARED_STATEMENTS:
+                evicted, _ = prepared_set.popitem(last=False)
+                if _session_holds(cursor, evicted):  # ✅ DEALLOCATE of an unknown name would abort the transaction
+                    cursor.execute(f"DEALLOCATE {evicted}")
+            # ✅ PREPARE is not undone by a rollback: the session may already hold the statement
+            #    (e.g. prepared before an error in the same transaction), only PREPARE what it lacks
+            if not _session_holds(cursor, stmt):
+                cursor.execute(f"PREPARE {stmt} AS {sql}")
+            prepared_set[stmt] = None
+        try:
+            if values:
+                cursor.execute(f"EXECUTE {stmt} ({', '.join(['%s'] * len(values))})", values)
+            else:
+                cursor.execute(f"EXECUTE {stmt}")
+        except errors.InvalidSqlStatementName:
+            prepared_set.pop(stmt, None)  # ✅ Session no longer holds it (DEALLOCATE / DISCARD ALL): re-PREPARE on next use
+            raise
+
+
+def get_query_stats():
+    """Snapshot of per-query-name timing: count, avg/max/total ms and latency histogram"""
+    labels = [f"<={b}ms" for b in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}ms"]
+    with _stats_lock:
+        return {
+            name: {
+                "count": st["count"],
+                "total_ms": round(st["total_ms"], 3),
+                "avg_ms": round(st["total_ms"] / st["count"], 3) if st["count"] else 0.0,
+                "max_ms": round(st["max_ms"], 3),
+                "histogram": dict(zip(labels, st["buckets"])),
+                "sql": st["sql"]
+            }
+            for name, st in sorted(_query_stats.items(), key=lambda kv: kv[1]["total_ms"], reverse=True)
+        }
+
+
+def export_query_stats(file_path=None):
+    """Write the timing snapshot as JSON (default: log folder) and return the file path"""
+    stats = get_query_stats()
+    if not stats:
+        return None
+    if not file_path:
+        file_path = os.path.join(logger.log_dir, f"TransMatch_query_stats_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    try:
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump({"slow_query_ms": SLOW_QUERY_MS, "generated_at": datetime.now().isoformat(), "queries": stats}, f, indent=2)
+        logger.logger.info(f"[db_manager] : Query statistics exported to {file_path}")
+        return file_path
+    except OSError as e:
+        logger.logger.exception(f"[db_manager] : ❌ Failed to export query statistics: {e}")
+        return None
+
+
+def reset_query_stats():
+    with _stats_lock:
+        _query_stats.clear()
+
+
+# ✅ Keep a per-run snapshot next to the application log
+atexit.register(export_query_stats)
+
+
+def executionWithRs_query(query, params=None, name=None, prepared=False):
     """Execute SELECT queries with proper exception handling"""
     conn = None
     cursor = None
@@ -87,7 +268,7 @@ def executionWithRs_query(query, params=None):
             # logger.logger.info(f"[db_manager][DEBUG] : executionWithRs_query - Executing SQL => {final_sql1_clean}")
 
             # Execute query
-            cursor.execute(query, params or ())
+            _execute(cursor, query, params, name, prepared)
             results = cursor.fetchall()
             return results
 
@@ -103,11 +284,10 @@ def executionWithRs_query(query, params=None):
         if cursor:
             cursor.close()
         if conn:
-            conn.close()
-            release_connection(conn)
+            release_connection(conn)  # ✅ Keep the session open in the pool for reuse
 
 
-def executionWithRs_queryWithCommit(query, params=None):
+def executionWithRs_queryWithCommit(query, params=None, name=None, prepared=False):
     """Execute SELECT queries with COMMIT and proper exception handling"""
     conn = None
     cursor = None
@@ -122,7 +302,7 @@ def executionWithRs_queryWithCommit(query, params=None):
             # logger.logger.info(f"[db_manager][DEBUG] : executionWithRs_queryWithCommit - Executing SQL => {final_sql_clean}")
 
             # Execute
-            cursor.execute(query, params or ())
+            _execute(cursor, query, params, name, prepared)
             results = cursor.fetchall()
 
             conn.commit()  # ✅ COMMIT only after success
@@ -144,11 +324,10 @@ def executionWithRs_queryWithCommit(query, params=None):
         if cursor:
             cursor.close()
         if conn:
-            conn.close()
-            release_connection(conn)
+            release_connection(conn)  # ✅ Keep the session open in the pool for reuse
 
 
-def execute_query(query, params=None, conn=None):
+def execute_query(query, params=None, conn=None, name=None, prepared=False):
     """Execute SELECT queries"""
     if conn is None:
         conn = connect_db()  # Only create connection if not passed
@@ -168,7 +347,7 @@ def execute_query(query, params=None, conn=None):
         # else:
         #     logger.logger.info(f"[db_manager] : Final SQL = {query}")
 
-        cursor.execute(query, params or ())
+        _execute(cursor, query, params, name, prepared)
         cursor.close()
         """commit and close the connection only each transaction had successfully inserted"""
         # conn.close()
@@ -177,11 +356,85 @@ def execute_query(query, params=None, conn=None):
     return conn
 
 
+def execute_query_fetch(query, params=None, conn=None, name=None, prepared=False):
+    """Execute SELECT inside an open transaction; returns (rows, conn) so callers can keep chaining"""
+    if conn is None:
+        conn = connect_db()  # Only create connection if not passed
+
+    rows = []
+    if conn:
+        cursor = conn.cursor()
+        _execute(cursor, query, params, name, prepared)
+        rows = cursor.fetchall()
+        cursor.close()
+    return rows, conn
+
+
+def copy_rows(table, columns, rows, conn=None):
+    """COPY rows (sequence of tuples) into table inside conn's transaction; returns conn for chaining"""
+    if conn is None:
+        conn = connect_db()  # Only create connection if not passed
+
+    if conn:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        cursor = conn.cursor()
+        with _timed(f"COPY {table.upper()}", sql):
+            cursor.copy_expert(sql, buffer)
+        cursor.close()
+    return conn
+
+
+def insert_rows(query, rows, conn=None, name=None, page_size=500):
+    """
+    Multi-row INSERT of rows (iterable of tuples) inside conn's transaction: query has a single
+    VALUES %s, sent once per page_size rows. Returns conn for chaining.
+    """
+    if conn is None:
+        conn = connect_db()  # Only create connection if not passed
+
+    if conn:
+        cursor = conn.cursor()
+        with _timed(name, query):
+            extras.execute_values(cursor, query, rows, page_size=page_size)
+        cursor.close()
+    return conn
+
+
+def stream_query(query, params=None, batch_size=2000, name=None):
+    """
+    Yield SELECT results in lists of at most batch_size rows through a server-side (named) cursor,
+    so that large result sets are never held in memory at once.
+    """
+    conn = connect_db()
+    if not conn:
+        return
+    cursor = None
+    try:
+        cursor = conn.cursor(name=f"tm_stream_{threading.get_ident()}_{int(time.time() * 1000)}")
+        cursor.itersize = batch_size
+        with _timed(name, query):  # ✅ DECLARE + first batch (where the server does the work)
+            cursor.execute(query, params or ())
+            rows = cursor.fetchmany(batch_size)
+        while rows:
+            yield rows
+            rows = cursor.fetchmany(batch_size)
+    finally:
+        if cursor:
+            try:
+                cursor.close()
+            except psycopg2.Error:
+                pass
+        conn.rollback()  # ✅ End the read transaction holding the cursor
+        release_connection(conn)
+
+
 def commit(conn):
     """Execute SELECT queries"""
     if conn:
         conn.commit()
-        conn.close()
         release_connection(conn)  # ✅ Return connection to the pool
     return None
 
@@ -190,7 +443,6 @@ def rollback(conn):
     """Execute SELECT queries"""
     if conn:
         conn.rollback()
-        conn.close()
         release_connection(conn)  # ✅ Return connection to the pool
     return None
 
@@ -8,6 +8,7 @@ import os
 import sys
 import TransMatch_main
 import logger
+import master_data_cache
 import dependency_manager
 
 logger.logger.info("[login_screen] : Login Landing Page initiation")
@@ -180,6 +181,9 @@ class LoginScreen:
                 "gb_user_name": result[0][3]
             }
             
+            # ✅ Preload dropdown master data in background while main menu loads
+            master_data_cache.warm_up_async()
+
             self.root.destroy()
             self.launch_main_app(global_info)
         else:
@@ -0,0 +1,107 @@
+# flake8: noqa: E501
+
+# master_data_cache.py
+import threading
+import time
+import logger
+from db_manager import executionWithRs_query
+
+logger.logger.info("[master_data_cache] : Menu initiation")
+
+# ✅ Default time-to-live (seconds) for cached master data
+DEFAULT_TTL = 300
+
+# ✅ Cache groups, used for invalidation after admin maintenance
+GROUP_BANK = "bank"
+GROUP_CUSTOMER = "customer"
+GROUP_DATA_ENTRY = "data_entry"
+GROUP_USER = "user"
+GROUP_ROLE = "role"
+GROUP_STATEMENT = "statement"
+
+# ✅ Shared dropdown queries (also preloaded by warm_up)
+SQL_BANK_NAMES = "SELECT VCH_BANK_NAME FROM TM_MST_BANK ORDER BY VCH_BANK_NAME"
+SQL_ACTIVE_BANK_NAMES = "SELECT DISTINCT VCH_BANK_NAME FROM TM_MST_BANK WHERE CHR_ACTIVE_IND = 'Y' ORDER BY VCH_BANK_NAME"
+SQL_CUSTOMER_CODES = "SELECT DISTINCT VCH_CUST_CODE FROM TM_MST_CUSTOMER ORDER BY VCH_CUST_CODE"
+SQL_ACTIVE_GROUPS = "SELECT NUM_GROUP_ID, VCH_GROUP_NAME FROM TM_MST_GROUP WHERE CHR_ACTIVE_IND = 'Y' ORDER BY VCH_GROUP_NAME"
+SQL_ACTIVE_ROLES = "SELECT VCH_ROLE_NAME FROM TM_MST_ROLE WHERE CHR_ACTIVE_IND = 'Y' ORDER BY VCH_ROLE_NAME"
+SQL_ACTIVE_USERS = "SELECT NUM_USER_ID, VCH_USER_NAME FROM TM_MST_USER WHERE CHR_ACTIVE_IND = 'Y' ORDER BY VCH_USER_NAME"
+
+# ✅ Statement-level dropdowns read the small TM_TRN_STATEMENT header table
+SQL_FILE_NAMES = "SELECT DISTINCT VCH_FILE_NAME FROM TM_TRN_STATEMENT WHERE CHR_ACTIVE_IND = 'Y' ORDER BY VCH_FILE_NAME"
+SQL_STATEMENT_BANK_NAMES = """
+    SELECT DISTINCT c.VCH_BANK_DISPLAY_NM FROM TM_TRN_STATEMENT s
+    INNER JOIN TM_MST_BANK c ON s.NUM_BANK_ID = c.NUM_BANK_ID
+    WHERE s.CHR_ACTIVE_IND = 'Y' ORDER BY c.VCH_BANK_DISPLAY_NM
+"""
+SQL_STATEMENT_AGENT_NAMES = """
+    SELECT DISTINCT d.VCH_USER_NAME FROM TM_TRN_STATEMENT s
+    INNER JOIN TM_MST_USER d ON s.NUM_USER_ID = d.NUM_USER_ID
+    WHERE s.CHR_ACTIVE_IND = 'Y' ORDER BY d.VCH_USER_NAME
+"""
+
+_WARM_UP_QUERIES = [
+    (GROUP_BANK, SQL_BANK_NAMES),
+    (GROUP_BANK, SQL_ACTIVE_BANK_NAMES),
+    (GROUP_STATEMENT, SQL_FILE_NAMES),
+    (GROUP_STATEMENT, SQL_STATEMENT_BANK_NAMES),
+    (GROUP_STATEMENT, SQL_STATEMENT_AGENT_NAMES),
+    (GROUP_USER, SQL_ACTIVE_USERS),
+    (GROUP_CUSTOMER, SQL_CUSTOMER_CODES),
+    (GROUP_ROLE, SQL_ACTIVE_GROUPS),
+    (GROUP_ROLE, SQL_ACTIVE_ROLES),
+]
+
+_cache = {}  # (group, query, params) -> (expires_at, rows)
+_lock = threading.Lock()
+
+
+def cached_query(group, query, params=None, ttl=DEFAULT_TTL, name=None):
+    """Execute SELECT through the master-data cache, keyed by group, query and params.
+    Named lookups run as prepared statements on a cache miss."""
+    key = (group, " ".join(query.split()), tuple(params) if params else ())
+    now = time.monotonic()
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+
+    rows = executionWithRs_query(query, params, name=name, prepared=name is not None)
+
+    # ✅ Only cache successful, non-empty results, so that "not found" lookups
+    #    (e.g. before get_or_create inserts a new record) are never remembered
+    if rows:
+        with _lock:
+            _cache[key] = (now + ttl, rows)
+    return rows
+
+
+def invalidate(*groups):
+    """Drop cached entries of the given groups (all groups if none given)"""
+    with _lock:
+        if not groups:
+            _cache.clear()
+            logger.logger.info("[master_data_cache] : All cached master data invalidated")
+            return
+        for key in [k for k in _cache if k[0] in groups]:
+            del _cache[key]
+    logger.logger.info(f"[master_data_cache] : Cached master data invalidated for {', '.join(groups)}")
+
+
+def warm_up():
+    """Preload the shared dropdown lists into the cache"""
+    logger.logger.info("[master_data_cache] : Warming up master data cache")
+    for group, query in _WARM_UP_QUERIES:
+        try:
+            cached_query(group, query)
+        except Exception as e:
+            logger.logger.exception(f"[master_data_cache] : ❌ Warm-up failed for {group} : {e}")
+    logger.logger.info("[master_data_cache] : ✅ Master data cache warm-up completed")
+
+
+def warm_up_async():
+    """Run warm_up on a daemon thread so the UI is not blocked"""
+    thread = threading.Thread(target=warm_up, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,170 @@
+# flake8: noqa: E501
+
+# daily_summary.py
+import logger
+from db_manager import executionWithRs_query, execute_query, execute_query_fetch, commit, rollback
+
+logger.logger.info("[daily_summary] : Menu initiation")
+
+# ✅ Summary group of a transaction (alias a = TM_TRN_TRANSACTION), same order as the key columns
+SQL_SUMMARY_KEY = "a.DTT_TRANSACTION_DATE::date, a.DTT_CREATED_AT::date, a.NUM_CUST_ID, a.NUM_BANK_ID, a.NUM_USER_ID"
+
+# ✅ Aggregate of the transactions selected by {join_sql} / {where_sql}
+SQL_AGGREGATE = f"""
+    INSERT INTO TM_TRN_DAILY_SUMMARY (
+        DTT_TRN_DATE, DTT_ENTRY_DATE, NUM_CUST_ID, NUM_BANK_ID, NUM_USER_ID,
+        NUM_TRN_COUNT, NUM_CREDIT_COUNT, NUM_DEBIT_COUNT, NUM_CREDIT_TOTAL, NUM_DEBIT_TOTAL,
+        NUM_PRINTED_COUNT, NUM_BLACKLIST_HIT_COUNT, NUM_SUSPICIOUS_HIT_COUNT
+    )
+    SELECT {SQL_SUMMARY_KEY},
+           COUNT(*),
+           COUNT(*) FILTER (WHERE COALESCE(a.NUM_AMOUNT_CREDIT, 0) <> 0),
+           COUNT(*) FILTER (WHERE COALESCE(a.NUM_AMOUNT_DEBIT, 0) <> 0),
+           COALESCE(SUM(a.NUM_AMOUNT_CREDIT), 0),
+           COALESCE(SUM(a.NUM_AMOUNT_DEBIT), 0),
+           COUNT(*) FILTER (WHERE a.CHR_PRINTED_IND = 'Y'),
+           COUNT(*) FILTER (WHERE h.blacklisted),
+           COUNT(*) FILTER (WHERE h.suspicious)
+    FROM TM_TRN_TRANSACTION a
+    {{join_sql}}
+    LEFT JOIN LATERAL (
+        SELECT bool_or(x.VCH_MATCH_TYPE IN ('full', 'partial')) AS blacklisted,
+               bool_or(x.VCH_MATCH_TYPE = 'suspicious')        AS suspicious
+        FROM TM_TRN_SCREENING_HIT x
+        WHERE x.NUM_TRN_ID = a.NUM_TRN_ID
+    ) h ON TRUE
+    WHERE a.DTT_TRANSACTION_DATE IS NOT NULL AND a.DTT_CREATED_AT IS NOT NULL
+      AND a.NUM_CUST_ID IS NOT NULL AND a.NUM_BANK_ID IS NOT NULL AND a.NUM_USER_ID IS NOT NULL
+    GROUP BY {SQL_SUMMARY_KEY}
+"""
+
+# ✅ Groups to refresh, passed as parallel arrays
+SQL_KEYS = "unnest(%s::date[], %s::date[], %s::integer[], %s::integer[], %s::integer[]) k(trn_date, entry_date, cust_id, bank_id, user_id)"
+
+SQL_DELETE_GROUPS = f"""
+    DELETE FROM TM_TRN_DAILY_SUMMARY s
+    USING {SQL_KEYS}
+    WHERE s.DTT_TRN_DATE = k.trn_date AND s.DTT_ENTRY_DATE = k.entry_date
+      AND s.NUM_CUST_ID = k.cust_id AND s.NUM_BANK_ID = k.bank_id AND s.NUM_USER_ID = k.user_id
+"""
+
+# Range on the transaction date so IX_TM_TRN_TRANSACTION_TRN_DATE is used
+SQL_INSERT_GROUPS = SQL_AGGREGATE.format(join_sql=f"""
+    INNER JOIN {SQL_KEYS}
+        ON a.DTT_TRANSACTION_DATE >= k.trn_date AND a.DTT_TRANSACTION_DATE < k.trn_date + 1
+       AND a.DTT_CREATED_AT::date = k.entry_date
+       AND a.NUM_CUST_ID = k.cust_id AND a.NUM_BANK_ID = k.bank_id AND a.NUM_USER_ID = k.user_id
+""")
+
+
+def summary_keys(where_sql, params=(), conn=None):
+    """Summary groups of the transactions selected by where_sql (alias a). Returns (keys, conn)."""
+    rows, conn = execute_query_fetch(f"SELECT DISTINCT {SQL_SUMMARY_KEY} FROM TM_TRN_TRANSACTION a WHERE {where_sql}", params, conn)
+    return [tuple(row) for row in rows], conn
+
+
+def refresh_groups(keys, conn=None):
+    """Recompute the given summary groups within conn's DB transaction (the caller commits)"""
+    keys = [k for k in set(keys) if None not in k]
+    if not keys:
+        return conn
+    arrays = tuple(list(column) for column in zip(*keys))
+    conn = execute_query(SQL_DELETE_GROUPS, arrays, conn, name="daily_summary_delete")
+    conn = execute_query(SQL_INSERT_GROUPS, arrays, conn, name="daily_summary_insert")
+    return conn
+
+
+def refresh_transactions(where_sql, params=(), conn=None, previous_keys=()):
+    """
+    Refresh the groups of the transactions selected by where_sql, plus previous_keys: the groups
+    those rows belonged to before an update or delete (see summary_keys). The caller commits.
+    """
+    keys, conn = summary_keys(where_sql, params, conn)
+    return refresh_groups(list(keys) + list(previous_keys), conn)
+
+
+def refresh_statement(stmt_id, conn=None, previous_keys=()):
+    """Refresh after a statement was ingested (called by save_transactions_to_db before commit)"""
+    return refresh_transactions("a.NUM_STMT_ID = %s", (stmt_id,), conn, previous_keys)
+
+
+def rebuild_all():
+    """Recompute the whole summary table (initial backfill / after a full re-screen)"""
+    conn = None
+    try:
+        conn = execute_query("DELETE FROM TM_TRN_DAILY_SUMMARY", conn=conn)
+        conn = execute_query(SQL_AGGREGATE.format(join_sql=""), conn=conn, name="daily_summary_rebuild")
+        commit(conn)
+    except Exception:
+        rollback(conn)
+        raise
+    logger.logger.info("[daily_summary] : ✅ Daily summary rebuilt")
+
+
+def fetch_agent_kpi(filters: dict):
+    """
+    KPI per agent from the summary table.
+    filters keys: entry_date_from / entry_date_to (date or None), agent_login_id, user_group,
+    user_role (str or None), printed_status ("All" | "Y" | "N").
+    """
+    where = ["1=1"]
+    params = []
+    if (df := filters.get("entry_date_from")):
+        where.append("s.DTT_ENTRY_DATE >= %s")
+        params.append(df)
+    if (dt := filters.get("entry_date_to")):
+        where.append("s.DTT_ENTRY_DATE <= %s")
+        params.append(dt)
+
+    sql = f"""
+        WITH agent_totals AS (
+            SELECT s.NUM_USER_ID,
+                   COUNT(DISTINCT s.NUM_CUST_ID)     AS customers,
+                   COUNT(DISTINCT s.NUM_BANK_ID)     AS banks,
+                   SUM(s.NUM_TRN_COUNT)              AS trn_count,
+                   SUM(s.NUM_CREDIT_TOTAL)           AS credit_total,
+                   SUM(s.NUM_DEBIT_TOTAL)            AS debit_total,
+                   SUM(s.NUM_BLACKLIST_HIT_COUNT)    AS blacklist_hits,
+                   SUM(s.NUM_SUSPICIOUS_HIT_COUNT)   AS suspicious_hits,
+                   SUM(s.NUM_PRINTED_COUNT)          AS printed_count
+            FROM TM_TRN_DAILY_SUMMARY s
+            WHERE {" AND ".join(where)}
+            GROUP BY s.NUM_USER_ID
+        )
+        SELECT usr.VCH_LOGIN_ID, usr.VCH_USER_NAME,
+               COALESCE(string_agg(DISTINCT grp.VCH_GROUP_NAME, ', '), ''),
+               COALESCE(string_agg(DISTINCT rol.VCH_ROLE_NAME, ', '), ''),
+               t.customers, t.banks, t.trn_count, t.credit_total, t.debit_total,
+               t.blacklist_hits, t.suspicious_hits, t.printed_count, t.trn_count - t.printed_count
+        FROM agent_totals t
+        INNER JOIN TM_MST_USER usr ON t.NUM_USER_ID = usr.NUM_USER_ID
+        LEFT JOIN TM_MST_USER_ASSIGNMENT ua ON usr.NUM_USER_ID = ua.NUM_USER_ID
+        LEFT JOIN TM_MST_GROUP grp ON ua.NUM_GROUP_ID = grp.NUM_GROUP_ID
+        LEFT JOIN TM_MST_ROLE rol ON ua.NUM_ROLE_ID = rol.NUM_ROLE_ID
+        WHERE 1=1
+    """
+    if (ag := filters.get("agent_login_id")):
+        sql += " AND usr.VCH_LOGIN_ID = %s"
+        params.append(ag)
+    if (ug := filters.get("user_group")):
+        sql += " AND grp.VCH_GROUP_NAME ILIKE %s"
+        params.append(f"%{ug}%")
+    if (ur := filters.get("user_role")):
+        sql += " AND rol.VCH_ROLE_NAME ILIKE %s"
+        params.append(f"%{ur}%")
+
+    sql += """
+        GROUP BY usr.VCH_LOGIN_ID, usr.VCH_USER_NAME, t.customers, t.banks, t.trn_count, t.credit_total,
+                 t.debit_total, t.blacklist_hits, t.suspicious_hits, t.printed_count
+    """
+    if (ps := filters.get("printed_status")) == "Y":
+        sql += " HAVING t.printed_count > 0"
+    elif ps == "N":
+        sql += " HAVING t.trn_count - t.printed_count > 0"
+    sql += " ORDER BY usr.VCH_USER_NAME"
+
+    return executionWithRs_query(sql, tuple(params), name="kpi_agent") or []
+
+
+if __name__ == "__main__":
+    rebuild_all()
@@ -1,69 +1,42 @@
 # flake8: noqa: E501
 
 import tkinter as tk
-import re
 import os
-import logger
 import threading
-from tkinter import ttk, messagebox, font as tkFont
+import logger
+from tkinter import ttk, messagebox, filedialog
 from tkcalendar import DateEntry
-from db_manager import executionWithRs_query
-from report.report_manager import ReportManager
+import db_executor
+from master_data_cache import GROUP_STATEMENT, SQL_FILE_NAMES, SQL_STATEMENT_BANK_NAMES, SQL_STATEMENT_AGENT_NAMES
+from report.report_manager import ReportManager, DEFAULT_ORDER
+from report import screening_engine, screening_lists
+from report.report_export import stream_export
 from collections import defaultdict
 from datetime import datetime, timedelta
 from openpyxl import Workbook
 from openpyxl.styles import Font
 from LoadingPopup import LoadingPopupClass
+from virtual_grid import VirtualGrid, PagedDataSource, ListDataSource
 
 
 logger.logger.info("[enquiryScreen] : Menu initiation")
 
+# ✅ Search results are read from the database one page at a time (sorted / filtered in SQL)
+RESULT_PAGE_SIZE = 500
 
-def is_keyword_matched(keyword_words, desc_words, min_words_per_block=2, max_gap_per_block=3):
-    found_positions = []
-    keyword_words = keyword_words.lower().strip()
-    desc_words = desc_words.lower().strip()
-
-    # First strict full phrase check
-    if keyword_words in desc_words:
-        return True
-
-    keyword_words = keyword_words.split()
-    desc_words = desc_words.split()
-
-    for kw in keyword_words:
-        if kw in desc_words:
-            pos = desc_words.index(kw)
-            found_positions.append((kw, pos))
-
-    if len(found_positions) == 0:
-        return False
-
-    # Sort by position
-    found_positions.sort(key=lambda x: x[1])
-
-    # Now check proximity block-wise
-    blocks = []
-    current_block = [found_positions[0]]
-
-    for i in range(1, len(found_positions)):
-        prev_word, prev_pos = found_positions[i-1]
-        curr_word, curr_pos = found_positions[i]
-
-        if curr_pos - prev_pos <= max_gap_per_block:
-            current_block.append((curr_word, curr_pos))
-        else:
-            blocks.append(current_block)
-            current_block = [(curr_word, curr_pos)]
-
-    blocks.append(current_block)
+# ✅ Row colour per stored screening hit (see report.screening_hits)
+MATCH_TAGS = {
+    screening_engine.MATCH_FULL: "redtext",          # Blacklist full match
+    screening_engine.MATCH_PARTIAL: "bluetext",      # Blacklist partial (word-based) match
+    screening_engine.MATCH_SUSPICIOUS: "purpletext",  # Suspicious full match
+    screening_engine.MATCH_FUZZY_BLACKLIST: "orangetext",   # Spelling variant, for review
+    screening_engine.MATCH_FUZZY_SUSPICIOUS: "orangetext",  # Spelling variant, for review
+}
 
-    # Evaluate blocks
-    for block in blocks:
-        if len(block) >= min_words_per_block:
-            return True  # Accept if any block has enough words close
 
-    return False
+def _cell(value):
+    """Report value as the text the summaries / exports work with"""
+    return "" if value is None else str(value)
 
 
 class EnquiryScreen:
@@ -128,10 +101,12 @@ class EnquiryScreen:
         self.enquiry_window.grab_set()  # Prevent interaction with the main window
         self.enquiry_window.focus_force()  # Bring the focus to this window
 
-        self.selection_states = []  # Stores ✓/✗ state per row
         self.next_summary_number = 1  # To avoid duplicated trn summ running number
         self.report_mgr = ReportManager()
         self.all_selected = True  # Default: tick all
+        self.toggled_ids = set()  # Transactions whose tick differs from all_selected
+        self.current_filters = None  # Filters of the results on screen (None = not from a search)
+        self.sort_order = DEFAULT_ORDER  # (report column index, descending)
 
         self.create_enquiry_header()
         self.create_enquiry_filters()
@@ -225,22 +200,16 @@ class EnquiryScreen:
             row=0, column=6, padx=10, pady=5, sticky='w')
         self.bank_dropdown = ttk.Combobox(
             filter_frame_inner, textvariable=self.bank_name_var, state="readonly")
-        bank_data = executionWithRs_query(
-            "SELECT VCH_BANK_NAME FROM TM_MST_BANK ORDER BY VCH_BANK_NAME")
-        bank_names = ["All"] + [row[0]
-                                for row in bank_data] if bank_data else ["All"]
-        self.bank_dropdown['values'] = bank_names
+        self.bank_dropdown['values'] = ["All"]
+        db_executor.fill_combobox(self.enquiry_window, self.bank_dropdown, GROUP_STATEMENT, SQL_STATEMENT_BANK_NAMES, leading=["All"])
         self.bank_name_var.set("All")
         self.bank_dropdown.grid(row=0, column=7, padx=10, pady=5, sticky='e')
 
         # Row 1 ────────────────────────────────────────────────────
         tk.Label(filter_frame_inner, text="File Name:", bg="white").grid(row=1, column=0, padx=10, pady=5, sticky='w')
         self.file_dropdown = ttk.Combobox(filter_frame_inner, textvariable=self.file_name_var, state="readonly")
-        file_data = executionWithRs_query(
-            "SELECT DISTINCT VCH_FILE_NAME FROM TM_TRN_TRANSACTION ORDER BY VCH_FILE_NAME")
-        file_names = ["All"] + [row[0]
-                                for row in file_data] if file_data else ["All"]
-        self.file_dropdown['values'] = file_names
+        self.file_dropdown['values'] = ["All"]
+        db_executor.fill_combobox(self.enquiry_window, self.file_dropdown, GROUP_STATEMENT, SQL_FILE_NAMES, leading=["All"])
         self.file_name_var.set("All")
         self.file_dropdown.grid(row=1, column=1, padx=10, pady=5, sticky='w')
 
@@ -263,11 +232,8 @@ class EnquiryScreen:
 
         tk.Label(filter_frame_inner, text="Agent Name:", bg="white").grid(row=1, column=6, padx=10, pady=5, sticky='w')
         self.agent_dropdown = ttk.Combobox(filter_frame_inner, textvariable=self.agent_name_var, state="readonly")
-        agent_data = executionWithRs_query(
-            "SELECT VCH_USER_NAME FROM TM_MST_USER ORDER BY VCH_USER_NAME")
-        agent_names = ["All"] + [row[0]
-                                 for row in agent_data] if agent_data else ["All"]
-        self.agent_dropdown['values'] = agent_names
+        self.agent_dropdown['values'] = ["All"]
+        db_executor.fill_combobox(self.enquiry_window, self.agent_dropdown, GROUP_STATEMENT, SQL_STATEMENT_AGENT_NAMES, leading=["All"])
         self.agent_name_var.set("All")
         self.agent_dropdown.grid(row=1, column=7, padx=10, pady=5, sticky='w')
 
@@ -371,14 +337,6 @@ class EnquiryScreen:
             bg="#f0f0f5"
         ).pack(side=tk.LEFT)
 
-        # ✅ Fixed height frame to contain the table (approx. 10 rows)
-        results_frame = tk.Frame(self.scrollable_frame)
-        results_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=5)
-
-        # ✅ Scrollbar
-        scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
         # ✅ Treeview showing max 10 rows visually
         columns = (
             "✓/✗", "Customer Code", "Customer Name", "Transaction Description",
@@ -386,14 +344,41 @@ class EnquiryScreen:
             "Transaction Date", "Data Entry Date", "Printed Status",
             "Agent Name", "File Name"
         )
+        # ✅ Stored screening result (TM_TRN_SCREENING_HIT), carried with each row but not displayed
+        screening_columns = ("Screening Match", "Screening Keyword", "Export Category", "Export Keyword", "Transaction ID")
+
+        # ✅ Quick filter on one column, applied in SQL to the current search
+        self.quick_filter_columns = columns[1:]
+        quick_filter_frame = tk.Frame(results_header, bg="#f0f0f5")
+        quick_filter_frame.pack(side=tk.RIGHT)
+
+        tk.Label(quick_filter_frame, text="Quick Filter:", bg="#f0f0f5").pack(side=tk.LEFT, padx=(0, 5))
+        self.quick_filter_col_var = tk.StringVar(value="Customer Name")
+        ttk.Combobox(quick_filter_frame, textvariable=self.quick_filter_col_var, values=self.quick_filter_columns,
+                     state="readonly", width=22).pack(side=tk.LEFT, padx=(0, 5))
+        self.quick_filter_var = tk.StringVar()
+        quick_filter_entry = ttk.Entry(quick_filter_frame, textvariable=self.quick_filter_var, width=25)
+        quick_filter_entry.pack(side=tk.LEFT, padx=(0, 5))
+        quick_filter_entry.bind("<Return>", lambda e: self.apply_quick_filter())
+        ttk.Button(quick_filter_frame, text="Filter", command=self.apply_quick_filter).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(quick_filter_frame, text="Clear", command=self.clear_quick_filter).pack(side=tk.LEFT)
+
+        # ✅ Fixed height frame to contain the table (approx. 10 rows)
+        results_frame = tk.Frame(self.scrollable_frame)
+        results_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=5)
 
-        self.results_table = ttk.Treeview(
+        # ✅ Only the visible rows are in the Treeview; ✓/✗ is derived from toggled_ids
+        self.results_grid = VirtualGrid(
             results_frame,
-            columns=columns,
-            show="headings",
+            columns + screening_columns,
             height=10,
-            yscrollcommand=scrollbar.set
+            displaycolumns=columns,
+            display=self._display_row,
+            row_tags=self._row_tags,
+            sortable=False
         )
+        self.results_grid.pack(fill=tk.BOTH, expand=True)
+        self.results_table = self.results_grid.tree
 
         style = ttk.Style()
         style.configure("Treeview", rowheight=20)
@@ -403,16 +388,13 @@ class EnquiryScreen:
         self.results_table.tag_configure("redtext", background="#f5f5f5", foreground="red", font=("Helvetica", 10, "bold"))
         self.results_table.tag_configure("purpletext", background="#f5f5f5", foreground="purple")
         self.results_table.tag_configure("bluetext", background="#f5f5f5", foreground="blue")
-
-        # ✅ Configure scrollbar command
-        scrollbar.config(command=self.results_table.yview)
+        self.results_table.tag_configure("orangetext", background="#f5f5f5", foreground="#d2691e")
 
         for col in self.results_table["columns"]:
             self.results_table.heading(col, text=col)
             self.results_table.column(
                 col, width=10 if col == "✓/✗" else 80, anchor="w")
 
-        self.results_table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         # Row Count Label
         self.result_count_label = tk.Label(
             self.scrollable_frame,
@@ -454,8 +436,7 @@ class EnquiryScreen:
                     col,
                     text=col,
                     anchor="center",
-                    command=lambda _col=col: self.sort_treeview_column(
-                        self.results_table, _col, False)
+                    command=lambda _col=col: self.sort_results(_col)
                 )
             self.results_table.column(
                 col, anchor=anchor_style, width=120 if col != "✓/✗" else 60)
@@ -523,6 +504,9 @@ class EnquiryScreen:
         ttk.Button(export_btn_frame, text="Export Excel", command=self.export_excel)\
             .pack(side=tk.RIGHT, padx=(5, 0))
 
+        ttk.Button(export_btn_frame, text="Export All Results", command=self.export_all_results)\
+            .pack(side=tk.RIGHT, padx=(5, 0))
+
     def create_enquiry_footer(self):
         logger.logger.info("[enquiryScreen] : Footer - Deploying menu footer section")
 
@@ -538,33 +522,37 @@ class EnquiryScreen:
         if region == "cell":
             row_id = self.results_table.identify_row(event.y)
             col = self.results_table.identify_column(event.x)
-            if col == "#1":  # only toggle if clicking the 'Select' column
-                current = self.results_table.item(row_id)["values"]
-                index = self.results_table.index(row_id)
-                new_value = "✗" if current[0] == "✓" else "✓"
-                self.selection_states[index] = (new_value == "✓")
-                self.results_table.item(
-                    row_id, values=[new_value] + current[1:])
+            if col == "#1" and row_id:  # only toggle if clicking the 'Select' column
+                row = self.results_grid.row(self.results_grid.index_of(row_id))
+                if row is None:
+                    return  # placeholder, its page is still loading
+                self.toggled_ids ^= {row[-1]}  # keyed by transaction id, survives paging / sorting
+                self.results_grid.render()
+
+    def _is_ticked(self, row):
+        return (row[-1] in self.toggled_ids) != self.all_selected
+
+    def _display_row(self, row, index):
+        return ["✓" if self._is_ticked(row) else "✗", *row]
+
+    def _row_tags(self, values, index):
+        match_tag = MATCH_TAGS.get(values[13])  # "Screening Match"
+        return (match_tag or ("evenrow" if index % 2 == 0 else "oddrow"),)
 
     def search_enquiry(self):
         logger.logger.info("[enquiryScreen] : Executing the SEARCH operation, extract all transaction filter by parameter(s)")
         loading = LoadingPopupClass(
             self.enquiry_window, message="Searching... Please wait.")
 
-        def threaded_search():
-            try:
-                self.perform_search_logic()
-            finally:
-                loading.close()
-
-        threading.Thread(target=threaded_search).start()
-
-    def perform_search_logic(self):
-        # 1) clear existing
-        self.results_table.delete(*self.results_table.get_children())
-        self.selection_states.clear()
+        try:
+            self.perform_search_logic(popup=loading)
+        except Exception as e:
+            loading.close()
+            logger.logger.exception(f"[enquiryScreen] : Error during search: {str(e)}")
+            messagebox.showerror("Error", f"An error occurred during search:\n{str(e)}")
 
-        # 2) collect filter values
+    def collect_filters(self):
+        """Current search criteria as the filters dict understood by ReportManager"""
         filters = {
             "customer_code":       self.customer_code_var.get(),
             "customer_name":       self.customer_name_var.get().strip(),
@@ -595,47 +583,135 @@ class EnquiryScreen:
             filters["trx_date_from"] = None
             filters["trx_date_to"] = None
 
-        # 3) fetch real rows
-        rows = self.report_mgr.fetch_transactions(filters)
+        return filters
 
-        # 4) populate with check‐boxes and zebra tags
-        if rows:
-            for idx, row in enumerate(rows):
-                tag = "evenrow" if idx % 2 == 0 else "oddrow"
-                self.results_table.insert(
-                    "", tk.END, values=["✓", *row], tags=(tag,))
-                self.selection_states.append(True)
+    def perform_search_logic(self, popup=None):
+        # 1) collect filter values (a new search drops the quick filter)
+        self.quick_filter_var.set("")
+        self.current_filters = self.collect_filters()
+        self.sort_order = DEFAULT_ORDER
 
-        # 5) Filter for blacklisted transaction
-        self.filter_blacklisted()
+        # 2) count and first page on the DB worker, further pages as the grid scrolls
+        self.load_results(popup=popup)
 
-        # 6) show the total number of rows 
-        total_rows = len(self.results_table.get_children())
-        self.result_count_label.config(text=f"Total Rows: {total_rows}")
+    def load_results(self, popup=None, total=None):
+        """(Re)load the current search with the current sort order; total is reused when only the order changed"""
+        filters = dict(self.current_filters)
+        order = self.sort_order
+        self.all_selected = True
+        self.toggled_ids.clear()
+
+        def fetch():
+            count = total if total is not None else self.report_mgr.count_transactions(filters)
+            return count, self.report_mgr.fetch_transactions(filters, order, RESULT_PAGE_SIZE, 0)
+
+        def update_ui(result):
+            try:
+                count, first_page = result
+                # ✅ Further pages are fetched on the DB worker once the grid attaches the source
+                source = PagedDataSource(
+                    count=lambda: count,
+                    fetch_page=lambda offset, limit, page_order: self.report_mgr.fetch_transactions(filters, page_order, limit, offset),
+                    page_size=RESULT_PAGE_SIZE,
+                    total=count,
+                    first_page=first_page,
+                    order=order
+                )
+                self.results_grid.set_source(source, autofit=False)
+                self.result_count_label.config(text=f"Total Rows: {count}")
+            finally:
+                if popup:
+                    popup.close()
+
+        def on_error(e):
+            if popup:
+                popup.close()
+            messagebox.showerror("Error", f"An error occurred during search:\n{str(e)}")
+
+        db_executor.submit(self.enquiry_window, fetch, on_success=update_ui, on_error=on_error)
 
     def clear_enquiry_filters(self):
         logger.logger.info("[enquiryScreen] : Executing the RESET operation, for searching criteria layer only")
 
-        self.results_table.delete(*self.results_table.get_children())
-        self.selection_states.clear()
-        self.auto_fit_columns(self.results_table)
+        self.current_filters = None
+        self.quick_filter_var.set("")
+        self.results_grid.set_rows([])
+        self.result_count_label.config(text="")
+
+    def apply_quick_filter(self):
+        if self.current_filters is None:
+            messagebox.showwarning("No Search", "Please search first, the quick filter narrows the search results.")
+            return
+
+        filters = dict(self.current_filters)
+        text = self.quick_filter_var.get().strip()
+        if text:
+            column_index = self.quick_filter_columns.index(self.quick_filter_col_var.get())
+            filters["quick_filter"] = (column_index, text)
+        else:
+            filters.pop("quick_filter", None)
+        self.current_filters = filters
+
+        loading = LoadingPopupClass(self.enquiry_window, message="Filtering... Please wait.")
+        self.load_results(popup=loading)
+
+    def clear_quick_filter(self):
+        self.quick_filter_var.set("")
+        if self.current_filters and "quick_filter" in self.current_filters:
+            self.apply_quick_filter()
+
+    def sort_results(self, col):
+        """Header click: ORDER BY in SQL for search results, in memory for rows restored from a summary"""
+        if not len(self.results_grid):
+            return
+        column_index = self.results_grid.columns.index(col) - 1  # skip ✓/✗
+        current_index, descending = self.sort_order
+        descending = not descending if current_index == column_index else False
+        self.sort_order = (column_index, descending)
+
+        if isinstance(self.results_grid.source, ListDataSource):
+            self.results_grid.source.sort(column_index, descending)
+            self.results_grid.refresh(reset=True)
+            return
+
+        loading = LoadingPopupClass(self.enquiry_window, message="Sorting... Please wait.")
+        self.load_results(popup=loading, total=len(self.results_grid))
 
     def add_summary(self):
         logger.logger.info("[enquiryScreen] : Executing the ADD operation")
 
-        # Collect only ticked rows (✓)
-        selected_items = [
-            item for item in self.results_table.get_children()
-            if self.results_table.item(item, "values")[0] == "✓"
-        ]
-
-        if not selected_items:
+        source = self.results_grid.source
+        if not len(source):
             messagebox.showwarning("No Selection", "No records selected.")
             return
 
-        # Prepare to collect data for summary
-        self.selected_records = [self.results_table.item(
-            item, "values") for item in selected_items]
+        if isinstance(source, ListDataSource):
+            self.store_summary(source.all_rows())
+            return
+
+        # Search results are paged: read every row of the search on the DB worker
+        filters = dict(self.current_filters)
+        order = self.sort_order
+        loading = LoadingPopupClass(self.enquiry_window, message="Adding... Please wait.")
+
+        def on_success(rows):
+            loading.close()
+            self.store_summary(rows)
+
+        def on_error(e):
+            loading.close()
+            messagebox.showerror("Error", f"An error occurred while adding the summary:\n{str(e)}")
+
+        db_executor.submit(self.enquiry_window, self.report_mgr.fetch_transactions, filters, order,
+                           on_success=on_success, on_error=on_error)
+
+    def store_summary(self, rows):
+        # Collect only ticked rows (✓), kept as text with the ✓ column like the exports expect
+        self.selected_records = [["✓", *map(_cell, row)] for row in rows if self._is_ticked(row)]
+
+        if not self.selected_records:
+            messagebox.showwarning("No Selection", "No records selected.")
+            return
 
         total_rows = len(self.selected_records)
         total_amount = 0
@@ -689,8 +765,8 @@ class EnquiryScreen:
             tags=(tag,)
         )
 
-        self.results_table.delete(*self.results_table.get_children())
-        self.selection_states.clear()
+        self.current_filters = None
+        self.results_grid.set_rows([], autofit=False)
         self.result_count_label.config(text="Total Rows: 0")
 
     def edit_summary(self):
@@ -715,17 +791,14 @@ class EnquiryScreen:
                 "No Records", "No matching records found for this summary.")
             return
 
-        self.results_table.delete(*self.results_table.get_children())
-        self.selection_states.clear()
-
-        for idx, record in enumerate(records):
-            tag = "evenrow" if idx % 2 == 0 else "oddrow"
-            self.results_table.insert("", tk.END, values=record, tags=(tag,))
-            self.selection_states.append(True)  # mark all as selected again
+        # mark all as selected again
+        self.all_selected = True
+        self.toggled_ids.clear()
+        self.current_filters = None
+        self.results_grid.set_rows([record[1:] for record in records], autofit=False)
 
         # ✅ Update Total Row count label
-        total_rows = len(self.results_table.get_children())
-        self.result_count_label.config(text=f"Total Rows: {total_rows}")
+        self.result_count_label.config(text=f"Total Rows: {len(records)}")
 
     def delete_summary(self):
         logger.logger.info("[enquiryScreen] : Executing the DELETE operation")
@@ -758,101 +831,10 @@ class EnquiryScreen:
         self.main_canvas.unbind_all("<MouseWheel>")  # ✅ Unbind global scroll
         self.enquiry_window.destroy()                # ✅ Properly destroy window
 
-    def auto_fit_columns(self, treeview):
-        for col in treeview["columns"]:
-            max_width = tkFont.Font().measure(col)  # Header width
-
-            for row_id in treeview.get_children():
-                cell_value = str(treeview.set(row_id, col))
-                cell_width = tkFont.Font().measure(cell_value)
-                if cell_width > max_width:
-                    max_width = cell_width
-
-            treeview.column(col, width=max_width + 20)  # +20 for padding
-
-    def filter_blacklisted(self):
-        # Fetch blacklist names
-        bl_query = "SELECT VCH_BLACKLISTED_NAME FROM TM_MST_BLACKLISTED"
-        bl_results = executionWithRs_query(bl_query)
-        blacklist_names = [row[0].strip().lower()
-                           for row in bl_results if row[0]] if bl_results else []
-
-        # Fetch Suspicious names
-        sp_query = "SELECT VCH_SUSPICIOUS_NAME FROM TM_MST_SUSPICIOUS"
-        sp_results = executionWithRs_query(sp_query)
-        suspicious_names = [row[0].strip().lower()
-                            for row in sp_results if row[0]] if sp_results else []
-
-        # Loop through Treeview rows
-        for item_id in self.results_table.get_children():
-            row_values = self.results_table.item(item_id)["values"]
-            trx_desc = str(row_values[3]).strip().lower()
-
-            # Replace '*' with space before full-match checks
-            trx_desc_clean = trx_desc.replace("*", " ")
-            tagged = False
-
-            # --- Blacklist full match ---
-            for bl_name in blacklist_names:
-                if bl_name in trx_desc_clean:
-                    self.results_table.item(item_id, tags=("redtext",))
-                    tagged = True
-                    break
-
-            if not tagged:
-                # --- Blacklist partial (word-based) match ---
-                for bl_name in blacklist_names:
-                    words = bl_name.split()
-                    for word in words:
-                        if len(word) > 1:
-                            pattern = r'\b' + re.escape(word) + r'\b'
-                            if re.search(pattern, trx_desc):
-                                self.results_table.item(
-                                    item_id, tags=("bluetext",))
-                                tagged = True
-                                break
-                    if tagged:
-                        break
-
-            if not tagged:
-                # --- Suspicious full match ---
-                for sp_name in suspicious_names:
-                    if sp_name in trx_desc_clean:
-                        self.results_table.item(item_id, tags=("purpletext",))
-                        break
-
     def toggle_all_selection(self):
         self.all_selected = not self.all_selected  # Flip state
-
-        for idx, item_id in enumerate(self.results_table.get_children()):
-            row_values = self.results_table.item(item_id)["values"]
-            new_symbol = "✓" if self.all_selected else "✗"
-            self.results_table.item(
-                item_id, values=[new_symbol] + row_values[1:])
-            self.selection_states[idx] = self.all_selected
-
-    def sort_treeview_column(self, treeview, col, reverse):
-        # Get data from Treeview
-        data = [(treeview.set(k, col), k) for k in treeview.get_children("")]
-
-        # Try numeric sort first, fall back to string sort
-        try:
-            data.sort(key=lambda t: float(
-                str(t[0]).replace(",", "")), reverse=reverse)
-        except ValueError:
-            data.sort(key=lambda t: str(t[0]).lower(), reverse=reverse)
-
-        # Reorder rows in Treeview
-        for index, (val, k) in enumerate(data):
-            treeview.move(k, "", index)
-
-            # Zebra tagging
-            tag = "evenrow" if index % 2 == 0 else "oddrow"
-            treeview.item(k, tags=(tag,))
-
-        # Toggle sort direction for next click
-        treeview.heading(col, command=lambda: self.sort_treeview_column(
-            treeview, col, not reverse))
+        self.toggled_ids.clear()
+        self.results_grid.render()
 
     def export_plain_text(self):
         logger.logger.info("[enquiryScreen] : Executing the EXPORT operation into plain text")
@@ -871,22 +853,8 @@ class EnquiryScreen:
         if not hasattr(self, 'selected_summaries') or not self.selected_summaries:
             messagebox.showinfo("No Data", "No summaries available to export.")
             return
-        # Load blacklist and suspected keywords from DB
-        bl_query = "SELECT VCH_BLACKLISTED_NAME FROM TM_MST_BLACKLISTED"
-        bl_results = executionWithRs_query(bl_query)
-        blacklist_names = [row[0].strip().lower()
-                           for row in bl_results if row[0]] if bl_results else []
-
-        sp_query = "SELECT VCH_SUSPICIOUS_NAME FROM TM_MST_SUSPICIOUS"
-        sp_results = executionWithRs_query(sp_query)
-        suspected_names = [row[0].strip().lower()
-                           for row in sp_results if row[0]] if sp_results else []
-
         # Load bank display names
-        bank_query = "SELECT VCH_BANK_NAME, VCH_BANK_DISPLAY_NM FROM TM_MST_BANK"
-        bank_results = executionWithRs_query(bank_query)
-        bank_display_map = {row[0].strip(): row[1].strip(
-        ) for row in bank_results if row[0] and row[1]} if bank_results else {}
+        bank_display_map = screening_lists.bank_display_map()
 
         grouped_output = {}
         final_agent_info = set()
@@ -906,23 +874,13 @@ class EnquiryScreen:
                 agent_id = values[10]
 
                 final_agent_info.add((agent_name, agent_id))
-                trx_desc_clean = trx_desc.lower().replace("*", " ")
 
+                # ✅ Category and keyword come from the stored screening hits
                 match_type = "Others"
                 matched_key = "Others"
-
-                for keyword in blacklist_names:
-                    if is_keyword_matched(keyword, trx_desc_clean):
-                        match_type = "Blacklisted"
-                        matched_key = keyword.upper()
-                        break
-                else:
-                    # --- Suspected full match ---
-                    for keyword in suspected_names:
-                        if keyword in trx_desc_clean:
-                            match_type = "Suspected"
-                            matched_key = keyword.upper()
-                            break
+                if len(values) > 15 and values[14] in ("Blacklisted", "Suspected"):
+                    match_type = values[14]
+                    matched_key = str(values[15]).upper()
 
                 # Group by Customer
                 cust_key = (customer_code, customer_name)
@@ -1036,8 +994,7 @@ class EnquiryScreen:
         # self.summary_table.delete(*self.summary_table.get_children())
         # self.selected_summaries = {}
         # self.next_summary_number = 1
-        # self.results_table.delete(*self.results_table.get_children())
-        # self.selection_states.clear()
+        # self.results_grid.set_rows([])
 
     def export_excel(self):
         logger.logger.info("[enquiryScreen] : Executing the EXPORT operation into Excel")
@@ -1069,19 +1026,7 @@ class EnquiryScreen:
         bold_font = Font(bold=True)
 
         # Bank display mapping
-        bank_query = "SELECT VCH_BANK_NAME, VCH_BANK_DISPLAY_NM FROM TM_MST_BANK"
-        bank_results = executionWithRs_query(bank_query)
-        bank_display_map = {row[0].strip(): row[1].strip(
-        ) for row in bank_results if row[0] and row[1]} if bank_results else {}
-
-        # Keywords
-        bl_query = "SELECT VCH_BLACKLISTED_NAME FROM TM_MST_BLACKLISTED"
-        blacklist = [r[0].strip().lower()
-                     for r in executionWithRs_query(bl_query) or [] if r[0]]
-
-        sp_query = "SELECT VCH_SUSPICIOUS_NAME FROM TM_MST_SUSPICIOUS"
-        suspected = [r[0].strip().lower()
-                     for r in executionWithRs_query(sp_query) or [] if r[0]]
+        bank_display_map = screening_lists.bank_display_map()
 
         # Grouped output: (Customer Code, Name) → list of rows
         grouped_output = defaultdict(list)
@@ -1092,7 +1037,6 @@ class EnquiryScreen:
                 cust_id = values[0]
                 cust_name = values[1]
                 trx_desc_raw = values[2]
-                trx_desc = trx_desc_raw.lower().replace("*", " ")
                 trx_ner = values[3]
                 bank = values[4]
                 credit = values[5]
@@ -1103,25 +1047,12 @@ class EnquiryScreen:
                 agent_name = values[10]
                 file_name = values[11]
 
-                # Match logic
+                # Match logic (stored screening hits)
                 category = "Others"
                 keyword = trx_ner
-                # for kw in blacklist:
-                #     if kw in trx_desc or any(re.search(rf'\b{re.escape(w)}\b', trx_desc) for w in kw.split()):
-                #         category = "Blacklisted"
-                #         keyword = kw.upper()
-                #         break
-                for kw in blacklist:
-                    if is_keyword_matched(kw, trx_desc):
-                        category = "Blacklisted"
-                        keyword = kw.upper()
-                        break
-                else:
-                    for kw in suspected:
-                        if kw in trx_desc:
-                            category = "Suspected"
-                            keyword = kw.upper()
-                            break
+                if len(values) > 15 and values[14] in ("Blacklisted", "Suspected"):
+                    category = values[14]
+                    keyword = str(values[15]).upper()
 
                 # Format date
                 try:
@@ -1175,8 +1106,64 @@ class EnquiryScreen:
         # self.summary_table.delete(*self.summary_table.get_children())
         # self.selected_summaries = {}
         # self.next_summary_number = 1
-        # self.results_table.delete(*self.results_table.get_children())
-        # self.selection_states.clear()
+        # self.results_grid.set_rows([])
+
+    def export_all_results(self):
+        logger.logger.info("[enquiryScreen] : Executing the streaming EXPORT operation for all search results")
+
+        filepath = filedialog.asksaveasfilename(
+            parent=self.enquiry_window,
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx"), ("CSV files", "*.csv")],
+            initialfile=f"Transaction_Export_All_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+            title="Export All Results As"
+        )
+        if not filepath:
+            return
+
+        filters = self.collect_filters()
+
+        # ✅ Progress window; the worker only updates this dict, the Tk thread polls it
+        state = {"total": None, "written": 0, "cancel": False}
+        popup = tk.Toplevel(self.enquiry_window)
+        popup.title("Exporting")
+        popup.transient(self.enquiry_window)
+        popup.resizable(False, False)
+        status = ttk.Label(popup, text="Counting rows...", font=("Segoe UI", 10))
+        status.pack(padx=20, pady=(15, 5))
+        bar = ttk.Progressbar(popup, length=300, mode="determinate")
+        bar.pack(padx=20, pady=5)
+        ttk.Button(popup, text="Cancel", command=lambda: state.update(cancel=True)).pack(pady=(5, 15))
+        popup.protocol("WM_DELETE_WINDOW", lambda: state.update(cancel=True))
+
+        def poll():
+            if not popup.winfo_exists():
+                return
+            if state["total"]:
+                bar["maximum"] = state["total"]
+                bar["value"] = state["written"]
+                status.config(text=f"Exported {state['written']:,} of {state['total']:,} rows")
+            popup.after(200, poll)
+
+        def run():
+            state["total"] = self.report_mgr.count_transactions(filters)
+            return stream_export(self.report_mgr, filters, filepath,
+                                 progress=lambda n: state.update(written=n),
+                                 cancelled=lambda: state["cancel"])
+
+        def on_done(written):
+            popup.destroy()
+            if state["cancel"]:
+                messagebox.showwarning("Export Cancelled", f"Export stopped after {written:,} rows:\n{filepath}")
+            else:
+                messagebox.showinfo("Success", f"{written:,} rows exported to:\n{filepath}")
+
+        def on_error(e):
+            popup.destroy()
+            messagebox.showerror("Export Failed", f"Could not export results:\n{e}")
+
+        poll()
+        db_executor.submit(self.enquiry_window, run, on_success=on_done, on_error=on_error)
 
     def toggle_date_filter_type(self):
         if self.date_filter_type.get() == "Transaction Date":
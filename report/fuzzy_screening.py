@@ -0,0 +1,152 @@
+# flake8: noqa: E501
+
+# fuzzy_screening.py
+import os
+import re
+import logger
+
+logger.logger.info("[fuzzy_screening] : Menu initiation")
+
+# ✅ Jaro-Winkler similarity (0..1) a candidate must reach to be reported; 0 disables fuzzy screening
+FUZZY_THRESHOLD = float(os.getenv("FUZZY_SCREENING_THRESHOLD", "0.92"))
+
+# ✅ Character n-gram size used for candidate blocking
+NGRAM_SIZE = 3
+
+# ✅ Minimum Dice overlap of n-grams before a candidate is verified with Jaro-Winkler
+MIN_NGRAM_DICE = 0.5
+
+# ✅ Names shorter than this (letters, spaces removed) or with a single word are left to exact matching
+MIN_NAME_LENGTH = 6
+MIN_NAME_WORDS = 2
+
+# ✅ Common romanisation / abbreviation variants folded to one spelling before comparing
+NAME_VARIANTS = {
+    "mohd": "muhammad", "mohamad": "muhammad", "mohammad": "muhammad", "mohamed": "muhammad",
+    "mohammed": "muhammad", "muhamad": "muhammad", "muhammed": "muhammad", "muhd": "muhammad", "md": "muhammad",
+    "abd": "abdul", "abdl": "abdul",
+    "bt": "binti", "bte": "binti", "bint": "binti",
+    "a/l": "al", "s/o": "al", "a/p": "ap", "d/o": "ap",
+    "sdn": "sendirian", "bhd": "berhad",
+    "nurul": "nur", "noor": "nur", "nor": "nur",
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:/[a-z0-9]+)?")
+
+
+def normalize_tokens(text):
+    """Lower-case word tokens with name variants folded ("MOHD A/L" → ["muhammad", "al"])"""
+    tokens = []
+    for token in _TOKEN.findall(str(text or "").lower()):
+        token = NAME_VARIANTS.get(token, token)
+        tokens.append(token.replace("/", ""))
+    return tokens
+
+
+def _ngrams(compact):
+    padded = f"#{compact}#"
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+def jaro_winkler(s1, s2, prefix_scale=0.1):
+    """Jaro-Winkler similarity of two strings (1.0 = identical)"""
+    if s1 == s2:
+        return 1.0
+    len1, len2 = len(s1), len(s2)
+    if not len1 or not len2:
+        return 0.0
+
+    window = max(max(len1, len2) // 2 - 1, 0)
+    matched1 = [False] * len1
+    matched2 = [False] * len2
+    matches = 0
+    for i, ch in enumerate(s1):
+        for j in range(max(0, i - window), min(len2, i + window + 1)):
+            if not matched2[j] and s2[j] == ch:
+                matched1[i] = matched2[j] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+
+    transpositions = 0
+    j = 0
+    for i in range(len1):
+        if matched1[i]:
+            while not matched2[j]:
+                j += 1
+            if s1[i] != s2[j]:
+                transpositions += 1
+            j += 1
+
+    jaro = (matches / len1 + matches / len2 + (matches - transpositions / 2) / matches) / 3
+
+    prefix = 0
+    for a, b in zip(s1[:4], s2[:4]):
+        if a != b:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+class FuzzyNameIndex:
+    """
+    N-gram inverted index over normalized list names. Candidates are looked up through the
+    n-grams of the text (posting lists only), then verified with Jaro-Winkler.
+    """
+
+    def __init__(self, names, threshold=FUZZY_THRESHOLD):
+        self.threshold = threshold
+        self._names = []      # original (lower-case) list entry
+        self._compact = []    # normalized name without spaces
+        self._gram_count = []
+        self._index = {}      # n-gram → [name index]
+        window_sizes = set()
+
+        for name in names:
+            tokens = normalize_tokens(name)
+            compact = "".join(tokens)
+            if len(tokens) < MIN_NAME_WORDS or len(compact) < MIN_NAME_LENGTH:
+                continue
+            idx = len(self._names)
+            grams = _ngrams(compact)
+            self._names.append(name)
+            self._compact.append(compact)
+            self._gram_count.append(len(grams))
+            for gram in grams:
+                self._index.setdefault(gram, []).append(idx)
+            # spacing variants: the same name may span one word more or less in the text
+            window_sizes.update((len(tokens) - 1, len(tokens), len(tokens) + 1))
+
+        self._window_sizes = sorted(size for size in window_sizes if size > 0)
+
+    def __len__(self):
+        return len(self._names)
+
+    def _candidates(self, compact):
+        grams = _ngrams(compact)
+        shared = {}
+        for gram in grams:
+            for idx in self._index.get(gram, ()):
+                shared[idx] = shared.get(idx, 0) + 1
+        total = len(grams)
+        return [idx for idx, count in shared.items() if 2 * count / (total + self._gram_count[idx]) >= MIN_NGRAM_DICE]
+
+    def search(self, text):
+        """Return {list entry: best score} for names similar to any word window of text"""
+        if not self._names or self.threshold <= 0:
+            return {}
+        tokens = normalize_tokens(text)
+        best = {}
+        seen = set()
+        for size in self._window_sizes:
+            for start in range(0, max(len(tokens) - size + 1, 0)):
+                compact = "".join(tokens[start:start + size])
+                if len(compact) < MIN_NAME_LENGTH or compact in seen:
+                    continue
+                seen.add(compact)
+                for idx in self._candidates(compact):
+                    score = jaro_winkler(compact, self._compact[idx])
+                    if score >= self.threshold and score > best.get(self._names[idx], 0.0):
+                        best[self._names[idx]] = score
+        return best
@@ -0,0 +1,86 @@
+# flake8: noqa: E501
+
+# report_export.py
+import csv
+import logger
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+logger.logger.info("[report_export] : Menu initiation")
+
+EXPORT_HEADERS = [
+    "Customer Code", "Customer Name", "Category Keyword", "Category",
+    "Transaction Date", "Transaction Description", "Target Audience",
+    "Bank Display Name", "Credit Amount", "Debit Amount",
+    "Data Entry Date", "Printed Status", "Agent Name", "File Name"
+]
+
+
+def _export_row(row):
+    """ReportManager row → export columns (category from the stored screening hits)"""
+    (cust_code, cust_name, trx_desc, trx_ner, bank, credit, debit, trx_date,
+     entry_date, printed, agent_name, file_name, _match, _keyword, category, export_keyword) = row[:16]
+    keyword = str(export_keyword).upper() if category in ("Blacklisted", "Suspected") else trx_ner
+    return [cust_code, cust_name, keyword, category, trx_date, trx_desc, trx_ner,
+            bank, credit, debit, entry_date, printed, agent_name, file_name]
+
+
+class _CsvSink:
+    def __init__(self, file_path):
+        self._file = open(file_path, "w", newline="", encoding="utf-8-sig")  # BOM so Excel reads UTF-8
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(EXPORT_HEADERS)
+
+    def write(self, values):
+        self._writer.writerow(["" if v is None else v for v in values])
+
+    def close(self):
+        self._file.close()
+
+
+class _XlsxSink:
+    """openpyxl write-only workbook: rows are flushed to disk as they are appended"""
+
+    def __init__(self, file_path):
+        self._file_path = file_path
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet("Transactions")
+        bold_font = Font(bold=True)
+        header = []
+        for title in EXPORT_HEADERS:
+            cell = WriteOnlyCell(self._ws, value=title)
+            cell.font = bold_font
+            header.append(cell)
+        self._ws.append(header)
+
+    def write(self, values):
+        self._ws.append(values)
+
+    def close(self):
+        self._wb.save(self._file_path)
+
+
+def stream_export(report_mgr, filters, file_path, progress=None, cancelled=None):
+    """
+    Write every row matching filters to file_path (.csv or .xlsx) straight from a server-side cursor.
+    progress(rows_written) is called after each batch; cancelled() returning True stops the export.
+    Returns the number of rows written.
+    """
+    sink = _CsvSink(file_path) if file_path.lower().endswith(".csv") else _XlsxSink(file_path)
+    written = 0
+    try:
+        for batch in report_mgr.stream_transactions(filters):
+            for row in batch:
+                sink.write(_export_row(row))
+            written += len(batch)
+            if progress:
+                progress(written)
+            if cancelled and cancelled():
+                logger.logger.info(f"[report_export] : Export cancelled after {written} row(s)")
+                break
+    finally:
+        sink.close()
+
+    logger.logger.info(f"[report_export] : ✅ {written} row(s) exported to {file_path}")
+    return written
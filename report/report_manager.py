@@ -3,8 +3,67 @@
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
 
-from db_manager import executionWithRs_query
+from db_manager import executionWithRs_query, stream_query
+
+# ✅ Rows fetched per round trip when streaming an export
+STREAM_BATCH_SIZE = 2000
+
+# ✅ Column expression and type per report column (same order as the SELECT list), used for
+#    header sorting and quick filters so both run in SQL (see sql/038_report_sort_indexes.sql)
+REPORT_COLUMNS = [
+    ("b.vch_cust_code", "text"),
+    ("b.vch_cust_name", "text"),
+    ("a.vch_trn_desc_1", "desc"),
+    ("a.vch_ner", "text"),
+    ("c.vch_bank_display_nm", "text"),
+    ("a.num_amount_credit", "amount"),
+    ("a.num_amount_debit", "amount"),
+    ("a.dtt_transaction_date", "date"),
+    ("a.dtt_created_at", "date"),
+    ("a.chr_printed_ind", "flag"),
+    ("d.VCH_USER_NAME", "text"),
+    ("s.vch_file_name", "text"),
+    ("t.vch_match_type", "text"),
+    ("t.vch_keyword", "text"),
+    ("e.category", "text"),
+    ("e.vch_keyword", "text"),
+]
+
+# ✅ Default result order: latest transaction first
+DEFAULT_ORDER = (7, True)
+
+QUICK_FILTER_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d-%b-%y", "%d-%b-%Y")
+
+
+def _parse_filter_date(text):
+    for fmt in QUICK_FILTER_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"'{text}' is not a date (e.g. 2024-12-31 or 31/12/2024)")
+
+
+def _quick_filter_clause(column_index, text):
+    """Typed WHERE clause for a quick filter on one report column → (sql, params)"""
+    expr, kind = REPORT_COLUMNS[column_index]
+    if kind == "amount":
+        try:
+            return f" AND {expr} = %s", [Decimal(text.replace(",", ""))]
+        except InvalidOperation:
+            raise ValueError(f"'{text}' is not an amount")
+    if kind == "date":
+        day = _parse_filter_date(text)
+        # range instead of ::date so the column index is used
+        return f" AND {expr} >= %s AND {expr} < %s", [day, day + timedelta(days=1)]
+    if kind == "flag":
+        return f" AND {expr} = %s", [text[:1].upper()]
+    if kind == "desc":
+        return " AND (a.vch_trn_desc_1 ILIKE %s OR a.vch_trn_desc_2 ILIKE %s)", [f"%{text}%", f"%{text}%"]
+    return f" AND {expr} ILIKE %s", [f"%{text}%"]
 
 
 class ReportManager:
@@ -12,9 +71,9 @@ class ReportManager:
     Encapsulates transaction‐report fetching logic.
     """
 
-    def fetch_transactions(self, filters: dict):
+    def build_query(self, filters: dict, order=None):
         """
-        Given a dict of filter values, build and execute the SQL, and return the list of rows.
+        Given a dict of filter values, build the SQL and its parameters.
         filters keys:
           - customer_code (str or None)
           - customer_name (str or None)
@@ -29,6 +88,9 @@ class ReportManager:
           - printed_status  ("All"|"Y"|"N")
           - agent_name      (str or None)
           - file_name       (str or None)
+          - quick_filter    ((column index, text) or None) typed filter on one report column
+        order is (column index, descending) into REPORT_COLUMNS; defaults to DEFAULT_ORDER.
+        Each row ends with the stored screening result: match type, keyword, export category and export keyword.
         """
         sql = """
         SELECT
@@ -45,8 +107,31 @@ class ReportManager:
           a.dtt_created_at        AS date_entry_date,
           a.chr_printed_ind       AS printed_ind,
           d.VCH_USER_NAME        AS staff_name,
-          a.vch_file_name         AS file_name
+          s.vch_file_name         AS file_name,
+          COALESCE(t.vch_match_type, '')  AS screening_match,
+          COALESCE(t.vch_keyword, '')     AS screening_keyword,
+          COALESCE(e.category, 'Others')  AS export_category,
+          COALESCE(e.vch_keyword, '')     AS export_keyword,
+          a.num_trn_id
         FROM tm_trn_transaction a
+        INNER JOIN tm_trn_statement s ON a.num_stmt_id = s.num_stmt_id
+        -- Stored screening hits: strongest hit tags the row (exact hits before spelling variants), export uses the proximity rule
+        LEFT JOIN LATERAL (
+          SELECT h.vch_match_type, h.vch_keyword
+          FROM tm_trn_screening_hit h
+          WHERE h.num_trn_id = a.num_trn_id
+          ORDER BY CASE h.vch_match_type WHEN 'full' THEN 1 WHEN 'partial' THEN 2 WHEN 'suspicious' THEN 3 WHEN 'fuzzy_bl' THEN 4 WHEN 'fuzzy_sp' THEN 5 ELSE 6 END, h.num_hit_id
+          LIMIT 1
+        ) t ON TRUE
+        LEFT JOIN LATERAL (
+          SELECT CASE WHEN h.vch_match_type = 'suspicious' THEN 'Suspected' ELSE 'Blacklisted' END AS category,
+                 h.vch_keyword
+          FROM tm_trn_screening_hit h
+          WHERE h.num_trn_id = a.num_trn_id
+            AND (h.chr_proximity_ind = 'Y' OR h.vch_match_type = 'suspicious')
+          ORDER BY CASE WHEN h.vch_match_type = 'suspicious' THEN 2 ELSE 1 END, h.num_hit_id
+          LIMIT 1
+        ) e ON TRUE
         INNER JOIN tm_mst_customer b ON a.num_cust_id  = b.num_cust_id
         INNER JOIN tm_mst_bank     c ON a.num_bank_id  = c.num_bank_id
         INNER JOIN TM_MST_USER    d ON a.NUM_USER_ID = d.NUM_USER_ID
@@ -94,8 +179,36 @@ class ReportManager:
             sql += " AND d.VCH_USER_NAME = %s"
             params.append(ag)
         if (fn := filters.get("file_name")) and fn != "All":
-            sql += " AND a.vch_file_name = %s"
+            sql += " AND s.vch_file_name = %s"
             params.append(fn)
 
-        sql += " ORDER BY a.dtt_transaction_date DESC"
-        return executionWithRs_query(sql, tuple(params)) or []
+        if (qf := filters.get("quick_filter")) and str(qf[1]).strip():
+            clause, clause_params = _quick_filter_clause(qf[0], str(qf[1]).strip())
+            sql += clause
+            params += clause_params
+
+        # Transaction id breaks ties so LIMIT/OFFSET pages are stable
+        column_index, descending = order or DEFAULT_ORDER
+        direction = "DESC" if descending else "ASC"
+        sql += f" ORDER BY {REPORT_COLUMNS[column_index][0]} {direction}, a.num_trn_id {direction}"
+        return sql, tuple(params)
+
+    def fetch_transactions(self, filters: dict, order=None, limit=None, offset=None):
+        """Execute the report SQL for the filters and return the list of rows (one page if limit is given)."""
+        sql, params = self.build_query(filters, order)
+        if limit is not None:
+            sql += " LIMIT %s OFFSET %s"
+            params += (limit, offset or 0)
+        return executionWithRs_query(sql, params, name="report_search", prepared=True) or []
+
+    def count_transactions(self, filters: dict):
+        """Number of rows fetch_transactions would return (used for export progress)."""
+        sql, params = self.build_query(filters)
+        sql = sql[:sql.rindex(" ORDER BY")]
+        rows = executionWithRs_query(f"SELECT COUNT(*) FROM ({sql}) x", params, name="report_count")
+        return rows[0][0] if rows else 0
+
+    def stream_transactions(self, filters: dict, batch_size=STREAM_BATCH_SIZE):
+        """Yield the report rows in batches from a server-side cursor (full result set, constant memory)."""
+        sql, params = self.build_query(filters)
+        yield from stream_query(sql, params, batch_size=batch_size, name="report_stream")
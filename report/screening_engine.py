@@ -0,0 +1,278 @@
+# flake8: noqa: E501
+
+# screening_engine.py
+import re
+import heapq
+import threading
+from collections import deque
+from functools import lru_cache
+import logger
+from report.fuzzy_screening import FuzzyNameIndex
+
+logger.logger.info("[screening_engine] : Menu initiation")
+
+# ✅ Match types, in priority order (same order the enquiry screen tags rows)
+MATCH_FULL = "full"                # whole blacklisted name found in description
+MATCH_PARTIAL = "partial"          # any word (len > 1) of a blacklisted name found as a whole word
+MATCH_SUSPICIOUS = "suspicious"    # whole suspicious name found in description
+MATCH_FUZZY_BLACKLIST = "fuzzy_bl"   # spelling variant of a blacklisted name (description or NER)
+MATCH_FUZZY_SUSPICIOUS = "fuzzy_sp"  # spelling variant of a suspicious name (description or NER)
+
+_WORD_TOKEN = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=4096)
+def _keyword_tokens(keyword):
+    """Tokenize a list entry once: (full phrase, distinct words)"""
+    phrase = keyword.lower().strip()
+    return phrase, tuple(dict.fromkeys(phrase.split()))
+
+
+class KeywordMatcher:
+    """
+    A description tokenized once into a token → positions index, so that many keywords
+    can be checked against it with the block-proximity rule.
+    """
+
+    __slots__ = ("text", "positions")
+
+    def __init__(self, description):
+        self.text = str(description or "").lower().strip()
+        self.positions = {}
+        for pos, token in enumerate(self.text.split()):
+            self.positions.setdefault(token, []).append(pos)
+
+    def matches(self, keyword, min_words_per_block=2, max_gap_per_block=3):
+        phrase, tokens = _keyword_tokens(keyword)
+
+        # First strict full phrase check
+        if phrase in self.text:
+            return True
+
+        present = [t for t in tokens if t in self.positions]
+        if not present or len(present) < min_words_per_block:
+            return False
+
+        # Merge every occurrence of the keyword words by position, then walk blocks of
+        # neighbours at most max_gap_per_block apart counting distinct keyword words
+        merged = heapq.merge(*[[(pos, t) for pos in self.positions[t]] for t in present])
+        block = {}
+        prev_pos = None
+        for pos, token in merged:
+            if prev_pos is not None and pos - prev_pos > max_gap_per_block:
+                block = {}
+            block[token] = True
+            if len(block) >= min_words_per_block:
+                return True  # Accept if any block has enough words close
+            prev_pos = pos
+
+        return False
+
+
+def is_keyword_matched(keyword_words, desc_words, min_words_per_block=2, max_gap_per_block=3):
+    return KeywordMatcher(desc_words).matches(keyword_words, min_words_per_block, max_gap_per_block)
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher: all patterns are found in one pass over the text."""
+
+    __slots__ = ("_goto", "_fail", "_out")
+
+    def __init__(self, patterns):
+        goto = [{}]
+        out = [()]
+        for pattern in patterns:
+            if not pattern:
+                continue
+            node = 0
+            for ch in pattern:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append(())
+                node = nxt
+            if not out[node]:
+                out[node] = (pattern,)
+
+        # Breadth-first failure links; a node also reports the outputs of its failure node
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            r = queue.popleft()
+            for ch, s in goto[r].items():
+                queue.append(s)
+                if r:
+                    f = fail[r]
+                    while f and ch not in goto[f]:
+                        f = fail[f]
+                    fail[s] = goto[f].get(ch, 0)
+                if out[fail[s]]:
+                    out[s] = out[s] + out[fail[s]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def find_first(self, text):
+        """Return the first pattern (by end position) occurring in text, or None."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                return out[node][0]
+        return None
+
+    def find_all(self, text):
+        """Return every pattern occurring in text, in order of first occurrence."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = {}
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pattern in out[node]:
+                found.setdefault(pattern, None)
+        return list(found)
+
+
+class ScreeningEngine:
+    """
+    Compiled blacklist / suspicious lists.
+    Full and suspicious names use Aho-Corasick; partial matching uses a word-token index
+    (plus one precompiled regex for words containing non-word characters).
+    """
+
+    def __init__(self, blacklist_names, suspicious_names):
+        blacklist_names = [n.strip().lower() for n in blacklist_names if n and n.strip()]
+        suspicious_names = [n.strip().lower() for n in suspicious_names if n and n.strip()]
+
+        self.blacklist_count = len(blacklist_names)
+        self.suspicious_count = len(suspicious_names)
+        self._full = AhoCorasick(blacklist_names)
+        self._suspicious = AhoCorasick(suspicious_names)
+        self._fuzzy_blacklist = FuzzyNameIndex(blacklist_names)
+        self._fuzzy_suspicious = FuzzyNameIndex(suspicious_names)
+
+        # word → blacklisted names containing it (in list order)
+        self._partial_words = {}
+        special_words = {}
+        for name in blacklist_names:
+            for word in name.split():
+                if len(word) <= 1:
+                    continue
+                index = self._partial_words if _WORD_TOKEN.fullmatch(word) else special_words
+                names = index.setdefault(word, [])
+                if name not in names:
+                    names.append(name)
+
+        # Words such as "A&B" or "SDN." keep the original \b...\b regex semantics
+        self._special_words = special_words
+        self._special_regex = re.compile(
+            r"\b(?:" + "|".join(re.escape(w) for w in sorted(special_words, key=len, reverse=True)) + r")\b"
+        ) if special_words else None
+
+    def screen(self, description):
+        """Return (match_type, keyword) for a transaction description, or (None, None)."""
+        desc = str(description or "").strip().lower()
+        desc_clean = desc.replace("*", " ")  # '*' treated as space for full-name checks
+
+        # --- Blacklist full match ---
+        keyword = self._full.find_first(desc_clean)
+        if keyword:
+            return MATCH_FULL, keyword
+
+        # --- Blacklist partial (word-based) match ---
+        if self._partial_words:
+            for token in _WORD_TOKEN.findall(desc):
+                if token in self._partial_words:
+                    return MATCH_PARTIAL, self._partial_words[token][0]
+        if self._special_regex:
+            found = self._special_regex.search(desc)
+            if found:
+                return MATCH_PARTIAL, self._special_words.get(found.group(0), [found.group(0)])[0]
+
+        # --- Suspicious full match ---
+        keyword = self._suspicious.find_first(desc_clean)
+        if keyword:
+            return MATCH_SUSPICIOUS, keyword
+
+        return None, None
+
+    def screen_all(self, description, ner=None):
+        """
+        Return every hit for a description as (match_type, keyword, proximity) tuples.
+        proximity tells whether a blacklist hit also satisfies the block-proximity rule (used by the exports).
+        Names not matched exactly are also looked up fuzzily in the description and the extracted NER name.
+        """
+        desc = str(description or "").strip().lower()
+        desc_clean = desc.replace("*", " ")
+        hits = []
+
+        full = self._full.find_all(desc_clean)
+        for keyword in full:
+            hits.append((MATCH_FULL, keyword, True))
+
+        partial = {}
+        if self._partial_words:
+            for token in _WORD_TOKEN.findall(desc):
+                for keyword in self._partial_words.get(token, ()):
+                    partial.setdefault(keyword, None)
+        if self._special_regex:
+            for found in self._special_regex.finditer(desc):
+                for keyword in self._special_words.get(found.group(0), ()):
+                    partial.setdefault(keyword, None)
+        matcher = KeywordMatcher(desc_clean) if partial else None
+        for keyword in partial:
+            if keyword not in full:
+                hits.append((MATCH_PARTIAL, keyword, matcher.matches(keyword)))
+
+        suspicious = self._suspicious.find_all(desc_clean)
+        for keyword in suspicious:
+            hits.append((MATCH_SUSPICIOUS, keyword, False))
+
+        # --- Fuzzy (spelling variant) matches, reported for review only ---
+        texts = [desc_clean] + ([str(ner)] if ner else [])
+        for match_type, index, exact in ((MATCH_FUZZY_BLACKLIST, self._fuzzy_blacklist, set(full) | set(partial)),
+                                         (MATCH_FUZZY_SUSPICIOUS, self._fuzzy_suspicious, set(suspicious))):
+            if not len(index):
+                continue
+            fuzzy = {}
+            for text in texts:
+                for keyword, score in index.search(text).items():
+                    fuzzy[keyword] = max(score, fuzzy.get(keyword, 0.0))
+            for keyword in fuzzy:
+                if keyword not in exact:
+                    hits.append((match_type, keyword, False))
+
+        return hits
+
+
+_engine_lock = threading.Lock()
+_engine = None
+_engine_key = None
+
+
+def get_engine(blacklist_names, suspicious_names):
+    """Return the shared engine, rebuilding it only when the name lists have changed."""
+    global _engine, _engine_key
+    key = (hash(tuple(blacklist_names)), len(blacklist_names), hash(tuple(suspicious_names)), len(suspicious_names))
+    with _engine_lock:
+        if _engine is None or key != _engine_key:
+            _engine = ScreeningEngine(blacklist_names, suspicious_names)
+            _engine_key = key
+            logger.logger.info(f"[screening_engine] : Screening engine rebuilt ({_engine.blacklist_count} blacklisted, {_engine.suspicious_count} suspicious)")
+        return _engine
+
+
+def invalidate_engine():
+    """Force a rebuild on next get_engine (after blacklist / suspicious maintenance)."""
+    global _engine, _engine_key
+    with _engine_lock:
+        _engine = None
+        _engine_key = None
@@ -0,0 +1,146 @@
+# flake8: noqa: E501
+
+# screening_hits.py
+import logger
+from db_manager import execute_query, execute_query_fetch, commit, rollback
+from report import screening_lists
+from report.daily_summary import refresh_transactions, rebuild_all
+
+logger.logger.info("[screening_hits] : Menu initiation")
+
+# ✅ Same description the enquiry screen shows (and used to screen in Python)
+SQL_TRN_DESC = "(replace(trim(a.vch_trn_desc_1), '  ', ' ') || ' ' || replace(trim(a.vch_trn_desc_2), '  ', ''))"
+
+# ✅ Rows re-screened / written per round trip
+BATCH_SIZE = 5000
+
+# ✅ Beyond this many changed names, a full re-screen is cheaper than LIKE ANY pre-filtering
+MAX_INCREMENTAL_NAMES = 200
+
+SQL_INSERT_HITS = """
+    INSERT INTO TM_TRN_SCREENING_HIT (NUM_TRN_ID, VCH_MATCH_TYPE, VCH_KEYWORD, CHR_PROXIMITY_IND)
+    SELECT * FROM unnest(%s::integer[], %s::varchar[], %s::varchar[], %s::char[])
+    ON CONFLICT (NUM_TRN_ID, VCH_MATCH_TYPE, VCH_KEYWORD) DO NOTHING
+"""
+
+
+def current_engine():
+    """Screening engine for the lists as they are in the database now (process-wide, see screening_lists)"""
+    return screening_lists.get_engine()
+
+
+def _replace_hits(conn, engine, rows):
+    """Screen (NUM_TRN_ID, description, NER name) rows and replace their stored hits"""
+    trn_ids, hit_ids, match_types, keywords, proximity = [], [], [], [], []
+    for trn_id, description, ner in rows:
+        trn_ids.append(trn_id)
+        for match_type, keyword, near in engine.screen_all(description, ner):
+            hit_ids.append(trn_id)
+            match_types.append(match_type)
+            keywords.append(keyword[:255])
+            proximity.append("Y" if near else "N")
+
+    if not trn_ids:
+        return conn, 0
+
+    conn = execute_query("DELETE FROM TM_TRN_SCREENING_HIT WHERE NUM_TRN_ID = ANY(%s)", (trn_ids,), conn)
+    if hit_ids:
+        conn = execute_query(SQL_INSERT_HITS, (hit_ids, match_types, keywords, proximity), conn, name="screening_hit_insert")
+    return conn, len(hit_ids)
+
+
+def screen_transactions(where_sql, params=(), conn=None, engine=None):
+    """
+    Re-screen the transactions selected by where_sql (alias a = TM_TRN_TRANSACTION) within conn's
+    DB transaction. The caller commits. Returns (conn, number of hits written).
+    """
+    engine = engine or current_engine()
+    rows, conn = execute_query_fetch(
+        f"SELECT a.NUM_TRN_ID, {SQL_TRN_DESC}, a.VCH_NER FROM TM_TRN_TRANSACTION a WHERE {where_sql}", params, conn)
+    total = 0
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn, written = _replace_hits(conn, engine, rows[start:start + BATCH_SIZE])
+        total += written
+    return conn, total
+
+
+def screen_statement(stmt_id, conn=None):
+    """Screen every transaction of a statement (called by save_transactions_to_db before commit)"""
+    conn, total = screen_transactions("a.NUM_STMT_ID = %s", (stmt_id,), conn)
+    logger.logger.info(f"[screening_hits] : Statement {stmt_id} screened, {total} hit(s) stored")
+    return conn
+
+
+def screen_transaction_ids(trn_ids, conn=None):
+    """Screen the given transactions (e.g. after a description was edited)"""
+    conn, _ = screen_transactions("a.NUM_TRN_ID = ANY(%s::integer[])", ([int(i) for i in trn_ids],), conn)
+    return conn
+
+
+def _like_pattern(term):
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def rescreen_for_names(added=(), removed=()):
+    """
+    Incremental re-screen after blacklist / suspicious maintenance.
+    Only rows whose description contains an added name (or one of its words), or whose stored
+    hit refers to a removed name, are screened again against the complete lists.
+    """
+    added = [n.strip().lower() for n in added if n and n.strip()]
+    removed = [n.strip().lower() for n in removed if n and n.strip()]
+    if not added and not removed:
+        return 0
+    screening_lists.invalidate()  # ✅ Lists were just maintained, do not wait for the version check interval
+    if len(added) + len(removed) > MAX_INCREMENTAL_NAMES:
+        return rescreen_all()
+
+    terms = set(added)
+    for name in added:
+        terms.update(word for word in name.split() if len(word) > 1)
+    patterns = [_like_pattern(t) for t in terms]
+
+    where_sql = f"""
+        (lower({SQL_TRN_DESC}) LIKE ANY(%s) OR replace(lower({SQL_TRN_DESC}), '*', ' ') LIKE ANY(%s)
+         OR a.NUM_TRN_ID IN (SELECT NUM_TRN_ID FROM TM_TRN_SCREENING_HIT WHERE VCH_KEYWORD = ANY(%s)))
+    """
+    conn = None
+    try:
+        conn, total = screen_transactions(where_sql, (patterns, patterns, removed))
+        conn = refresh_transactions(where_sql, (patterns, patterns, removed), conn)  # ✅ Hit counts in the daily summary
+        commit(conn)
+        logger.logger.info(f"[screening_hits] : ✅ Incremental re-screen done ({len(added)} added, {len(removed)} removed, {total} hit(s) stored)")
+        return total
+    except Exception:
+        rollback(conn)
+        raise
+
+
+def rescreen_all():
+    """Re-screen every transaction in NUM_TRN_ID batches (initial backfill / large imports)"""
+    engine = current_engine()
+    last_id = 0
+    total = 0
+    while True:
+        conn = None
+        try:
+            rows, conn = execute_query_fetch(
+                f"SELECT a.NUM_TRN_ID, {SQL_TRN_DESC}, a.VCH_NER FROM TM_TRN_TRANSACTION a WHERE a.NUM_TRN_ID > %s ORDER BY a.NUM_TRN_ID LIMIT %s",
+                (last_id, BATCH_SIZE), conn)
+            if not rows:
+                commit(conn)
+                break
+            conn, written = _replace_hits(conn, engine, rows)
+            commit(conn)
+        except Exception:
+            rollback(conn)
+            raise
+        total += written
+        last_id = rows[-1][0]
+    logger.logger.info(f"[screening_hits] : ✅ Full re-screen done, {total} hit(s) stored")
+    rebuild_all()  # ✅ Hit counts in the daily summary
+    return total
+
+
+if __name__ == "__main__":
+    rescreen_all()
@@ -0,0 +1,81 @@
+# flake8: noqa: E501
+
+# screening_lists.py
+import threading
+import time
+import logger
+from db_manager import executionWithRs_query
+from master_data_cache import cached_query, GROUP_BANK
+from report import screening_engine
+
+logger.logger.info("[screening_lists] : Menu initiation")
+
+# ✅ Seconds between two version checks; within this window the cached lists are used as they are
+VERSION_CHECK_INTERVAL = 15
+
+# ✅ Cheap change detector: row count and latest created / updated time of each list
+#    (an insert moves the max time, a delete changes the count, an edit moves DTT_UPDATED_AT)
+SQL_LIST_VERSION = """
+    SELECT (SELECT COUNT(*) FROM TM_MST_BLACKLISTED),
+           (SELECT MAX(GREATEST(DTT_CREATED_AT, COALESCE(DTT_UPDATED_AT, DTT_CREATED_AT))) FROM TM_MST_BLACKLISTED),
+           (SELECT COUNT(*) FROM TM_MST_SUSPICIOUS),
+           (SELECT MAX(GREATEST(DTT_CREATED_AT, COALESCE(DTT_UPDATED_AT, DTT_CREATED_AT))) FROM TM_MST_SUSPICIOUS)
+"""
+SQL_BLACKLISTED_NAMES = "SELECT VCH_BLACKLISTED_NAME FROM TM_MST_BLACKLISTED"
+SQL_SUSPICIOUS_NAMES = "SELECT VCH_SUSPICIOUS_NAME FROM TM_MST_SUSPICIOUS"
+SQL_BANK_DISPLAY_NAMES = "SELECT VCH_BANK_NAME, VCH_BANK_DISPLAY_NM FROM TM_MST_BANK"
+
+_lock = threading.Lock()
+_lists = None          # (blacklist names, suspicious names), lower-cased
+_version = None
+_checked_at = 0.0
+
+
+def _lower_names(rows):
+    return [row[0].strip().lower() for row in rows if row[0]] if rows else []
+
+
+def _current_version():
+    rows = executionWithRs_query(SQL_LIST_VERSION, name="screening_list_version")
+    return tuple(rows[0]) if rows else None
+
+
+def get_names():
+    """
+    (blacklist names, suspicious names), lower-cased, shared by the whole process.
+    The lists are only fetched again when the version check sees a change.
+    """
+    global _lists, _version, _checked_at
+    with _lock:
+        now = time.monotonic()
+        if _lists is not None and now - _checked_at < VERSION_CHECK_INTERVAL:
+            return _lists
+
+        version = _current_version()
+        _checked_at = now
+        if _lists is not None and version == _version:
+            return _lists
+
+        _lists = (_lower_names(executionWithRs_query(SQL_BLACKLISTED_NAMES)),
+                  _lower_names(executionWithRs_query(SQL_SUSPICIOUS_NAMES)))
+        _version = version
+        logger.logger.info(f"[screening_lists] : Screening lists loaded ({len(_lists[0])} blacklisted, {len(_lists[1])} suspicious)")
+        return _lists
+
+
+def get_engine():
+    """Compiled screening engine for the current lists (rebuilt only when the lists changed)"""
+    return screening_engine.get_engine(*get_names())
+
+
+def bank_display_map():
+    """VCH_BANK_NAME → VCH_BANK_DISPLAY_NM, from the master data cache (invalidated by bank maintenance)"""
+    rows = cached_query(GROUP_BANK, SQL_BANK_DISPLAY_NAMES)
+    return {row[0].strip(): row[1].strip() for row in rows if row[0] and row[1]} if rows else {}
+
+
+def invalidate():
+    """Check the version on next use (after blacklist / suspicious maintenance in this process)"""
+    global _checked_at
+    with _lock:
+        _checked_at = 0.0
@@ -0,0 +1,38 @@
+-- 027_statement_idempotency.sql
+-- Statement header table and natural keys so that re-ingesting the same
+-- bank statement is a no-op instead of double-counting transactions.
+
+CREATE TABLE IF NOT EXISTS TM_TRN_STATEMENT (
+    NUM_STMT_ID         SERIAL PRIMARY KEY,
+    VCH_FINGERPRINT     VARCHAR(64)  NOT NULL,
+    VCH_FILE_HASH       VARCHAR(64),
+    NUM_BANK_ID         INTEGER,
+    NUM_CUST_ID         INTEGER,
+    NUM_DT_ENT_ID       INTEGER,
+    NUM_USER_ID         INTEGER,
+    NUM_ACCOUNT_NO      VARCHAR(50),
+    DTT_STATEMENT_DATE  TIMESTAMP,
+    VCH_FILE_NAME       VARCHAR(255),
+    CHR_ACTIVE_IND      CHAR(1)      DEFAULT 'Y',
+    NUM_CREATED_BY      INTEGER,
+    DTT_CREATED_AT      TIMESTAMP    DEFAULT (CURRENT_TIMESTAMP AT TIME ZONE 'Asia/Kuala_Lumpur'),
+    NUM_UPDATED_BY      INTEGER,
+    DTT_UPDATED_AT      TIMESTAMP
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS UX_TM_TRN_STATEMENT_FINGERPRINT
+    ON TM_TRN_STATEMENT (VCH_FINGERPRINT);
+
+CREATE INDEX IF NOT EXISTS IX_TM_TRN_STATEMENT_FILE_HASH
+    ON TM_TRN_STATEMENT (VCH_FILE_HASH);
+
+ALTER TABLE TM_TRN_TRANSACTION ADD COLUMN IF NOT EXISTS NUM_STMT_ID INTEGER REFERENCES TM_TRN_STATEMENT (NUM_STMT_ID);
+ALTER TABLE TM_TRN_TRANSACTION ADD COLUMN IF NOT EXISTS VCH_TRN_KEY VARCHAR(64);
+
+-- Natural key: account, transaction date, amounts, balance, description hash
+-- and occurrence number (identical lines within one statement stay distinct)
+CREATE UNIQUE INDEX IF NOT EXISTS UX_TM_TRN_TRANSACTION_TRN_KEY
+    ON TM_TRN_TRANSACTION (VCH_TRN_KEY);
+
+CREATE INDEX IF NOT EXISTS IX_TM_TRN_TRANSACTION_STMT_ID
+    ON TM_TRN_TRANSACTION (NUM_STMT_ID);
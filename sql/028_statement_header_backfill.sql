@@ -0,0 +1,109 @@
+-- 028_statement_header_backfill.sql
+-- Make TM_TRN_STATEMENT the owner of statement-level fields: backfill one
+-- header per previously ingested statement, let a statement delete cascade to
+-- its transactions and drop the fields only the header keeps (file name, statement
+-- date, data entry source) from TM_TRN_TRANSACTION. Bank, customer, agent and account
+-- number stay on the row: Data Enrichment reassigns them per transaction, the daily
+-- summary groups by them and the account is part of the transaction key.
+--
+-- Legacy headers and rows get the exact keys the application computes
+-- (transaction_manager.build_statement_fingerprint / build_transaction_key), so
+-- re-ingesting a pre-migration statement matches its header and every row
+-- conflicts on VCH_TRN_KEY instead of being inserted a second time:
+--   fingerprint = sha256(bank id | account number (trimmed) | 'YYYY-MM-DD HH24:MI:SS' statement date)
+--   trn key     = sha256(account | transaction date | credit | debit | balance (2 decimals)
+--                        | sha1(upper(desc 1 | desc 2), whitespace collapsed) | occurrence)
+-- Legacy rows without bank, account or statement date have no such fingerprint (the
+-- application falls back to the file hash, unknown for them): they get a 'legacy-'
+-- header per file and cannot be matched on re-ingest.
+
+CREATE EXTENSION IF NOT EXISTS pgcrypto;  -- digest(..., 'sha1')
+
+CREATE OR REPLACE FUNCTION TM_STATEMENT_FINGERPRINT(p_bank_id INTEGER, p_account_no TEXT, p_statement_date TIMESTAMP, p_file_name TEXT)
+RETURNS VARCHAR(64) AS $$
+    SELECT CASE
+        WHEN p_bank_id IS NOT NULL AND NULLIF(BTRIM(p_account_no), '') IS NOT NULL AND p_statement_date IS NOT NULL
+        THEN ENCODE(SHA256(CONVERT_TO(CONCAT_WS('|', p_bank_id, BTRIM(p_account_no), TO_CHAR(p_statement_date, 'YYYY-MM-DD HH24:MI:SS')), 'UTF8')), 'hex')
+        ELSE 'legacy-' || MD5(CONCAT_WS('|', p_bank_id, p_account_no, p_statement_date, p_file_name))
+    END
+$$ LANGUAGE SQL IMMUTABLE;
+
+INSERT INTO TM_TRN_STATEMENT (
+    VCH_FINGERPRINT, NUM_BANK_ID, NUM_CUST_ID, NUM_DT_ENT_ID, NUM_USER_ID,
+    NUM_ACCOUNT_NO, DTT_STATEMENT_DATE, VCH_FILE_NAME, CHR_ACTIVE_IND, NUM_CREATED_BY
+)
+SELECT DISTINCT ON (FINGERPRINT)
+    FINGERPRINT, NUM_BANK_ID, NUM_CUST_ID, NUM_DT_ENT_ID, NUM_USER_ID,
+    NUM_ACCOUNT_NO, DTT_STATEMENT_DATE, VCH_FILE_NAME, 'Y', 0
+FROM (
+    SELECT
+        TM_STATEMENT_FINGERPRINT(NUM_BANK_ID, NUM_ACCOUNT_NO, DTT_STATEMENT_DATE, VCH_FILE_NAME) AS FINGERPRINT,
+        NUM_BANK_ID, NUM_CUST_ID, MAX(NUM_DT_ENT_ID) AS NUM_DT_ENT_ID, MAX(NUM_USER_ID) AS NUM_USER_ID,
+        NUM_ACCOUNT_NO, DTT_STATEMENT_DATE, VCH_FILE_NAME, MIN(NUM_TRN_ID) AS FIRST_TRN_ID
+    FROM TM_TRN_TRANSACTION
+    WHERE NUM_STMT_ID IS NULL
+    GROUP BY NUM_BANK_ID, NUM_CUST_ID, NUM_ACCOUNT_NO, DTT_STATEMENT_DATE, VCH_FILE_NAME
+) LEGACY
+ORDER BY FINGERPRINT, FIRST_TRN_ID  -- same statement uploaded under several file names: the first upload names the header
+ON CONFLICT (VCH_FINGERPRINT) DO NOTHING;
+
+UPDATE TM_TRN_TRANSACTION A
+SET NUM_STMT_ID = S.NUM_STMT_ID
+FROM TM_TRN_STATEMENT S
+WHERE A.NUM_STMT_ID IS NULL
+  AND S.VCH_FINGERPRINT = TM_STATEMENT_FINGERPRINT(A.NUM_BANK_ID, A.NUM_ACCOUNT_NO, A.DTT_STATEMENT_DATE, A.VCH_FILE_NAME);
+
+-- Every transaction belongs to a header from here on (the application upserts the header before
+-- its rows): the screens join TM_TRN_STATEMENT, so an orphan would silently vanish from them
+DO $$
+DECLARE
+    orphans INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO orphans FROM TM_TRN_TRANSACTION WHERE NUM_STMT_ID IS NULL;
+    IF orphans > 0 THEN
+        RAISE EXCEPTION '028: % transaction(s) still without a statement header after the backfill', orphans;
+    END IF;
+END $$;
+
+ALTER TABLE TM_TRN_TRANSACTION ALTER COLUMN NUM_STMT_ID SET NOT NULL;
+
+-- Natural keys of the legacy rows; identical lines of a statement are numbered in insert order
+-- (the statement order), as the application numbers them while saving
+UPDATE TM_TRN_TRANSACTION A
+SET VCH_TRN_KEY = K.TRN_KEY
+FROM (
+    SELECT
+        NUM_TRN_ID,
+        ENCODE(SHA256(CONVERT_TO(CONCAT_WS('|',
+            BTRIM(COALESCE(NUM_ACCOUNT_NO, '')),
+            TO_CHAR(DTT_TRANSACTION_DATE, 'YYYY-MM-DD HH24:MI:SS'),
+            ROUND(COALESCE(NUM_AMOUNT_CREDIT, 0), 2)::TEXT,
+            ROUND(COALESCE(NUM_AMOUNT_DEBIT, 0), 2)::TEXT,
+            ROUND(COALESCE(NUM_STATEMENT_BALANCE, 0), 2)::TEXT,
+            ENCODE(DIGEST(BTRIM(REGEXP_REPLACE(UPPER(COALESCE(VCH_TRN_DESC_1, '') || '|' || COALESCE(VCH_TRN_DESC_2, '')), '\s+', ' ', 'g')), 'sha1'), 'hex'),
+            ROW_NUMBER() OVER (
+                PARTITION BY NUM_STMT_ID, DTT_TRANSACTION_DATE,
+                             ROUND(COALESCE(NUM_AMOUNT_CREDIT, 0), 2), ROUND(COALESCE(NUM_AMOUNT_DEBIT, 0), 2), ROUND(COALESCE(NUM_STATEMENT_BALANCE, 0), 2),
+                             COALESCE(VCH_TRN_DESC_1, ''), COALESCE(VCH_TRN_DESC_2, '')
+                ORDER BY NUM_TRN_ID)
+        ), 'UTF8')), 'hex') AS TRN_KEY
+    FROM TM_TRN_TRANSACTION
+    WHERE VCH_TRN_KEY IS NULL AND NUM_STMT_ID IS NOT NULL
+) K
+WHERE A.NUM_TRN_ID = K.NUM_TRN_ID;
+
+-- Statement-only fields are read from the header from here on
+ALTER TABLE TM_TRN_TRANSACTION DROP COLUMN IF EXISTS VCH_FILE_NAME;
+ALTER TABLE TM_TRN_TRANSACTION DROP COLUMN IF EXISTS DTT_STATEMENT_DATE;
+ALTER TABLE TM_TRN_TRANSACTION DROP COLUMN IF EXISTS NUM_DT_ENT_ID;
+
+-- Per-statement delete / re-process is a single keyed operation
+ALTER TABLE TM_TRN_TRANSACTION DROP CONSTRAINT IF EXISTS TM_TRN_TRANSACTION_NUM_STMT_ID_FKEY;
+ALTER TABLE TM_TRN_TRANSACTION
+    ADD CONSTRAINT TM_TRN_TRANSACTION_NUM_STMT_ID_FKEY
+    FOREIGN KEY (NUM_STMT_ID) REFERENCES TM_TRN_STATEMENT (NUM_STMT_ID) ON DELETE CASCADE;
+
+-- Dropdown sources (file / bank / agent) read the header only
+CREATE INDEX IF NOT EXISTS IX_TM_TRN_STATEMENT_FILE_NAME ON TM_TRN_STATEMENT (VCH_FILE_NAME);
+CREATE INDEX IF NOT EXISTS IX_TM_TRN_STATEMENT_BANK_ID ON TM_TRN_STATEMENT (NUM_BANK_ID);
+CREATE INDEX IF NOT EXISTS IX_TM_TRN_STATEMENT_USER_ID ON TM_TRN_STATEMENT (NUM_USER_ID);
@@ -0,0 +1,20 @@
+-- 032_screening_hits.sql
+-- Persisted blacklist / suspicious screening result per transaction, filled at
+-- ingestion and re-screened incrementally when the name lists are maintained.
+-- Existing transactions are screened once after deployment with:
+--     python -m report.screening_hits
+
+CREATE TABLE IF NOT EXISTS TM_TRN_SCREENING_HIT (
+    NUM_HIT_ID          SERIAL PRIMARY KEY,
+    NUM_TRN_ID          INTEGER      NOT NULL REFERENCES TM_TRN_TRANSACTION (NUM_TRN_ID) ON DELETE CASCADE,
+    VCH_MATCH_TYPE      VARCHAR(10)  NOT NULL,  -- full / partial / suspicious
+    VCH_KEYWORD         VARCHAR(255) NOT NULL,  -- matched list entry (lower case)
+    CHR_PROXIMITY_IND   CHAR(1)      DEFAULT 'N',  -- 'Y' when the export proximity rule also holds
+    DTT_SCREENED_AT     TIMESTAMP    DEFAULT (CURRENT_TIMESTAMP AT TIME ZONE 'Asia/Kuala_Lumpur')
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS UX_TM_TRN_SCREENING_HIT
+    ON TM_TRN_SCREENING_HIT (NUM_TRN_ID, VCH_MATCH_TYPE, VCH_KEYWORD);
+
+CREATE INDEX IF NOT EXISTS IX_TM_TRN_SCREENING_HIT_KEYWORD
+    ON TM_TRN_SCREENING_HIT (VCH_KEYWORD);
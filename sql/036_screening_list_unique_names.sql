@@ -0,0 +1,20 @@
+-- 036_screening_list_unique_names.sql
+-- One row per blacklisted / suspicious name (case and surrounding blanks ignored),
+-- so bulk imports can merge with INSERT ... ON CONFLICT DO NOTHING.
+
+-- Remove duplicates created by earlier imports, keeping the first row of each name
+DELETE FROM TM_MST_BLACKLISTED a
+USING TM_MST_BLACKLISTED b
+WHERE a.ctid > b.ctid
+  AND lower(trim(a.VCH_BLACKLISTED_NAME)) = lower(trim(b.VCH_BLACKLISTED_NAME));
+
+DELETE FROM TM_MST_SUSPICIOUS a
+USING TM_MST_SUSPICIOUS b
+WHERE a.ctid > b.ctid
+  AND lower(trim(a.VCH_SUSPICIOUS_NAME)) = lower(trim(b.VCH_SUSPICIOUS_NAME));
+
+CREATE UNIQUE INDEX IF NOT EXISTS UX_TM_MST_BLACKLISTED_NAME
+    ON TM_MST_BLACKLISTED (lower(trim(VCH_BLACKLISTED_NAME)));
+
+CREATE UNIQUE INDEX IF NOT EXISTS UX_TM_MST_SUSPICIOUS_NAME
+    ON TM_MST_SUSPICIOUS (lower(trim(VCH_SUSPICIOUS_NAME)));
@@ -0,0 +1,37 @@
+-- 038_report_sort_indexes.sql
+-- Indexes behind the enquiry header sort and quick filter (ReportManager.build_query):
+-- every sort is "<column> <dir>, NUM_TRN_ID <dir>" and results are read one page at a time,
+-- so the composite indexes let PostgreSQL return the first page without sorting everything.
+
+CREATE INDEX IF NOT EXISTS IX_TM_TRN_TRANSACTION_TRN_DATE
+    ON TM_TRN_TRANSACTION (DTT_TRANSACTION_DATE, NUM_TRN_ID);
+
+CREATE INDEX IF NOT EXISTS IX_TM_TRN_TRANSACTION_CREATED_AT
+    ON TM_TRN_TRANSACTION (DTT_CREATED_AT, NUM_TRN_ID);
+
+CREATE INDEX IF NOT EXISTS IX_TM_TRN_TRANSACTION_CREDIT
+    ON TM_TRN_TRANSACTION (NUM_AMOUNT_CREDIT, NUM_TRN_ID);
+
+CREATE INDEX IF NOT EXISTS IX_TM_TRN_TRANSACTION_DEBIT
+    ON TM_TRN_TRANSACTION (NUM_AMOUNT_DEBIT, NUM_TRN_ID);
+
+CREATE INDEX IF NOT EXISTS IX_TM_TRN_TRANSACTION_CUST_ID
+    ON TM_TRN_TRANSACTION (NUM_CUST_ID);
+
+CREATE INDEX IF NOT EXISTS IX_TM_MST_CUSTOMER_NAME
+    ON TM_MST_CUSTOMER (VCH_CUST_NAME);
+
+-- Contains-style quick filters (ILIKE '%text%') on the free-text columns
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS IX_TM_TRN_TRANSACTION_DESC_1_TRGM
+    ON TM_TRN_TRANSACTION USING gin (VCH_TRN_DESC_1 gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS IX_TM_TRN_TRANSACTION_DESC_2_TRGM
+    ON TM_TRN_TRANSACTION USING gin (VCH_TRN_DESC_2 gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS IX_TM_TRN_TRANSACTION_NER_TRGM
+    ON TM_TRN_TRANSACTION USING gin (VCH_NER gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS IX_TM_MST_CUSTOMER_NAME_TRGM
+    ON TM_MST_CUSTOMER USING gin (VCH_CUST_NAME gin_trgm_ops);
@@ -0,0 +1,30 @@
+-- 039_daily_summary.sql
+-- Pre-aggregated transactions per transaction day, data entry day, customer, bank and agent.
+-- Maintained incrementally by report.daily_summary (statement ingestion, data enrichment edits
+-- and screening list re-screens refresh only the groups they touched) and read by the KPI screen.
+-- Existing transactions are summarised once after deployment with:
+--     python -m report.daily_summary
+
+CREATE TABLE IF NOT EXISTS TM_TRN_DAILY_SUMMARY (
+    DTT_TRN_DATE              DATE          NOT NULL,
+    DTT_ENTRY_DATE            DATE          NOT NULL,
+    NUM_CUST_ID               INTEGER       NOT NULL,
+    NUM_BANK_ID               INTEGER       NOT NULL,
+    NUM_USER_ID               INTEGER       NOT NULL,
+    NUM_TRN_COUNT             INTEGER       NOT NULL DEFAULT 0,
+    NUM_CREDIT_COUNT          INTEGER       NOT NULL DEFAULT 0,
+    NUM_DEBIT_COUNT           INTEGER       NOT NULL DEFAULT 0,
+    NUM_CREDIT_TOTAL          NUMERIC(18,2) NOT NULL DEFAULT 0,
+    NUM_DEBIT_TOTAL           NUMERIC(18,2) NOT NULL DEFAULT 0,
+    NUM_PRINTED_COUNT         INTEGER       NOT NULL DEFAULT 0,
+    NUM_BLACKLIST_HIT_COUNT   INTEGER       NOT NULL DEFAULT 0,  -- transactions with a full / partial blacklist hit
+    NUM_SUSPICIOUS_HIT_COUNT  INTEGER       NOT NULL DEFAULT 0,  -- transactions with a suspicious hit
+    DTT_REFRESHED_AT          TIMESTAMP     DEFAULT (CURRENT_TIMESTAMP AT TIME ZONE 'Asia/Kuala_Lumpur'),
+    PRIMARY KEY (DTT_TRN_DATE, DTT_ENTRY_DATE, NUM_CUST_ID, NUM_BANK_ID, NUM_USER_ID)
+);
+
+CREATE INDEX IF NOT EXISTS IX_TM_TRN_DAILY_SUMMARY_ENTRY_USER
+    ON TM_TRN_DAILY_SUMMARY (DTT_ENTRY_DATE, NUM_USER_ID);
+
+CREATE INDEX IF NOT EXISTS IX_TM_TRN_DAILY_SUMMARY_CUST
+    ON TM_TRN_DAILY_SUMMARY (NUM_CUST_ID, DTT_TRN_DATE);
@@ -0,0 +1,6 @@
+# flake8: noqa: E501
+import os
+import sys
+
+# ✅ Modules are imported the way the application imports them (repository root on the path)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
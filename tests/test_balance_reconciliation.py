@@ -0,0 +1,75 @@
+# flake8: noqa: E501
+from transaction.balance_reconciliation import AS_EXTRACTED, apply_column_map, best_reconciled, reconcile, reconciled_stream
+
+
+def _trx(credit, debit, balance):
+    return {"trn_pdf_CR_Amount": credit, "trn_pdf_DR_Amount": debit, "trn_pdf_statementBalance": balance}
+
+
+STATEMENT = [_trx("1,000.00", "", "1,500.00"), _trx("", "200.50", "1,299.50"), _trx("0.50", "", "1,300.00")]
+SWAPPED = apply_column_map(STATEMENT, "CR/DR swapped")
+
+
+# ===== RUNNING BALANCE =====
+def test_statement_reconciles():
+    result = reconcile(STATEMENT)
+    assert result.ok and result.checked == 3 and not result.message()
+
+
+def test_opening_balance_checks_first_row():
+    assert reconcile(STATEMENT, opening_balance="500.00").ok
+    assert reconcile(STATEMENT, opening_balance="400.00").breaks == [0]
+
+
+def test_misread_amount_breaks_its_row():
+    rows = [STATEMENT[0], _trx("", "20.50", "1,299.50"), STATEMENT[2]]
+    assert reconcile(rows).breaks == [1]
+
+
+def test_row_without_printed_balance_carried_not_checked():
+    rows = [STATEMENT[0], _trx("", "200.50", ""), STATEMENT[2]]
+    result = reconcile(rows)
+    assert result.ok and result.checked == 2
+
+
+def test_unreadable_amount_is_a_break():
+    rows = [STATEMENT[0], _trx("", "2OO.5O", "1,299.50"), STATEMENT[2]]
+    result = reconcile(rows)
+    assert result.unreadable == [1] and 1 in result.breaks
+
+
+# ===== AMOUNT COLUMN MAPS =====
+def test_swapped_columns_suggested_not_applied_on_stream():
+    results = []
+    streamed = list(reconciled_stream(iter(SWAPPED), lambda *args: results.append(args)))
+    column_map, result, extracted = results[0]
+    assert streamed == SWAPPED
+    assert column_map == "CR/DR swapped" and result.ok
+    assert not extracted.ok
+
+
+def test_stream_as_extracted_reports_one_check():
+    results = []
+    list(reconciled_stream(iter(STATEMENT), lambda *args: results.append(args)))
+    column_map, result, extracted = results[0]
+    assert column_map == AS_EXTRACTED and result is extracted and result.ok
+
+
+def test_best_reconciled_returns_rows_as_extracted():
+    label, column_map, transactions, result = best_reconciled([("fitz", lambda: SWAPPED)])
+    assert (label, column_map) == ("fitz", "CR/DR swapped")
+    assert transactions == SWAPPED and result.ok
+
+
+def test_alternate_engine_only_run_when_preferred_does_not_reconcile():
+    calls = []
+    broken = [STATEMENT[0], _trx("", "20.50", "1,299.50"), STATEMENT[2]]
+    candidates = [("fitz", lambda: calls.append("fitz") or broken), ("fitz2", lambda: calls.append("fitz2") or STATEMENT), ("pdfplumber", lambda: calls.append("pdfplumber") or STATEMENT)]
+    label, column_map, transactions, result = best_reconciled(candidates)
+    assert (label, column_map, calls) == ("fitz2", AS_EXTRACTED, ["fitz", "fitz2"])
+
+
+def test_nothing_reconciles_keeps_preferred_as_extracted():
+    broken = [STATEMENT[0], _trx("", "20.50", "1,299.50"), STATEMENT[2]]
+    label, column_map, transactions, result = best_reconciled([("fitz", lambda: broken), ("fitz2", lambda: [])])
+    assert (label, column_map, transactions, result.breaks) == ("fitz", AS_EXTRACTED, broken, [1])
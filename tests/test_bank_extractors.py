@@ -0,0 +1,54 @@
+# flake8: noqa: E501
+from transaction.balance_reconciliation import reconcile
+from transaction.pdf_extraction_method import mbb_pdf_extraction, rhb_pdf_extraction
+
+# ✅ Made-up statements, laid out as fitz reads the bank's PDFs
+
+
+# ===== MAYBANK =====
+MBB_TEXT = "\n".join([
+    "MAYBANK ISLAMIC BERHAD", "URUSNIAGA AKAUN", "TARIKH MASUK", "STATEMENT BALANCE",
+    "06/12", "TRANSFER TO A/C", "500.00+", "500.00", "ACME TRADING",
+    "07/12", "150.00+", "650.00", "PETROL STATION*", "KUALA LUMPUR",    # card hold: no description
+    "07/12", "40.00-", "610.00", "PETROL STATION*",
+    "08/12", "PRE-AUTH DEBIT", "150.00-", "460.00",
+    "09/12", "SALE DEBIT", "500.00-", "40.00DR", "PETROL STATION*",     # overdrawn
+    "10/12", "DIVIDEND PAID", ".05+", "39.95DR",
+    "ENDING BALANCE :", "39.95DR",
+])
+
+
+def test_mbb_rows_without_description_are_kept():
+    rows = mbb_pdf_extraction.extract_trxInfo(MBB_TEXT, 4, "statement.pdf")
+    assert [(r["trn_pdf_date"], r["trn_pdf_description"]) for r in rows[1:3]] == [("07/12", ""), ("07/12", "")]
+    assert (rows[1]["trn_pdf_CR_Amount"], rows[2]["trn_pdf_DR_Amount"]) == (150.0, 40.0)
+
+
+def test_mbb_overdrawn_balance_is_negative():
+    rows = mbb_pdf_extraction.extract_trxInfo(MBB_TEXT, 4, "statement.pdf")
+    assert [r["trn_pdf_statementBalance"] for r in rows[-2:]] == [-40.0, -39.95]
+    assert rows[-1]["trn_pdf_CR_Amount"] == 0.05
+    assert reconcile(rows).ok
+
+
+# ===== RHB (text rows) =====
+def _rhb_row(date, description, amount, balance, *others):
+    return [date, description, "001", amount, balance, *others]
+
+
+RHB_TEXT = "\n".join([
+    "JANE TAN", "NO 1, JALAN CONTOH", "B/F BALANCE", "100.00",
+    *_rhb_row("01 Sep", "RPP INWD INST C", "50.00", "150.00", "JANE TAN", "Fund transfer"),   # own-account transfer
+    *_rhb_row("02 Sep", "MYDEBIT", "20.00", "130.00"),
+    "", "JANE TAN", "Account Statement / Penyata Akaun", "Page No / No Mukasurat", "2 of 2",
+    "Date", "Tarikh", "Balance", "Baki",
+    *_rhb_row("03 Sep", "MYDEBIT", "10.00", "120.00"),
+    "30 Sep", "C/F BALANCE", "120.00",
+])
+
+
+def test_rhb_holder_name_in_a_row_does_not_start_the_page_header():
+    rows = rhb_pdf_extraction.extract_trxInfo(RHB_TEXT, 9, "statement.pdf")
+    assert [(r["trn_pdf_date"], r["trn_pdf_statementBalance"]) for r in rows] == \
+        [("01 Sep", 150.0), ("02 Sep", 130.0), ("03 Sep", 120.0)]
+    assert reconcile(rows).ok
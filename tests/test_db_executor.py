@@ -0,0 +1,107 @@
+# flake8: noqa: E501
+import threading
+import tkinter as tk
+
+import pytest
+
+import db_executor
+
+
+class FakeWidget:
+    """Queues after() callbacks instead of running a Tk mainloop; drain() plays the Tk thread"""
+
+    def __init__(self):
+        self.pending = []
+        self.alive = True
+        self.destroyed = False
+        self.values = {}
+
+    def after(self, delay, func):
+        if self.destroyed:
+            raise tk.TclError("application has been destroyed")
+        self.pending.append(func)
+
+    def winfo_exists(self):
+        return self.alive
+
+    def __setitem__(self, key, value):
+        self.values[key] = value
+
+    def drain(self):
+        pending, self.pending = self.pending, []
+        for func in pending:
+            func()
+
+
+def _wait_pending(widget):
+    # ✅ add_done_callback may still be running on the worker thread when result() returns
+    for _ in range(100):
+        if widget.pending:
+            break
+        threading.Event().wait(0.01)
+    widget.drain()
+
+
+def _wait(future, widget):
+    future.result(timeout=5)
+    _wait_pending(widget)
+
+
+# ===== SUBMIT =====
+def test_result_is_delivered_on_the_widget_thread():
+    widget, received = FakeWidget(), []
+    worker = []
+    future = db_executor.submit(widget, lambda: worker.append(threading.current_thread().name) or 42, on_success=received.append)
+    _wait(future, widget)
+    assert received == [42]
+    assert worker[0].startswith("TransMatchDB")
+
+
+def test_error_goes_to_on_error():
+    widget, errors = FakeWidget(), []
+
+    def boom():
+        raise ValueError("bad query")
+
+    future = db_executor.submit(widget, boom, on_success=pytest.fail, on_error=errors.append)
+    with pytest.raises(ValueError):
+        future.result(timeout=5)
+    _wait_pending(widget)
+    assert [str(e) for e in errors] == ["bad query"]
+
+
+def test_closed_window_skips_callback():
+    widget, received = FakeWidget(), []
+    future = db_executor.submit(widget, lambda: 1, on_success=received.append)
+    widget.alive = False
+    _wait(future, widget)
+    assert received == []
+
+
+def test_destroyed_interpreter_drops_result():
+    widget = FakeWidget()
+    widget.destroyed = True
+    future = db_executor.submit(widget, lambda: 1, on_success=pytest.fail)
+    assert future.result(timeout=5) == 1
+
+
+# ===== QUERIES =====
+def test_run_query_turns_no_rows_into_empty_list(monkeypatch):
+    monkeypatch.setattr(db_executor, "executionWithRs_query", lambda query, params=None: None)
+    widget, received = FakeWidget(), []
+    _wait(db_executor.run_query(widget, "SELECT 1", on_success=received.append), widget)
+    assert received == [[]]
+
+
+def test_fill_combobox_uses_cache_and_keeps_leading_values(monkeypatch):
+    seen = []
+
+    def fake_cached(group, query, params=None):
+        seen.append((group, query, params))
+        return [("MAYBANK",), ("RHB",)]
+
+    monkeypatch.setattr(db_executor, "cached_query", fake_cached)
+    widget, combobox = FakeWidget(), FakeWidget()
+    _wait(db_executor.fill_combobox(widget, combobox, "bank", "SELECT ...", leading=("All",)), widget)
+    assert seen == [("bank", "SELECT ...", None)]
+    assert combobox.values["values"] == ["All", "MAYBANK", "RHB"]
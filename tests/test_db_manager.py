@@ -0,0 +1,195 @@
+# flake8: noqa: E501
+from collections import OrderedDict
+
+import pytest
+from psycopg2 import errors
+
+import db_manager
+
+
+class FakeConnection:
+    def __init__(self):
+        self.prepared_statements = OrderedDict()
+
+
+class FakeCursor:
+    """Records SQL sent to the server; pg_prepared_statements is answered from server_prepared"""
+
+    def __init__(self, connection=None, fail_execute=None):
+        self.connection = connection or FakeConnection()
+        self.executed = []
+        self.server_prepared = set()
+        self.fail_execute = fail_execute
+        self._row = None
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        if sql.startswith("SELECT 1 FROM pg_prepared_statements"):
+            self._row = (1,) if params[0] in self.server_prepared else None
+        elif sql.startswith("PREPARE "):
+            self.server_prepared.add(sql.split()[1])
+        elif sql.startswith("DEALLOCATE "):
+            self.server_prepared.remove(sql.split()[1])
+        elif sql.startswith("EXECUTE ") and self.fail_execute:
+            raise self.fail_execute
+
+    def fetchone(self):
+        return self._row
+
+    def statements(self, verb):
+        return [sql for sql, _ in self.executed if sql.startswith(verb)]
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    db_manager.reset_query_stats()
+    yield
+    db_manager.reset_query_stats()
+
+
+# ===== STATEMENT NAMES / PLACEHOLDERS =====
+@pytest.mark.parametrize("query, expected", [
+    ("select * from tm_mst_bank where num_bank_id = %s", "SELECT TM_MST_BANK"),
+    ("  INSERT INTO public.tm_trn_transaction (a) VALUES (%s)", "INSERT PUBLIC.TM_TRN_TRANSACTION"),
+    ("update tm_trn_statement set x = 1", "UPDATE TM_TRN_STATEMENT"),
+    ("SELECT 1", "SELECT"),
+    ("", "UNKNOWN"),
+])
+def test_default_query_name(query, expected):
+    assert db_manager._query_name(query) == expected
+
+
+def test_positional_placeholders_are_numbered():
+    assert db_manager._to_prepared_sql("SELECT a FROM t WHERE b = %s AND c LIKE 'x%%' AND d = %s") == \
+        ("SELECT a FROM t WHERE b = $1 AND c LIKE 'x%' AND d = $2", [])
+
+
+def test_named_placeholders_reuse_their_number():
+    assert db_manager._to_prepared_sql("WHERE a = %(bank)s OR b = %(cust)s OR c = %(bank)s") == \
+        ("WHERE a = $1 OR b = $2 OR c = $1", ["bank", "cust"])
+
+
+# ===== TIMING =====
+def test_timings_are_aggregated_per_name_with_histogram():
+    db_manager._record_timing("bank_lookup", 3.0, "SELECT 1")
+    db_manager._record_timing("bank_lookup", 7.0, "SELECT   1")
+    db_manager._record_timing("bank_lookup", 99999.0, "SELECT 1")
+    stat = db_manager.get_query_stats()["bank_lookup"]
+    assert stat["count"] == 3
+    assert stat["max_ms"] == 99999.0
+    assert stat["avg_ms"] == pytest.approx((3 + 7 + 99999) / 3, abs=0.001)
+    assert stat["histogram"]["<=5ms"] == 1
+    assert stat["histogram"]["<=10ms"] == 1
+    assert stat["histogram"][">5000ms"] == 1
+    assert stat["sql"] == "SELECT 1"
+
+
+def test_stats_are_ordered_by_total_time():
+    db_manager._record_timing("fast", 1.0, "SELECT 1")
+    db_manager._record_timing("slow", 400.0, "SELECT 2")
+    assert list(db_manager.get_query_stats()) == ["slow", "fast"]
+
+
+def test_unnamed_query_is_timed_under_default_name():
+    cursor = FakeCursor()
+    db_manager._execute(cursor, "SELECT * FROM tm_mst_bank", None, None, False)
+    assert cursor.executed == [("SELECT * FROM tm_mst_bank", ())]
+    assert list(db_manager.get_query_stats()) == ["SELECT TM_MST_BANK"]
+
+
+# ===== PREPARED STATEMENTS =====
+SQL = "SELECT VCH_BANK_NAME FROM TM_MST_BANK WHERE NUM_BANK_ID = %s"
+
+
+def test_prepared_statement_is_prepared_once_per_session():
+    cursor = FakeCursor()
+    db_manager._execute(cursor, SQL, (1,), "bank_by_id", True)
+    db_manager._execute(cursor, SQL, (2,), "bank_by_id", True)
+
+    prepares = cursor.statements("PREPARE")
+    assert len(prepares) == 1
+    stmt = prepares[0].split()[1]
+    assert stmt.startswith("tm_bank_by_id_")
+    assert prepares[0].endswith("AS SELECT VCH_BANK_NAME FROM TM_MST_BANK WHERE NUM_BANK_ID = $1")
+    assert [(sql, params) for sql, params in cursor.executed if sql.startswith("EXECUTE")] == \
+        [(f"EXECUTE {stmt} (%s)", [1]), (f"EXECUTE {stmt} (%s)", [2])]
+    assert db_manager.get_query_stats()["bank_by_id"]["count"] == 2
+
+
+def test_named_params_are_passed_in_placeholder_order():
+    cursor = FakeCursor()
+    db_manager._execute(cursor, "SELECT 1 FROM t WHERE a = %(cust)s AND b = %(bank)s", {"bank": 7, "cust": 3}, "lookup", True)
+    assert cursor.executed[-1][1] == [3, 7]
+
+
+def test_each_sql_variant_gets_its_own_statement():
+    cursor = FakeCursor()
+    db_manager._execute(cursor, SQL, (1,), "report_search", True)
+    db_manager._execute(cursor, SQL + " AND CHR_ACTIVE_IND = 'Y'", (1,), "report_search", True)
+    names = [sql.split()[1] for sql in cursor.statements("PREPARE")]
+    assert len(set(names)) == 2
+    assert all(name.startswith("tm_report_search_") for name in names)
+
+
+def test_statement_already_held_by_session_is_not_prepared_again():
+    first = FakeCursor()
+    db_manager._execute(first, SQL, (1,), "bank_by_id", True)
+    # ✅ Same server session, but the connection lost its bookkeeping (e.g. PREPARE before a rollback)
+    second = FakeCursor()
+    second.server_prepared = set(first.server_prepared)
+    db_manager._execute(second, SQL, (1,), "bank_by_id", True)
+    assert second.statements("PREPARE") == []
+    assert len(second.statements("EXECUTE")) == 1
+
+
+def test_lost_statement_is_prepared_again_on_next_use():
+    cursor = FakeCursor(fail_execute=errors.InvalidSqlStatementName("prepared statement does not exist"))
+    with pytest.raises(errors.InvalidSqlStatementName):
+        db_manager._execute(cursor, SQL, (1,), "bank_by_id", True)
+    assert not cursor.connection.prepared_statements
+
+
+def test_connection_without_bookkeeping_runs_plain_sql():
+    cursor = FakeCursor(connection=object())
+    db_manager._execute(cursor, SQL, (1,), "bank_by_id", True)
+    assert cursor.executed == [(SQL, (1,))]
+
+
+# ===== BOUNDED PER SESSION =====
+def _variants(count):
+    return [SQL + f" AND NUM_GROUP_ID = {i}" for i in range(count)]
+
+
+def test_least_recently_used_statement_is_deallocated(monkeypatch):
+    monkeypatch.setattr(db_manager, "MAX_PREPARED_STATEMENTS", 2)
+    cursor = FakeCursor()
+    first, second, third = _variants(3)
+    db_manager._execute(cursor, first, (1,), "report_search", True)
+    db_manager._execute(cursor, second, (1,), "report_search", True)
+    db_manager._execute(cursor, first, (1,), "report_search", True)  # second is now the oldest
+    db_manager._execute(cursor, third, (1,), "report_search", True)
+
+    first_stmt, second_stmt, third_stmt = [sql.split()[1] for sql in cursor.statements("PREPARE")]
+    assert [sql.split()[1] for sql in cursor.statements("DEALLOCATE")] == [second_stmt]
+    assert list(cursor.connection.prepared_statements) == [first_stmt, third_stmt]
+    assert cursor.server_prepared == {first_stmt, third_stmt}
+
+
+def test_session_never_holds_more_than_the_limit(monkeypatch):
+    monkeypatch.setattr(db_manager, "MAX_PREPARED_STATEMENTS", 3)
+    cursor = FakeCursor()
+    for query in _variants(10):
+        db_manager._execute(cursor, query, (1,), "report_search", True)
+    assert len(cursor.connection.prepared_statements) == 3
+    assert len(cursor.server_prepared) == 3
+
+
+def test_evicted_statement_unknown_to_session_is_not_deallocated(monkeypatch):
+    monkeypatch.setattr(db_manager, "MAX_PREPARED_STATEMENTS", 1)
+    cursor = FakeCursor()
+    first, second = _variants(2)
+    db_manager._execute(cursor, first, (1,), "report_search", True)
+    cursor.server_prepared.clear()  # e.g. DISCARD ALL on the session
+    db_manager._execute(cursor, second, (1,), "report_search", True)
+    assert cursor.statements("DEALLOCATE") == []
+    assert len(cursor.statements("PREPARE")) == 2
@@ -0,0 +1,113 @@
+# flake8: noqa: E501
+import pytest
+
+import master_data_cache
+
+SQL = "SELECT VCH_BANK_NAME FROM TM_MST_BANK WHERE NUM_BANK_ID = %s"
+
+
+class FakeDatabase:
+    """Stands in for executionWithRs_query: records every round trip and answers from a dict"""
+
+    def __init__(self):
+        self.calls = []
+        self.answers = {}
+
+    def __call__(self, query, params=None, name=None, prepared=False):
+        self.calls.append((query, params, name, prepared))
+        return self.answers.get(tuple(params or ()), [])
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(master_data_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def db(monkeypatch, clock):
+    fake = FakeDatabase()
+    monkeypatch.setattr(master_data_cache, "executionWithRs_query", fake)
+    master_data_cache.invalidate()
+    yield fake
+    master_data_cache.invalidate()
+
+
+# ===== HIT / MISS =====
+def test_repeated_lookup_is_served_from_cache(db):
+    db.answers[(1,)] = [("MAYBANK",)]
+    assert master_data_cache.cached_query("bank", SQL, (1,)) == [("MAYBANK",)]
+    assert master_data_cache.cached_query("bank", SQL, [1]) == [("MAYBANK",)]
+    assert len(db.calls) == 1
+
+
+def test_whitespace_in_query_does_not_split_the_cache(db):
+    db.answers[(1,)] = [("MAYBANK",)]
+    master_data_cache.cached_query("bank", SQL, (1,))
+    master_data_cache.cached_query("bank", "  " + SQL.replace(" ", "\n    "), (1,))
+    assert len(db.calls) == 1
+
+
+def test_params_are_part_of_the_key(db):
+    db.answers[(1,)] = [("MAYBANK",)]
+    db.answers[(2,)] = [("RHB",)]
+    assert master_data_cache.cached_query("bank", SQL, (1,)) == [("MAYBANK",)]
+    assert master_data_cache.cached_query("bank", SQL, (2,)) == [("RHB",)]
+    assert len(db.calls) == 2
+
+
+def test_empty_result_is_not_remembered(db):
+    assert master_data_cache.cached_query("bank", SQL, (9,)) == []
+    db.answers[(9,)] = [("NEW BANK",)]  # e.g. inserted by get_or_create
+    assert master_data_cache.cached_query("bank", SQL, (9,)) == [("NEW BANK",)]
+    assert len(db.calls) == 2
+
+
+def test_named_lookup_runs_prepared(db):
+    master_data_cache.cached_query("bank", SQL, (1,), name="bank_by_id")
+    master_data_cache.cached_query("bank", SQL, (2,))
+    assert [call[2:] for call in db.calls] == [("bank_by_id", True), (None, False)]
+
+
+# ===== EXPIRY / INVALIDATION =====
+def test_entry_expires_after_ttl(db, clock):
+    db.answers[(1,)] = [("MAYBANK",)]
+    master_data_cache.cached_query("bank", SQL, (1,), ttl=60)
+    clock[0] += 59
+    master_data_cache.cached_query("bank", SQL, (1,), ttl=60)
+    assert len(db.calls) == 1
+    clock[0] += 1
+    master_data_cache.cached_query("bank", SQL, (1,), ttl=60)
+    assert len(db.calls) == 2
+
+
+def test_invalidate_drops_only_the_given_group(db):
+    db.answers[(1,)] = [("MAYBANK",)]
+    master_data_cache.cached_query("bank", SQL, (1,))
+    master_data_cache.cached_query("customer", SQL, (1,))
+    master_data_cache.invalidate("bank")
+    master_data_cache.cached_query("bank", SQL, (1,))
+    master_data_cache.cached_query("customer", SQL, (1,))
+    assert len(db.calls) == 3
+
+
+def test_invalidate_without_groups_clears_everything(db):
+    db.answers[(1,)] = [("MAYBANK",)]
+    master_data_cache.cached_query("bank", SQL, (1,))
+    master_data_cache.cached_query("customer", SQL, (1,))
+    master_data_cache.invalidate()
+    master_data_cache.cached_query("bank", SQL, (1,))
+    master_data_cache.cached_query("customer", SQL, (1,))
+    assert len(db.calls) == 4
+
+
+def test_warm_up_survives_a_failing_query(db, monkeypatch):
+    def flaky(query, params=None, name=None, prepared=False):
+        if query == master_data_cache.SQL_BANK_NAMES:
+            raise RuntimeError("connection lost")
+        return [("row",)]
+
+    monkeypatch.setattr(master_data_cache, "executionWithRs_query", flaky)
+    master_data_cache.warm_up()
+    assert master_data_cache.cached_query("role", master_data_cache.SQL_ACTIVE_ROLES) == [("row",)]
@@ -0,0 +1,38 @@
+# flake8: noqa: E501
+"""
+Parity of the PyMuPDF RHB XY engines (fitzxy_rhb / fitzxy_rhbcc) with the pdfplumber ones
+(pdfplumberxy_rhb / pdfplumberxy_rhbcc): the DOC and TRN output (as JSON) of every ok_RHB_*
+statement in PDF_Sample must be identical. Skipped when the samples are not available.
+"""
+
+import glob
+import os
+
+import pytest
+
+for module in ("fitz", "pdfplumber", "cv2", "pdf2image", "pytesseract", "ocrmypdf"):
+    pytest.importorskip(module)
+
+from transaction.pdf_extraction_method import pdf_extractor_engine as engines  # noqa: E402
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PDF_Sample")
+SAMPLES = sorted(glob.glob(os.path.join(SAMPLE_DIR, "ok_RHB_*.pdf")))
+
+# (pdfplumber engine, PyMuPDF engine), DOC pass before TRN pass as in pdf_processor
+ENGINE_PAIRS = {
+    "Reflex DOC": (engines.extract_with_pdfplumber_xy_rhb_doc, engines.extract_with_fitz_xy_rhb_doc),
+    "Reflex TRN": (engines.extract_with_pdfplumber_xy_rhb_trn, engines.extract_with_fitz_xy_rhb_trn),
+    "Current DOC": (engines.extract_with_pdfplumber_xy_rhbcurr_doc, engines.extract_with_fitz_xy_rhbcurr_doc),
+    "Current TRN": (engines.extract_with_pdfplumber_xy_rhbcurr_trn, engines.extract_with_fitz_xy_rhbcurr_trn),
+}
+
+pytestmark = pytest.mark.skipif(not SAMPLES, reason=f"no ok_RHB_* sample statements in {SAMPLE_DIR}")
+
+
+@pytest.mark.parametrize("label", list(ENGINE_PAIRS))
+@pytest.mark.parametrize("pdf_path", SAMPLES, ids=os.path.basename)
+def test_fitz_xy_matches_pdfplumber_xy(pdf_path, label):
+    plumber_engine, fitz_engine = ENGINE_PAIRS[label]
+    expected = plumber_engine(pdf_path).to_json()
+    actual = fitz_engine(pdf_path).to_json()
+    assert actual.splitlines() == expected.splitlines()
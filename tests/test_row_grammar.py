@@ -0,0 +1,30 @@
+# flake8: noqa: E501
+import pytest
+
+from transaction.pdf_extraction_method import row_grammar
+
+PATTERNS = {"amount": r"^\d{1,3}(?:,\d{3})*\.\d{2}-?$", "date": r"^(\d{2})/(\d{2})$"}
+
+
+def test_grammar_compiled_and_registered():
+    grammar = row_grammar.register("test_valid", PATTERNS, [("amount", "1,234.50", True), ("amount", "1234.5", False), ("date", "01/12", ("01", "12"))])
+    assert grammar.amount.match("27,764.33-")
+    assert row_grammar.get("test_valid") is grammar
+    assert "test_valid" in row_grammar.registered()
+
+
+def test_broken_pattern_fails_registration():
+    with pytest.raises(ValueError, match="expected"):
+        row_grammar.register("test_broken", PATTERNS, [("date", "01/12/2024", True)])
+    assert "test_broken" not in row_grammar.registered()
+
+
+def test_sample_for_unknown_pattern_rejected():
+    with pytest.raises(ValueError, match="unknown pattern"):
+        row_grammar.register("test_unknown", PATTERNS, [("balance", "1.00", True)])
+
+
+def test_grammar_registered_once():
+    row_grammar.register("test_once", PATTERNS)
+    with pytest.raises(ValueError, match="already registered"):
+        row_grammar.register("test_once", PATTERNS)
@@ -0,0 +1,108 @@
+# flake8: noqa: E501
+import pytest
+
+from report.fuzzy_screening import FuzzyNameIndex, jaro_winkler, normalize_tokens
+from report.screening_engine import MATCH_FULL, MATCH_FUZZY_BLACKLIST, MATCH_FUZZY_SUSPICIOUS, MATCH_PARTIAL, MATCH_SUSPICIOUS, AhoCorasick, KeywordMatcher, ScreeningEngine, is_keyword_matched
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return ScreeningEngine(["Ahmad Bin Ali", "ACME SDN. BHD.", "Rahmat Sulaiman"], ["Lee Chong Wei", "Ahmad Bin Ali Trading"])
+
+
+# ===== AHO-CORASICK =====
+def test_aho_corasick_finds_overlapping_patterns():
+    matcher = AhoCorasick(["he", "she", "his", "hers"])
+    assert matcher.find_first("ushers") == "she"
+    assert matcher.find_all("ushers") == ["she", "he", "hers"]
+    assert matcher.find_first("xyz") is None
+
+
+def test_aho_corasick_ignores_empty_patterns():
+    assert AhoCorasick(["", "ali"]).find_all("ali bin abu") == ["ali"]
+
+
+# ===== EXACT SCREENING =====
+@pytest.mark.parametrize("description, expected", [
+    ("IBG TRANSFER AHMAD BIN ALI", (MATCH_FULL, "ahmad bin ali")),
+    ("*AHMAD*BIN*ALI*", (MATCH_FULL, "ahmad bin ali")),           # '*' read as a space
+    ("TRF ACME SDN. BHD. INV 123", (MATCH_FULL, "acme sdn. bhd.")),
+    ("PAYMENT TO ALI", (MATCH_PARTIAL, "ahmad bin ali")),
+    ("DUITNOW LEE CHONG WEI", (MATCH_SUSPICIOUS, "lee chong wei")),
+    ("CASH DEPOSIT", (None, None)),
+    ("", (None, None)),
+])
+def test_screen(engine, description, expected):
+    assert engine.screen(description) == expected
+
+
+def test_blacklist_hit_ranks_before_suspicious(engine):
+    assert engine.screen("AHMAD BIN ALI TRADING") == (MATCH_FULL, "ahmad bin ali")
+    assert engine.screen_all("AHMAD BIN ALI TRADING") == [(MATCH_FULL, "ahmad bin ali", True), (MATCH_SUSPICIOUS, "ahmad bin ali trading", False)]
+
+
+# ===== BLOCK PROXIMITY =====
+def test_keyword_words_close_together_match():
+    assert KeywordMatcher("trf ahmad bn ali").matches("ahmad bin ali")
+    assert not KeywordMatcher("ahmad paid for a long list of items to ali").matches("ahmad bin ali")
+
+
+def test_single_keyword_word_is_not_a_block():
+    assert not KeywordMatcher("payment to ali").matches("ahmad bin ali")
+
+
+def test_one_matcher_checks_many_keywords():
+    matcher = KeywordMatcher("IBG LEE WEI CHONG SALARY")
+    assert [matcher.matches(k) for k in ("lee chong wei", "tan ah kow", "wei chong")] == [True, False, True]
+
+
+def test_is_keyword_matched_wrapper():
+    assert is_keyword_matched("ahmad bin ali", "x ahmad y ali")
+    assert not is_keyword_matched("ahmad bin ali", "ahmad a b c d ali")
+
+
+def test_partial_hit_reports_proximity(engine):
+    assert engine.screen_all("TRF AHMAD BN ALI") == [(MATCH_PARTIAL, "ahmad bin ali", True)]
+    assert engine.screen_all("PAYMENT TO ALI") == [(MATCH_PARTIAL, "ahmad bin ali", False)]
+
+
+# ===== FUZZY SCREENING =====
+def test_spelling_variant_of_blacklisted_name(engine):
+    assert engine.screen("IBG RAHMATT SULAIMANN") == (None, None)  # exact screening only
+    assert engine.screen_all("IBG RAHMATT SULAIMANN") == [(MATCH_FUZZY_BLACKLIST, "rahmat sulaiman", False)]
+    assert engine.screen_all("IBG RAHMATSULAIMAN") == [(MATCH_FUZZY_BLACKLIST, "rahmat sulaiman", False)]
+
+
+def test_fuzzy_match_on_ner_name(engine):
+    assert engine.screen_all("IBG TRANSFER", ner="Lee Chong Way") == [(MATCH_FUZZY_SUSPICIOUS, "lee chong wei", False)]
+
+
+def test_exact_hit_not_reported_again_as_fuzzy(engine):
+    assert [hit[0] for hit in engine.screen_all("DUITNOW LEE CHONG WEI", ner="Lee Chong Wei")] == [MATCH_SUSPICIOUS]
+
+
+def test_name_variants_folded():
+    assert normalize_tokens("MOHD ALI A/L RAMU") == ["muhammad", "ali", "al", "ramu"]
+
+
+def test_jaro_winkler():
+    assert jaro_winkler("abc", "abc") == 1.0
+    assert jaro_winkler("", "abc") == 0.0
+    assert jaro_winkler("martha", "marhta") == pytest.approx(0.9611, abs=1e-4)
+
+
+def test_fuzzy_index_skips_short_names():
+    index = FuzzyNameIndex(["Muhammad Ali bin Abu", "Tan", "Ng Ah"])
+    assert len(index) == 1
+    assert index.search("TAN AH KOW") == {}
+
+
+def test_fuzzy_index_finds_variant_in_text():
+    index = FuzzyNameIndex(["Muhammad Ali bin Abu"])
+    assert index.search("IBG MOHD ALI BIN ABU SALARY") == {"Muhammad Ali bin Abu": 1.0}
+    assert index.search("MUHAMAD ALLI BIN ABU")["Muhammad Ali bin Abu"] >= index.threshold
+    assert index.search("IBG SALARY MAY") == {}
+
+
+def test_fuzzy_screening_disabled_by_zero_threshold():
+    assert FuzzyNameIndex(["Muhammad Ali bin Abu"], threshold=0).search("MUHAMMAD ALI BIN ABU") == {}
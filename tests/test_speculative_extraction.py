@@ -0,0 +1,60 @@
+# flake8: noqa: E501
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from transaction import speculative_extraction as se
+
+
+@pytest.fixture(autouse=True)
+def wins_file(tmp_path, monkeypatch):
+    path = tmp_path / "engine_wins.json"
+    monkeypatch.setattr(se, "ENGINE_WINS_FILE", str(path))
+    monkeypatch.setattr(se, "ENGINE_WINS_LOCK", str(path) + ".lock")
+    return path
+
+
+def _wins(wins_file, bank_wins):
+    wins_file.write_text(json.dumps({"8": bank_wins}), encoding="utf-8")
+
+
+# ===== RANKING =====
+def test_configured_engine_kept_below_min_wins(wins_file):
+    _wins(wins_file, {"pdfplumberxy_rhb": se.ADAPT_MIN_WINS - 1})
+    assert se.ranked_engines(8, ["fitzxy_rhb", "pdfplumberxy_rhb"]) == ["fitzxy_rhb", "pdfplumberxy_rhb"]
+
+
+def test_engine_that_keeps_winning_goes_first(wins_file):
+    _wins(wins_file, {"fitzxy_rhb": 1, "pdfplumberxy_rhb": se.ADAPT_MIN_WINS})
+    assert se.ranked_engines(8, ["fitzxy_rhb", "fitzxy_rhbcc", "pdfplumberxy_rhb"]) == ["pdfplumberxy_rhb", "fitzxy_rhb", "fitzxy_rhbcc"]
+
+
+def test_ocr_engine_never_promoted(wins_file):
+    _wins(wins_file, {"pdf2image": 50})
+    assert se.ranked_engines(8, ["fitz", "pdf2image"]) == ["fitz", "pdf2image"]
+
+
+# ===== REGISTRY =====
+def _record(args):
+    path, bank_id, engine, count = args
+    se.ENGINE_WINS_FILE = path
+    se.ENGINE_WINS_LOCK = path + ".lock"
+    for _ in range(count):
+        se.record_win(bank_id, engine)
+
+
+def test_wins_from_concurrent_processes_all_counted(wins_file):
+    jobs = [(str(wins_file), 8, engine, 20) for engine in ("fitzxy_rhb", "pdfplumberxy_rhb", "fitzxy_rhb", "pdfplumberxy_rhb")]
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_record, jobs))
+    assert se.load_engine_wins() == {"8": {"fitzxy_rhb": 40, "pdfplumberxy_rhb": 40}}
+    assert not (wins_file.parent / (wins_file.name + ".lock")).exists()
+
+
+def test_stale_lock_taken_over(wins_file, monkeypatch):
+    lock = wins_file.parent / (wins_file.name + ".lock")
+    lock.write_text("1")
+    monkeypatch.setattr(se, "LOCK_STALE_SECONDS", -1)
+    se.record_win(8, "fitzxy_rhb")
+    assert se.load_engine_wins() == {"8": {"fitzxy_rhb": 1}}
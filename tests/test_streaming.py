@@ -0,0 +1,167 @@
+# flake8: noqa: E501
+import io
+import json
+
+import pytest
+
+from transaction.pdf_extraction_method import mbb_pdf_extraction
+from transaction.pdf_extraction_method.line_extractor import iter_text_lines
+
+# ✅ Made-up Maybank layout: the page header repeats and the second row continues on page 2
+HEADER = "MAYBANK ISLAMIC BERHAD\nSTATEMENT OF ACCOUNT\nURUSNIAGA AKAUN\nTARIKH MASUK\nENTRY DATE\nSTATEMENT BALANCE\n"
+PAGES = [
+    HEADER + "01/06/24 TRANSFER FR A/C 1,000.00+ 26,000.50\nACME TRADING\n02/06/24 CASH DEPOSIT 200.00+ 26,200.50\n"
+             "03/06/24 CHEQUE 100.00- 26,100.50\n04/06/24 ATM WITHDRAWAL 300.00- 25,800.50\n"
+             "05/06/24 DUITNOW PAYMENT 300.00- 25,500.50\nBETA SUPPLIES",
+    HEADER + "SEWA KEDAI\n06/06/24 PROFIT PAID 12.34+ 25,512.84\nENDING BALANCE : 25,512.84\nTOTAL DEBIT : 700.00",
+]
+
+
+def _batch_extract():
+    try:
+        from transaction import batch_extract
+    except Exception as e:  # OCR toolchain (OpenCV, Tesseract, Poppler) not installed here
+        pytest.skip(f"transaction.batch_extract unavailable: {e}")
+    return batch_extract
+
+
+def _pdf_processor():
+    try:
+        from transaction import pdf_processor
+    except Exception as e:  # OCR toolchain (OpenCV, Tesseract, Poppler) not installed here
+        pytest.skip(f"transaction.pdf_processor unavailable: {e}")
+    return pdf_processor
+
+
+def _trx(credit, debit, balance):
+    return {"trn_pdf_CR_Amount": credit, "trn_pdf_DR_Amount": debit, "trn_pdf_statementBalance": balance}
+
+
+def _pages(consumed):
+    for page in PAGES:
+        consumed.append(page)
+        yield page
+
+
+# ===== PAGE TEXTS =====
+def test_page_lines_match_the_joined_text():
+    assert list(iter_text_lines(PAGES)) == "\n".join(PAGES).split("\n")
+    assert list(iter_text_lines(["", "a\n", "b"])) == ["", "a", "", "b"]
+
+
+# ===== STREAMED EXTRACTION =====
+def test_streamed_rows_equal_the_list_extraction():
+    streamed = list(mbb_pdf_extraction.iter_trxInfo(iter(PAGES), 1, "statement.pdf"))
+    assert streamed == mbb_pdf_extraction.extract_trxInfo("\n".join(PAGES), 1, "statement.pdf")
+    assert [(t["trn_pdf_date"], t["trn_pdf_statementBalance"]) for t in streamed] == \
+        [("01/06/24", 26000.5), ("02/06/24", 26200.5), ("03/06/24", 26100.5),
+         ("04/06/24", 25800.5), ("05/06/24", 25500.5), ("06/06/24", 25512.84)]
+
+
+def test_row_continued_on_next_page_keeps_its_lines():
+    rows = list(mbb_pdf_extraction.iter_trxInfo(iter(PAGES), 1, "statement.pdf"))
+    assert rows[4]["trn_pdf_description_others"] == "BETA SUPPLIES SEWA KEDAI"
+
+
+def test_first_row_arrives_before_the_next_page_is_read():
+    consumed = []
+    rows = mbb_pdf_extraction.iter_trxInfo(_pages(consumed), 1, "statement.pdf")
+    first = next(rows)
+    assert first["trn_pdf_date"] == "01/06/24"
+    assert len(consumed) == 1
+
+
+# ===== BATCH CLI =====
+def test_batch_writes_document_rows_and_reconciliation(monkeypatch):
+    batch_extract = _batch_extract()
+
+    class Reconciliation:
+        checked = 3
+        breaks = [1]
+
+    def fake_extraction(pdf_path, stream=False, on_reconciled=None):
+        def transactions():
+            yield {"trn_pdf_date": "01/06/24"}
+            yield {"trn_pdf_date": "02/06/24"}
+            on_reconciled("CR/DR swapped", None, Reconciliation())
+
+        return {"Document Info": {"Account Number": "000"}, "Transactions": transactions()}
+
+    monkeypatch.setattr(batch_extract, "pdf_data_extraction_main", fake_extraction)
+    out = io.StringIO()
+    assert batch_extract.extract_to_jsonl(["a.pdf"], out) == {"a.pdf": 2}
+
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [sorted(k for k in line if k != "file") for line in lines] == \
+        [["document"], ["row", "transaction"], ["row", "transaction"], ["reconciliation"]]
+    assert lines[-1]["reconciliation"] == {"checked": 3, "breaks": [2], "column_map": "CR/DR swapped"}
+
+
+def test_batch_writes_rows_of_the_alternate_engine_that_reconciles(monkeypatch):
+    batch_extract = _batch_extract()
+    rows = [{"trn_pdf_date": "01/06/24"}]
+
+    class Reconciliation:
+        checked = 1
+        breaks = [0]
+
+    def fake_extraction(pdf_path, stream=False, on_reconciled=None):
+        def transactions():
+            yield {"trn_pdf_date": "01/06"}
+            on_reconciled(batch_extract.AS_EXTRACTED, Reconciliation(), Reconciliation(), ("fitzxy_rhbcc", batch_extract.AS_EXTRACTED, rows, None))
+
+        return {"Document Info": {}, "Transactions": transactions()}
+
+    monkeypatch.setattr(batch_extract, "pdf_data_extraction_main", fake_extraction)
+    out = io.StringIO()
+    batch_extract.extract_to_jsonl(["a.pdf"], out)
+    reconciliation = json.loads(out.getvalue().splitlines()[-1])["reconciliation"]
+    assert reconciliation == {"checked": 1, "breaks": [1], "engine": "fitzxy_rhbcc", "transactions": rows}
+
+
+def test_alternate_engine_is_offered_only_when_it_reconciles(monkeypatch):
+    pdf_processor = _pdf_processor()
+    texts = {"fitzxy_rhbcc": "reconciles", "pdfplumberxy_rhbcc": "breaks"}
+    rows = {
+        "reconciles": [_trx("100.00", "", "1,100.00"), _trx("", "50.00", "1,050.00")],
+        "breaks": [_trx("100.00", "", "1,100.00"), _trx("", "50.00", "9,999.00")],
+    }
+    monkeypatch.setattr(pdf_processor, "extract_text_by_engine", lambda pdf_path, engine, page_mode="all": texts[engine])
+    monkeypatch.setattr(pdf_processor, "extract_docInfo_TrxInfo", lambda bank, text, purpose: rows[text])
+
+    engine, column_map, transactions, result = pdf_processor.alternate_trxInfo(8, "fitzxy_rhb", "statement.pdf")
+    assert (engine, column_map, transactions, result.ok) == ("fitzxy_rhbcc", pdf_processor.AS_EXTRACTED, rows["reconciles"], True)
+    assert pdf_processor.alternate_trxInfo(8, "pdfplumberxy_rhb", "statement.pdf") is None
+    assert pdf_processor.alternate_trxInfo(2, "fitz", "statement.pdf") is None  # no alternates configured
+
+
+def test_batch_reports_failed_statement_and_goes_on(monkeypatch):
+    batch_extract = _batch_extract()
+
+    def fake_extraction(pdf_path, stream=False, on_reconciled=None):
+        if pdf_path == "bad.pdf":
+            raise ValueError("not a statement")
+        return {"Document Info": {}, "Transactions": iter([{}])}
+
+    monkeypatch.setattr(batch_extract, "pdf_data_extraction_main", fake_extraction)
+    results = batch_extract.extract_to_jsonl(["bad.pdf", "good.pdf"], io.StringIO())
+    assert results == {"bad.pdf": "error: not a statement", "good.pdf": 1}
+
+
+# ===== FITZ PAGES =====
+def test_fitz_pages_are_read_one_by_one(tmp_path):
+    fitz = pytest.importorskip("fitz")
+    try:
+        from transaction.pdf_extraction_method import pdf_extractor_engine as engine
+    except Exception as e:
+        pytest.skip(f"pdf_extractor_engine unavailable: {e}")
+    path = str(tmp_path / "two_pages.pdf")
+    doc = fitz.open()
+    for text in ("PAGE ONE", "PAGE TWO"):
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(path)
+    doc.close()
+
+    pages = list(engine.iter_pages_by_engine(path, "fitz"))
+    assert [page.strip() for page in pages] == ["PAGE ONE", "PAGE TWO"]
+    assert "\n".join(pages) == engine.extract_with_fitz(path)
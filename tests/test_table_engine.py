@@ -0,0 +1,54 @@
+# flake8: noqa: E501
+import json
+
+import pytest
+
+pytest.importorskip("fitz")
+
+from transaction.pdf_extraction_method.table_engine import EngineResult, PageWords, TableLayout, TableRow, box_fields, table_row  # noqa: E402
+
+LAYOUT = TableLayout({"Date": (0, 60), "Description": (60, 300), "Debit": (300, 380), "Credit": (380, 460), "Balance": (460, 560)})
+
+# (x0, top, x1, bottom, text) in reading order
+WORDS = [
+    (10, 100.0, 50, 108, "01/12"), (70, 100.5, 120, 108, "IBG"), (125, 100.5, 200, 108, "TRANSFER"), (470, 100.0, 540, 108, "1,500.00"), (390, 101.0, 450, 108, "1,000.00"),
+    (70, 110.0, 160, 118, "AHMAD"),
+    (10, 130.0, 50, 138, "02/12"), (70, 130.0, 120, 138, "FEE"), (310, 130.2, 370, 138, "0.50"), (470, 130.0, 540, 138, "1,499.50"),
+]
+
+
+def test_overlapping_columns_rejected():
+    with pytest.raises(ValueError, match="overlap"):
+        TableLayout({"A": (0, 100), "B": (90, 200)})
+
+
+@pytest.mark.parametrize("x, column", [(0, "Date"), (59.9, "Date"), (60, "Description"), (459, "Credit"), (560, None), (-1, None)])
+def test_column_of(x, column):
+    assert LAYOUT.column_of(x) == column
+
+
+def test_bands_group_words_within_tolerance():
+    rows = PageWords(WORDS).bands(3)
+    assert [[w[4] for w in row] for row in rows] == [["01/12", "1,500.00", "IBG", "TRANSFER", "1,000.00"], ["AHMAD"], ["02/12", "FEE", "1,499.50", "0.50"]]
+
+
+def test_layout_row_puts_words_in_columns():
+    first = PageWords(WORDS).bands(3)[0]
+    assert LAYOUT.row(sorted(first)) == {"Date": "01/12", "Description": "IBG TRANSFER", "Debit": "", "Credit": "1,000.00", "Balance": "1,500.00"}
+
+
+def test_between_lines_keeps_reading_order():
+    rows = list(PageWords(WORDS).between_lines([95, 125, 140]))
+    assert [[w[4] for w in row] for row in rows] == [["01/12", "IBG", "TRANSFER", "1,500.00", "1,000.00", "AHMAD"], ["02/12", "FEE", "0.50", "1,499.50"]]
+
+
+def test_box_fields_keep_default_for_empty_box():
+    fields = box_fields(PageWords(WORDS), {"Date": (0, 60, 95, 105), "Account": (0, 60, 0, 50)}, {"Date": "", "Account": "NA"})
+    assert fields == {"Date": "01/12", "Account": "NA"}
+
+
+def test_engine_result_json():
+    row = table_row({"Date": "01/12"}, WORDS[:2], page=1)
+    assert row == TableRow({"Date": "01/12"}, 1, 100.0, 108)
+    assert json.loads(EngineResult("fitzxy_rhb", [row]).to_json()) == [{"Date": "01/12"}]
+    assert json.loads(EngineResult("fitzxy_rhb", fields={"Account": "NA"}).to_json()) == {"Account": "NA"}
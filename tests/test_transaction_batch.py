@@ -0,0 +1,114 @@
+# flake8: noqa: E501
+from datetime import datetime
+
+import pytest
+
+from transaction.transaction_batch import TransactionBatch, cents_text, normalize_amounts, normalize_dates, parse_statement_date, to_cents
+
+
+# ===== STATEMENT DATE =====
+@pytest.mark.parametrize("text, expected", [
+    ("01/12/24", datetime(2024, 12, 1)),      # day first, not 12 Jan
+    ("13/01/2025", datetime(2025, 1, 13)),
+    ("30 Jun 2025", datetime(2025, 6, 30)),
+    ("2024-12-31", datetime(2024, 12, 31)),
+    ("31.12.2024", datetime(2024, 12, 31)),
+])
+def test_statement_date_is_day_first(text, expected):
+    assert parse_statement_date(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2025-01-05", datetime(2025, 1, 5)),      # DateEntry text: 5 Jan, not 1 May
+    ("2025-01-05 00:00:00", datetime(2025, 1, 5)),
+    ("2025-02-30", None),
+])
+def test_iso_statement_date_is_year_month_day(text, expected):
+    assert parse_statement_date(text) == expected
+
+
+def test_batch_takes_year_from_iso_statement_date():
+    assert TransactionBatch("2025-01-05").statement_date == datetime(2025, 1, 5)
+
+
+def test_unreadable_statement_date():
+    assert parse_statement_date("NA") is None
+
+
+# ===== DD/MM ROLLOVER =====
+def _dates(texts, statement_date_text):
+    return normalize_dates(texts, parse_statement_date(statement_date_text))
+
+
+def test_day_month_takes_statement_year():
+    values, reasons = _dates(["15/11", "01/12"], "01/12/24")
+    assert values == ["2024-11-15 00:00:00", "2024-12-01 00:00:00"]
+    assert not reasons
+
+
+def test_december_row_of_january_statement_is_previous_year():
+    values, _ = _dates(["28/12", "05/01"], "31/01/25")
+    assert values == ["2024-12-28 00:00:00", "2025-01-05 00:00:00"]
+
+
+def test_row_within_grace_after_statement_date_keeps_year():
+    values, _ = _dates(["02/02"], "31/01/25")
+    assert values == ["2025-02-02 00:00:00"]
+
+
+def test_leap_day_tried_against_previous_year():
+    values, reasons = _dates(["29/02"], "15/03/25")
+    assert values == ["2024-02-29 00:00:00"]
+    assert not reasons
+
+
+def test_leap_day_without_leap_year_is_rejected():
+    values, reasons = _dates(["29/02"], "15/03/23")
+    assert values == [None]
+    assert "29/02" in reasons[0]
+
+
+def test_day_month_without_statement_date_is_rejected():
+    values, reasons = normalize_dates(["15/11"], None)
+    assert values == [None] and 0 in reasons
+
+
+# ===== BATCH =====
+def test_batch_rejects_bad_rows_and_keeps_statement_positions():
+    batch = TransactionBatch("01/12/24")
+    batch.append("15/11", "A", "", "", "10.00", "", "110.00")
+    batch.append("31/11", "B", "", "", "", "5", "105.00")      # no 31 November
+    batch.append("20/11", "C", "", "", "abc", "", "105.00")    # unreadable amount
+    batch.append("21/11", "D", "", "", "", "1,000.5", "-895.50")
+
+    assert len(batch) == 2
+    assert [row.description for row in batch] == ["A", "D"]
+    assert [row.date for row in batch] == ["2024-11-15 00:00:00", "2024-11-21 00:00:00"]
+    assert list(batch.credits) == [1000, 0]
+    assert list(batch.debits) == [0, 100050]
+    assert list(batch.balances) == [11000, -89550]
+    assert [(r.row, r.values[1]) for r in batch.rejected] == [(2, "B"), (3, "C")]
+    assert "invalid trn_pdf_CR_Amount 'abc'" in batch.rejected[1].reason
+
+
+# ===== AMOUNTS =====
+@pytest.mark.parametrize("value, cents", [
+    ("1,234.5", 123450),
+    (1234.5, 123450),
+    ("  -12.30 ", -1230),
+    (0.1 + 0.2, 30),       # float noise rounded to the cent
+    ("", 0),
+    (None, 0),
+])
+def test_to_cents(value, cents):
+    assert to_cents(value) == cents
+
+
+def test_cents_text_has_two_decimals():
+    assert [cents_text(c) for c in (123450, -5, 0)] == ["1234.50", "-0.05", "0.00"]
+
+
+def test_normalize_amounts_rejects_non_numbers():
+    cents, reasons = normalize_amounts(["1.00", "abc", "", "2,000"], "credit")
+    assert list(cents) == [100, 0, 0, 200000]
+    assert reasons == {1: "invalid credit 'abc'"}
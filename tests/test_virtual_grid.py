@@ -0,0 +1,167 @@
+# flake8: noqa: E501
+import pytest
+
+import virtual_grid
+from virtual_grid import ListDataSource, PagedDataSource
+
+
+class FakeTable:
+    """Numbered rows [i, f"name {i}"] with a record of every page fetch"""
+
+    def __init__(self, total):
+        self.total = total
+        self.fetches = []
+
+    def fetch_page(self, offset, limit, order):
+        self.fetches.append((offset, limit, order))
+        rows = [[i, f"name {i}"] for i in range(self.total)]
+        if order:
+            rows.sort(key=lambda r: r[order[0]], reverse=order[1])
+        return rows[offset:offset + limit]
+
+    def source(self, **kwargs):
+        kwargs.setdefault("page_size", 10)
+        return PagedDataSource(count=lambda: self.total, fetch_page=self.fetch_page, **kwargs)
+
+
+class FakeExecutor:
+    """Replaces db_executor.submit: jobs wait until the test runs them, like the DB worker and after()"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, widget, func, *args, on_success=None, on_error=None, **kwargs):
+        self.jobs.append((func, args, on_success, on_error))
+
+    def run(self, fail=False):
+        jobs, self.jobs = self.jobs, []
+        for func, args, on_success, on_error in jobs:
+            if fail:
+                on_error(RuntimeError("connection lost"))
+            else:
+                on_success(func(*args))
+
+    def offsets(self):
+        return [args[0] for _, args, _, _ in self.jobs]
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    fake = FakeExecutor()
+    monkeypatch.setattr(virtual_grid.db_executor, "submit", fake.submit)
+    return fake
+
+
+# ===== IN-MEMORY ROWS =====
+def test_list_source_sorts_numbers_as_numbers_and_empty_last():
+    source = ListDataSource([["1,234.50"], [""], ["99"], ["abc"], [None], [7]])
+    source.sort(0)
+    assert [r[0] for r in source.all_rows()] == [7, "99", "1,234.50", "abc", "", None]
+
+
+def test_list_source_sample_spreads_over_all_rows():
+    source = ListDataSource([[i] for i in range(1000)])
+    sample = source.sample(10)
+    assert len(sample) == 10
+    assert sample[0] == [0] and sample[-1] == [900]
+
+
+# ===== PAGED ROWS (no grid attached: fetched inline) =====
+def test_window_only_fetches_the_pages_it_covers():
+    table = FakeTable(100)
+    source = table.source()
+    assert source.rows(15, 25) == [[i, f"name {i}"] for i in range(15, 25)]
+    assert [offset for offset, _, _ in table.fetches] == [10, 20]
+    source.rows(12, 18)
+    assert len(table.fetches) == 2
+
+
+def test_only_max_pages_are_kept():
+    table = FakeTable(100)
+    source = table.source(max_pages=2)
+    source.row(0)
+    source.row(10)
+    source.row(20)  # evicts page 0
+    source.row(10)
+    source.row(0)
+    assert [offset for offset, _, _ in table.fetches] == [0, 10, 20, 0]
+
+
+def test_first_page_and_total_avoid_round_trips():
+    table = FakeTable(100)
+    source = PagedDataSource(count=lambda: pytest.fail("counted again"), fetch_page=table.fetch_page,
+                             page_size=10, total=100, first_page=[[0, "prefetched"]])
+    assert len(source) == 100
+    assert source.row(0) == [0, "prefetched"]
+    assert table.fetches == []
+
+
+def test_rows_past_a_short_last_page_are_left_out():
+    table = FakeTable(25)
+    source = table.source(total=30)  # count taken before rows were deleted
+    assert len(source.rows(20, 30)) == 5
+    assert source.row(27) is None
+
+
+def test_sort_refetches_in_the_new_order_and_drops_edits():
+    table = FakeTable(30)
+    source = table.source()
+    source.set_row(0, [0, "edited"])
+    assert source.row(0) == [0, "edited"]
+    source.sort(0, reverse=True)
+    assert source.row(0) == [29, "name 29"]
+    assert table.fetches[-1] == (0, 10, (0, True))
+
+
+# ===== PAGED ROWS (attached to a grid: fetched on the DB worker) =====
+def test_attached_source_shows_placeholders_then_fills_in(executor):
+    table = FakeTable(100)
+    source = table.source(total=100)
+    loaded = []
+    source.attach(object(), lambda start, stop: loaded.append((start, stop)))
+
+    assert source.rows(0, 5) == [None] * 5
+    assert table.fetches == []  # nothing ran on the Tk thread
+    assert executor.offsets() == [0, 10]  # visible page and the one below it
+
+    executor.run()
+    assert loaded == [(0, 10), (10, 20)]
+    assert source.rows(0, 5) == [[i, f"name {i}"] for i in range(5)]
+
+
+def test_pages_in_flight_are_not_requested_twice(executor):
+    source = FakeTable(100).source(total=100)
+    source.attach(object(), lambda start, stop: None)
+    source.rows(0, 5)
+    source.rows(2, 7)
+    assert executor.offsets() == [0, 10]
+
+
+def test_no_prefetch_past_the_last_page(executor):
+    source = FakeTable(20).source(total=20)
+    source.attach(object(), lambda start, stop: None)
+    source.rows(10, 20)
+    assert executor.offsets() == [10]
+
+
+def test_result_of_an_old_sort_order_is_dropped(executor):
+    table = FakeTable(30)
+    source = table.source(total=30)
+    loaded = []
+    source.attach(object(), lambda start, stop: loaded.append(start))
+    source.rows(0, 5)
+    source.sort(0, reverse=True)  # the grid re-renders and asks again
+    source.rows(0, 5)
+    executor.run()
+    assert source.row(0) == [29, "name 29"]
+    assert loaded == [0, 10]  # only the pages of the current order were announced
+
+
+def test_failed_page_is_requested_again(executor):
+    source = FakeTable(30).source(total=30)
+    source.attach(object(), lambda start, stop: None)
+    source.rows(0, 5)
+    executor.run(fail=True)
+    assert source.row(0) is None
+    source.rows(0, 5)
+    assert executor.offsets() == [0, 10]
@@ -0,0 +1,191 @@
+# flake8: noqa: E501
+"""
+balance_reconciliation.py
+Running-balance check of extracted transactions.
+
+Every row must satisfy previous balance + CR - DR = balance. The check is done for a whole
+statement at once on int cents: the cumulative sum of CR - DR is taken from the printed balances
+and the remainder ("drift") has to stay constant; a row where it changes is a break (misread
+amount, CR / DR in the wrong column, two rows merged into one, a row lost). Rows without a
+printed balance (blank or 0, as the extractors leave it) are carried in the sum but not checked.
+
+A statement that does not reconcile is tried under the alternate amount column maps (COLUMN_MAPS,
+e.g. CR and DR read the wrong way round) and, through best_reconciled(), under alternate
+extractions (engines): the first combination that reconciles is kept. A column map other than
+AS_EXTRACTED is only a suggestion: the transactions are always returned as extracted and the
+amounts are moved (apply_column_map) only once the user confirmed it.
+"""
+
+from array import array
+from typing import NamedTuple
+import numpy as np
+import logger
+from transaction.transaction_batch import to_cents, cents_text
+
+logger.logger.info("[balance_reconciliation] : Menu initiation")
+
+
+class Reconciliation(NamedTuple):
+    """Outcome of the check: breaks are 0-based row indices, unreadable rows count as breaks"""
+    rows: int
+    checked: int
+    breaks: list
+    unreadable: list
+
+    @property
+    def ok(self):
+        return not self.breaks
+
+    def message(self, limit=10):
+        """Breaks for the user (1-based rows, first limit rows), "" when the statement reconciles"""
+        if self.ok:
+            return ""
+        rows = ", ".join(str(i + 1) for i in self.breaks[:limit]) + (f" ... (+{len(self.breaks) - limit})" if len(self.breaks) > limit else "")
+        return f"Running balance does not reconcile at {len(self.breaks)} of {self.rows} transaction(s), row(s): {rows}"
+
+
+def _cents_or_none(value):
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    try:
+        return to_cents(value)
+    except Exception:
+        return False  # unreadable
+
+
+def reconcile_cents(credits, debits, balances, has_balance, opening_balance=None, unreadable=()):
+    """
+    Vectorized check of amount columns in cents (sequences of the same length); has_balance marks
+    the rows with a printed balance. opening_balance (cents) also checks the first row.
+    """
+    rows = len(balances)
+    if not rows:
+        return Reconciliation(0, 0, [], list(unreadable))
+
+    credit = np.asarray(credits, dtype=np.int64)
+    debit = np.asarray(debits, dtype=np.int64)
+    balance = np.asarray(balances, dtype=np.int64)
+    checked = np.flatnonzero(np.asarray(has_balance, dtype=bool))
+    if not len(checked):
+        return Reconciliation(rows, 0, sorted(unreadable), list(unreadable))
+
+    # Remainder of each printed balance after the running sum of CR - DR: constant while the rows reconcile
+    drift = balance[checked] - np.cumsum(credit - debit)[checked]
+    steps = np.diff(drift, prepend=drift[0] if opening_balance is None else opening_balance)
+    breaks = set(checked[np.flatnonzero(steps)].tolist()) | set(unreadable)
+    return Reconciliation(rows, len(checked), sorted(breaks), list(unreadable))
+
+
+def reconcile(transactions, opening_balance=None):
+    """Reconciliation of extracted transactions (trn_pdf_* dicts, in statement order)"""
+    collector = BalanceCollector()
+    for trx in transactions:
+        collector.add(trx)
+    return collector.result(opening_balance)
+
+
+# ✅ Amount column maps: label → (field read as CR, field read as DR); the first is the extraction as is
+COLUMN_MAPS = {
+    "as extracted": ("trn_pdf_CR_Amount", "trn_pdf_DR_Amount"),
+    "CR/DR swapped": ("trn_pdf_DR_Amount", "trn_pdf_CR_Amount"),
+}
+AS_EXTRACTED = "as extracted"
+
+
+def apply_column_map(transactions, column_map):
+    """Transactions with their amounts moved to the CR / DR fields of the COLUMN_MAPS entry"""
+    credit_field, debit_field = COLUMN_MAPS[column_map]
+    if column_map == AS_EXTRACTED:
+        return transactions
+    return [{**trx, "trn_pdf_CR_Amount": trx.get(credit_field), "trn_pdf_DR_Amount": trx.get(debit_field)} for trx in transactions]
+
+
+class BalanceCollector:
+    """Amount columns (cents) of transactions seen one by one, e.g. while a statement is streamed"""
+
+    __slots__ = ("columns", "balances", "has_balance", "unreadable")
+
+    def __init__(self):
+        self.columns = {"trn_pdf_CR_Amount": array("q"), "trn_pdf_DR_Amount": array("q")}
+        self.balances = array("q")
+        self.has_balance = array("b")
+        self.unreadable = []
+
+    def add(self, trx):
+        index = len(self.balances)
+        values = [_cents_or_none(trx.get(field)) for field in self.columns]
+        balance = _cents_or_none(trx.get("trn_pdf_statementBalance"))
+        if any(value is False for value in values) or balance is False:
+            self.unreadable.append(index)
+        for column, value in zip(self.columns.values(), values):
+            column.append(value or 0)
+        self.balances.append(balance or 0)
+        self.has_balance.append(bool(balance))  # 0 is how extractors leave a balance that is not printed
+
+    def result(self, opening_balance=None, column_map=AS_EXTRACTED):
+        credit_field, debit_field = COLUMN_MAPS[column_map]
+        opening = None if opening_balance is None else to_cents(opening_balance)
+        return reconcile_cents(self.columns[credit_field], self.columns[debit_field], self.balances, self.has_balance, opening, self.unreadable)
+
+    def best_column_map(self):
+        """(COLUMN_MAPS label, Reconciliation) of the first map that reconciles, else of the extraction as is"""
+        first = None
+        for column_map in COLUMN_MAPS:
+            result = self.result(column_map=column_map)
+            if result.ok:
+                return column_map, result
+            first = first or (column_map, result)
+        return first
+
+
+def reconciled_stream(transactions, on_result):
+    """
+    Yield transactions unchanged; once the stream is exhausted on_result(column map, Reconciliation,
+    Reconciliation as extracted) is called with the best_column_map() of the statement.
+    """
+    collector = BalanceCollector()
+    for trx in transactions:
+        collector.add(trx)
+        yield trx
+    column_map, result = collector.best_column_map()
+    on_result(column_map, result, result if column_map == AS_EXTRACTED else collector.result())
+
+
+def best_reconciled(candidates):
+    """
+    candidates: (label, callable returning transactions) pairs, e.g. one per engine, preferred first;
+    each is only run when the ones before it do not reconcile under any column map.
+    Returns (label, column map, transactions as extracted, Reconciliation under the column map) of
+    the first that reconciles. When none does, the preferred extraction is kept as is: fewer breaks
+    under another engine or map is not enough to trust it.
+    """
+    fallback = None
+    for label, extract in candidates:
+        try:
+            transactions = list(extract() or [])
+        except Exception as e:
+            logger.logger.exception(f"[balance_reconciliation] : Candidate {label} failed: {e}")
+            continue
+        collector = BalanceCollector()
+        for trx in transactions:
+            collector.add(trx)
+        column_map, result = collector.best_column_map()
+        logger.logger.info(f"[balance_reconciliation] : Candidate {label} ({column_map}): {len(transactions)} row(s), {len(result.breaks)} break(s)")
+        if transactions and result.ok:
+            return label, column_map, transactions, result
+        if fallback is None or (transactions and not fallback[2]):
+            fallback = (label, AS_EXTRACTED, transactions, collector.result())
+    return fallback
+
+
+def describe_breaks(transactions, result, limit=5):
+    """Log lines of the first breaks: row, expected and printed balance (for the investigator)"""
+    lines = []
+    previous = None
+    for index, trx in enumerate(transactions):
+        if index in result.breaks and len(lines) < limit:
+            lines.append(f"row {index + 1} {trx.get('trn_pdf_date', '')}: previous {previous} CR {trx.get('trn_pdf_CR_Amount')} DR {trx.get('trn_pdf_DR_Amount')} → printed {trx.get('trn_pdf_statementBalance')}")
+        balance = _cents_or_none(trx.get("trn_pdf_statementBalance"))
+        if balance:
+            previous = cents_text(balance)
+    return lines
@@ -0,0 +1,99 @@
+# flake8: noqa: E501
+"""
+batch_extract.py
+Batch extraction of bank statements without the UI: every PDF given (files or folders) is
+extracted with pdf_data_extraction_main(stream=True) and written as JSON lines while its pages
+are parsed — one "document" line with the statement info, one "transaction" line per row, then
+a "reconciliation" line (1-based rows where the running balance breaks; rows are written as
+extracted, "column_map" names the amount column map that would reconcile them, if another one;
+when only an alternate engine's rows reconcile, "engine" names it and "transactions" holds its rows).
+With --speculative the bank's engines run concurrently and the first that reconciles is written
+(lines come once the statement is done).
+
+    python -m transaction.batch_extract <pdf or folder> [...] [--out result.jsonl] [--speculative]
+"""
+
+import json
+import os
+import sys
+import logger
+from transaction.balance_reconciliation import AS_EXTRACTED
+from transaction.pdf_processor import pdf_data_extraction_main
+
+logger.logger.info("[batch_extract] : Menu initiation")
+
+
+def statement_files(paths):
+    """PDF files of the given files / folders (folders not recursed), in name order per folder"""
+    for path in paths:
+        if os.path.isdir(path):
+            for file_name in sorted(os.listdir(path)):
+                if file_name.lower().endswith(".pdf"):
+                    yield os.path.join(path, file_name)
+        else:
+            yield path
+
+
+def extract_to_jsonl(paths, out, speculative=False):
+    """Write the statements of paths to out as JSON lines; returns {file name: transaction count or error}"""
+    results = {}
+    for pdf_path in statement_files(paths):
+        file_name = os.path.basename(pdf_path)
+        count = 0
+        try:
+            def reconciled(column_map, result, extracted, alternate=None, file_name=file_name):
+                # ✅ Rows are written as extracted: their breaks, and the column map that would reconcile
+                reconciliation = {"checked": extracted.checked, "breaks": [i + 1 for i in extracted.breaks]}
+                if alternate:
+                    engine, column_map, transactions, _ = alternate
+                    reconciliation["engine"] = engine
+                    reconciliation["transactions"] = transactions
+                if column_map != AS_EXTRACTED:
+                    reconciliation["column_map"] = column_map
+                out.write(json.dumps({"file": file_name, "reconciliation": reconciliation}, ensure_ascii=False, default=str) + "\n")
+
+            if speculative:
+                data = pdf_data_extraction_main(pdf_path, speculative=True)
+            else:
+                data = pdf_data_extraction_main(pdf_path, stream=True, on_reconciled=reconciled)
+            out.write(json.dumps({"file": file_name, "document": data["Document Info"]}, ensure_ascii=False, default=str) + "\n")
+            for trx in data["Transactions"]:
+                count += 1
+                out.write(json.dumps({"file": file_name, "row": count, "transaction": trx}, ensure_ascii=False, default=str) + "\n")
+                out.flush()  # ✅ each row is visible as soon as it is parsed
+            if speculative and data["Reconciliation"]:
+                reconciled(data["Amount Columns"], None, data["Reconciliation"])
+            results[file_name] = count
+        except Exception as e:
+            logger.logger.exception(f"[batch_extract] : {file_name} failed after {count} transaction(s): {e}")
+            results[file_name] = f"error: {e}"
+    return results
+
+
+def main(argv):
+    args = argv[1:]
+    speculative = "--speculative" in args
+    args = [arg for arg in args if arg != "--speculative"]
+    out_path = None
+    if "--out" in args:
+        i = args.index("--out")
+        out_path = args[i + 1] if i + 1 < len(args) else None
+        args = args[:i] + args[i + 2:]
+    if not args or ("--out" in argv and not out_path):
+        print(__doc__)
+        return 2
+
+    out = open(out_path, "w", encoding="utf-8") if out_path else sys.stdout
+    try:
+        results = extract_to_jsonl(args, out, speculative)
+    finally:
+        if out_path:
+            out.close()
+
+    for file_name, result in results.items():
+        print(f"{file_name:<40} {result}", file=sys.stderr)
+    return 1 if any(isinstance(r, str) for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -3,11 +3,15 @@
 import tkinter as tk
 import psycopg2
 import logger
-import threading
 from LoadingPopup import LoadingPopupClass
 from tkinter import ttk, messagebox
 from tkcalendar import DateEntry
 from db_manager import executionWithRs_query, execute_query, commit
+import db_executor
+from report.screening_hits import screen_transaction_ids
+from report.daily_summary import summary_keys, refresh_transactions
+from master_data_cache import cached_query, invalidate, GROUP_BANK, GROUP_CUSTOMER, GROUP_STATEMENT, GROUP_USER, SQL_BANK_NAMES, SQL_CUSTOMER_CODES, SQL_FILE_NAMES
+from virtual_grid import VirtualGrid
 
 logger.logger.info("[data_enrichment_main] : Menu initiation")
 
@@ -51,10 +55,8 @@ class DataEnrichment:
         self.customer_code_var = tk.StringVar()
         self.customer_code_dropdown = ttk.Combobox(
             frame, textvariable=self.customer_code_var, state="readonly")
-        codes = executionWithRs_query(
-            "SELECT DISTINCT VCH_CUST_CODE FROM TM_MST_CUSTOMER ORDER BY VCH_CUST_CODE")
-        self.customer_code_dropdown['values'] = [
-            "All"] + [row[0] for row in codes] if codes else ["All"]
+        self.customer_code_dropdown['values'] = ["All"]
+        db_executor.fill_combobox(self.dataEnrch_window, self.customer_code_dropdown, GROUP_CUSTOMER, SQL_CUSTOMER_CODES, leading=["All"])
         self.customer_code_var.set("All")
         self.customer_code_dropdown.grid(row=0, column=1, padx=10, pady=5)
 
@@ -103,10 +105,8 @@ class DataEnrichment:
         self.file_var = tk.StringVar()
         self.file_dropdown = ttk.Combobox(
             frame, textvariable=self.file_var, state="readonly")
-        files = executionWithRs_query(
-            "SELECT DISTINCT VCH_FILE_NAME FROM TM_TRN_TRANSACTION ORDER BY VCH_FILE_NAME")
-        self.file_dropdown['values'] = ["All"] + [row[0]
-                                                  for row in files] if files else ["All"]
+        self.file_dropdown['values'] = ["All"]
+        db_executor.fill_combobox(self.dataEnrch_window, self.file_dropdown, GROUP_STATEMENT, SQL_FILE_NAMES, leading=["All"])
         self.file_var.set("All")
         self.file_dropdown.grid(row=1, column=3, padx=10, pady=5)
 
@@ -168,25 +168,20 @@ class DataEnrichment:
         cols = ("NO.", "Customer Code", "Customer Name", "Account Number", "Target Audience",
                 "File Name", "Transaction Description", "Transaction Date", "Data Entry Date")
 
-        self.tree = ttk.Treeview(
-            frame, columns=cols, show="headings", height=25)
+        # ✅ Virtualized grid: only the visible rows exist as Treeview items (vertical scrollbar included)
+        self.result_grid = VirtualGrid(frame, cols, height=25, bg="white")
+        self.tree = self.result_grid.tree
 
         for col in cols:
-            self.tree.heading(col, text=col)
             self.tree.column(col, anchor="center", width=150)
 
-        # Add vertical scrollbar
-        vsb = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscroll=vsb.set)
-        vsb.pack(side=tk.RIGHT, fill=tk.Y)
-
         # Add horizontal scrollbar (optional)
         hsb = ttk.Scrollbar(frame, orient="horizontal",
                             command=self.tree.xview)
         self.tree.configure(xscroll=hsb.set)
         hsb.pack(side=tk.BOTTOM, fill=tk.X)
 
-        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.result_grid.pack(fill=tk.BOTH, expand=True)
         self.tree.bind("<Double-1>", self.edit_record)
 
     # def search(self):
@@ -273,25 +268,22 @@ class DataEnrichment:
 
     def search(self):
         loading = LoadingPopupClass(self.dataEnrch_window, message="Searching... Please wait.")
-
-        def threaded_search():
-            self.perform_search_logic(popup=loading)
-
-        threading.Thread(target=threaded_search).start()
+        self.perform_search_logic(popup=loading)
 
     def perform_search_logic(self, popup=None):
         try:
             logger.logger.info("[data_enrichment_main] : Search triggered")
-            self.tree.delete(*self.tree.get_children())
+            self.result_grid.set_rows([], autofit=False)
 
             logger.logger.info("[data_enrichment_main] : Start SQL building for search")
             sql = """
                 SELECT a.NUM_TRN_ID,b.vch_cust_code, b.vch_cust_name, a.num_account_no, a.vch_ner, 
-                    a.vch_file_name, 
+                    s.vch_file_name, 
                     (replace(trim(a.vch_trn_desc_1), '  ', ' ') || ' ' || replace(trim(a.vch_trn_desc_2), '  ', ' ')) AS trx_desc,
                     a.dtt_transaction_date, TO_CHAR(a.dtt_created_at, 'YYYY-MM-DD HH24:MI:SS') AS dtt_created_at
                 FROM tm_trn_transaction a
                 JOIN tm_mst_customer b ON a.num_cust_id = b.num_cust_id
+                JOIN tm_trn_statement s ON a.num_stmt_id = s.num_stmt_id
                 WHERE 1=1
             """
 
@@ -323,7 +315,7 @@ class DataEnrichment:
 
             # File Name filter
             if self.file_var.get() != "All":
-                sql += " AND a.vch_file_name = %s"
+                sql += " AND s.vch_file_name = %s"
                 params.append(self.file_var.get())
 
             # Transaction Description filter
@@ -354,22 +346,31 @@ class DataEnrichment:
 
             sql += " ORDER BY a.num_trn_id"
 
-            rows = executionWithRs_query(sql, tuple(params)) or []
-            for idx, row in enumerate(rows):
-                self.tree.insert("", "end", values=row)
+            def update_ui(rows):
+                try:
+                    self.result_grid.set_rows(rows or [], autofit=False)
 
-            self.adjust_column_width()
-            logger.logger.info("[data_enrichment_main] : Search completed.")
+                    self.adjust_column_width()
+                    logger.logger.info("[data_enrichment_main] : Search completed.")
+                finally:
+                    if popup:
+                        popup.close()
+
+            def on_error(e):
+                if popup:
+                    popup.close()
+                messagebox.showerror(
+                    "Error", f"An error occurred during search:\n{str(e)}")
+
+            db_executor.run_query(self.dataEnrch_window, sql, tuple(params), on_success=update_ui, on_error=on_error)
 
         except Exception as e:
             logger.logger.exception(
                 f"[data_enrichment_main] : Error during search: {str(e)}")
-            messagebox.showerror(
-                "Error", f"An error occurred during search:\n{str(e)}")
-
-        finally:
             if popup:
                 popup.close()
+            messagebox.showerror(
+                "Error", f"An error occurred during search:\n{str(e)}")
 
     def reset_filters(self):
         self.customer_code_var.set("All")
@@ -385,13 +386,13 @@ class DataEnrichment:
 
     def edit_record(self, event):
         try:
-            selected_item = self.tree.focus()
-            if not selected_item:
+            selected = self.result_grid.selected_rows()
+            if not selected:
                 messagebox.showwarning(
                     "No Selection", "Please select a record to edit.")
                 return
 
-            values = self.tree.item(selected_item)["values"]  # whole tuple
+            values = selected[0]  # whole row
             self.open_edit_window(values)
 
         except Exception as e:
@@ -405,19 +406,20 @@ class DataEnrichment:
         popup.grab_set()
         popup.focus_force()
 
-        # === Retrieve NUM_TRN_ID from selected Treeview row ===
+        # === Retrieve NUM_TRN_ID from selected grid row ===
         trn_id = data[0]
 
         # === Query full record from DB ===
         sql = """
             SELECT
-                A.NUM_TRN_ID, A.VCH_FILE_NAME, B.VCH_BANK_NAME, B.VCH_ADDRESS, B.VCH_BANK_REG_NO,
+                A.NUM_TRN_ID, S.VCH_FILE_NAME, B.VCH_BANK_NAME, B.VCH_ADDRESS, B.VCH_BANK_REG_NO,
                 C.VCH_CUST_CODE, C.VCH_CUST_NAME, C.VCH_ADDRESS,
-                A.NUM_ACCOUNT_NO, A.DTT_STATEMENT_DATE, A.DTT_TRANSACTION_DATE,
+                A.NUM_ACCOUNT_NO, S.DTT_STATEMENT_DATE, A.DTT_TRANSACTION_DATE,
                 A.VCH_TRN_DESC_1, A.VCH_TRN_DESC_2,
                 A.VCH_NER, A.NUM_AMOUNT_CREDIT, A.NUM_AMOUNT_DEBIT, A.NUM_STATEMENT_BALANCE,
                 A.CHR_PRINTED_IND, D.NUM_USER_ID
             FROM TM_TRN_TRANSACTION A
+            INNER JOIN TM_TRN_STATEMENT S ON A.NUM_STMT_ID = S.NUM_STMT_ID
             INNER JOIN TM_MST_BANK B ON A.NUM_BANK_ID = B.NUM_BANK_ID
             INNER JOIN TM_MST_CUSTOMER C ON A.NUM_CUST_ID = C.NUM_CUST_ID
             INNER JOIN TM_MST_USER D ON A.NUM_USER_ID = D.NUM_USER_ID
@@ -445,10 +447,7 @@ class DataEnrichment:
         bank_var = tk.StringVar()
         bank_dropdown = ttk.Combobox(
             popup, textvariable=bank_var, state="readonly", width=50)
-        bank_results = executionWithRs_query(
-            "SELECT VCH_BANK_NAME FROM TM_MST_BANK ORDER BY VCH_BANK_NAME")
-        bank_dropdown['values'] = [row[0]
-                                   for row in bank_results] if bank_results else []
+        db_executor.fill_combobox(popup, bank_dropdown, GROUP_BANK, SQL_BANK_NAMES)
         bank_dropdown.grid(row=1, column=1, padx=10, pady=5, sticky='w')
 
         tk.Label(popup, text="Bank Address:").grid(
@@ -464,14 +463,17 @@ class DataEnrichment:
             row=2, column=1, padx=10, pady=5, sticky='w')
 
         def populate_bank_details(event):
-            result = executionWithRs_query(
-                "SELECT VCH_ADDRESS, VCH_BANK_REG_NO FROM TM_MST_BANK WHERE VCH_BANK_NAME = %s", (bank_var.get(),))
-            if result:
-                bank_addr_var.set(result[0][0])
-                bank_reg_var.set(result[0][1])
-            else:
-                bank_addr_var.set("")
-                bank_reg_var.set("")
+            def apply(result):
+                if result:
+                    bank_addr_var.set(result[0][0])
+                    bank_reg_var.set(result[0][1])
+                else:
+                    bank_addr_var.set("")
+                    bank_reg_var.set("")
+
+            db_executor.submit(popup, cached_query, GROUP_BANK,
+                               "SELECT VCH_ADDRESS, VCH_BANK_REG_NO FROM TM_MST_BANK WHERE VCH_BANK_NAME = %s", (bank_var.get(),),
+                               on_success=apply)
         bank_dropdown.bind("<<ComboboxSelected>>", populate_bank_details)
 
         # === ROW 2: Customer Code ===
@@ -480,10 +482,7 @@ class DataEnrichment:
         cust_code_var = tk.StringVar()
         cust_dropdown = ttk.Combobox(
             popup, textvariable=cust_code_var, state="readonly", width=50)
-        cust_results = executionWithRs_query(
-            "SELECT VCH_CUST_CODE FROM TM_MST_CUSTOMER ORDER BY VCH_CUST_CODE")
-        cust_dropdown['values'] = [row[0]
-                                   for row in cust_results] if cust_results else []
+        db_executor.fill_combobox(popup, cust_dropdown, GROUP_CUSTOMER, "SELECT VCH_CUST_CODE FROM TM_MST_CUSTOMER ORDER BY VCH_CUST_CODE")
         cust_dropdown.grid(row=3, column=1, padx=10, pady=5, sticky='w')
 
         tk.Label(popup, text="Customer Name:").grid(
@@ -499,14 +498,17 @@ class DataEnrichment:
             row=4, column=1, padx=10, pady=5, sticky='w')
 
         def populate_customer_details(event):
-            result = executionWithRs_query(
-                "SELECT VCH_CUST_NAME, VCH_CUST_ADDRESS FROM TM_MST_CUSTOMER WHERE VCH_CUST_CODE = %s", (cust_code_var.get(),))
-            if result:
-                cust_name_var.set(result[0][0])
-                cust_addr_var.set(result[0][1])
-            else:
-                cust_name_var.set("")
-                cust_addr_var.set("")
+            def apply(result):
+                if result:
+                    cust_name_var.set(result[0][0])
+                    cust_addr_var.set(result[0][1])
+                else:
+                    cust_name_var.set("")
+                    cust_addr_var.set("")
+
+            db_executor.submit(popup, cached_query, GROUP_CUSTOMER,
+                               "SELECT VCH_CUST_NAME, VCH_CUST_ADDRESS FROM TM_MST_CUSTOMER WHERE VCH_CUST_CODE = %s", (cust_code_var.get(),),
+                               on_success=apply)
         cust_dropdown.bind("<<ComboboxSelected>>", populate_customer_details)
 
         # === ROW 3: Account No, Statement Date ===
@@ -576,10 +578,7 @@ class DataEnrichment:
         agent_var = tk.StringVar()
         agent_dropdown = ttk.Combobox(
             popup, textvariable=agent_var, state="readonly", width=40)
-        agent_results = executionWithRs_query(
-            "SELECT NUM_USER_ID FROM TM_MST_USER ORDER BY NUM_USER_ID")
-        agent_dropdown['values'] = [row[0]
-                                    for row in agent_results] if agent_results else []
+        db_executor.fill_combobox(popup, agent_dropdown, GROUP_USER, "SELECT NUM_USER_ID FROM TM_MST_USER ORDER BY NUM_USER_ID")
         agent_dropdown.grid(row=10, column=3, padx=10, pady=5, sticky='w')
 
         # === Populate values from DB ===
@@ -611,8 +610,8 @@ class DataEnrichment:
         def save():
             try:
                 # 1️⃣ Retrieve Bank ID based on Bank Name
-                bank_result = executionWithRs_query(
-                    "SELECT NUM_BANK_ID FROM TM_MST_BANK WHERE VCH_BANK_NAME = %s",
+                bank_result = cached_query(
+                    GROUP_BANK, "SELECT NUM_BANK_ID FROM TM_MST_BANK WHERE VCH_BANK_NAME = %s",
                     (bank_var.get(),)
                 )
                 if not bank_result:
@@ -621,8 +620,8 @@ class DataEnrichment:
                 num_bank_id = bank_result[0][0]
 
                 # 2️⃣ Retrieve Customer ID based on Customer Code
-                cust_result = executionWithRs_query(
-                    "SELECT NUM_CUST_ID FROM TM_MST_CUSTOMER WHERE VCH_CUST_CODE = %s",
+                cust_result = cached_query(
+                    GROUP_CUSTOMER, "SELECT NUM_CUST_ID FROM TM_MST_CUSTOMER WHERE VCH_CUST_CODE = %s",
                     (cust_code_var.get(),)
                 )
                 if not cust_result:
@@ -631,8 +630,8 @@ class DataEnrichment:
                 num_cust_id = cust_result[0][0]
 
                 # 3️⃣ Retrieve Staff ID based on Agent Name
-                staff_result = executionWithRs_query(
-                    "SELECT NUM_USER_ID FROM TM_MST_USER WHERE NUM_USER_ID = %s",
+                staff_result = cached_query(
+                    GROUP_USER, "SELECT NUM_USER_ID FROM TM_MST_USER WHERE NUM_USER_ID = %s",
                     (agent_var.get(),)
                 )
                 if not staff_result:
@@ -643,11 +642,9 @@ class DataEnrichment:
                 # 4️⃣ Prepare UPDATE SQL
                 sql = """
                     UPDATE TM_TRN_TRANSACTION SET 
-                        VCH_FILE_NAME = %s,
                         NUM_BANK_ID = %s,
                         NUM_CUST_ID = %s,
                         NUM_ACCOUNT_NO = %s,
-                        DTT_STATEMENT_DATE = %s,
                         DTT_TRANSACTION_DATE = %s,
                         VCH_TRN_DESC_1 = %s,
                         VCH_TRN_DESC_2 = %s,
@@ -663,11 +660,9 @@ class DataEnrichment:
                 """
 
                 params = (
-                    file_var.get(),
                     num_bank_id,
                     num_cust_id,
                     account_var.get(),
-                    stmt_date_var.get_date(),
                     trx_date_var.get_date(),
                     trx_desc_var.get(),
                     trx_desc2_var.get(),
@@ -680,11 +675,30 @@ class DataEnrichment:
                     trn_id
                 )
 
-                # 5️⃣ Execute the update
+                # 5️⃣ Execute the update (remember the summary group the row is moving out of)
                 conn = None
+                previous_summary_keys, conn = summary_keys("a.NUM_TRN_ID = %s", (trn_id,), conn)
                 conn = execute_query(sql, params, conn)
+
+                # 6️⃣ File name and statement date belong to the statement header
+                stmt_sql = """
+                    UPDATE TM_TRN_STATEMENT SET
+                        VCH_FILE_NAME = %s,
+                        DTT_STATEMENT_DATE = %s,
+                        NUM_UPDATED_BY = 1,
+                        DTT_UPDATED_AT = CURRENT_TIMESTAMP AT TIME ZONE 'Asia/Kuala_Lumpur'
+                    WHERE NUM_STMT_ID = (SELECT NUM_STMT_ID FROM TM_TRN_TRANSACTION WHERE NUM_TRN_ID = %s)
+                      AND (VCH_FILE_NAME IS DISTINCT FROM %s OR DTT_STATEMENT_DATE::date IS DISTINCT FROM %s)
+                """
+                stmt_date = stmt_date_var.get_date()
+                conn = execute_query(stmt_sql, (file_var.get(), stmt_date, trn_id, file_var.get(), stmt_date), conn)
+
+                # 7️⃣ Description may have changed, refresh the stored screening hits
+                conn = screen_transaction_ids([trn_id], conn)
+                conn = refresh_transactions("a.NUM_TRN_ID = %s", (trn_id,), conn, previous_summary_keys)
                 if conn:
                     commit(conn)
+                    invalidate(GROUP_STATEMENT)  # ✅ File name / statement date may have changed
 
                 messagebox.showinfo(
                     "Success", "Transaction record updated successfully.")
@@ -0,0 +1,85 @@
+# flake8: noqa: E501
+"""
+grammar_benchmark.py
+Micro-benchmark of the bank transaction extractors: rows per second of extract_trxInfo on the
+statements in PDF_Sample, per bank module. The statement text is extracted once and only the row
+parsing is timed.
+
+    python -m transaction.pdf_extraction_method.grammar_benchmark [sample folder] [repeat]
+"""
+
+import importlib
+import os
+import re
+import sys
+import time
+import logger
+from transaction.pdf_extraction_method import row_grammar
+from transaction.pdf_extraction_method.pdf_extractor_engine import extract_text_by_engine
+
+logger.logger.info("[grammar_benchmark] : Menu initiation")
+
+DEFAULT_SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "PDF_Sample")
+DEFAULT_REPEAT = 5
+
+# ✅ Sample file prefix → (module, bank id of the conventional / Islamic statement), same ids as pdf_processor.BANK_MODULES
+SAMPLE_BANKS = {
+    "PBB": ("pbb_pdf_extraction", 2, 1),
+    "MBB": ("mbb_pdf_extraction", 4, 3),
+    "CIMB": ("cimb_pdf_extraction", 6, 5),
+    "RHB": ("rhb_pdf_extraction", 9, 7),
+    "HLB": ("hlb_pdf_extraction", 11, 10),
+    "UOB": ("uob_pdf_extraction", 15, 14),
+}
+
+# e.g. ok_MBB_Islamic_sample_2.pdf, UOB_sample_1.pdf, MBB_sample_1_image.pdf
+SAMPLE_NAME = re.compile(r"^(?:ok_)?([A-Z]+)(_Islamic)?_sample_\d+(?:_image)?\.pdf$", re.IGNORECASE)
+
+
+def sample_statements(sample_dir):
+    """(bank prefix, module name, bank id, pdf path) of every sample with a bank module"""
+    for file_name in sorted(os.listdir(sample_dir)):
+        match = SAMPLE_NAME.match(file_name)
+        if not match or match.group(1).upper() not in SAMPLE_BANKS:
+            continue
+        module_name, bank_id, islamic_id = SAMPLE_BANKS[match.group(1).upper()]
+        yield match.group(1).upper(), module_name, islamic_id if match.group(2) else bank_id, os.path.join(sample_dir, file_name)
+
+
+def benchmark(sample_dir=DEFAULT_SAMPLE_DIR, repeat=DEFAULT_REPEAT):
+    """{bank prefix: (statements, rows per run, seconds per run)}"""
+    results = {}
+    for bank, module_name, bank_id, pdf_path in sample_statements(sample_dir):
+        module = importlib.import_module(f"transaction.pdf_extraction_method.{module_name}")
+        text = extract_text_by_engine(pdf_path, "fitz", page_mode="all")
+        try:
+            rows = len(module.extract_trxInfo(text, bank_id, pdf_path) or [])  # warm-up
+            start = time.perf_counter()
+            for _ in range(repeat):
+                module.extract_trxInfo(text, bank_id, pdf_path)
+            seconds = (time.perf_counter() - start) / repeat
+        except Exception as e:
+            print(f"{bank:<5} {os.path.basename(pdf_path)}: skipped ({e})")
+            continue
+
+        print(f"{bank:<5} {os.path.basename(pdf_path):<32} {rows:>6} rows  {seconds * 1000:>9.2f} ms")
+        statements, total_rows, total_seconds = results.get(bank, (0, 0, 0.0))
+        results[bank] = (statements + 1, total_rows + rows, total_seconds + seconds)
+    return results
+
+
+def main(argv):
+    os.environ["OUTPUT_TEXT_PATH"] = os.devnull  # ✅ extractors' raw text dumps are not kept (customer statement text)
+    sample_dir = argv[1] if len(argv) > 1 else DEFAULT_SAMPLE_DIR
+    repeat = int(argv[2]) if len(argv) > 2 else DEFAULT_REPEAT
+
+    results = benchmark(sample_dir, repeat)
+    print(f"\nRegistered row grammars: {', '.join(row_grammar.registered())}")
+    print(f"{'Bank':<5} {'Statements':>10} {'Rows':>8} {'Seconds':>10} {'Rows/s':>12}")
+    for bank, (statements, rows, seconds) in results.items():
+        rate = rows / seconds if seconds else 0.0
+        print(f"{bank:<5} {statements:>10} {rows:>8} {seconds:>10.4f} {rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
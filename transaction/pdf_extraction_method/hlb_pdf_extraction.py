@@ -4,6 +4,27 @@ import re
 import logger
 import fitz  # type: ignore # PyMuPDF
 from transaction.name_extractor import NER_extraction
+from transaction.pdf_extraction_method import row_grammar
+from transaction.pdf_extraction_method.table_engine import TableLayout, fitz_span_lines
+
+# ✅ Row grammar (compiled and validated once, see row_grammar); applied to each stripped text span
+GRAMMAR = row_grammar.register("HLB", {
+    "date": r"^\d{2}-\d{2}-\d{4}$",                   # span holding only a DD-MM-YYYY date opens a transaction
+    "amount": r"^\d{1,3}(,\d{3})*(\.\d{2})$",          # amount span, placed in a column by its x position
+}, samples=(
+    ("date", "03-06-2024", True),
+    ("date", "03-06-24", False),
+    ("amount", "12,345.67", True),
+    ("amount", "12345.67", False),
+))
+
+# ✅ Amount columns by x position of the amount span (tune these as needed);
+#    the statement balance appears to the far right
+AMOUNT_LAYOUT = TableLayout({
+    "credit": (350, 400),
+    "debit": (450, 500),
+    "balance": (501, float("inf")),
+})
 
 # ===================== HongLeong Bank & ISLAMIC BANK =====================
 # Hong Leong & ISLAMIC TEMPLATE - GENERAL INFO EXTRACTION --------------------------------------------
@@ -90,30 +111,20 @@ def extract_trxInfo(noUse, identified_bank, pdf_path_global):
     current_block = []
     current_amounts = []
 
-    # Define amount column x-position ranges (tune these as needed)
-    CREDIT_X_RANGE = (350, 400)
-    DEBIT_X_RANGE = (450, 500)
-    BALANCE_X_MIN = 501  # assume statement balance appears to the far right
-
     def is_date(text):
-        return re.match(r"^\d{2}-\d{2}-\d{4}$", text.strip())
+        return GRAMMAR.date.match(text.strip())
 
     def is_amount(text):
-        return re.match(r"^\d{1,3}(,\d{3})*(\.\d{2})$", text.strip())
+        return GRAMMAR.amount.match(text.strip())
 
     # Helper to convert extracted block into a transaction object
     def process_block(date, content_lines, amounts):
         trx_list = []
 
-        cr_amt = dr_amt = balance = 0.0
-
-        for val, x0 in amounts:
-            if CREDIT_X_RANGE[0] <= x0 < CREDIT_X_RANGE[1]:
-                cr_amt = val
-            elif DEBIT_X_RANGE[0] <= x0 < DEBIT_X_RANGE[1]:
-                dr_amt = val
-            elif x0 >= BALANCE_X_MIN:
-                balance = val
+        amount_cells = {"credit": 0.0, "debit": 0.0, "balance": 0.0}
+        for val, column in amounts:
+            amount_cells[column] = val
+        cr_amt, dr_amt, balance = amount_cells["credit"], amount_cells["debit"], amount_cells["balance"]
 
         desc = content_lines[0] if content_lines else ""
         desc_others = " ".join(content_lines[1:]) if len(
@@ -135,49 +146,48 @@ def extract_trxInfo(noUse, identified_bank, pdf_path_global):
     skipAfterLastTrnInd = False
 
     for page in doc:
-        blocks = page.get_text("dict")["blocks"] # pyright: ignore[reportAttributeAccessIssue]
-
-        for block in blocks:
-            for line in block.get("lines", []):
-                for span in line.get("spans", []):
-                    text = span["text"].strip()
-                    x0 = span["bbox"][0]
-
-                    if not text:
+        for line_spans in fitz_span_lines(page):
+            for x0, _, _, _, span_text in line_spans:
+                text = span_text.strip()
+
+                if not text:
+                    continue
+
+                # ✅ STOP if bank name appears
+                if identified_bank == 9:
+                    if setSkipKey in text.upper() or setSkipKey2 in text.upper():
+                        skipAfterLastTrnInd = True
+                else:
+                    if setSkipKey in text.upper():
+                        skipAfterLastTrnInd = True
+
+                if setContKey == text.upper():
+                    skipAfterLastTrnInd = False
+                    break
+
+                if skipAfterLastTrnInd:
+                    break  # or use return transactions if final result ready
+
+                if is_date(text):
+                    if current_date and current_block:
+                        transactions.extend(process_block(
+                            current_date, current_block, current_amounts))
+                    current_date = text
+                    current_block = []
+                    current_amounts = []
+                    continue
+
+                if is_amount(text):
+                    column = AMOUNT_LAYOUT.column_of(x0)
+                    if column is None:
+                        continue  # amount outside the credit / debit / balance columns
+                    try:
+                        amt = float(text.replace(",", ""))
+                        current_amounts.append((amt, column))
+                    except Exception:
                         continue
-
-                    # ✅ STOP if bank name appears
-                    if identified_bank == 9:
-                        if setSkipKey in text.upper() or setSkipKey2 in text.upper():
-                            skipAfterLastTrnInd = True
-                    else:
-                        if setSkipKey in text.upper():
-                            skipAfterLastTrnInd = True
-
-                    if setContKey == text.upper():
-                        skipAfterLastTrnInd = False
-                        break
-
-                    if skipAfterLastTrnInd:
-                        break  # or use return transactions if final result ready
-
-                    if is_date(text):
-                        if current_date and current_block:
-                            transactions.extend(process_block(
-                                current_date, current_block, current_amounts))
-                        current_date = text
-                        current_block = []
-                        current_amounts = []
-                        continue
-
-                    if is_amount(text):
-                        try:
-                            amt = float(text.replace(",", ""))
-                            current_amounts.append((amt, x0))
-                        except Exception:
-                            continue
-                    else:
-                        current_block.append(text)
+                else:
+                    current_block.append(text)
 
     # Final block
     if current_date and current_block:
@@ -0,0 +1,143 @@
+# flake8: noqa: E501
+"""
+line_extractor.py
+Shared single-pass line state machine for the text based bank extractors.
+
+A bank declares the regions of the statement text to drop (page headers, carried forward
+balances, trailing summary) as SkipRegion rules and implements the row grammar in
+parse_lines(). The statement text (or the text of each page) is walked once, line by line:
+every line is upper-cased once and flows through all skip rules as a chain of generators, so
+no intermediate cleaned copies of the text are built.
+"""
+
+import logger
+
+logger.logger.info("[line_extractor] : Menu initiation")
+
+
+class Line:
+    """Statement line with its upper-case form (computed once for every rule)"""
+
+    __slots__ = ("text", "upper")
+
+    def __init__(self, text):
+        self.text = text
+        self.upper = text.upper()
+
+
+_NO_LINE = Line("")
+
+
+class Marker:
+    """
+    Text looked for (in upper case) on the current line, the next line or the previous line.
+    exact=True compares the whole current line instead of searching in it.
+    """
+
+    __slots__ = ("text", "where", "exact")
+
+    def __init__(self, text, where="line", exact=False):
+        self.text = text
+        self.where = where
+        self.exact = exact
+
+    def matches(self, prev, line, nxt):
+        if self.where == "next":
+            target = nxt.upper
+        elif self.where == "prev":
+            target = prev.upper
+        else:
+            target = line.upper
+        return target == self.text if self.exact else self.text in target
+
+
+class SkipRegion:
+    """
+    Drop lines from the line matching start until the line matching end.
+    The end line is kept unless drop_end is set; without end everything after start is dropped.
+    """
+
+    __slots__ = ("start", "end", "drop_end")
+
+    def __init__(self, start, end=None, drop_end=False):
+        self.start = start
+        self.end = end
+        self.drop_end = drop_end
+
+
+def iter_text_lines(source):
+    """
+    Lines of a statement without copying it: source is the full text or an iterable of page texts
+    (same lines as "\\n".join(pages).split("\\n")).
+    """
+    pages = (source,) if isinstance(source, str) else source
+    for page in pages:
+        start = 0
+        while True:
+            end = page.find("\n", start)
+            if end < 0:
+                yield page[start:]
+                break
+            yield page[start:end]
+            start = end + 1
+
+
+def _skip_region(lines, region):
+    """One skip rule as a generator stage, with one line of look-ahead for next-line markers"""
+    skip = False
+    prev = _NO_LINE
+    it = iter(lines)
+    line = next(it, None)
+    while line is not None:
+        nxt = next(it, None)
+        if region.start.matches(prev, line, nxt or _NO_LINE):
+            skip = True
+        elif region.end is not None and region.end.matches(prev, line, nxt or _NO_LINE):
+            skip = False
+            if region.drop_end:
+                prev, line = line, nxt
+                continue
+
+        if not skip:
+            yield line
+        prev, line = line, nxt
+
+
+class LineExtractor:
+    """
+    Base class of the text based bank extractors.
+    Subclasses set skip_regions (applied in order, each on the output of the previous one)
+    and implement parse_lines(lines) yielding transaction dicts.
+    """
+
+    skip_regions = ()
+
+    def regions(self, first_line):
+        """Skip rules for this statement; override when a marker depends on the text (e.g. its first line)"""
+        return self.skip_regions
+
+    def clean_lines(self, source):
+        """Statement lines (Line objects) with every skip region removed, produced lazily"""
+        lines = (Line(text) for text in iter_text_lines(source))
+        first = next(lines, None)
+        if first is None:
+            return iter(())
+
+        def restored():
+            yield first
+            yield from lines
+
+        stream = restored()
+        for region in self.regions(first):
+            stream = _skip_region(stream, region)
+        return stream
+
+    def parse_lines(self, lines):
+        raise NotImplementedError
+
+    def iter_transactions(self, source):
+        """Yield the transactions of the statement text (or of its page texts) as they are parsed"""
+        yield from self.parse_lines(self.clean_lines(source))
+
+    def extract(self, source):
+        return list(self.iter_transactions(source))
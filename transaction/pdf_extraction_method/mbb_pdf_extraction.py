@@ -2,6 +2,31 @@
 import re
 import logger
 from transaction.name_extractor import NER_extract_name
+from transaction.pdf_extraction_method.line_extractor import LineExtractor, SkipRegion, Marker
+from transaction.pdf_extraction_method import row_grammar
+
+# ✅ Amounts as printed: "1,000.00", "12" or ".03"; an overdrawn balance carries a "DR" suffix
+_AMOUNT = r"(?:[\d,]+(?:\.\d{2})?|\.\d{2})"
+
+# ✅ Row grammar (compiled and validated once, see row_grammar)
+#    The description is optional: card holds and their reversals are printed with date and amounts only
+GRAMMAR = row_grammar.register("MBB", {
+    "record_start": r"\d{2}/\d{2}",                # line starting with DD/MM opens a transaction
+    "record_date": r"\s*\d{2}/\d{2}(/\d{2})?\s",    # record must start with DD/MM or DD/MM/YY
+    "row_full": rf"\s*(\d{{2}}/\d{{2}}(?:/\d{{2}})?)\s+(?:(.+?)\s+)?({_AMOUNT})([-+]?)\s+({_AMOUNT}(?:DR)?)\s+(.+)",
+    "row_short": rf"\s*(\d{{2}}/\d{{2}}(?:/\d{{2}})?)\s+(?:(.+?)\s+)?({_AMOUNT})([-+]?)\s+({_AMOUNT}(?:DR)?)",
+}, samples=(
+    ("record_start", "01/06/24 TRANSFER FR A/C", True),
+    ("record_start", "TRANSFER FR A/C", False),
+    ("record_date", " 01/06/24 TRANSFER", True),
+    ("record_date", "BEGINNING BALANCE", False),
+    ("row_full", " 01/06/24 TRANSFER FR A/C 1,000.00+ 25,000.50 ALI BIN ABU ", ("01/06/24", "TRANSFER FR A/C", "1,000.00", "+", "25,000.50", "ALI BIN ABU ")),
+    ("row_full", " 01/06 PROFIT PAID 12.34+ 25,012.84", False),
+    ("row_short", " 01/06 PROFIT PAID 12.34+ 25,012.84", ("01/06", "PROFIT PAID", "12.34", "+", "25,012.84")),
+    ("row_short", " 30/06 PROFIT PAID .05+ 1,204.10", ("30/06", "PROFIT PAID", ".05", "+", "1,204.10")),
+    ("row_full", " 07/12 150.00+ 1,350.00 PETROL STATION* ", ("07/12", None, "150.00", "+", "1,350.00", "PETROL STATION* ")),
+    ("row_full", " 09/12 SALE DEBIT 80.00- 25.40DR PETROL STATION* ", ("09/12", "SALE DEBIT", "80.00", "-", "25.40DR", "PETROL STATION* ")),
+))
 
 # ===================== MAYBANK & ISLAMIC BANK =====================
 # MAYBANK & ISLAMIC TEMPLATE - GENERAL INFO EXTRACTION --------------------------------------------
@@ -103,117 +128,83 @@ def extract_docInfo(text, identified_bank, pdf_path_global):
     }
 
 # MAYBANK & ISLAMIC  BANK TEMPLATE - TRANSACTION EXTRACTION --------------------------------------------
-def extract_trxInfo(text, identified_bank, pdf_path_global):
-    logger.logger.info("[mbb_pdf_extraction] : Executing the MAYBANK pdf file extraction operation, for the transaction(s) data only")
-
-    # Perform pre-cleaning (Step 1) in the text to remove unnecessary text
-    lines = text.split("\n")
-    cleaned_lines = []
-
-    skip = False
-    for line in lines:
-        if "MAYBANK ISLAMIC BERHAD" in line.upper():
-            skip = True  # Start skipping
-        elif "URUSNIAGA AKAUN" in line.upper():
-            skip = False  # Stop skipping
-            continue  # Optionally skip the marker line too
-
-        if not skip:
-            cleaned_lines.append(line)
-
-    # Rejoin cleaned text for further processing
-    textCleaned = "\n".join(cleaned_lines)
-
-    # Perform pre-cleaning (Step 2) in the text to remove unnecessary text
-    lines = textCleaned.split("\n")
-    cleaned_lines = []
-
-    skip = False
-    for line in lines:
-        if "TARIKH MASUK" in line.upper():
-            skip = True  # Start skipping
-        elif "STATEMENT BALANCE" in line.upper():
-            skip = False  # Stop skipping
-            continue  # Optionally skip the marker line too
-
-        if not skip:
-            cleaned_lines.append(line)
-
-    # Rejoin cleaned text for further processing
-    textCleaned2 = "\n".join(cleaned_lines)
-
-    # Perform pre-cleaning (Step 2) in the text to remove unnecessary text
-    lines = textCleaned2.split("\n")
-    cleaned_lines = []
-
-    skip = False
-    for line in lines:
-        if "ENDING BALANCE :" in line.upper():
-            skip = True  # Start skipping
-
-        if not skip:
-            cleaned_lines.append(line)
-
-    # Rejoin cleaned text for further processing
-    textCleaned3 = "\n".join(cleaned_lines)
-    textSplit = textCleaned3.split("\n")
-    textAppend = []
-
-    # for seqNum, line in enumerate(textSplit, start=1):  # Start from 1
-    for seqNum, line in enumerate(textSplit, start=1):  # Start from 1
-        # if re.match(r"^\d{2}/\d{2}(/\d{2})?$", line.strip()): # Check if "line" starts with a date (DD/MM) / (DD/MM/YY)
-        if re.match(r"\d{2}/\d{2}", line):  # Check if "line" starts with a date (DD/MM)
-            textAppend.append(f"%% {line}")  # Add sequence number with %
-        else:
-            textAppend.append(line)  # Keep line unchanged
-
-    textJoin = " ".join(textAppend)  # Joins with a space
-    textSplitTran = textJoin.split("%%")
-
-    # Filter out items that don't start with a valid date (DD/MM)
-    filteredText = [
-        # Ensures MMYY format with space
-        # item for item in textSplitTran if re.match(r"\s*\d{2}/\d{2}\s", item)
-        item for item in textSplitTran if re.match(r"\s*\d{2}/\d{2}(/\d{2})?\s", item)
-    ]
+class MbbExtractor(LineExtractor):
+    """
+    Maybank statement text → transactions, in one pass over the lines.
+    Row grammar: a line starting with DD/MM opens a transaction, the following lines are appended
+    to it; the record is then read as date, description, amount with +/- sign, statement balance
+    and other descriptions.
+    """
+
+    skip_regions = (
+        # Bank header until the "URUSNIAGA AKAUN" title (both dropped)
+        SkipRegion(Marker("MAYBANK ISLAMIC BERHAD"), Marker("URUSNIAGA AKAUN"), drop_end=True),
+        # Column headings until the "STATEMENT BALANCE" heading (both dropped)
+        SkipRegion(Marker("TARIKH MASUK"), Marker("STATEMENT BALANCE"), drop_end=True),
+        # Statement summary at the end
+        SkipRegion(Marker("ENDING BALANCE :")),
+    )
+
+    def parse_lines(self, lines):
+        # Record text is laid out as the former "%%"-joined text: " <date line> <more lines> "
+        record = []
+        is_preamble = True
+        for line in lines:
+            if GRAMMAR.record_start.match(line.text):
+                trx = self._parse_record(("" if is_preamble else " ") + " ".join(record) + " ")
+                if trx:
+                    yield trx
+                record = [line.text]
+                is_preamble = False
+            else:
+                record.append(line.text)
+
+        trx = self._parse_record(("" if is_preamble else " ") + " ".join(record))
+        if trx:
+            yield trx
+
+    @staticmethod
+    def _parse_record(item):
+        # Only records starting with a valid date (DD/MM or DD/MM/YY)
+        if not GRAMMAR.record_date.match(item):
+            return None
+
+        # Attempt to match full 6-part pattern, then the 5-part pattern (without trailing desc_others)
+        match = GRAMMAR.row_full.match(item) or GRAMMAR.row_short.match(item)
+        if not match:
+            return None
+
+        date = match.group(1)
+        description = (match.group(2) or "").strip()
+        amount = match.group(3)
+        amountInd = match.group(4) if match.group(4) else "NULL"
+        statementBalance = match.group(5)
+        overdrawn = statementBalance.endswith("DR")
+        if overdrawn:
+            statementBalance = statementBalance[:-2]
+        description_others = match.group(
+            6).strip() if len(match.groups()) >= 6 else ""
+
+        full_desc = description + " " + description_others
+        ner_name = NER_extract_name(full_desc)
+
+        return {
+            "trn_pdf_date": date,
+            "trn_pdf_description": description,
+            "trn_pdf_CR_Amount": float(amount.replace(",", "")) if amountInd == "+" else 0,
+            "trn_pdf_DR_Amount": float(amount.replace(",", "")) if amountInd == "-" else 0,
+            "trn_pdf_statementBalance": -float(statementBalance.replace(",", "")) if overdrawn else float(statementBalance.replace(",", "")),
+            "trn_pdf_description_others": description_others,
+            "trn_pdf_ner": ner_name if ner_name else ""
+        }
 
-    # Define storage list
-    transactions = []
 
-    for item in filteredText:
-        # match = re.match(pattern, item)
+def extract_trxInfo(text, identified_bank, pdf_path_global):
+    logger.logger.info("[mbb_pdf_extraction] : Executing the MAYBANK pdf file extraction operation, for the transaction(s) data only")
+    return MbbExtractor().extract(text)
 
-        # Attempt to match full 6-part pattern
-        # pattern_full = r"\s*(\d{2}/\d{2})\s+(.+?)\s+([\d,]+(?:\.\d{2})?)([-+]?)\s+([\d,]+(?:\.\d{2})?)\s+(.+)"
-        pattern_full = r"\s*(\d{2}/\d{2}(?:/\d{2})?)\s+(.+?)\s+([\d,]+(?:\.\d{2})?)([-+]?)\s+([\d,]+(?:\.\d{2})?)\s+(.+)"
-        match = re.match(pattern_full, item)
 
-        if not match:
-            # Try fallback 5-part pattern (without trailing desc_others)
-            # pattern_short = r"\s*(\d{2}/\d{2})\s+(.+?)\s+([\d,]+(?:\.\d{2})?)([-+]?)\s+([\d,]+(?:\.\d{2})?)"
-            pattern_short = r"\s*(\d{2}/\d{2}(?:/\d{2})?)\s+(.+?)\s+([\d,]+(?:\.\d{2})?)([-+]?)\s+([\d,]+(?:\.\d{2})?)"
-            match = re.match(pattern_short, item)
-
-        if match:
-            date = match.group(1)
-            description = match.group(2).strip()
-            amount = match.group(3)
-            amountInd = match.group(4) if match.group(4) else "NULL"
-            statementBalance = match.group(5)
-            description_others = match.group(
-                6).strip() if len(match.groups()) >= 6 else ""
-
-            full_desc = description + " " + description_others
-            ner_name = NER_extract_name(full_desc)
-
-            transactions.append({
-                "trn_pdf_date": date,
-                "trn_pdf_description": description,
-                "trn_pdf_CR_Amount": float(amount.replace(",", "")) if amountInd == "+" else 0,
-                "trn_pdf_DR_Amount": float(amount.replace(",", "")) if amountInd == "-" else 0,
-                "trn_pdf_statementBalance": float(statementBalance.replace(",", "")),
-                "trn_pdf_description_others": description_others,
-                "trn_pdf_ner": ner_name if ner_name else ""
-            })
-
-    return transactions
+def iter_trxInfo(pages, identified_bank, pdf_path_global):
+    """Transactions yielded as the page texts are consumed (running balance carried across pages)"""
+    logger.logger.info("[mbb_pdf_extraction] : Streaming the MAYBANK pdf file extraction operation, for the transaction(s) data only")
+    return MbbExtractor().iter_transactions(pages)
@@ -1,13 +1,25 @@
 # flake8: noqa: E501
 from datetime import datetime
-import re
 import logger
 from transaction.name_extractor import NER_extract_name
+from transaction.pdf_extraction_method.line_extractor import LineExtractor, SkipRegion, Marker
+from transaction.pdf_extraction_method import row_grammar
+
+# ✅ Row grammar (compiled and validated once, see row_grammar)
+GRAMMAR = row_grammar.register("PBB", {
+    "date_line": r"^\d{2}/\d{2}$",     # a line holding only a DD/MM date opens a new date block
+    "amount": r"^\d+\.\d{2}$",         # amount with the thousands separators removed
+}, samples=(
+    ("date_line", "01/06", True),
+    ("date_line", "01/06 DUITNOW", False),
+    ("amount", "1500.00", True),
+    ("amount", "1500.0", False),
+))
 
 
 def is_two_decimal_numeric(val):
     clean = val.replace(",", "").strip()
-    return re.match(r"^\d+\.\d{2}$", clean) is not None
+    return GRAMMAR.amount.match(clean) is not None
 
 # ===================== Public Bank & ISLAMIC BANK =====================
 # PUBLIC BANK TEMPLATE - GENERAL INFO EXTRACTION --------------------------------------------
@@ -97,161 +109,111 @@ def extract_docInfo(text, identified_bank, pdf_path_global):
 
 
 # PUBLIC BANK TEMPLATE - TRANSACTION EXTRACTION --------------------------------------------
-def extract_trxInfo(text, identified_bank, pdf_path_global):
-    logger.logger.info("[pbb_pdf_extraction] : Executing the PUBLIC BANK pdf file extraction operation, for the transaction(s) data only")
-
-    all_lines = text.split("\n")
-
-    # Perform pre-cleaning (Step 1) in the text to remove unnecessary text
-    cleaned_lines = []
-    PB_SEQ = all_lines[0].strip()
-    skip = False
-    for i, line in enumerate(all_lines):
-        # prev_line = all_lines[i - 1].strip().upper() if i - 1 >= 0 else ""
-
-        if PB_SEQ == line.upper():
-            skip = True  # Start skipping
-        elif "BALANCE FROM LAST STATEMENT" in line.upper():
-            skip = False  # Stop skipping
-            # continue  # Optionally skip the marker line too
-
-        if not skip:
-            cleaned_lines.append(line)
-
-    # Rejoin cleaned text for further processing
-    textCleaned = "\n".join(cleaned_lines)
-
-    # Perform pre-cleaning (Step 2) in the text to remove unnecessary text
-    cleaned_lines = []
-    textSplit = textCleaned.split("\n")
-
-    skip = False
-    for i, line in enumerate(textSplit):
-        next_line = textSplit[i + 1].strip().upper() if i + \
-            1 < len(textSplit) else ""
-
-        if "BALANCE C/F" in line.upper():
-            skip = True  # Start skipping
-        elif "BALANCE B/F" in next_line:
-            skip = False  # Stop skipping
-
-        if not skip:
-            cleaned_lines.append(line)
-
-    # Rejoin cleaned text for further processing
-    textCleaned2 = "\n".join(cleaned_lines)
-
-    # Perform pre-cleaning (Step 3) in the text to remove unnecessary text
-    cleaned_lines = []
-    textSplit = textCleaned2.split("\n")
-
-    skip = False
-    for i, line in enumerate(textSplit):
-        prev_line = textSplit[i - 1].strip().upper() if i - 1 >= 0 else ""
-        next_line = textSplit[i + 1].strip().upper() if i + \
-            1 < len(textSplit) else ""
+class PbbExtractor(LineExtractor):
+    """
+    Public Bank statement text → transactions, in one pass over the lines.
+    Row grammar: a DD/MM line opens a date; the line after it, or a two-decimal amount after a
+    non-amount line, opens a transaction (amount, balance, description, other descriptions).
+    Debit / credit is derived from the balance moving down / up.
+    """
+
+    def regions(self, first_line):
+        return (
+            # Page header (repeats the first line of the statement) until the opening balance
+            SkipRegion(Marker(first_line.text.strip(), exact=True), Marker("BALANCE FROM LAST STATEMENT")),
+            # Carried forward balance until the line before the next brought forward balance
+            SkipRegion(Marker("BALANCE C/F"), Marker("BALANCE B/F", where="next")),
+            # Brought forward balance: the line before it, the marker line and its amount
+            SkipRegion(Marker("BALANCE B/F", where="next"), Marker("BALANCE B/F", where="prev"), drop_end=True),
+            # Statement summary at the end
+            SkipRegion(Marker("CLOSING BALANCE IN THIS STATEMENT")),
+        )
+
+    def parse_lines(self, lines):
+        compare_balance = None
+        preamble = []    # tagged lines before the first date (opening balance)
+        date = None      # None until the first date line
+        fields = None    # fields of the transaction being read
+        prev_text = None
+
+        for seq_num, line in enumerate(lines, start=1):
+            text = line.text
+            if GRAMMAR.date_line.match(text.strip()):
+                if date is None:
+                    opening = " ".join(preamble).strip()
+                    if opening:
+                        compare_balance = float(opening.replace("##", "").replace(",", "").strip())
+                else:
+                    trx = self._build(date, fields, compare_balance)
+                    if trx:
+                        compare_balance = trx["trn_pdf_statementBalance"]
+                        yield trx
+                stripped = text.strip()
+                date = stripped.split()[0] if stripped else "Unknown"
+                fields = None
+            elif seq_num >= 2:
+                if GRAMMAR.date_line.match(prev_text) or (is_two_decimal_numeric(text) and not is_two_decimal_numeric(prev_text)):
+                    if date is None:
+                        preamble.append(f"## {text}")
+                    else:
+                        trx = self._build(date, fields, compare_balance)
+                        if trx:
+                            compare_balance = trx["trn_pdf_statementBalance"]
+                            yield trx
+                        fields = [text.strip()]
+                elif date is None:
+                    preamble.append(f"#@ {text}")
+                elif fields is not None:
+                    fields.append(text.strip())
+            prev_text = text
+
+        if date is not None:
+            trx = self._build(date, fields, compare_balance)
+            if trx:
+                yield trx
+
+    @staticmethod
+    def _build(date, fields, compare_balance):
+        if not fields or fields == [""]:
+            return None
+
+        amount = float(fields[0].replace(",", "")) if len(fields) > 0 else 0.0
+        statement_balance = float(fields[1].replace(",", "")) if len(fields) > 1 else 0.0
+        description = fields[2] if len(fields) > 2 else ""
+        description_others = " ".join(fields[3:]) if len(fields) > 3 else ""
+
+        if compare_balance is not None:
+            if statement_balance < compare_balance:
+                debit = amount
+                credit = 0.0
+            else:
+                credit = amount
+                debit = 0.0
+        else:
+            debit = credit = 0.0
 
-        if "BALANCE B/F" in next_line:
-            skip = True  # Start skipping
-        elif "BALANCE B/F" in prev_line:
-            skip = False  # Stop skipping
-            continue  # Optionally skip the marker line too
+        full_desc = description + " " + description_others
+        ner_name = NER_extract_name(full_desc)
 
-        if not skip:
-            cleaned_lines.append(line)
+        return {
+            "trn_pdf_date": date,
+            "trn_pdf_statementBalance": statement_balance,
+            "trn_pdf_DR_Amount": debit,
+            "trn_pdf_CR_Amount": credit,
+            "trn_pdf_description": description,
+            "trn_pdf_description_others": description_others,
+            "trn_pdf_ner": ner_name if ner_name else ""
+        }
 
-    # Rejoin cleaned text for further processing
-    textCleaned3 = "\n".join(cleaned_lines)
 
-    # Perform pre-cleaning (Step 4) in the text to remove unnecessary text
-    cleaned_lines = []
-    textSplit = textCleaned3.split("\n")
+def extract_trxInfo(text, identified_bank, pdf_path_global):
+    logger.logger.info("[pbb_pdf_extraction] : Executing the PUBLIC BANK pdf file extraction operation, for the transaction(s) data only")
+    return PbbExtractor().extract(text)
 
-    skip = False
-    for i, line in enumerate(textSplit):
-        if "CLOSING BALANCE IN THIS STATEMENT" in line.upper():
-            skip = True  # Start skipping
 
-        if not skip:
-            cleaned_lines.append(line)
+def iter_trxInfo(pages, identified_bank, pdf_path_global):
+    """Transactions yielded as the page texts are consumed (running balance carried across pages)"""
+    logger.logger.info("[pbb_pdf_extraction] : Streaming the PUBLIC BANK pdf file extraction operation, for the transaction(s) data only")
+    return PbbExtractor().iter_transactions(pages)
 
-    # Rejoin cleaned text for further processing
-    textCleaned4 = "\n".join(cleaned_lines)
-    textSplit4 = textCleaned4.split("\n")
-    textAppend = []
-
-    for seqNum, line in enumerate(textSplit4, start=1):  # Start from 1
-        # if re.match(r"\d{2}/\d{2}", line):  # Check if "line" starts with a date (DD/MM)
-        # Check if "line" starts with a date and only exact DD/MM
-        if re.match(r"^\d{2}/\d{2}$", line.strip()):
-            # Add re.match(r"^\d{2}/\d{2}$", line.strip())sequence number with %
-            textAppend.append(f"%% {line}")
-        else:
-            # textAppend.append(line)  # Keep line unchanged
-            # Check previous line (index seqNum - 2 due to start=1)
-            if seqNum >= 2:
-                prev_line = textSplit4[seqNum - 2]
-                if re.match(r"^\d{2}/\d{2}$", prev_line) or (is_two_decimal_numeric(line) and not is_two_decimal_numeric(prev_line)):
-                    textAppend.append(f"## {line}")
-                else:
-                    textAppend.append(f"#@ {line}")
-
-    textJoin = " ".join(textAppend)  # Joins with a space
-    textSplitTran = textJoin.split("%%")
-
-    # Parsed result list
-    split_transactions = []
-    compare_balance = None
-
-    for idx, line in enumerate(textSplitTran):
-        line = line.strip()
-        if not line:
-            continue
-
-        if idx == 0:
-            compare_balance = float(line.replace(
-                "##", "").replace(",", "").strip())
-            continue
-
-        parts = line.split("##")
-        date = parts[0].strip().split()[0] if parts[0].strip() else "Unknown"
-
-        for trx in parts[1:]:
-            trx_cleaned = trx.strip()
-            if trx_cleaned:
-                fields = [p.strip() for p in trx_cleaned.split("#@")]
-
-                amount = float(fields[0].replace(",", "")
-                               ) if len(fields) > 0 else 0.0
-                statement_balance = float(fields[1].replace(
-                    ",", "")) if len(fields) > 1 else 0.0
-                description = fields[2] if len(fields) > 2 else ""
-                description_others = " ".join(
-                    fields[3:]) if len(fields) > 3 else ""
-
-                if compare_balance is not None:
-                    if statement_balance < compare_balance:
-                        debit = amount
-                        credit = 0.0
-                    else:
-                        credit = amount
-                        debit = 0.0
-                else:
-                    debit = credit = 0.0
-
-                full_desc = description + " " + description_others
-                ner_name = NER_extract_name(full_desc)
-
-                split_transactions.append({
-                    "trn_pdf_date": date,
-                    "trn_pdf_statementBalance": statement_balance,
-                    "trn_pdf_DR_Amount": debit,
-                    "trn_pdf_CR_Amount": credit,
-                    "trn_pdf_description": description,
-                    "trn_pdf_description_others": description_others,
-                    "trn_pdf_ner": ner_name if ner_name else ""
-                })
-
-                compare_balance = statement_balance
-    return split_transactions
-# Sub Process - Differentiate the caller by detected bank name ---------------------------------------
\ No newline at end of file
+# Sub Process - Differentiate the caller by detected bank name ---------------------------------------
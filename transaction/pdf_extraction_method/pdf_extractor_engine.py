@@ -17,7 +17,11 @@ import os
 import sys
 import re
 import json
+import threading
+from contextlib import contextmanager
 from typing import List, Dict, Tuple
+from transaction.pdf_extraction_method import row_grammar
+from transaction.pdf_extraction_method.table_engine import EngineResult, TableLayout, table_row, pdfplumber_words, fitz_plumber_words, fitz_plumber_line_ys, box_fields
 
 
 IS_FROZEN = getattr(sys, "frozen", False)
@@ -119,6 +123,16 @@ def extract_with_fitz(pdf_path: str) -> str:
     # - "\fPage" (or "\fPage:{n}") marks actual page separation
     return "\n".join(text_content)
 
+def iter_fitz_pages(pdf_path: str):
+    """Text of each page as extract_with_fitz reads it, one page at a time ("\n".join gives extract_with_fitz)"""
+    logger.logger.info(f"[pdf_extractor_engine] Streaming pages with FITZ: {pdf_path}")
+    doc = fitz.open(pdf_path)
+    try:
+        for page in doc:
+            yield page.get_text("text")
+    finally:
+        doc.close()
+
 # ===================== FITZ 2 =====================
 def extract_with_fitz2(pdf_path: str) -> str:
     logger.logger.info(f"[pdf_extractor_engine] Using FITZ for text extraction: {pdf_path}")
@@ -174,271 +188,272 @@ def extract_rhb_pdf_lines(pdf_path: str) -> str:
     # - "\fPage" (or "\fPage:{n}") marks actual page separation
     return "\n".join(lines)  
 
-# ===================== PDFPLUMBER x & y - RHB TRN =====================
+# ===================== PDFPLUMBER x & y - RHB =====================
+# ✅ Row grammar of the coordinate rows (compiled and validated once, see row_grammar)
+RHB_XY_GRAMMAR = row_grammar.register("RHB_XY", {
+    "date": r"^\d{2}-\d{2}-\d{4}$",       # 06-06-2024 etc.
+}, samples=(
+    ("date", "06-06-2024", True),
+    ("date", "Beginning", False),
+))
+
+# ✅ RHB Reflex: fixed X columns, rows formed by merging all words within Y_TOLERANCE (±pt) vertically
+RHB_REFLEX_LAYOUT = TableLayout({
+    "Date": (10, 58),
+    "Branch": (59, 85),
+    "Description": (86, 130),
+    "Sender": (135, 185),
+    "Ref1": (191, 245),
+    "Ref2": (246, 305),
+    "RefNum": (306, 350),
+    "AmountDR": (351, 435),
+    "AmountCR": (436, 515),
+    "Balance": (516, 585),
+})
+RHB_REFLEX_Y_TOLERANCE = 30
+
+# ✅ RHB Current Account: fixed X columns (you can fine-tune later), rows between the blue horizontal lines
+RHB_CURRENT_LAYOUT = TableLayout({
+    "Date": (40, 90),
+    "Description": (95, 330),
+    "Cheque": (335, 400),
+    "Debit": (405, 460),
+    "Credit": (465, 520),
+    "Balance": (525, 590),
+})
+RHB_CURRENT_SEPARATOR_MIN_WIDTH = 200   # horizontal lines wider than this separate transactions
+
+# ✅ Statement header fields: (xmin, xmax, ymin, ymax) box on the first page + default when the box is empty
+RHB_REFLEX_DOC_BOXES = {
+    "Bank Name": {"coords": (0, 0, 0, 0), "default": "RHB Bank Berhad"},
+    "Bank Registration No": {"coords": (0, 0, 0, 0), "default": "NA"},
+    "Bank Address": {"coords": (0, 0, 0, 0), "default": "NA"},
+    "Customer Name": {"coords": (10, 300, 60, 72), "default": "Unknown Customer"},
+    "Customer Address": {"coords": (10, 300, 73, 130), "default": "NA"},
+    "Statement Date": {"coords": (320, 375, 150, 160), "default": "NA"},
+    "Account Number": {"coords": (10, 200, 180, 195), "default": "NA"},
+}
+RHB_CURRENT_DOC_BOXES = {
+    "Bank Name": {"coords": (0, 0, 0, 0), "default": "RHB Bank Berhad"},
+    "Bank Registration No": {"coords": (0, 0, 0, 0), "default": "NA"},
+    "Bank Address": {"coords": (0, 0, 0, 0), "default": "NA"},
+    "Customer Name": {"coords": (35, 200, 135, 145), "default": "Unknown Customer"},
+    "Customer Address": {"coords": (35, 200, 146, 190), "default": "NA"},
+    "Statement Date": {"coords": (475, 560, 55, 70), "default": "NA"},
+    "Account Number": {"coords": (160, 225, 280, 295), "default": "NA"},
+}
+
+
+def rhb_reflex_rows(page_words, page_number):
+    """Valid RHB Reflex transaction rows (TableRow) of one page (PageWords)"""
+    rows = []
+    for group in page_words.bands(RHB_REFLEX_Y_TOLERANCE):
+        row_data = RHB_REFLEX_LAYOUT.row(group)
+
+        # Skip blank or invalid
+        if not any(row_data.values()):
+            continue
+        if row_data["Date"].lower() in ("date", "beginning"):
+            continue
+        if not RHB_XY_GRAMMAR.date.match(row_data["Date"]):
+            logger.logger.debug(f"[rhb_xy_extraction] Skipped invalid date: {row_data['Date']}")
+            continue
+
+        rows.append(table_row(row_data, group, page_number))
+    return rows
+
+
+def rhb_current_rows(page_words, separator_ys, page_number):
+    """RHB Current Account transaction rows (TableRow) of one page: separator_ys are the y of the transaction separator lines"""
+    rows = []
+    for row_words in page_words.between_lines(sorted(set(separator_ys), reverse=True)):
+        if not row_words:
+            continue
+        record = RHB_CURRENT_LAYOUT.row(row_words)
+
+        # skip empty or header lines
+        if not any(record.values()):
+            continue
+        if record["Date"].lower() in ("date", "tarikh"):
+            continue
+
+        rows.append(table_row(record, row_words, page_number))
+    return rows
+
+
+def rhb_doc_defaults(engine, doc_boxes):
+    return EngineResult(engine, fields={field: cfg["default"] for field, cfg in doc_boxes.items()})
+
+
+def rhb_doc_info(engine, page_words, doc_boxes):
+    """Statement header of the first page (PageWords) as an EngineResult with fields"""
+    result = rhb_doc_defaults(engine, doc_boxes)
+    if len(page_words):
+        result.fields = box_fields(page_words, {field: cfg["coords"] for field, cfg in doc_boxes.items()}, result.fields)
+    return result
+
+
 def extract_with_pdfplumber_xy_rhb_trn(pdf_path):
     logger.logger.info(f"[rhb_xy_extraction] Processing: {pdf_path}")
 
-    column_boxes = {
-        "Date": (10, 58),
-        "Branch": (59, 85),
-        "Description": (86, 130),
-        "Sender": (135, 185),
-        "Ref1": (191, 245),
-        "Ref2": (246, 305),
-        "RefNum": (306, 350),
-        "AmountDR": (351, 435),
-        "AmountCR": (436, 515),
-        "Balance": (516, 585),
-    }
-
-    Y_TOLERANCE = 30        # ✅ merge all words within ±25 pt vertically
-    DATE_PATTERN = re.compile(r"^\d{2}-\d{2}-\d{4}$")  # 06-06-2024 etc.
-    all_rows = []
-
+    result = EngineResult("pdfplumberxy_rhb")
     with pdfplumber.open(pdf_path) as pdf:
         for page_index, page in enumerate(pdf.pages, start=1):
-            words = page.extract_words()
-            if not words:
-                continue
+            result.rows.extend(rhb_reflex_rows(pdfplumber_words(page), page_index))
 
-            # Sort words top to bottom
-            words.sort(key=lambda w: w["top"])
-            groups, current_group, current_y = [], [], None
+    logger.logger.info(f"[rhb_xy_extraction] Total valid transactions extracted: {len(result)}")
+    return result
 
-            # Group by Y proximity
-            for w in words:
-                if current_y is None:
-                    current_y = w["top"]
-                    current_group.append(w)
-                    continue
 
-                if abs(w["top"] - current_y) <= Y_TOLERANCE:
-                    current_group.append(w)
-                else:
-                    groups.append(current_group)
-                    current_group = [w]
-                    current_y = w["top"]
-            if current_group:
-                groups.append(current_group)
-
-            # Convert grouped words into structured rows
-            for group in groups:
-                row_data = {}
-                for col, (xmin, xmax) in column_boxes.items():
-                    cell_words = [w["text"] for w in group if xmin <= w["x0"] < xmax]
-                    row_data[col] = " ".join(cell_words).strip()
-
-                # Skip blank or invalid
-                if not any(row_data.values()):
-                    continue
-                if row_data["Date"].lower() in ("date", "beginning"):
-                    continue
-                if not DATE_PATTERN.match(row_data["Date"]):
-                    logger.logger.debug(f"[rhb_xy_extraction] Skipped invalid date: {row_data['Date']}")
-                    continue
-
-                all_rows.append(row_data)
-
-    # ✅ Convert list of dicts to JSON string
-    json_output = json.dumps(all_rows, indent=4, ensure_ascii=False)
-
-    logger.logger.info(f"[rhb_xy_extraction] Total valid transactions extracted: {len(all_rows)}")
-    return json_output
-
-# ===================== PDFPLUMBER x & y - RHB DOC =====================
 def extract_with_pdfplumber_xy_rhb_doc(pdf_path):
     logger.logger.info(f"[rhb_xy_extraction][extract_with_pdfplumber_xy_rhb_doc] Processing: {pdf_path}")
 
-    # Define coordinate zones + default fallback for each field
-    coord_boxes = {
-        "Bank Name": {
-            "coords": (0, 0, 0, 0),
-            "default": "RHB Bank Berhad"
-        },
-        "Bank Registration No": {
-            "coords": (0, 0, 0, 0),
-            "default": "NA"
-        },
-        "Bank Address": {
-            "coords": (0, 0, 0, 0),
-            "default": "NA"
-        },
-        "Customer Name": {
-            "coords": (10, 300, 60, 72),
-            "default": "Unknown Customer"
-        },
-        "Customer Address": {
-            "coords": (10, 300, 73, 130),
-            "default": "NA"
-        },
-        "Statement Date": {
-            "coords": (320, 375, 150, 160),
-            "default": "NA"
-        },
-        "Account Number": {
-            "coords": (10, 200, 180, 195),
-            "default": "NA"
-        },
-    }
-
-    doc_info = {key: val["default"] for key, val in coord_boxes.items()}
-
     try:
         with pdfplumber.open(pdf_path) as pdf:
             if not pdf.pages:
-                return json.dumps(doc_info)
-
-            page = pdf.pages[0]
-            words = page.extract_words()
-            if not words:
-                return json.dumps(doc_info)
-
-            # Loop through each field: extract if text found, else keep default
-            for field, cfg in coord_boxes.items():
-                xmin, xmax, ymin, ymax = cfg["coords"]
-                found_words = [
-                    w["text"] for w in words
-                    if xmin <= w["x0"] < xmax and ymin <= w["top"] < ymax
-                ]
-                if found_words:
-                    doc_info[field] = " ".join(found_words).strip()
-
+                return rhb_doc_defaults("pdfplumberxy_rhb", RHB_REFLEX_DOC_BOXES)
+            return rhb_doc_info("pdfplumberxy_rhb", pdfplumber_words(pdf.pages[0]), RHB_REFLEX_DOC_BOXES)
     except Exception as e:
         logger.logger.exception(f"[rhb_xy_extraction][extract_with_pdfplumber_xy_rhb_doc][ERROR]: {e}")
 
-    return json.dumps(doc_info, indent=4, ensure_ascii=False)
+    return rhb_doc_defaults("pdfplumberxy_rhb", RHB_REFLEX_DOC_BOXES)
+
 
-# ===================== PDFPLUMBER x & y - RHB CURRENT ACCOUNT TRN =====================
 def extract_with_pdfplumber_xy_rhbcurr_trn(pdf_path):
     """
     Extract RHB Current Account transactions.
     Uses fixed X-column coordinates and dynamically detects Y-ranges between blue horizontal lines.
-    Returns JSON string.
+    Returns an EngineResult of TableRow records.
     """
     logger.logger.info(f"[rhb_xy_extraction][extract_with_pdfplumber_xy_rhbcurr_trn] Processing: {pdf_path}")
 
-    # Define X-column ranges (you can fine-tune later)
-    column_boxes = {
-        "Date": (40, 90),
-        "Description": (95, 330),
-        "Cheque": (335, 400),
-        "Debit": (405, 460),
-        "Credit": (465, 520),
-        "Balance": (525, 590),
-    }
-
-    all_rows = []
+    result = EngineResult("pdfplumberxy_rhbcc")
 
     try:
         with pdfplumber.open(pdf_path) as pdf:
             for page_index, page in enumerate(pdf.pages, start=1):
-                words = page.extract_words()
-                lines = page.lines
-
-                # 🧩 Step 1: detect horizontal blue lines (transaction separators)
-                horizontal_lines = [
-                    ln["y0"] for ln in lines if abs(ln["x1"] - ln["x0"]) > 200
-                ]
-                horizontal_lines = sorted(set(horizontal_lines), reverse=True)
-
-                if len(horizontal_lines) < 2:
+                # 🧩 detect horizontal blue lines (transaction separators)
+                separator_ys = [ln["y0"] for ln in page.lines if abs(ln["x1"] - ln["x0"]) > RHB_CURRENT_SEPARATOR_MIN_WIDTH]
+                if len(set(separator_ys)) < 2:
                     logger.logger.warning(f"[rhb_xy_extraction] Page {page_index}: no blue lines found.")
                     continue
 
-                # 🧩 Step 2: iterate between each pair of blue lines
-                for i in range(len(horizontal_lines) - 1):
-                    top_y = horizontal_lines[i]
-                    bottom_y = horizontal_lines[i + 1]
+                result.rows.extend(rhb_current_rows(pdfplumber_words(page), separator_ys, page_index))
+                logger.logger.info(f"[rhb_xy_extraction] Page {page_index}: extracted {len(result)} transactions.")
+
+    except Exception as e:
+        logger.logger.exception(f"[rhb_xy_extraction][extract_with_pdfplumber_xy_rhbcurr_trn][ERROR]: {e}")
+
+    # ✅ rows go to the bank extractor as they are (no JSON round trip)
+    return result
 
-                    # collect all words between the two lines
-                    row_words = [w for w in words if bottom_y < w["top"] < top_y]
-                    if not row_words:
-                        continue
 
-                    # 🧩 Step 3: group into columns using X-ranges
-                    record = {}
-                    for col, (xmin, xmax) in column_boxes.items():
-                        cell_words = [w["text"] for w in row_words if xmin <= w["x0"] < xmax]
-                        record[col] = " ".join(cell_words).strip()
+def extract_with_pdfplumber_xy_rhbcurr_doc(pdf_path):
+    logger.logger.info(f"[rhb_xy_extraction][extract_with_pdfplumber_xy_rhb_doc] Processing: {pdf_path}")
+
+    try:
+        with pdfplumber.open(pdf_path) as pdf:
+            if not pdf.pages:
+                return rhb_doc_defaults("pdfplumberxy_rhbcc", RHB_CURRENT_DOC_BOXES)
+            return rhb_doc_info("pdfplumberxy_rhbcc", pdfplumber_words(pdf.pages[0]), RHB_CURRENT_DOC_BOXES)
+    except Exception as e:
+        logger.logger.exception(f"[rhb_xy_extraction][extract_with_pdfplumber_xy_rhb_doc][ERROR]: {e}")
+
+    return rhb_doc_defaults("pdfplumberxy_rhbcc", RHB_CURRENT_DOC_BOXES)
 
-                    # skip empty or header lines
-                    if not any(record.values()):
-                        continue
-                    if record["Date"].lower() in ("date", "tarikh"):
-                        continue
 
-                    all_rows.append(record)
+# ===================== PyMuPDF x & y - RHB =====================
+# ✅ Same layouts and rows as the pdfplumber XY engines above, with the words read by MuPDF (fitz_plumber_words).
+#    The DOC pass (first page) keeps the document open for the TRN pass (all pages) of the same file.
+_shared_fitz_lock = threading.Lock()
+_shared_fitz = {"key": None, "doc": None}
 
-                logger.logger.info(f"[rhb_xy_extraction] Page {page_index}: extracted {len(all_rows)} transactions.")
 
+def _close_shared_fitz():
+    if _shared_fitz["doc"] is not None:
+        _shared_fitz["doc"].close()
+    _shared_fitz.update(key=None, doc=None)
+
+
+@contextmanager
+def shared_fitz_document(pdf_path, keep_open=False):
+    """
+    PyMuPDF document of pdf_path, reused when the previous pass left the same file open.
+    keep_open=True leaves it open for the next pass, otherwise it is closed on exit.
+    """
+    key = (os.path.abspath(pdf_path), os.path.getmtime(pdf_path))
+    with _shared_fitz_lock:
+        if _shared_fitz["key"] != key:
+            _close_shared_fitz()
+            _shared_fitz.update(key=key, doc=fitz.open(pdf_path))
+        try:
+            yield _shared_fitz["doc"]
+        finally:
+            if not keep_open:
+                _close_shared_fitz()
+
+
+def extract_with_fitz_xy_rhb_trn(pdf_path):
+    logger.logger.info(f"[rhb_xy_extraction][extract_with_fitz_xy_rhb_trn] Processing: {pdf_path}")
+
+    result = EngineResult("fitzxy_rhb")
+    with shared_fitz_document(pdf_path) as doc:
+        for page_index, page in enumerate(doc, start=1):
+            result.rows.extend(rhb_reflex_rows(fitz_plumber_words(page), page_index))
+
+    logger.logger.info(f"[rhb_xy_extraction] Total valid transactions extracted: {len(result)}")
+    return result
+
+
+def extract_with_fitz_xy_rhb_doc(pdf_path):
+    logger.logger.info(f"[rhb_xy_extraction][extract_with_fitz_xy_rhb_doc] Processing: {pdf_path}")
+
+    try:
+        with shared_fitz_document(pdf_path, keep_open=True) as doc:
+            if not doc.page_count:
+                return rhb_doc_defaults("fitzxy_rhb", RHB_REFLEX_DOC_BOXES)
+            return rhb_doc_info("fitzxy_rhb", fitz_plumber_words(doc[0]), RHB_REFLEX_DOC_BOXES)
     except Exception as e:
-        logger.logger.exception(f"[rhb_xy_extraction][extract_with_pdfplumber_xy_rhbcurr_trn][ERROR]: {e}")
+        logger.logger.exception(f"[rhb_xy_extraction][extract_with_fitz_xy_rhb_doc][ERROR]: {e}")
 
-    # ✅ return as JSON for downstream processing
-    return json.dumps(all_rows, indent=4, ensure_ascii=False)
+    return rhb_doc_defaults("fitzxy_rhb", RHB_REFLEX_DOC_BOXES)
 
-# ===================== PDFPLUMBER x & y - RHB CURRENT ACCOUNT DOC =====================
-def extract_with_pdfplumber_xy_rhbcurr_doc(pdf_path):
-    logger.logger.info(f"[rhb_xy_extraction][extract_with_pdfplumber_xy_rhb_doc] Processing: {pdf_path}")
 
-    # Define coordinate zones + default fallback for each field
-    coord_boxes = {
-        "Bank Name": {
-            "coords": (0, 0, 0, 0),
-            "default": "RHB Bank Berhad"
-        },
-        "Bank Registration No": {
-            "coords": (0, 0, 0, 0),
-            "default": "NA"
-        },
-        "Bank Address": {
-            "coords": (0, 0, 0, 0),
-            "default": "NA"
-        },
-        "Customer Name": {
-            "coords": (35, 200, 135, 145),
-            "default": "Unknown Customer"
-        },
-        "Customer Address": {
-            "coords": (35, 200, 146, 190),
-            "default": "NA"
-        },
-        "Statement Date": {
-            "coords": (475, 560, 55, 70),
-            "default": "NA"
-        },
-        "Account Number": {
-            "coords": (160, 225, 280, 295),
-            "default": "NA"
-        },
-    }
-
-    doc_info = {key: val["default"] for key, val in coord_boxes.items()}
+def extract_with_fitz_xy_rhbcurr_trn(pdf_path):
+    logger.logger.info(f"[rhb_xy_extraction][extract_with_fitz_xy_rhbcurr_trn] Processing: {pdf_path}")
+
+    result = EngineResult("fitzxy_rhbcc")
 
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            if not pdf.pages:
-                return json.dumps(doc_info)
+        with shared_fitz_document(pdf_path) as doc:
+            for page_index, page in enumerate(doc, start=1):
+                # 🧩 detect horizontal blue lines (transaction separators)
+                separator_ys = fitz_plumber_line_ys(page, RHB_CURRENT_SEPARATOR_MIN_WIDTH)
+                if len(set(separator_ys)) < 2:
+                    logger.logger.warning(f"[rhb_xy_extraction] Page {page_index}: no blue lines found.")
+                    continue
 
-            page = pdf.pages[0]
-            words = page.extract_words()
-            if not words:
-                return json.dumps(doc_info)
-
-            # Loop through each field: extract if text found, else keep default
-            for field, cfg in coord_boxes.items():
-                xmin, xmax, ymin, ymax = cfg["coords"]
-                found_words = [
-                    w["text"] for w in words
-                    if xmin <= w["x0"] < xmax and ymin <= w["top"] < ymax
-                ]
-                if found_words:
-                    doc_info[field] = " ".join(found_words).strip()
+                result.rows.extend(rhb_current_rows(fitz_plumber_words(page), separator_ys, page_index))
+                logger.logger.info(f"[rhb_xy_extraction] Page {page_index}: extracted {len(result)} transactions.")
 
     except Exception as e:
-        logger.logger.exception(f"[rhb_xy_extraction][extract_with_pdfplumber_xy_rhb_doc][ERROR]: {e}")
+        logger.logger.exception(f"[rhb_xy_extraction][extract_with_fitz_xy_rhbcurr_trn][ERROR]: {e}")
+
+    return result
+
+
+def extract_with_fitz_xy_rhbcurr_doc(pdf_path):
+    logger.logger.info(f"[rhb_xy_extraction][extract_with_fitz_xy_rhbcurr_doc] Processing: {pdf_path}")
+
+    try:
+        with shared_fitz_document(pdf_path, keep_open=True) as doc:
+            if not doc.page_count:
+                return rhb_doc_defaults("fitzxy_rhbcc", RHB_CURRENT_DOC_BOXES)
+            return rhb_doc_info("fitzxy_rhbcc", fitz_plumber_words(doc[0]), RHB_CURRENT_DOC_BOXES)
+    except Exception as e:
+        logger.logger.exception(f"[rhb_xy_extraction][extract_with_fitz_xy_rhbcurr_doc][ERROR]: {e}")
 
-    return json.dumps(doc_info, indent=4, ensure_ascii=False)
+    return rhb_doc_defaults("fitzxy_rhbcc", RHB_CURRENT_DOC_BOXES)
 
 
 # ===================== PDF2IMAGE + TESSERACT =====================
@@ -501,12 +516,16 @@ def extract_with_trocr(pdf_path: str) -> str:
 
 
 # ===================== Dispatcher (Final Modular Version) =====================
-def extract_text_by_engine(pdf_path: str, engine: str = "fitz", page_mode: str = "all") -> str:
+def extract_text_by_engine(pdf_path: str, engine: str = "fitz", page_mode: str = "all", fallback: bool = True) -> str | EngineResult:
     """
     Unified dispatcher for text extraction.
 
-    engine: fitz, pdfplumber, pdf2image, ocrmypdf, trocr
+    engine: fitz, pdfplumber, pdf2image, ocrmypdf, trocr,
+            pdfplumberxy_rhb / fitzxy_rhb (RHB Reflex), pdfplumberxy_rhbcc / fitzxy_rhbcc (RHB Current Account)
     page_mode: "first" for first page only, "all" for full document
+
+    The coordinate engines (*xy_*) return an EngineResult (rows / header fields) instead of text.
+    fallback=False raises the engine's error instead of re-reading the file with FITZ.
     """
     engine = engine.lower().strip()
     page_mode = page_mode.lower().strip()
@@ -531,6 +550,15 @@ def extract_text_by_engine(pdf_path: str, engine: str = "fitz", page_mode: str =
             full_text = extract_with_pdfplumber_xy_rhbcurr_doc(pdf_path)
         elif engine == "pdfplumberxy_rhbcc" and page_mode == "all":
             full_text = extract_with_pdfplumber_xy_rhbcurr_trn(pdf_path)
+            # RHB - Reflx / Current Account, words read by PyMuPDF (same rows as pdfplumberxy_*)
+        elif engine == "fitzxy_rhb" and page_mode == "first":
+            full_text = extract_with_fitz_xy_rhb_doc(pdf_path)
+        elif engine == "fitzxy_rhb" and page_mode == "all":
+            full_text = extract_with_fitz_xy_rhb_trn(pdf_path)
+        elif engine == "fitzxy_rhbcc" and page_mode == "first":
+            full_text = extract_with_fitz_xy_rhbcurr_doc(pdf_path)
+        elif engine == "fitzxy_rhbcc" and page_mode == "all":
+            full_text = extract_with_fitz_xy_rhbcurr_trn(pdf_path)
 
             
 
@@ -547,9 +575,15 @@ def extract_text_by_engine(pdf_path: str, engine: str = "fitz", page_mode: str =
             full_text = extract_with_fitz(pdf_path)
 
     except Exception as e:
+        if not fallback:
+            raise
         logger.logger.exception(f"[pdf_extractor_engine] Error using {engine}: {str(e)}. Falling back to FITZ.")
         full_text = extract_with_fitz(pdf_path)
 
+    # Coordinate engines already split DOC (first page) and TRN (all pages)
+    if isinstance(full_text, EngineResult):
+        return full_text
+
     # === Page mode handling (common across engines) ===
     # Note: Not all engines produce page delimiters (e.g., \f).
     # This logic ensures you can still extract "first page only" text consistently.
@@ -563,3 +597,14 @@ def extract_text_by_engine(pdf_path: str, engine: str = "fitz", page_mode: str =
         return approx_first_page
     else:
         return full_text
+
+
+def iter_pages_by_engine(pdf_path: str, engine: str = "fitz"):
+    """
+    Statement pages for the streaming (TRN) extraction: one text per page, read lazily, for the
+    fitz engine. Other engines give their whole "all" page-mode output as a single item.
+    """
+    if engine.lower().strip() == "fitz":
+        yield from iter_fitz_pages(pdf_path)
+    else:
+        yield extract_text_by_engine(pdf_path, engine, page_mode="all")
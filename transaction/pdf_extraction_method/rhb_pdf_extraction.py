@@ -1,16 +1,52 @@
 # flake8: noqa: E501
 from datetime import datetime
 import re
+import os
 import logger
 import json
 import fitz  # type: ignore # PyMuPDF
 from transaction.name_extractor import NER_extraction
+from transaction.pdf_extraction_method import row_grammar
+from transaction.pdf_extraction_method.table_engine import EngineResult
 from datetime import datetime
 
+# ✅ Row grammar (compiled and validated once, see row_grammar)
+GRAMMAR = row_grammar.register("RHB", {
+    # Coordinate rows (extract_trxInfo_1)
+    "distributo_join": r"(DISTRIBUTO)([A-Z0-9])",                # sender name glued to the next word
+    "distributo_tail": r"DISTRIBUTO\S*",
+    "multi_space": r"\s{2,}",
+    # Text rows (extract_trxInfo_2)
+    "period_label": re.compile(r"Statement\s+Period|Tempoh\s+Penyata", re.IGNORECASE),
+    "period_range": r"(\d{1,2}\s+\w+\s+(\d{2,4}))\s*[–-]\s*(\d{1,2}\s+\w+\s+(\d{2,4}))",
+    "balance": r"^\d+\.\d{2}$",                                 # B/F balance with separators and trailing minus removed
+    "row_date": r"^\d{1,2}\s+[A-Za-z]{3,}$",                      # line holding only "02 Jul" opens a transaction
+    "signed_amount": r"^[\d,]+\.\d{2}-?$",                         # 27,764.33 or 27,764.33-
+    "amount": r"^[\d,]+\.\d{2}$",
+    "reference": r"\d{10}",                                       # 10-digit reference, used with fullmatch
+    "page_title": re.compile(r"^Account\s+Statement\b", re.IGNORECASE),  # line under the page header's first line
+}, samples=(
+    ("distributo_join", "DISTRIBUTOSDN", ("DISTRIBUTO", "S")),
+    ("distributo_tail", "DISTRIBUTORS", True),
+    ("multi_space", "   ", True),
+    ("period_label", "Statement Period / Tempoh Penyata : 1 Jul 24 – 31 Jul 24", True),
+    ("period_range", "1 Jul 24 – 31 Jul 24", ("1 Jul 24", "24", "31 Jul 24", "24")),
+    ("balance", "27764.33", True),
+    ("balance", "27,764.33", False),
+    ("row_date", "02 Jul", True),
+    ("row_date", "02 Jul 2024", False),
+    ("signed_amount", "27,764.33-", True),
+    ("amount", "27,764.33", True),
+    ("amount", "27,764.33-", False),
+    ("reference", "1234567890", True),
+    ("page_title", "Account Statement / Penyata Akaun", True),
+    ("page_title", "Fund transfer", False),
+))
+
 
 def output_rawdata(text):
-    # # To output the raw data from "text"
-    output_path = r"D:\CHIANWEILON\Software_Dev\TransMatch\Sample\OUTPUT_TEXT\OUTPUT_TEXT_.txt"
+    # # To output the raw data from "text" (statement text: kept in the git-ignored log folder unless OUTPUT_TEXT_PATH is set)
+    output_path = os.getenv("OUTPUT_TEXT_PATH") or os.path.join(logger.log_dir, "OUTPUT_TEXT_.txt")
     with open(output_path, "a", encoding="utf-8") as file:
         file.write(text)
 
@@ -31,22 +67,19 @@ def extract_trxInfo(text, id_bnk, pdf_path_global):
 def extract_docInfo_1(text, id_bnk, pdf_path_global):
     """
     Extract RHB document-level info (bank header fields).
-    Now reads data from coordinate-based JSON extraction.
+    Reads the header fields of the coordinate engine (EngineResult), JSON text is still accepted.
     """
-    logger.logger.info("[rhb_pdf_extraction][extract_docInfo()] : Reading doc info using coordinate JSON extractor")
+    logger.logger.info("[rhb_pdf_extraction][extract_docInfo()] : Reading doc info using coordinate extractor")
 
     try:
-        # Run coordinate-based extraction (JSON format)
-        json_result = text
-
-        # Parse JSON string into dictionary
-        data = json.loads(json_result)
+        # Header fields of the coordinate-based extraction
+        data = text.fields if isinstance(text, EngineResult) else json.loads(text)
 
         # Normalize missing or malformed keys
         def safe_get(key, default="NA"):
             return str(data.get(key, default)).strip() if data.get(key) else default
 
-        # Assign fields from JSON
+        # Assign header fields
         bank_name = safe_get("Bank Name")
         bank_regNo = safe_get("Bank Registration No")
         bank_address = safe_get("Bank Address")
@@ -71,7 +104,7 @@ def extract_docInfo_1(text, id_bnk, pdf_path_global):
             if parsed:
                 statement_date = parsed.strftime("%d/%m/%y")  # ✅ → "30/06/25"
 
-        logger.logger.info(f"[rhb_pdf_extraction][extract_docInfo()] : Successfully extracted via JSON ({bank_name}, {customer_name})")
+        logger.logger.info(f"[rhb_pdf_extraction][extract_docInfo()] : Successfully extracted via coordinates ({bank_name}, {customer_name})")
 
         return {
             "Bank Name": bank_name,
@@ -164,20 +197,17 @@ def extract_docInfo_2(text, id_bnk, pdf_path_global):
 # RHB & RHB ISLAMIC  BANK TEMPLATE - TRANSACTION EXTRACTION --------------------------------------------
 def extract_trxInfo_1(text, id_bnk, pdf_path_global):
     """
-    Extract RHB transaction data from coordinate-based JSON (rhb_xy_extraction).
-    Converts JSON rows into standardized transaction dictionaries.
+    Extract RHB transaction data from the coordinate engine rows (EngineResult of TableRow, JSON text is still accepted).
+    Converts the rows into standardized transaction dictionaries.
     """
-    logger.logger.info("[rhb_pdf_extraction][extract_trxInfo()] : Reading transaction info via coordinate JSON extractor")
+    logger.logger.info("[rhb_pdf_extraction][extract_trxInfo()] : Reading transaction info via coordinate extractor")
     # output_rawdata(text)
 
     transactions = []
 
     try:
-        # Run coordinate-based transaction extraction (returns JSON string)
-        json_result = text
-
-        # Parse JSON string → Python list of dictionaries
-        data = json.loads(json_result)
+        # Rows of the coordinate-based transaction extraction (TableRow or dict, both have .get)
+        data = text.rows if isinstance(text, EngineResult) else json.loads(text)
 
         for row in data:
             # Safely extract fields with fallback
@@ -193,7 +223,7 @@ def extract_trxInfo_1(text, id_bnk, pdf_path_global):
             bal_raw = safe_get("Balance")
             description = safe_get("Description")
             desc_others_parts = [
-                re.sub(r"(DISTRIBUTO)([A-Z0-9])", r"\1 \2", safe_get("Sender")),
+                GRAMMAR.distributo_join.sub(r"\1 \2", safe_get("Sender")),
                 safe_get("Ref1"),
                 safe_get("Ref2")
             ]
@@ -219,10 +249,10 @@ def extract_trxInfo_1(text, id_bnk, pdf_path_global):
                 ner = " ".join(p for p in [safe_get("Ref1"), safe_get("Ref2")] if p).strip()
 
             # 🧩 [ SPECIAL hanlde ] Remove everything directly attached after 'DISTRIBUTO'
-            ner = re.sub(r"DISTRIBUTO\S*", "DISTRIBUTO", ner)
+            ner = GRAMMAR.distributo_tail.sub("DISTRIBUTO", ner)
 
             # Optional cleanup for multiple spaces
-            ner = re.sub(r"\s{2,}", " ", ner).strip()
+            ner = GRAMMAR.multi_space.sub(" ", ner).strip()
 
             transactions.append({
                 "trn_pdf_date": date_val,
@@ -234,7 +264,7 @@ def extract_trxInfo_1(text, id_bnk, pdf_path_global):
                 "trn_pdf_ner": ner
             })
 
-        logger.logger.info(f"[rhb_pdf_extraction][extract_trxInfo()] : Extracted {len(transactions)} transactions via JSON.")
+        logger.logger.info(f"[rhb_pdf_extraction][extract_trxInfo()] : Extracted {len(transactions)} transactions via coordinates.")
 
     except Exception as e:
         logger.logger.exception(f"[rhb_pdf_extraction][extract_trxInfo()][ERROR]: {e}")
@@ -255,16 +285,16 @@ def extract_trxInfo_2(text, id_bnk, pdf_path_global):
                 clean_val = lines[j].strip().replace(",", "")
                 if clean_val.endswith("-"):
                     clean_val = clean_val[:-1]  # remove trailing minus before matching
-                if re.match(r"^\d+\.\d{2}$", clean_val):
+                if GRAMMAR.balance.match(clean_val):
                     first_balance = float(clean_val)
                     break
             break
     # To get the year of statement date, as the transaction do not provide the year value
     statement_year = None
     for line in lines:
-        if re.search(r"Statement\s+Period|Tempoh\s+Penyata", line, re.IGNORECASE):
+        if GRAMMAR.period_label.search(line):
             # Example: "Statement Period / Tempoh Penyata : 1 Jul 24 – 31 Jul 24"
-            match = re.search(r"(\d{1,2}\s+\w+\s+(\d{2,4}))\s*[–-]\s*(\d{1,2}\s+\w+\s+(\d{2,4}))", line)
+            match = GRAMMAR.period_range.search(line)
             if match:
                 # take year from last date
                 last_date_str = match.group(3)
@@ -319,8 +349,11 @@ def extract_trxInfo_2(text, id_bnk, pdf_path_global):
             continue  # ⛔ skip blank lines
 
         previous = lines[i - 1].strip() if i > 0 else ""
+        following = next((ln.strip() for ln in lines[i + 1:] if ln.strip()), "")
 
-        if current == firstTextinPage:
+        # The page header repeats the statement's first line (the account holder's name): only a header when
+        # the page title follows, the holder's name also appears in the rows (e.g. own-account transfers)
+        if current == firstTextinPage and GRAMMAR.page_title.match(following):
             skip = True
         elif previous == "Balance" and current == "Baki":
             skip = False
@@ -364,7 +397,7 @@ def extract_trxInfo_2(text, id_bnk, pdf_path_global):
     lines = textCleaned.split("\n")
     transactions = []
     current_block = []
-    date_pattern = re.compile(r"^\d{1,2}\s+[A-Za-z]{3,}$")
+    date_pattern = GRAMMAR.row_date
 
     for line in lines:
         if date_pattern.match(line):
@@ -386,7 +419,7 @@ def extract_trxInfo_2(text, id_bnk, pdf_path_global):
         # Extract numeric-like lines (amount + balance)
         numbers = []
         for ln in block:
-            if re.match(r"^[\d,]+\.\d{2}-?$", ln.strip()):  # match values like 27,764.33 or 27,764.33-
+            if GRAMMAR.signed_amount.match(ln.strip()):  # match values like 27,764.33 or 27,764.33-
                 clean_val = ln.strip().replace(",", "")
                 if clean_val.endswith("-"):
                     clean_val = clean_val[:-1]  # remove trailing minus
@@ -398,9 +431,9 @@ def extract_trxInfo_2(text, id_bnk, pdf_path_global):
         else:
             continue
 
-        # Determine CR / DR
+        # Determine CR / DR: a credit raises the balance, a debit lowers it
         if prev_balance is not None:
-            if balance <= prev_balance:
+            if balance >= prev_balance:
                 amount_cr = amount
                 amount_dr = 0.0
             else:
@@ -425,12 +458,12 @@ def extract_trxInfo_2(text, id_bnk, pdf_path_global):
                 val = val[:-1].strip()
 
             # Detect 10-digit numeric (keep for end)
-            if re.fullmatch(r"\d{10}", val):
+            if GRAMMAR.reference.fullmatch(val):
                 numeric_10digit = val
                 continue
 
             # Skip pure amount (e.g., 27,764.33)
-            if re.match(r"^[\d,]+\.\d{2}$", val):
+            if GRAMMAR.amount.match(val):
                 continue
 
             # Skip if same as description
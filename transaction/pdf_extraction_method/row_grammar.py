@@ -0,0 +1,65 @@
+# flake8: noqa: E501
+"""
+row_grammar.py
+Precompiled row grammars of the bank extractors.
+
+Every bank module registers its row, date and amount patterns once at import. The patterns
+are compiled here and held by the module for its whole life, so the per-row loops never go
+through re's internal pattern cache (shared with every re.search in name_extractor and easily
+evicted under load). Each grammar carries sample lines that are checked on registration: a
+broken pattern fails the import of its bank module instead of silently dropping rows.
+"""
+
+import re
+import logger
+
+logger.logger.info("[row_grammar] : Menu initiation")
+
+_registry = {}
+
+
+class RowGrammar:
+    """Named compiled patterns of one bank statement layout, read as attributes (grammar.amount)"""
+
+    def __init__(self, name, patterns):
+        self.name = name
+        self.patterns = {key: re.compile(pattern) if isinstance(pattern, str) else pattern
+                         for key, pattern in patterns.items()}
+        for key, pattern in self.patterns.items():
+            setattr(self, key, pattern)
+
+    def validate(self, samples):
+        """
+        samples: (pattern name, text, expected) tuples. expected is True / False for match / no match,
+        or the tuple of groups the match must return.
+        """
+        for key, text, expected in samples:
+            if key not in self.patterns:
+                raise ValueError(f"[row_grammar] {self.name}: sample refers to unknown pattern '{key}'")
+            match = self.patterns[key].match(text)
+            if isinstance(expected, tuple):
+                ok = match is not None and match.groups() == expected
+            else:
+                ok = (match is not None) == expected
+            if not ok:
+                raise ValueError(f"[row_grammar] {self.name}.{key}: sample {text!r} gave {match.groups() if match else None}, expected {expected}")
+
+
+def register(name, patterns, samples=()):
+    """Compile, validate and register the grammar of a statement layout. Returns the RowGrammar."""
+    if name in _registry:
+        raise ValueError(f"[row_grammar] Grammar '{name}' is already registered")
+    grammar = RowGrammar(name, patterns)
+    grammar.validate(samples)
+    _registry[name] = grammar
+    logger.logger.info(f"[row_grammar] : Registered {name} grammar ({len(grammar.patterns)} patterns, {len(samples)} samples)")
+    return grammar
+
+
+def get(name):
+    return _registry[name]
+
+
+def registered():
+    """Names of the registered grammars"""
+    return list(_registry)
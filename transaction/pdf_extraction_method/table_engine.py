@@ -0,0 +1,266 @@
+# flake8: noqa: E501
+"""
+table_engine.py
+Geometry based table extraction shared by the coordinate bank extractors.
+
+The words of a page are read once, as (x0, top, x1, bottom, text) tuples in reading order, and
+sorted by top once. Rows are then formed by sweeping down the page (y bands) or by binary
+search between separator lines, and each word is put in its column by a binary search over
+the column edges of the bank's TableLayout. No row or column rescans the words of the page.
+
+The engines hand their rows to the bank extractor as an EngineResult of TableRow records (cells
+plus page and y extent), in memory: nothing is serialized between the engine and the extractor.
+"""
+
+from bisect import bisect_left, bisect_right
+import json
+from typing import NamedTuple
+import fitz  # type: ignore # PyMuPDF
+import logger
+
+logger.logger.info("[table_engine] : Menu initiation")
+
+# Positions in a word tuple
+X0, TOP, X1, BOTTOM, TEXT = range(5)
+
+
+class TableRow(NamedTuple):
+    """One table row: {column name: text} plus the page (1-based) and the y extent of its words"""
+    cells: dict
+    page: int
+    top: float
+    bottom: float
+
+    def get(self, column, default=""):
+        return self.cells.get(column, default)
+
+
+def table_row(cells, words, page):
+    """TableRow of cells built from words (non-empty) on page"""
+    return TableRow(cells, page, min(w[TOP] for w in words), max(w[BOTTOM] for w in words))
+
+
+class EngineResult:
+    """
+    Output of a coordinate engine as the bank extractor reads it: rows (TableRow) for the TRN pass,
+    fields ({field: text}) for the DOC pass.
+    """
+
+    __slots__ = ("engine", "rows", "fields")
+
+    def __init__(self, engine, rows=(), fields=None):
+        self.engine = engine
+        self.rows = list(rows)
+        self.fields = fields
+
+    def __len__(self):
+        return len(self.rows)
+
+    def to_json(self):
+        """The JSON text the engines used to return, for output_rawdata() and the parity checks"""
+        data = self.fields if self.fields is not None else [row.cells for row in self.rows]
+        return json.dumps(data, indent=4, ensure_ascii=False)
+
+
+class TableLayout:
+    """
+    Column spec of a statement table: {column name: (x min, x max)}, a word belongs to the column
+    whose half-open range holds its x0. Columns keep the given order in the rows built from them.
+    """
+
+    def __init__(self, columns):
+        self.names = list(columns)
+        edges = sorted((xmin, xmax, name) for name, (xmin, xmax) in columns.items())
+        for (_, prev_max, prev_name), (xmin, _, name) in zip(edges, edges[1:]):
+            if xmin < prev_max:
+                raise ValueError(f"[table_engine] Columns '{prev_name}' and '{name}' overlap")
+        self._starts = [edge[0] for edge in edges]
+        self._ends = [edge[1] for edge in edges]
+        self._columns = [edge[2] for edge in edges]
+
+    def column_of(self, x):
+        """Column name holding x, None when x falls between or outside the columns"""
+        i = bisect_right(self._starts, x) - 1
+        if i >= 0 and x < self._ends[i]:
+            return self._columns[i]
+        return None
+
+    def row(self, words):
+        """{column name: text of the row's words in that column}, words joined in the given order"""
+        cells = {name: [] for name in self.names}
+        for word in words:
+            column = self.column_of(word[X0])
+            if column is not None:
+                cells[column].append(word[TEXT])
+        return {name: " ".join(texts).strip() for name, texts in cells.items()}
+
+
+class PageWords:
+    """Words of one page, indexed by top so y ranges are found by binary search"""
+
+    def __init__(self, words):
+        self.words = words
+        self._order = sorted(range(len(words)), key=lambda i: words[i][TOP])  # stable: ties stay in reading order
+        self._tops = [words[i][TOP] for i in self._order]
+
+    def __len__(self):
+        return len(self.words)
+
+    def between(self, y_min, y_max, include_min=True):
+        """Words with y_min <= top < y_max (y_min < top when include_min is False), in reading order"""
+        lo = (bisect_left if include_min else bisect_right)(self._tops, y_min)
+        hi = bisect_left(self._tops, y_max)
+        return [self.words[i] for i in sorted(self._order[lo:hi])]
+
+    def in_box(self, xmin, xmax, ymin, ymax):
+        """Words whose top-left corner is inside the box (xmin <= x0 < xmax, ymin <= top < ymax)"""
+        return [w for w in self.between(ymin, ymax) if xmin <= w[X0] < xmax]
+
+    def bands(self, tolerance):
+        """
+        Rows by a y sweep: a row starts at the top-most remaining word and takes every word whose top
+        is within tolerance of it. Words of a row are in top order.
+        """
+        rows = []
+        current = []
+        anchor = None
+        for i in self._order:
+            word = self.words[i]
+            if anchor is not None and word[TOP] - anchor <= tolerance:
+                current.append(word)
+                continue
+            if current:
+                rows.append(current)
+            current = [word]
+            anchor = word[TOP]
+        if current:
+            rows.append(current)
+        return rows
+
+    def between_lines(self, line_ys):
+        """Rows between consecutive separator lines (y positions, in the order given), words strictly inside"""
+        for first, second in zip(line_ys, line_ys[1:]):
+            yield self.between(min(first, second), max(first, second), include_min=False)
+
+
+# ✅ Word sources: one call per page, every source gives (x0, top, x1, bottom, text) tuples in reading order
+def fitz_words(page):
+    return PageWords([w[:5] for w in page.get_text("words")])
+
+
+def pdfplumber_words(page):
+    return PageWords([(w["x0"], w["top"], w["x1"], w["bottom"], w["text"]) for w in page.extract_words()])
+
+
+# ✅ pdfplumber compatible words from PyMuPDF characters (see fitz_plumber_words)
+PLUMBER_X_TOLERANCE = 3
+PLUMBER_Y_TOLERANCE = 3
+
+# Descent pdfminer takes from its built-in metrics for the standard fonts (per 1000 units of font size)
+_STANDARD_FONT_DESCENT = {
+    "Courier": -194, "Courier-Bold": -194, "Courier-BoldOblique": -194, "Courier-Oblique": -194,
+    "CourierNew": -194, "CourierNew,Italic": -194, "CourierNew,Bold": -194, "CourierNew,BoldItalic": -194,
+    "Helvetica": -207, "Helvetica-Bold": -207, "Helvetica-BoldOblique": -207, "Helvetica-Oblique": -207,
+    "Arial": -207, "Arial,Italic": -207, "Arial,Bold": -207, "Arial,BoldItalic": -207,
+    "Times-Roman": -217, "Times-Bold": -217, "Times-BoldItalic": -217, "Times-Italic": -217,
+    "TimesNewRoman": -217, "TimesNewRoman,Italic": -217, "TimesNewRoman,Bold": -217, "TimesNewRoman,BoldItalic": -217,
+    "Symbol": 0, "ZapfDingbats": 0,
+}
+
+_LIGATURES = {"ﬀ": "ff", "ﬃ": "ffi", "ﬄ": "ffl", "ﬁ": "fi", "ﬂ": "fl", "ﬆ": "st", "ﬅ": "st"}
+
+# Only the characters drawn by the PDF: no spaces added by MuPDF for wide gaps, no clipping to the media box
+_RAW_CHAR_FLAGS = fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_INHIBIT_SPACES
+
+
+def _plumber_chars(page):
+    """(x0, top, x1, bottom, char) of the horizontal text, positioned the way pdfminer does"""
+    chars = []
+    for block in page.get_text("rawdict", flags=_RAW_CHAR_FLAGS)["blocks"]:
+        for line in block.get("lines", []):
+            if tuple(line["dir"]) != (1.0, 0.0):
+                continue  # rotated text is not part of any statement table
+            for span in line["spans"]:
+                size = span["size"]
+                descent = _STANDARD_FONT_DESCENT.get(span["font"], span["descender"] * 1000) / 1000
+                for char in span["chars"]:
+                    top = char["origin"][1] - size * (1 + descent)
+                    chars.append((char["bbox"][0], top, char["bbox"][2], top + size, char["c"]))
+    return chars
+
+
+def fitz_plumber_words(page):
+    """
+    Words of a PyMuPDF page cut the same way as pdfplumber's extract_words() with its defaults:
+    characters are clustered into lines by top (3 pt), sorted by x, and a word ends at a space or
+    at a gap over 3 pt. Layouts tuned on pdfplumber coordinates give the same rows, while the page
+    is read by MuPDF instead of pdfminer's pure Python parser.
+    """
+    chars = _plumber_chars(page)
+
+    # Lines: chained clusters of the distinct tops
+    cluster_of = {}
+    cluster = -1
+    last = None
+    for top in sorted({c[TOP] for c in chars}):
+        if last is None or top > last + PLUMBER_Y_TOLERANCE:
+            cluster += 1
+        cluster_of[top] = cluster
+        last = top
+    lines = [[] for _ in range(cluster + 1)]
+    for c in chars:
+        lines[cluster_of[c[TOP]]].append(c)
+
+    words = []
+    for line in lines:
+        current = []
+        for c in sorted(line, key=lambda c: c[X0]):
+            if c[TEXT].isspace():
+                if current:
+                    words.append(current)
+                current = []
+                continue
+            if current:
+                prev = current[-1]
+                if c[X0] < prev[X0] or c[X0] > prev[X1] + PLUMBER_X_TOLERANCE or abs(c[TOP] - prev[TOP]) > PLUMBER_Y_TOLERANCE:
+                    words.append(current)
+                    current = []
+            current.append(c)
+        if current:
+            words.append(current)
+
+    return PageWords([(min(c[X0] for c in w), min(c[TOP] for c in w), max(c[X1] for c in w), max(c[BOTTOM] for c in w),
+                       "".join(_LIGATURES.get(c[TEXT], c[TEXT]) for c in w)) for w in words])
+
+
+def fitz_plumber_line_ys(page, min_width):
+    """
+    y0 of the straight line objects wider than min_width, as pdfplumber's page.lines reports it
+    (PDF coordinates, measured from the bottom of the page)
+    """
+    ys = []
+    height = page.rect.height
+    for path in page.get_drawings():
+        items = path["items"]
+        if len(items) == 1 and items[0][0] == "l":
+            p1, p2 = items[0][1], items[0][2]
+            if abs(p2.x - p1.x) > min_width:
+                ys.append(height - max(p1.y, p2.y))
+    return ys
+
+
+def fitz_span_lines(page):
+    """Text spans of a PyMuPDF page grouped by text line, for layouts that need the spans' own spacing"""
+    for block in page.get_text("dict")["blocks"]:
+        for line in block.get("lines", []):
+            yield [(*span["bbox"], span["text"]) for span in line.get("spans", [])]
+
+
+def box_fields(page_words, boxes, defaults):
+    """{field: text in its (xmin, xmax, ymin, ymax) box}, the default kept when the box is empty"""
+    fields = dict(defaults)
+    for field, (xmin, xmax, ymin, ymax) in boxes.items():
+        found = page_words.in_box(xmin, xmax, ymin, ymax)
+        if found:
+            fields[field] = " ".join(w[TEXT] for w in found).strip()
+    return fields
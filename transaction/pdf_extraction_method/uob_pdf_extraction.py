@@ -1,17 +1,35 @@
 # flake8: noqa: E501
 from datetime import datetime
 import re
+import os
 import logger
 import json
 import fitz  # type: ignore # PyMuPDF
 from transaction.name_extractor import NER_extraction
 from transaction.name_extractor import NER_extraction_ML
+from transaction.pdf_extraction_method import row_grammar
 from datetime import datetime
 
+# ✅ Row grammar (compiled and validated once, see row_grammar)
+GRAMMAR = row_grammar.register("UOB", {
+    "timestamp": r"\d{2}/\d{2}/\d{4}\s+\d{1,2}:\d{2}:\d{2}",      # date + time (e.g. 01/06/2024 10:33:32), searched anywhere in the line
+    "date": r"^\d{2}/\d{2}/\d{4}$",                                # line holding only a DD/MM/YYYY date opens a transaction
+    "amount": r"^-?\d{1,3}(?:,\d{3})*\.\d{2}-?$",                   # 44,866.97 / -44,866.97 / 44,866.97-
+}, samples=(
+    ("timestamp", "01/06/2024 10:33:32", True),
+    ("timestamp", "01/06/2024", False),
+    ("date", "02/06/2024", True),
+    ("date", "02/06/2024 TRANSFER", False),
+    ("amount", "44,866.97", True),
+    ("amount", "-44,866.97", True),
+    ("amount", "44,866.97-", True),
+    ("amount", "44866.9", False),
+))
+
 
 def output_rawdata(text):
-    # # To output the raw data from "text"
-    output_path = r"D:\CHIANWEILON\Software_Dev\TransMatch\Sample\OUTPUT_TEXT\OUTPUT_TEXT_.txt"
+    # # To output the raw data from "text" (statement text: kept in the git-ignored log folder unless OUTPUT_TEXT_PATH is set)
+    output_path = os.getenv("OUTPUT_TEXT_PATH") or os.path.join(logger.log_dir, "OUTPUT_TEXT_.txt")
     with open(output_path, "a", encoding="utf-8") as file:
         file.write(text)
 
@@ -141,7 +159,7 @@ def extract_trxInfo(text, id_bnk, pdf_path_global):
             continue
 
         # Detect date+time pattern (e.g. 01/06/2024 10:33:32)
-        if re.search(r"\d{2}/\d{2}/\d{4}\s+\d{1,2}:\d{2}:\d{2}", current):
+        if GRAMMAR.timestamp.search(current):
             skip_next = True   # also skip next line (e.g., "AM" / "PM")
             continue
 
@@ -154,7 +172,7 @@ def extract_trxInfo(text, id_bnk, pdf_path_global):
     lines = [ln.strip() for ln in textCleaned.split("\n") if ln.strip()]
 
     # Step 1️⃣ : Group by date (e.g., 02/06/2024)
-    date_pattern = re.compile(r"^\d{2}/\d{2}/\d{4}$")
+    date_pattern = GRAMMAR.date
     transactions = []
     current_block = []
 
@@ -170,8 +188,7 @@ def extract_trxInfo(text, id_bnk, pdf_path_global):
 
     # Step 2️⃣ : Extract structured fields
     structured_trx = []
-    # Regex to match all valid amount formats (e.g. 44,866.97 / -44,866.97 / 44,866.97-)
-    amount_pat = re.compile(r"^-?\d{1,3}(?:,\d{3})*\.\d{2}-?$")
+    amount_pat = GRAMMAR.amount
 
     def clean_amount(val: str) -> float:
         val = val.strip().replace(",", "")
@@ -200,11 +217,12 @@ def extract_trxInfo(text, id_bnk, pdf_path_global):
         if len(numeric_lines_raw) < 3:
             continue  # must have 3 numeric values: DR, CR, Balance
 
-        # 4️⃣ amount_dr = first amount
-        # 5️⃣ amount_cr = second amount
+        # Column order of the statement: Deposit(MYR), Withdrawal(MYR), Ledger Balance(MYR)
+        # 4️⃣ amount_cr = first amount
+        # 5️⃣ amount_dr = second amount
         # 6️⃣ balance   = third amount
-        amount_dr = clean_amount(numeric_lines_raw[0])
-        amount_cr = clean_amount(numeric_lines_raw[1])
+        amount_cr = clean_amount(numeric_lines_raw[0])
+        amount_dr = clean_amount(numeric_lines_raw[1])
         balance = clean_amount(numeric_lines_raw[2])
 
         # 3️⃣ description_others = all lines between line 3 and before numeric section
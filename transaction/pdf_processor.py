@@ -10,7 +10,9 @@ import pytesseract
 import logger
 import importlib
 from transaction.name_extractor import NER_extract_name, NER_extraction
-from transaction.pdf_extraction_method.pdf_extractor_engine import extract_text_by_engine
+from transaction.pdf_extraction_method.pdf_extractor_engine import extract_text_by_engine, iter_pages_by_engine
+from transaction.balance_reconciliation import AS_EXTRACTED, best_reconciled, reconcile, reconciled_stream, describe_breaks
+from transaction.speculative_extraction import speculative_extract, ranked_engines
 from pdf2image import convert_from_path
 from datetime import datetime
 import pdfplumber
@@ -169,6 +171,28 @@ BANK_MODULES = {
 }
 
 
+# ✅ Engines tried, in order, when the configured engine's transactions do not reconcile
+#    (RHB: Reflex and Current Account table layouts)
+ALTERNATE_ENGINES = {
+    "fitzxy_rhb": ["fitzxy_rhbcc"],
+    "fitzxy_rhbcc": ["fitzxy_rhb"],
+    "pdfplumberxy_rhb": ["pdfplumberxy_rhbcc"],
+    "pdfplumberxy_rhbcc": ["pdfplumberxy_rhb"],
+}
+
+# ✅ Robust engine started next to the configured (cheap) one in speculative mode
+ROBUST_ENGINES = {
+    "fitz": ["pdf2image"],                     # OCR, for scanned statements
+    "fitzxy_rhb": ["pdfplumberxy_rhb"],
+    "fitzxy_rhbcc": ["pdfplumberxy_rhbcc"],
+}
+
+
+def speculative_engines(engine):
+    """Engines of a statement in speculative mode: configured, alternates, robust"""
+    return [engine] + ALTERNATE_ENGINES.get(engine, []) + ROBUST_ENGINES.get(engine, [])
+
+
 def identify_bank(pdf_path):
     """Detect bank name by extracting text from the top half of the first page"""
     logger.logger.info(f"[pdf_processor][identify_bank()] : Executing the BANK IDENTIFY operation, from the file path = {pdf_path}")
@@ -212,7 +236,7 @@ def identify_bank(pdf_path):
     logger.logger.info(f"[pdf_processor][identify_bank()] : Extracted bank name(Crop top 10% of the page only) = {extracted_text_lower_clean}")
 
 
-    # Engine Mode Option: fitz, pdfplumber, pdf2image, ocrmypdf, trocr
+    # Engine Mode Option: fitz, pdfplumber, pdf2image, ocrmypdf, trocr, fitzxy_rhb / pdfplumberxy_rhb (same output)
     # ✅ Public Bank
     if "public islamic bank" in extracted_text_lower:
         bank_id, engine_mode = 1, "fitz"
@@ -235,7 +259,7 @@ def identify_bank(pdf_path):
     elif "rhb islamic bank berhad" in extracted_text_lower:
         bank_id, engine_mode = 7, "fitz"
     elif "rbs" in extracted_text_lower and "reflex" in extracted_text_lower:
-        bank_id, engine_mode = 8, "pdfplumberxy_rhb"
+        bank_id, engine_mode = 8, "fitzxy_rhb"
     elif "rhb bank berhad" in extracted_text_lower:
         bank_id, engine_mode = 9, "fitz"
 
@@ -318,9 +342,97 @@ def extract_docInfo_TrxInfo(identified_bank, page_text, purpose):
         return {"error": 97}
 
 
+def stream_trxInfo(identified_bank, pages, pdf_path):
+    """
+    Yield the transactions of a statement as its pages (iterable of page texts) are consumed.
+    Bank modules with iter_trxInfo() parse page by page; the others get the whole text once and
+    their list is yielded from.
+    """
+    module_name = BANK_MODULES.get(identified_bank)
+    if not module_name:
+        logger.logger.info("[pdf_processor][stream_trxInfo()] : Error code [98] - Bank undefined from the uploaded PDF")
+        return
+
+    module = importlib.import_module(f"transaction.pdf_extraction_method.{module_name}")
+    if hasattr(module, "iter_trxInfo"):
+        yield from module.iter_trxInfo(pages, identified_bank, pdf_path)
+        return
+
+    pages = list(pages)
+    text = pages[0] if len(pages) == 1 else "\n".join(pages)  # coordinate engines give one EngineResult
+    yield from module.extract_trxInfo(text, identified_bank, pdf_path) or []
+
+
+def alternate_candidates(identified_bank, engine, pdf_path):
+    """best_reconciled candidates of the ALTERNATE_ENGINES of engine (each extracted only when reached)"""
+    def extract(alternate):
+        trx_info = extract_docInfo_TrxInfo(identified_bank, extract_text_by_engine(pdf_path, alternate, page_mode="all"), "TRN")
+        return trx_info if isinstance(trx_info, list) else []
+
+    return [(alternate, lambda alternate=alternate: extract(alternate)) for alternate in ALTERNATE_ENGINES.get(engine, [])]
+
+
+def alternate_trxInfo(identified_bank, engine, pdf_path):
+    """
+    For a streamed statement that did not reconcile under any column map: the first of ALTERNATE_ENGINES
+    whose transactions reconcile, as (engine, column map, transactions as extracted, Reconciliation), else None.
+    """
+    candidates = alternate_candidates(identified_bank, engine, pdf_path)
+    best = best_reconciled(candidates) if candidates else None
+    if not best or not best[2] or not best[3].ok:
+        return None
+    logger.logger.info(f"[pdf_processor][alternate_trxInfo()] : Transactions of engine = {best[0]}, amount columns = {best[1]} reconcile (to be confirmed)")
+    return best
+
+
+def reconciled_trxInfo(identified_bank, engine, pdf_path, all_text):
+    """
+    Transactions of the statement checked against its running balance: when the configured engine's
+    rows do not reconcile, the other amount column maps and ALTERNATE_ENGINES are tried, and the first
+    that reconciles is kept. Returns (transactions as extracted, column map that reconciles, Reconciliation
+    as extracted); extraction errors ({"error": n}) are returned as they are, with None.
+    """
+    trx_info = extract_docInfo_TrxInfo(identified_bank, all_text, "TRN")
+    if not isinstance(trx_info, list):
+        return trx_info, None, None
+
+    candidates = [(engine, lambda: trx_info)] + alternate_candidates(identified_bank, engine, pdf_path)
+    label, column_map, transactions, result = best_reconciled(candidates)
+    if (label, column_map) != (engine, AS_EXTRACTED):
+        logger.logger.info(f"[pdf_processor][reconciled_trxInfo()] : Transactions taken from engine = {label}, amount columns = {column_map} (reconciled, to be confirmed)")
+    extracted = result if column_map == AS_EXTRACTED else reconcile(transactions)
+    log_reconciliation(transactions, extracted)
+    return transactions, column_map, extracted
+
+
+def speculative_trxInfo(identified_bank, engines, pdf_path):
+    """
+    Transactions of the first of engines (run concurrently) whose rows reconcile, see
+    speculative_extraction. Returns (transactions as extracted, column map that reconciles, Reconciliation
+    as extracted), ([], None, None) when every engine failed.
+    """
+    def parse(text):
+        trx_info = extract_docInfo_TrxInfo(identified_bank, text, "TRN")
+        return trx_info if isinstance(trx_info, list) else []
+
+    outcome = speculative_extract(identified_bank, engines, lambda engine: extract_text_by_engine(pdf_path, engine, page_mode="all", fallback=False), parse)
+    if outcome is None:
+        return [], None, None
+    logger.logger.info(f"[pdf_processor][speculative_trxInfo()] : Transactions taken from engine = {outcome.engine}, amount columns = {outcome.column_map}")
+    extracted = outcome.result if outcome.column_map == AS_EXTRACTED else reconcile(outcome.transactions)
+    log_reconciliation(outcome.transactions, extracted)
+    return outcome.transactions, outcome.column_map, extracted
+
+
+def log_reconciliation(transactions, result):
+    logger.logger.info(f"[pdf_processor] : Running balance checked on {result.checked} of {result.rows} transaction(s), {len(result.breaks)} break(s)")
+    for line in describe_breaks(transactions, result) if transactions is not None else []:
+        logger.logger.info(f"[pdf_processor] : Balance break → {line}")
+
+
 def output_rawdata(text):
-    # # To output the raw data from "text"
-    output_path = r"D:\CHIANWEILON\Software_Dev\TransMatch\Sample\OUTPUT_TEXT\OUTPUT_TEXT_.txt"
+    # # To output the raw data from "text" (statement text: kept in the git-ignored log folder unless OUTPUT_TEXT_PATH is set)
+    output_path = os.getenv("OUTPUT_TEXT_PATH") or os.path.join(logger.log_dir, "OUTPUT_TEXT_.txt")
     with open(output_path, "a", encoding="utf-8") as file:
         file.write(text)
 
@@ -391,10 +503,20 @@ def output_rawdata(text):
 #     return {"Document Info": document_info, "Transactions": all_transactions}
 
 
-def pdf_data_extraction_main(pdf_path):
+def pdf_data_extraction_main(pdf_path, stream=False, on_reconciled=None, speculative=False):
     """
     New extraction handler that allows dynamic selection of PDF extraction method.
     Supported engines: 'fitz', 'pdfplumber', 'pdf2image', 'ocrmypdf', 'trocr'
+    stream=True returns the transactions as an iterator, parsed page by page while it is consumed;
+    on_reconciled(column map, Reconciliation, Reconciliation as extracted, alternate) is called once it is
+    exhausted. When no column map reconciles the streamed rows, ALTERNATE_ENGINES are tried then and
+    alternate is the alternate_trxInfo() that reconciles (None otherwise).
+    Otherwise "Amount Columns" holds the column map that reconciles and "Reconciliation" the check of
+    the transactions (see reconciled_trxInfo). The transactions are always returned as extracted: a
+    column map other than "as extracted" is only applied once the user confirms it.
+    speculative=True (not with stream) runs the bank's engines concurrently, the first that reconciles wins.
+    In speculative mode only, the engine that keeps winning for a bank is started and preferred first
+    (see ranked_engines); the stream and default modes always use the configured engine.
     """
     logger.logger.info(f"[pdf_processor][pdf_data_extraction_main()] : Start process")
 
@@ -434,11 +556,29 @@ def pdf_data_extraction_main(pdf_path):
     else:
         # Step 2: Extract text (first page for DOC, all pages for TRN)
         first_page_text = extract_text_by_engine(pdf_path, engine, page_mode="first")
-        all_text = extract_text_by_engine(pdf_path, engine, page_mode="all")
-        # output_rawdata(all_text)
 
         # Step 3: Pass text to bank-specific extraction modules
         doc_info = extract_docInfo_TrxInfo(identified_bank, first_page_text, "DOC")
-        trx_info = extract_docInfo_TrxInfo(identified_bank, all_text, "TRN")
+        if stream:
+            def reconciled(column_map, result, extracted):
+                if column_map != AS_EXTRACTED:
+                    logger.logger.info(f"[pdf_processor][pdf_data_extraction_main()] : Amount columns = {column_map} (reconciled, to be confirmed)")
+                log_reconciliation(None, extracted)
+                # ✅ The streamed rows are already shown: an alternate engine that reconciles is only offered
+                alternate = None if result.ok else alternate_trxInfo(identified_bank, engine, pdf_path)
+                if on_reconciled:
+                    on_reconciled(column_map, result, extracted, alternate)
+
+            trx_info = reconciled_stream(stream_trxInfo(identified_bank, iter_pages_by_engine(pdf_path, engine), pdf_path), reconciled)
+            column_map, reconciliation = None, None
+        elif speculative:
+            engines = ranked_engines(identified_bank, speculative_engines(engine))
+            if engines[0] != engine:
+                logger.logger.info(f"[pdf_processor][pdf_data_extraction_main()] : Engine {engines[0]} keeps winning for bank {identified_bank}, preferred over {engine}")
+            trx_info, column_map, reconciliation = speculative_trxInfo(identified_bank, engines, pdf_path)
+        else:
+            all_text = extract_text_by_engine(pdf_path, engine, page_mode="all")
+            # output_rawdata(all_text)
+            trx_info, column_map, reconciliation = reconciled_trxInfo(identified_bank, engine, pdf_path, all_text)
 
-    return {"Document Info": doc_info, "Transactions": trx_info}
\ No newline at end of file
+    return {"Document Info": doc_info, "Transactions": trx_info, "Amount Columns": column_map, "Reconciliation": reconciliation}
\ No newline at end of file
@@ -0,0 +1,203 @@
+# flake8: noqa: E501
+"""
+speculative_extraction.py
+Speculative extraction of a statement's transactions with several engines at once.
+
+The engines of a bank (the configured, cheap one first, then its alternates and a robust one such
+as pdfplumber XY or OCR) are started together on a worker pool. The first result that is valid —
+rows found and the running balance reconciles under one of the amount column maps — wins and the
+others are cancelled: engines not started yet are skipped, running ones are left to finish in the
+background and their result is dropped (an engine call cannot be interrupted). Without a valid
+result, that of the preferred engine is returned once all have finished.
+
+PyMuPDF is not thread-safe: the engines reading the PDF with it (PYMUPDF_ENGINES) and the bank
+parsers (some open the PDF themselves) take one lock, so only the pdfplumber / OCR reads really
+overlap with them — which is where the time goes.
+
+The winning engine of each bank is counted in ENGINE_WINS_FILE; in speculative mode ranked_engines()
+puts the text engine that keeps winning first for the next statements of that bank. OCR engines are
+never promoted: they stay a fallback behind the configured engine. The file is shared by every
+TransMatch process (GUI sessions, batch runs), so a win is recorded under ENGINE_WINS_LOCK, a lock
+file created exclusively, and written through a per-process temp file swapped in with os.replace.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager, nullcontext
+from typing import NamedTuple
+import logger
+from transaction.balance_reconciliation import BalanceCollector
+
+logger.logger.info("[speculative_extraction] : Menu initiation")
+
+# ✅ One worker per engine of a bank (configured + alternate + robust)
+MAX_WORKERS = 3
+
+# ✅ Engines reading the PDF with PyMuPDF
+PYMUPDF_ENGINES = {"fitz", "fitz2", "fitzxy_rhb", "fitzxy_rhbcc", "ocrmypdf"}
+
+# ✅ An engine needs this many wins for a bank before it is preferred over the configured one
+ADAPT_MIN_WINS = 3
+
+# ✅ Slow fallbacks, kept behind the configured engine however often they win
+OCR_ENGINES = {"pdf2image", "ocrmypdf", "trocr"}
+
+ENGINE_WINS_FILE = os.path.join(logger.log_dir, "TransMatch_engine_wins.json")
+ENGINE_WINS_LOCK = ENGINE_WINS_FILE + ".lock"
+
+# ✅ A lock older than this is left over by a killed process and taken over
+LOCK_STALE_SECONDS = 30
+LOCK_TIMEOUT_SECONDS = 5
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="TransMatchEngine")
+_pymupdf_lock = threading.Lock()
+_wins_lock = threading.Lock()
+
+
+class Outcome(NamedTuple):
+    """Transactions of one engine (as extracted), the column map that reconciles best and the check under it"""
+    engine: str
+    column_map: str
+    transactions: list
+    result: object
+    seconds: float
+
+    @property
+    def valid(self):
+        return bool(self.transactions) and self.result.ok
+
+
+def _run_engine(engine, read, parse, cancelled):
+    if cancelled.is_set():
+        return None
+    start = time.perf_counter()
+    with _pymupdf_lock if engine in PYMUPDF_ENGINES else nullcontext():
+        if cancelled.is_set():
+            return None
+        text = read(engine)
+    if cancelled.is_set():
+        return None
+    with _pymupdf_lock:
+        transactions = list(parse(text) or [])
+
+    collector = BalanceCollector()
+    for trx in transactions:
+        collector.add(trx)
+    column_map, result = collector.best_column_map()
+    return Outcome(engine, column_map, transactions, result, time.perf_counter() - start)
+
+
+def speculative_extract(bank_id, engines, read, parse):
+    """
+    Run read(engine) → text and parse(text) → transactions for each engine concurrently.
+    Returns the Outcome of the first valid engine, else that of the first engine (in the given
+    order) with rows, else None when every engine failed.
+    """
+    cancelled = threading.Event()
+    pending = {_executor.submit(_run_engine, engine, read, parse, cancelled) for engine in engines}
+    outcomes = {}
+    winner = None
+    while pending and winner is None:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                outcome = future.result()
+            except Exception as e:
+                logger.logger.exception(f"[speculative_extraction] : Engine failed: {e}")
+                continue
+            if outcome is None:
+                continue
+            outcomes[outcome.engine] = outcome
+            logger.logger.info(f"[speculative_extraction] : {outcome.engine} ({outcome.column_map}) → {len(outcome.transactions)} row(s), {len(outcome.result.breaks)} break(s) in {outcome.seconds:.2f}s")
+            if outcome.valid and winner is None:
+                winner = outcome
+
+    cancelled.set()
+    for future in pending:
+        future.cancel()
+
+    if winner:
+        logger.logger.info(f"[speculative_extraction] : Bank {bank_id} → {winner.engine} wins, {len(pending)} engine(s) cancelled")
+        record_win(bank_id, winner.engine)
+        return winner
+
+    logger.logger.info(f"[speculative_extraction] : Bank {bank_id} → no engine reconciles, preferred engine kept")
+    ranked = [outcomes[engine] for engine in engines if engine in outcomes]
+    return next((o for o in ranked if o.transactions), ranked[0] if ranked else None)
+
+
+# ===== ENGINE REGISTRY =====
+def load_engine_wins():
+    """{bank id (str): {engine: wins}} from ENGINE_WINS_FILE, {} when there is none yet"""
+    try:
+        with open(ENGINE_WINS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.logger.exception(f"[speculative_extraction] : ❌ Engine wins not readable, starting over: {e}")
+        return {}
+
+
+@contextmanager
+def _registry_lock():
+    """Exclusive lock on ENGINE_WINS_FILE across processes; yields False when it could not be taken"""
+    deadline = time.monotonic() + LOCK_TIMEOUT_SECONDS
+    while True:
+        try:
+            fd = os.open(ENGINE_WINS_LOCK, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(ENGINE_WINS_LOCK) > LOCK_STALE_SECONDS:
+                    os.remove(ENGINE_WINS_LOCK)
+                    continue
+            except OSError:
+                continue  # released meanwhile
+            if time.monotonic() > deadline:
+                yield False
+                return
+            time.sleep(0.05)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        yield True
+    finally:
+        try:
+            os.remove(ENGINE_WINS_LOCK)
+        except OSError:
+            pass
+
+
+def record_win(bank_id, engine):
+    with _wins_lock, _registry_lock() as locked:
+        if not locked:
+            logger.logger.warning(f"[speculative_extraction] : Engine wins locked by another process, win of {engine} for bank {bank_id} not recorded")
+            return
+        wins = load_engine_wins()
+        bank_wins = wins.setdefault(str(bank_id), {})
+        bank_wins[engine] = bank_wins.get(engine, 0) + 1
+        temp_path = f"{ENGINE_WINS_FILE}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(wins, f, indent=2)
+            os.replace(temp_path, ENGINE_WINS_FILE)
+        except OSError as e:
+            logger.logger.exception(f"[speculative_extraction] : ❌ Failed to record engine win: {e}")
+
+
+def ranked_engines(bank_id, engines):
+    """
+    engines with the text engine that won most for the bank first, once it has ADAPT_MIN_WINS wins
+    (ties keep the given order). OCR engines keep their place.
+    """
+    bank_wins = load_engine_wins().get(str(bank_id), {})
+    candidates = [engine for engine in engines if engine not in OCR_ENGINES]
+    best = max(candidates, key=lambda engine: bank_wins.get(engine, 0), default=None)
+    if best is None or bank_wins.get(best, 0) < ADAPT_MIN_WINS:
+        return list(engines)
+    return [best] + [engine for engine in engines if engine != best]
+
@@ -0,0 +1,305 @@
+# flake8: noqa: E501
+"""
+transaction_batch.py
+Column-wise batch of the transactions of one statement, as the save path reads them.
+
+Rows are appended as given (extractor dicts or grid values) and normalized column by column
+when the batch is first read: the date format is detected once for the statement, every
+distinct date text is converted once through a lookup table (DD/MM dates get their year from
+the statement date, December rows of a January statement fall in the previous year), and the
+amounts become exact int cents. Rows that cannot be normalized are kept in rejected with the
+reason, instead of being dropped silently.
+
+Accepted rows are held one column per field (lists for texts, arrays of cents for amounts) and
+read in place through TransactionRow views.
+"""
+
+import re
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import NamedTuple
+from dateutil import parser
+import logger
+
+logger.logger.info("[transaction_batch] : Menu initiation")
+
+DB_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# DD/MM dates later than this after the statement date belong to the previous year
+# (e.g. "28/12" on a statement dated 31/01/25 is 28/12/24)
+YEAR_ROLLOVER_GRACE = timedelta(days=31)
+
+_CENT = Decimal("0.01")
+
+# Extractor / Treeview field order
+FIELDS = ("trn_pdf_date", "trn_pdf_description", "trn_pdf_description_others", "trn_pdf_ner",
+          "trn_pdf_CR_Amount", "trn_pdf_DR_Amount", "trn_pdf_statementBalance")
+AMOUNT_FIELDS = (("trn_pdf_CR_Amount", 4), ("trn_pdf_DR_Amount", 5), ("trn_pdf_statementBalance", 6))
+
+
+class RejectedRow(NamedTuple):
+    """Row left out of the batch: position in the statement (1-based), reason, values as given"""
+    row: int
+    reason: str
+    values: tuple
+
+
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2})?)?$")
+
+
+def parse_statement_date(text):
+    """
+    Statement date as a datetime, None when it cannot be read. ISO text ("2025-01-05", as the
+    DateEntry widgets give it) is read strictly; anything else ("31/12/24", "31.12.2024",
+    "30 Jun 2025") day first, as the statements print it.
+    """
+    text = str(text or "").strip()
+    try:
+        if _ISO_DATE.match(text):
+            return datetime.fromisoformat(text)
+        return parser.parse(text, dayfirst=True)
+    except (ValueError, OverflowError):
+        return None
+
+
+# ===== DATES =====
+def _day_month(text, statement_date):
+    if statement_date is None:
+        raise ValueError("no statement date to take the year from")
+    day, month = int(text[:2]), int(text[3:5])
+    anchor = statement_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    error = None
+    for year in (anchor.year, anchor.year - 1):  # ✅ Year rollover: later than the grace → previous year
+        try:
+            value = datetime(year, month, day)
+        except ValueError as e:
+            error = e  # e.g. 29/02 outside a leap year, tried against the previous year too
+            continue
+        if value <= anchor + YEAR_ROLLOVER_GRACE:
+            return value
+    raise error or ValueError(f"{text} is not a date up to the statement date")
+
+
+def _slashed(text, statement_date):
+    return datetime.strptime(text, "%d/%m/%Y" if len(text.split("/")[2]) == 4 else "%d/%m/%y")
+
+
+def _dashed(text, statement_date):
+    return datetime.strptime(text, "%d-%m-%Y")
+
+
+# ✅ Transaction date formats of the bank extractors: name → (pattern, converter)
+DATE_FORMATS = {
+    "DD/MM": (re.compile(r"^\d{2}/\d{2}$"), _day_month),
+    "DD/MM/YY(YY)": (re.compile(r"^\d{2}/\d{2}/\d{2,4}$"), _slashed),
+    "DD-MM-YYYY": (re.compile(r"^\d{2}-\d{2}-\d{4}$"), _dashed),
+}
+
+
+def _format_of(text):
+    for name, (pattern, _) in DATE_FORMATS.items():
+        if pattern.match(text):
+            return name
+    return None
+
+
+def detect_date_format(texts):
+    """DATE_FORMATS name most of the (distinct) date texts are written in, None when none is known"""
+    counts = Counter(name for name in map(_format_of, texts) if name)
+    return counts.most_common(1)[0][0] if counts else None
+
+
+def normalize_dates(texts, statement_date):
+    """
+    Date column → (DB_DATE_FORMAT texts, {index: reason}), None at the rejected positions.
+    Each distinct text is converted once; equal dates share one string.
+    """
+    distinct = set(texts)
+    statement_format = detect_date_format(distinct)
+    lookup = {}
+    for text in distinct:
+        name = statement_format if statement_format and DATE_FORMATS[statement_format][0].match(text) else _format_of(text)
+        if name is None:
+            lookup[text] = (None, f"unknown date format '{text}'")
+            continue
+        if name != statement_format:
+            logger.logger.info(f"[transaction_batch] : Date '{text}' is {name}, the statement is {statement_format}")
+        try:
+            lookup[text] = (DATE_FORMATS[name][1](text, statement_date).strftime(DB_DATE_FORMAT), None)
+        except ValueError as e:
+            lookup[text] = (None, f"invalid date '{text}' ({str(e)})")
+
+    values = []
+    reasons = {}
+    for index, text in enumerate(texts):
+        value, reason = lookup[text]
+        values.append(value)
+        if reason:
+            reasons[index] = reason
+    return values, reasons
+
+
+# ===== AMOUNTS =====
+def to_cents(value):
+    """Amount ("1,234.5", 1234.5, "", None) in int cents; raises InvalidOperation when it is not a number"""
+    return int(Decimal(str(value or 0).replace(",", "").strip() or "0").quantize(_CENT) * 100)
+
+
+def cents_to_decimal(cents):
+    return Decimal(cents).scaleb(-2)
+
+
+def cents_text(cents):
+    """Amount as the transaction key renders it ("1234.50")"""
+    return str(cents_to_decimal(cents))
+
+
+def normalize_amounts(values, field):
+    """Amount column → (array of cents, {index: reason}), 0 at the rejected positions"""
+    cents = array("q")
+    reasons = {}
+    for index, value in enumerate(values):
+        try:
+            cents.append(to_cents(value))
+        except (InvalidOperation, ValueError):
+            cents.append(0)
+            reasons[index] = f"invalid {field} '{value}'"
+    return cents, reasons
+
+
+# ===== BATCH =====
+def _text(value):
+    return "" if value is None else str(value)
+
+
+class TransactionRow:
+    """One transaction of a batch, read from the batch's columns (amounts in cents)"""
+
+    __slots__ = ("batch", "index")
+
+    def __init__(self, batch, index):
+        self.batch = batch
+        self.index = index
+
+    @property
+    def date(self):
+        return self.batch.dates[self.index]
+
+    @property
+    def description(self):
+        return self.batch.descriptions[self.index]
+
+    @property
+    def description_others(self):
+        return self.batch.descriptions_others[self.index]
+
+    @property
+    def ner(self):
+        return self.batch.ners[self.index]
+
+    @property
+    def credit(self):
+        return self.batch.credits[self.index]
+
+    @property
+    def debit(self):
+        return self.batch.debits[self.index]
+
+    @property
+    def balance(self):
+        return self.batch.balances[self.index]
+
+
+class TransactionBatch:
+    """
+    Transactions of one statement. append() takes the fields in extractor / Treeview order (FIELDS);
+    the columns are normalized on first read (len, iteration, rejected).
+    """
+
+    __slots__ = ("statement_date", "dates", "descriptions", "descriptions_others", "ners",
+                 "credits", "debits", "balances", "_rejected", "_raw")
+
+    def __init__(self, statement_date_text):
+        self.statement_date = parse_statement_date(statement_date_text)
+        self._raw = [[] for _ in FIELDS]     # columns as appended, until normalize()
+        self._rejected = []
+        self.dates = []                      # DB_DATE_FORMAT text, one shared string per distinct date
+        self.descriptions = []
+        self.descriptions_others = []
+        self.ners = []
+        self.credits = array("q")            # amounts in cents
+        self.debits = array("q")
+        self.balances = array("q")
+
+    @classmethod
+    def from_dicts(cls, transactions, statement_date_text):
+        """Batch of extractor transaction dicts (trn_pdf_* keys)"""
+        batch = cls(statement_date_text)
+        for trx in transactions:
+            batch.append(*(trx.get(field, "") for field in FIELDS))
+        return batch
+
+    def append(self, date, description, description_others, ner, credit, debit, balance):
+        """Add one transaction as given (normalized with the rest of the statement)"""
+        for column, value in zip(self._raw, (date, description, description_others, ner, credit, debit, balance)):
+            column.append(value)
+
+    def normalize(self):
+        """Normalize the appended rows column by column and add the accepted ones to the batch"""
+        raw = self._raw
+        if not raw[0]:
+            return
+        self._raw = [[] for _ in FIELDS]
+        offset = len(self.dates) + len(self._rejected)  # rows normalized before
+
+        dates, reasons = normalize_dates([_text(v).strip() for v in raw[0]], self.statement_date)
+        rejected = {i: [reason] for i, reason in reasons.items()}
+        amounts = []
+        for field, position in AMOUNT_FIELDS:
+            cents, reasons = normalize_amounts(raw[position], field)
+            amounts.append(cents)
+            for i, reason in reasons.items():
+                rejected.setdefault(i, []).append(reason)
+
+        accepted = [i for i in range(len(dates)) if i not in rejected]
+        self.dates.extend(dates[i] for i in accepted)
+        self.descriptions.extend(_text(raw[1][i]) for i in accepted)
+        self.descriptions_others.extend(_text(raw[2][i]) for i in accepted)
+        self.ners.extend(_text(raw[3][i]) for i in accepted)
+        for column, cents in zip((self.credits, self.debits, self.balances), amounts):
+            column.extend(cents if len(accepted) == len(cents) else array("q", (cents[i] for i in accepted)))
+
+        for i in sorted(rejected):
+            self._rejected.append(RejectedRow(offset + i + 1, "; ".join(rejected[i]), tuple(column[i] for column in raw)))
+            logger.logger.info(f"[transaction_batch] : Row {offset + i + 1} rejected → {self._rejected[-1].reason}")
+
+    @property
+    def rejected(self):
+        self.normalize()
+        return self._rejected
+
+    def rejected_message(self, limit=10):
+        """Rejected rows for the user (first limit rows), "" when every row was accepted"""
+        rejected = self.rejected
+        if not rejected:
+            return ""
+        lines = [f"Row {r.row}: {r.reason}" for r in rejected[:limit]]
+        if len(rejected) > limit:
+            lines.append(f"... and {len(rejected) - limit} more")
+        return f"{len(rejected)} transaction(s) were not saved:\n" + "\n".join(lines)
+
+    def __len__(self):
+        self.normalize()
+        return len(self.dates)
+
+    def __getitem__(self, index):
+        size = len(self)
+        if not -size <= index < size:
+            raise IndexError("transaction index out of range")
+        return TransactionRow(self, index % size)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield TransactionRow(self, index)
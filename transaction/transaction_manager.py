@@ -2,15 +2,21 @@
 
 import logger
 import re
+import os
+import hashlib
 from db_manager import (
     execute_query,
-    executionWithRs_query,
+    execute_query_fetch,
+    insert_rows,
     commit,
     executionWithRs_queryWithCommit,
     rollback
 )
+from master_data_cache import cached_query, invalidate, GROUP_BANK, GROUP_CUSTOMER, GROUP_DATA_ENTRY, GROUP_STATEMENT
+from report.screening_hits import screen_statement
+from report.daily_summary import summary_keys, refresh_statement
+from transaction.transaction_batch import TransactionBatch, cents_text, cents_to_decimal
 from datetime import datetime
-from dateutil import parser
 
 logger.logger.info("[transaction_manager] : Menu initiation")
 
@@ -28,7 +34,7 @@ def get_or_create_bank_id(bank_name, bank_reg_no, bank_address):
         SELECT NUM_BANK_ID FROM TM_MST_BANK
         WHERE VCH_BANK_NAME = %s AND CHR_ACTIVE_IND = 'Y'
     """
-    existing = executionWithRs_query(query_check, (bank_name,))
+    existing = cached_query(GROUP_BANK, query_check, (bank_name,), name="bank_id_by_name")
     if existing:
         logger.logger.info(f"[transaction_manager] : Bank Name exists = {existing[0][0]}")
         return existing[0][0]
@@ -44,7 +50,9 @@ def get_or_create_bank_id(bank_name, bank_reg_no, bank_address):
     now = datetime.now()
     result = executionWithRs_queryWithCommit(query_insert, (
         bank_name, bank_name, bank_reg_no, bank_address, 1
-    ))
+    ), name="bank_insert")
+    if result:
+        invalidate(GROUP_BANK)
     return result[0][0] if result else None
 
 
@@ -65,7 +73,7 @@ def get_or_create_customer_id(customer_code, customer_name, customer_address):
         SELECT NUM_CUST_ID FROM TM_MST_CUSTOMER
         WHERE VCH_CUST_CODE = %s AND CHR_ACTIVE_IND = 'Y'
     """
-    existing = executionWithRs_query(query_check, (customer_code,))
+    existing = cached_query(GROUP_CUSTOMER, query_check, (customer_code,), name="customer_id_by_code")
     if existing:
         logger.logger.info(f"[transaction_manager] : Customer exists, CUST_ID = {existing[0][0]}")
         return existing[0][0]
@@ -79,7 +87,9 @@ def get_or_create_customer_id(customer_code, customer_name, customer_address):
     """
     result = executionWithRs_queryWithCommit(query_insert, (
         customer_code, customer_name, customer_address, 1
-    ))
+    ), name="customer_insert")
+    if result:
+        invalidate(GROUP_CUSTOMER)
     return result[0][0] if result else None
 
 
@@ -96,7 +106,7 @@ def get_data_entry_id(data_entry):
         SELECT NUM_DT_ENT_ID FROM TM_MST_DATA_ENTRY_SOURCE
         WHERE VCH_DT_ENT_CODE = %s AND CHR_ACTIVE_IND = 'Y'
     """
-    existing = executionWithRs_query(query_check, (data_entry,))
+    existing = cached_query(GROUP_DATA_ENTRY, query_check, (data_entry,), name="data_entry_id_by_code")
     if existing:
         logger.logger.info(f"[transaction_manager] : Data Entry Method exists, DT_ENT_ID = {existing[0][0]}")
         return existing[0][0] if existing else None
@@ -104,10 +114,87 @@ def get_data_entry_id(data_entry):
     logger.logger.info(f"[transaction_manager] : Data Entry ({data_entry}) NOT exists, no further action, please contact IT department for further assistance")
 
 
-def save_transactions_to_db(transactions, static_info):
+def compute_file_hash(file_path):
+    """Return SHA-256 hex digest of the given file, or None if it cannot be read."""
+    if not file_path or not os.path.isfile(file_path):
+        return None
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def build_statement_fingerprint(bank_id, account_number, statement_date, file_hash):
+    """Statement identity: bank + account + statement date, falling back to the file hash."""
+    if bank_id and account_number and statement_date:
+        raw = f"{bank_id}|{str(account_number).strip()}|{statement_date}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    return file_hash
+
+
+def build_transaction_key(account_number, row, occurrence):
+    """Natural key per transaction (TransactionRow): account, date, amounts, balance, description hash, occurrence."""
+    desc = f"{row.description}|{row.description_others}"
+    desc_hash = hashlib.sha1(" ".join(desc.upper().split()).encode("utf-8")).hexdigest()
+    raw = "|".join([
+        str(account_number).strip(),
+        row.date,
+        cents_text(row.credit),
+        cents_text(row.debit),
+        cents_text(row.balance),
+        desc_hash,
+        str(occurrence)
+    ])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get_or_create_statement_id(fingerprint, file_hash, bank_id, customer_id, data_entry_id, static_info, statement_date, conn=None):
+    logger.logger.info("[transaction_manager] : Create or Retrieve Statement ID")
+
+    """Upsert the statement header by fingerprint inside conn's transaction (not committed here, it is
+    committed with the statement's rows); returns (NUM_STMT_ID, conn)."""
+    if not fingerprint:
+        logger.logger.info("[transaction_manager] : Statement fingerprint is not available")
+        return None, conn
+
+    query_upsert = """
+        INSERT INTO TM_TRN_STATEMENT (
+            VCH_FINGERPRINT, VCH_FILE_HASH, NUM_BANK_ID, NUM_CUST_ID, NUM_DT_ENT_ID,
+            NUM_USER_ID, NUM_ACCOUNT_NO, DTT_STATEMENT_DATE, VCH_FILE_NAME,
+            CHR_ACTIVE_IND, NUM_CREATED_BY
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, 'Y', %s)
+        ON CONFLICT (VCH_FINGERPRINT) DO UPDATE SET
+            VCH_FILE_HASH = COALESCE(EXCLUDED.VCH_FILE_HASH, TM_TRN_STATEMENT.VCH_FILE_HASH),
+            CHR_ACTIVE_IND = 'Y',
+            NUM_UPDATED_BY = EXCLUDED.NUM_CREATED_BY,
+            DTT_UPDATED_AT = CURRENT_TIMESTAMP AT TIME ZONE 'Asia/Kuala_Lumpur'
+        RETURNING NUM_STMT_ID
+    """
+    result, conn = execute_query_fetch(query_upsert, (
+        fingerprint, file_hash, bank_id, customer_id, data_entry_id,
+        static_info.get("Staff ID", ""), static_info.get("Account Number", ""),
+        statement_date, static_info.get("File Name", ""), 0
+    ), conn, name="statement_upsert", prepared=True)
+    return (result[0][0] if result else None), conn
+
+
+def delete_statement(stmt_id):
+    logger.logger.info(f"[transaction_manager] : Deleting statement {stmt_id}")
+
+    """Delete a statement header; its transactions follow via ON DELETE CASCADE."""
+    result = executionWithRs_queryWithCommit(
+        "DELETE FROM TM_TRN_STATEMENT WHERE NUM_STMT_ID = %s RETURNING NUM_STMT_ID", (stmt_id,))
+    if result:
+        invalidate(GROUP_STATEMENT)
+    return bool(result)
+
+
+def save_transactions_to_db(transactions, static_info, reprocess=False):
     logger.logger.info("[transaction_manager] : Executing the transaction SAVE operation")
 
-    """Save transaction records into TM_TRN_TRANSACTION table"""
+    """Save transaction records (TransactionBatch, or extractor dicts) into TM_TRN_TRANSACTION table.
+    With reprocess=True the statement's existing transactions are replaced in the same DB transaction."""
 
     # ✅ 1. Get or insert bank
     bank_id = get_or_create_bank_id(
@@ -126,95 +213,77 @@ def save_transactions_to_db(transactions, static_info):
     # ✅ 3. Get Data Entry ID by code
     data_entry_id = get_data_entry_id(static_info.get("Data Entry", ""))
 
-    # ✅ 4. Get statement date from extracted data
-    statement_date_str = static_info.get("Statement Date", "").strip()
+    # ✅ 4. Transactions normalized column-wise, statement date ("31/12/24" → "2024-12-31 00:00:00") parsed once
+    batch = transactions if isinstance(transactions, TransactionBatch) else TransactionBatch.from_dicts(transactions, static_info.get("Statement Date", ""))
+    statement_date = batch.statement_date.strftime("%Y-%m-%d %H:%M:%S") if batch.statement_date else None
+    if batch.rejected:
+        logger.logger.warning(f"[transaction_manager] : {len(batch.rejected)} transaction(s) rejected: " + ", ".join(f"row {r.row} ({r.reason})" for r in batch.rejected))
 
-    # Convert "31/12/24" → "2024-12-31 00:00:00"
-    try:
-        # statement_date = datetime.strptime(statement_date_str, "%d/%m/%y")  # Convert to datetime object
-        # statement_date = statement_date.strftime("%Y-%m-%d %H:%M:%S") # Convert to string with timestamp format
-
-        statement_date = parser.parse(statement_date_str)
-        statement_date = statement_date.strftime("%Y-%m-%d %H:%M:%S")
+    file_hash = static_info.get("File Hash") or compute_file_hash(static_info.get("File Path", ""))
+    fingerprint = build_statement_fingerprint(bank_id, static_info.get("Account Number", ""), statement_date, file_hash)
 
-    except ValueError:
-        statement_date = None  # Handle invalid date gracefully
+    if not bank_id or not customer_id or not statement_date or not len(batch) or not fingerprint:
+        logger.logger.exception(f"[transaction_manager] : Error: Missing required information for transaction insertion. Bank ID: {bank_id}, Customer ID: {customer_id}, Statement Date: {statement_date}, Transactions: {len(batch)}, Fingerprint: {fingerprint}")
+        return None
 
+    # ✅ One multi-row INSERT per page of rows; rows already stored under the same natural key are silently skipped.
+    #    File name, statement date and data entry source live on the statement header only; bank, customer,
+    #    agent and account stay on the row (Data Enrichment reassigns them per transaction)
     insert_query = """
     INSERT INTO TM_TRN_TRANSACTION (
-        NUM_BANK_ID, NUM_DT_ENT_ID, NUM_CUST_ID, NUM_USER_ID,
-        NUM_ACCOUNT_NO, DTT_STATEMENT_DATE, DTT_TRANSACTION_DATE,
+        NUM_BANK_ID, NUM_CUST_ID, NUM_USER_ID,
+        NUM_ACCOUNT_NO, DTT_TRANSACTION_DATE,
         VCH_TRN_DESC_1, VCH_TRN_DESC_2, VCH_NER, NUM_AMOUNT_CREDIT,
-        NUM_AMOUNT_DEBIT, NUM_STATEMENT_BALANCE, VCH_FILE_NAME, NUM_CREATED_BY
-    )
-    VALUES (
-        %(bank_id)s, %(data_entry)s, %(cust_id)s, %(staff_id)s,
-        %(account_number)s, %(statement_date)s, %(transaction_date)s,
-        %(transaction_description)s, %(transaction_description_others)s,
-        %(trn_pdf_ner)s, %(amount_credit)s, %(amount_debit)s, 
-        %(statement_balance)s, %(file_name)s, %(creator)s
+        NUM_AMOUNT_DEBIT, NUM_STATEMENT_BALANCE, NUM_CREATED_BY,
+        NUM_STMT_ID, VCH_TRN_KEY
     )
+    VALUES %s
+    ON CONFLICT (VCH_TRN_KEY) DO NOTHING
     """
 
-    tempconn = None
-
-    for trx in transactions:
-        try:
-            transaction_date_str = trx.get("trn_pdf_date", "").strip()
-            
-            # ✅ Case 1: "DD/MM" → append statement year
-            if re.match(r"^\d{2}/\d{2}$", transaction_date_str):
-                trn_statDT = parser.parse(statement_date_str)
-                year = trn_statDT.year
-
-                transaction_date_full = f"{transaction_date_str}/{year}"
-                transaction_date = datetime.strptime(transaction_date_full, "%d/%m/%Y")
-
-            # ✅ Case 2: "DD/MM/YY" or "DD/MM/YYYY"
-            elif re.match(r"^\d{2}/\d{2}/\d{2,4}$", transaction_date_str):
-                transaction_date = datetime.strptime(transaction_date_str, "%d/%m/%Y") if len(transaction_date_str.split("/")[2]) == 4 else datetime.strptime(transaction_date_str, "%d/%m/%y")
-
-            # ✅ Case 3: "DD-MM-YYYY"
-            elif re.match(r"^\d{2}-\d{2}-\d{4}$", transaction_date_str):
-                transaction_date = datetime.strptime(transaction_date_str, "%d-%m-%Y")
-
-            else:
-                logger.logger.info(f"[transaction_manager] : Unknown date format → {transaction_date_str}")
-                continue  # skip invalid format
-
-            # ✅ Final conversion to standard format
-            transaction_date = transaction_date.strftime("%Y-%m-%d %H:%M:%S")
-
-        except Exception as e:
-            logger.logger.info(f"[transaction_manager] : Invalid transaction date format → {transaction_date_str} ({str(e)})")
-            continue
-
-        params = {
-            "bank_id": bank_id,
-            "data_entry": data_entry_id,
-            "cust_id": customer_id,
-            "staff_id": static_info.get("Staff ID", ""),
-            "account_number": static_info.get("Account Number", ""),
-            "statement_date": statement_date,
-            "transaction_date": transaction_date,
-            "transaction_description": trx.get("trn_pdf_description", ""),
-            "transaction_description_others": trx.get("trn_pdf_description_others", ""),
-            "trn_pdf_ner": trx.get("trn_pdf_ner", ""),
-            "amount_credit": trx.get("trn_pdf_CR_Amount", 0),
-            "amount_debit": trx.get("trn_pdf_DR_Amount", 0),
-            "statement_balance": trx.get("trn_pdf_statementBalance", 0),
-            "file_name": static_info.get("File Name", ""),
-            "creator": 0
-        }
-
-        conn = execute_query(insert_query, params, tempconn)
-        tempconn = conn
-
-    if not bank_id or not customer_id or not statement_date or not transaction_date:
+    account_number = static_info.get("Account Number", "")
+    staff_id = static_info.get("Staff ID", "")
+
+    def insert_values():
+        # ✅ Identical lines within one statement are told apart by occurrence number
+        key_occurrence = {}
+        for row in batch:
+            base_key = (row.date, row.credit, row.debit, row.balance, row.description, row.description_others)
+            key_occurrence[base_key] = key_occurrence.get(base_key, 0) + 1
+            yield (
+                bank_id, customer_id, staff_id,
+                account_number, row.date,
+                row.description, row.description_others, row.ner,
+                cents_to_decimal(row.credit), cents_to_decimal(row.debit), cents_to_decimal(row.balance),
+                0, stmt_id,
+                build_transaction_key(account_number, row, key_occurrence[base_key])
+            )
+
+    conn = None
+    previous_summary_keys = []
+    try:
+        # ✅ 5. Upsert statement header (re-ingesting the same statement reuses it) in the same DB
+        #    transaction as its rows: a failed save leaves no header behind to block the re-upload
+        stmt_id, conn = get_or_create_statement_id(fingerprint, file_hash, bank_id, customer_id, data_entry_id, static_info, statement_date, conn)
+        if not stmt_id:
+            logger.logger.error(f"[transaction_manager] : Statement header not saved (fingerprint = {fingerprint})")
+            rollback(conn)
+            return None
+
+        # ✅ Re-process: drop the statement's rows by key, then re-insert below
+        if reprocess:
+            logger.logger.info(f"[transaction_manager] : Re-processing statement {stmt_id}, existing transactions will be replaced")
+            previous_summary_keys, conn = summary_keys("a.NUM_STMT_ID = %s", (stmt_id,), conn)  # groups of the replaced rows
+            conn = execute_query("DELETE FROM TM_TRN_TRANSACTION WHERE NUM_STMT_ID = %s", (stmt_id,), conn)
+
+        conn = insert_rows(insert_query, insert_values(), conn, name="transaction_insert")
+        conn = screen_statement(stmt_id, conn)  # ✅ Store blacklist / suspicious hits with the rows
+        conn = refresh_statement(stmt_id, conn, previous_summary_keys)  # ✅ Daily summary for KPI / reporting
+    except Exception:
         rollback(conn)
-        logger.logger.exception(f"[transaction_manager] : Error: Missing required information for transaction insertion. Bank ID: {bank_id}, Customer ID: {customer_id}, Statement Date: {statement_date}")
-        return None
-    else:
-        commit(conn)
-        logger.logger.info("[transaction_manager] : Transaction data inserted successfully")
-        return True
+        raise
+
+    commit(conn)
+    invalidate(GROUP_STATEMENT)  # ✅ New statement for the File/Bank/Agent dropdowns
+    logger.logger.info(f"[transaction_manager] : Transaction data inserted successfully ({len(batch)} rows)")
+    return True
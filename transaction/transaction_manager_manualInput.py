@@ -6,9 +6,11 @@ import threading
 from LoadingPopup import LoadingPopupClass
 from tkinter import ttk, messagebox, StringVar, IntVar
 from tkcalendar import DateEntry
-from db_manager import executionWithRs_query
+import db_executor
+from master_data_cache import cached_query, GROUP_BANK, GROUP_CUSTOMER, SQL_ACTIVE_BANK_NAMES
 from datetime import datetime
 from transaction.transaction_manager import save_transactions_to_db
+from transaction.transaction_batch import TransactionBatch
 
 logger.logger.info("[transaction_manager_manualInput] : Menu initiation")
 
@@ -98,12 +100,6 @@ class ManualTransactionInput:
 
     def build_static_info_layer(self, parent_frame):
         logger.logger.info("[transaction_manager_manualInput] : Begin developing the static info layer content")
-        # === Load Bank Dropdown Values ===
-        banks_result = executionWithRs_query(
-            "SELECT DISTINCT VCH_BANK_NAME FROM TM_MST_BANK WHERE CHR_ACTIVE_IND = 'Y'")
-        bank_options = ["Manual Input"] + [b[0]
-                                           for b in banks_result] if banks_result else ["Manual Input"]
-
         self.manual_static_vars = {}
 
         # === File Name
@@ -144,8 +140,11 @@ class ManualTransactionInput:
         tk.Label(parent_frame, text="Bank:").grid(row=1, column=0, sticky="e")
         bank_dropdown_var = StringVar(value="Manual Input")
         bank_dropdown = ttk.Combobox(
-            parent_frame, textvariable=bank_dropdown_var, values=bank_options, state="readonly")
+            parent_frame, textvariable=bank_dropdown_var, values=["Manual Input"], state="readonly")
         bank_dropdown.grid(row=1, column=1, padx=5, pady=2)
+
+        # === Load Bank Dropdown Values ===
+        db_executor.fill_combobox(self.manual_window, bank_dropdown, GROUP_BANK, SQL_ACTIVE_BANK_NAMES, leading=["Manual Input"])
         self.manual_static_vars["Bank"] = bank_dropdown_var
 
         # === Bank Name
@@ -217,7 +216,7 @@ class ManualTransactionInput:
         tk.Label(parent_frame, text="Statement Date:").grid(
             row=5, column=0, sticky="e")
         stmt_date = DateEntry(parent_frame, width=20,
-                              background='darkblue', foreground='white')
+                              background='darkblue', foreground='white', date_pattern='yyyy-mm-dd')  # ✅ ISO text, as the uploader
         stmt_date.grid(row=5, column=1, padx=5, pady=2)
         self.manual_static_vars["Statement Date"] = stmt_date
 
@@ -247,21 +246,26 @@ class ManualTransactionInput:
                 bank_reg_var.set("")
                 bank_addr_var.set("")
             else:
-                result = executionWithRs_query(
+                def apply(result):
+                    if result:
+                        bank_name_var.set(result[0][0])
+                        bank_reg_var.set(result[0][1])
+                        bank_addr_var.set(result[0][2])
+
+                bank_name_entry.config(state="readonly")
+                bank_reg_entry.config(state="readonly")
+                bank_addr_entry.config(state="readonly")
+                db_executor.submit(
+                    self.manual_window, cached_query,
+                    GROUP_BANK,
                     """
                     SELECT VCH_BANK_NAME, VCH_BANK_REG_NO, VCH_ADDRESS 
                     FROM TM_MST_BANK 
                     WHERE VCH_BANK_NAME = %s AND CHR_ACTIVE_IND = 'Y'
                     """,
-                    (selected,)
+                    (selected,),
+                    on_success=apply
                 )
-                if result:
-                    bank_name_var.set(result[0][0])
-                    bank_reg_var.set(result[0][1])
-                    bank_addr_var.set(result[0][2])
-                bank_name_entry.config(state="readonly")
-                bank_reg_entry.config(state="readonly")
-                bank_addr_entry.config(state="readonly")
 
         bank_dropdown.bind("<<ComboboxSelected>>", on_bank_selected)
 
@@ -275,7 +279,7 @@ class ManualTransactionInput:
         tk.Label(frame, text="Transaction Date:").grid(
             row=0, column=0, sticky="e", padx=5, pady=2)
         trans_date = DateEntry(frame, width=20,
-                               background='darkblue', foreground='white')
+                               background='darkblue', foreground='white', date_pattern='yyyy-mm-dd')
         trans_date.grid(row=0, column=1, sticky="w", padx=5, pady=2)
         self.trans_entry_vars["Transaction Date"] = trans_date
 
@@ -629,18 +633,14 @@ class ManualTransactionInput:
             }
 
             # ✅ 3. Extract transactions from the table
-            transactions = []
+            transactions = TransactionBatch(static_info.get("Statement Date", ""))
             for row_id in self.manual_data_table.get_children():
                 values = self.manual_data_table.item(row_id)['values']
-                transactions.append({
-                    "trn_pdf_date": datetime.strptime(values[0], "%Y-%m-%d").strftime("%d/%m"),
-                    "trn_pdf_description": values[1],
-                    "trn_pdf_description_others": values[2],
-                    "trn_pdf_ner": values[3],  # ✅ Add this
-                    "trn_pdf_CR_Amount": float(values[4].replace(",", "")) if values[4] else 0,
-                    "trn_pdf_DR_Amount": float(values[5].replace(",", "")) if values[5] else 0,
-                    "trn_pdf_statementBalance": float(values[6].replace(",", "")) if values[6] else 0,
-                })
+                transactions.append(
+                    datetime.strptime(values[0], "%Y-%m-%d").strftime("%d/%m"),
+                    values[1], values[2], values[3],
+                    values[4], values[5], values[6]  # ✅ "1,234.50" / "" read as cents by the batch
+                )
 
             trx_result = save_transactions_to_db(transactions, static_info)
 
@@ -648,6 +648,8 @@ class ManualTransactionInput:
                 self.loading_popup.close()
                 if success:
                     messagebox.showinfo("Success", "Transactions successfully saved into database.")
+                    if transactions.rejected:
+                        messagebox.showwarning("Rejected Transactions", transactions.rejected_message())
                     self.reset_all()
                     logger.logger.info("[transaction_manager_manualInput] : Data saved successfully")
                 else:
@@ -677,20 +679,21 @@ class ManualTransactionInput:
             FROM TM_MST_CUSTOMER
             WHERE VCH_CUST_CODE = %s AND CHR_ACTIVE_IND = 'Y'
         """
-        result = executionWithRs_query(query, (cust_code,))
-
         cust_name_entry = self.manual_static_widgets["Customer Name"]
         cust_addr_entry = self.manual_static_widgets["Customer Address"]
 
-        if result:
-            # Found → auto populate and set readonly
-            self.manual_static_vars["Customer Name"].set(result[0][0])
-            self.manual_static_vars["Customer Address"].set(result[0][1])
-            cust_name_entry.config(state="readonly")
-            cust_addr_entry.config(state="readonly")
-        else:
-            # Not found → allow manual input
-            self.manual_static_vars["Customer Name"].set("")
-            self.manual_static_vars["Customer Address"].set("")
-            cust_name_entry.config(state="normal")
-            cust_addr_entry.config(state="normal")
+        def apply(result):
+            if result:
+                # Found → auto populate and set readonly
+                self.manual_static_vars["Customer Name"].set(result[0][0])
+                self.manual_static_vars["Customer Address"].set(result[0][1])
+                cust_name_entry.config(state="readonly")
+                cust_addr_entry.config(state="readonly")
+            else:
+                # Not found → allow manual input
+                self.manual_static_vars["Customer Name"].set("")
+                self.manual_static_vars["Customer Address"].set("")
+                cust_name_entry.config(state="normal")
+                cust_addr_entry.config(state="normal")
+
+        db_executor.submit(self.manual_window, cached_query, GROUP_CUSTOMER, query, (cust_code,), on_success=apply)
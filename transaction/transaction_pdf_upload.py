@@ -1,13 +1,16 @@
 # flake8: noqa: E501
 
 import os
+import time
 import tkinter as tk
 import threading
 import logger
 from LoadingPopup import LoadingPopupClass
 from db_manager import executionWithRs_query
 from transaction.pdf_processor import pdf_data_extraction_main
-from transaction.transaction_manager import save_transactions_to_db
+from transaction.transaction_manager import save_transactions_to_db, compute_file_hash
+from transaction.transaction_batch import TransactionBatch
+from transaction.balance_reconciliation import COLUMN_MAPS, AS_EXTRACTED, apply_column_map
 from tkinter import ttk
 from tkinter import filedialog
 from tkinter import messagebox
@@ -15,6 +18,10 @@ from tkinter import messagebox
 
 logger.logger.info("[transaction_pdf_upload] : Menu initiation")
 
+# ✅ Streamed extraction: rows are handed to the grid every STREAM_CHUNK_ROWS rows or STREAM_FLUSH_SECONDS
+STREAM_CHUNK_ROWS = 50
+STREAM_FLUSH_SECONDS = 0.3
+
 
 class DocxUploader:
     def __init__(self, root, login_id):
@@ -158,6 +165,7 @@ class DocxUploader:
         self.data_table.pack(fill=tk.BOTH, expand=True)
         self.data_table.tag_configure("evenrow", background="#f5f5f5")  # light grey
         self.data_table.tag_configure("oddrow", background="#ffffff")   # white
+        self.data_table.tag_configure("balancebreak", background="#f8d7da")  # light red: running balance does not reconcile
 
         x_scrollbar.config(command=self.data_table.xview)
         y_scrollbar.config(command=self.data_table.yview)
@@ -271,7 +279,7 @@ class DocxUploader:
         try:
             # 🧠 Do duplication check
             query_check = """
-                SELECT COUNT(DISTINCT VCH_FILE_NAME) FROM TM_TRN_TRANSACTION
+                SELECT COUNT(1) FROM TM_TRN_STATEMENT
                 WHERE VCH_FILE_NAME = %s AND CHR_ACTIVE_IND = 'Y'
             """
             existing = executionWithRs_query(query_check, (file_name,))
@@ -283,13 +291,29 @@ class DocxUploader:
                 ])
                 return
 
+            # 🧠 Same content uploaded under another file name
+            file_hash = compute_file_hash(file_path)
+            existing_hash = executionWithRs_query(
+                "SELECT 1 FROM TM_TRN_STATEMENT WHERE VCH_FILE_HASH = %s AND CHR_ACTIVE_IND = 'Y'", (file_hash,)) if file_hash else None
+            if existing_hash:
+                logger.logger.info(f"[transaction_pdf_upload] : Statement content already ingested (hash = {file_hash})")
+                self.root.after(0, lambda: [
+                    self.loading_popup.close(),
+                    messagebox.showerror("Duplicated Bank Statement",
+                                        "The uploaded bank statement already exists in the system under another file name.\nPlease upload another new PDF docx.")
+                ])
+                return
+
             logger.logger.info("[transaction_pdf_upload] : File Name not exists, proceed to file upload activity")
 
-            trn_pdf_extracted_data = pdf_data_extraction_main(file_path)
+            self.reconciliation = None
+            trn_pdf_extracted_data = pdf_data_extraction_main(file_path, stream=True, on_reconciled=self.set_reconciliation)
             logger.logger.info("[transaction_pdf_upload] : Successfully returned from function -> pdf_processor()")
 
-            # Safely update UI from main thread
-            self.root.after(0, lambda: self.after_pdf_extraction(trn_pdf_extracted_data, file_name, file_path))
+            # Safely update UI from main thread: document info first, then the rows as the pages are parsed
+            self.extracting = True
+            self.root.after(0, lambda: self.after_pdf_extraction({**trn_pdf_extracted_data, "Transactions": []}, file_name, file_path))
+            self.stream_transactions_to_grid(trn_pdf_extracted_data["Transactions"])
 
         except Exception as e:
             error_msg = str(e)
@@ -315,6 +339,20 @@ class DocxUploader:
                 self.root.after(0, lambda: messagebox.showerror("Error", error_msg))
             self.root.after(0, self.loading_popup.close)
 
+    def stream_transactions_to_grid(self, transactions):
+        """Worker thread: pass the streamed transactions to the grid in chunks"""
+        chunk = []
+        last_flush = time.monotonic()
+        try:
+            for trx in transactions:
+                chunk.append(trx)
+                if len(chunk) >= STREAM_CHUNK_ROWS or time.monotonic() - last_flush >= STREAM_FLUSH_SECONDS:
+                    rows, chunk = chunk, []
+                    self.root.after(0, lambda rows=rows: self.trn_pdf_append_rows(rows))
+                    last_flush = time.monotonic()
+        finally:
+            self.root.after(0, lambda rows=chunk: self.trn_pdf_append_rows(rows, done=True))
+
     def after_pdf_extraction(self, extracted_data, file_name, file_path):
         self.file_path_entry.delete(0, tk.END)
         self.file_path_entry.insert(0, file_path)
@@ -361,7 +399,12 @@ class DocxUploader:
         self.data_table.delete(
             *self.data_table.get_children())  # Clear existing data
 
-        for index, pdf_trxInfo in enumerate(pdf_trxInfos):
+        self.trn_pdf_append_rows(pdf_trxInfos, done=not getattr(self, "extracting", False))
+
+    def trn_pdf_append_rows(self, pdf_trxInfos, done=True):
+        """Append transactions to the grid (called per chunk while a statement is streamed)"""
+        start = len(self.data_table.get_children())
+        for index, pdf_trxInfo in enumerate(pdf_trxInfos, start=start):
             tag = "evenrow" if index % 2 == 0 else "oddrow"
             self.data_table.insert("", "end", values=(
                 pdf_trxInfo.get("trn_pdf_date", ""),
@@ -374,15 +417,76 @@ class DocxUploader:
             ), tags=(tag,))
 
         # ✅ Display transaction count in status label (bottom right)
+        self.extracting = not done
+        if done and getattr(self, "reconciliation", None):
+            reconciliation, self.reconciliation = self.reconciliation, None
+            self.apply_reconciliation(*reconciliation)
+        count_text = f"Total Transactions: {start + len(pdf_trxInfos)}" + ("" if done else " (loading...)")
         if hasattr(self, "transaction_count_label"):
-            self.transaction_count_label.config(text=f"Total Transactions: {len(pdf_trxInfos)}")
+            self.transaction_count_label.config(text=count_text)
         else:
             # Create the label once if not exist
-            self.transaction_count_label = tk.Label(self.docx_window, text=f"Total Transactions: {len(pdf_trxInfos)}", anchor="e", font=("Arial", 10))
+            self.transaction_count_label = tk.Label(self.docx_window, text=count_text, anchor="e", font=("Arial", 10))
             self.transaction_count_label.pack(side=tk.BOTTOM, anchor="e", padx=50, pady=(0, 5))
 
+    def set_reconciliation(self, column_map, result, extracted, alternate=None):
+        """Worker thread: keep the running balance check until the last rows are in the grid"""
+        self.reconciliation = (column_map, result, extracted, alternate)
+
+    def apply_reconciliation(self, column_map, result, extracted, alternate=None):
+        """
+        Grid: when the running balance only reconciles under another amount column map, or with the rows
+        of an alternate engine, ask the user before moving the amounts / replacing the rows (declined:
+        they stay as extracted); mark and report the balance breaks
+        """
+        rows = self.data_table.get_children()
+        if alternate:
+            engine, alternate_map, transactions, alternate_result = alternate
+            amounts = "" if alternate_map == AS_EXTRACTED else f", with the amounts {alternate_map}"
+            if messagebox.askyesno(
+                    "Extraction Engine",
+                    f"The running balance does not reconcile with the rows as extracted ({len(extracted.breaks)} break(s)), "
+                    f"it does with the {len(transactions)} row(s) read by the {engine} engine{amounts}.\n\n"
+                    "Replace the rows in the grid with them?\n"
+                    "Choose No to keep the rows as extracted."):
+                self.data_table.delete(*rows)
+                self.trn_pdf_append_rows(apply_column_map(transactions, alternate_map))
+                logger.logger.info(f"[transaction_pdf_upload] : Rows taken from engine {engine} ({alternate_map}, confirmed by user), the running balance reconciles")
+                return
+            logger.logger.info(f"[transaction_pdf_upload] : Rows of engine {engine} declined by user, kept as extracted")
+            column_map, result = AS_EXTRACTED, extracted
+
+        if column_map != AS_EXTRACTED:
+            confirmed = messagebox.askyesno(
+                "Amount Columns",
+                f"The running balance does not reconcile with the amounts as extracted ({len(extracted.breaks)} break(s)), "
+                f"it does with the amounts {column_map}.\n\n"
+                "Move the amounts to the CR / DR columns that reconcile?\n"
+                "Choose No to keep the amounts as extracted.")
+            if confirmed:
+                # ✅ Treeview values are in extractor field order: CR at 4, DR at 5
+                credit_field, debit_field = COLUMN_MAPS[column_map]
+                source = {"trn_pdf_CR_Amount": 4, "trn_pdf_DR_Amount": 5}
+                for row_id in rows:
+                    values = list(self.data_table.item(row_id)["values"])
+                    values[4], values[5] = values[source[credit_field]], values[source[debit_field]]
+                    self.data_table.item(row_id, values=values)
+                logger.logger.info(f"[transaction_pdf_upload] : Amount columns taken as {column_map} (confirmed by user), the running balance reconciles")
+            else:
+                logger.logger.info(f"[transaction_pdf_upload] : Amount columns {column_map} declined by user, kept as extracted")
+                result = extracted
+
+        for index in result.breaks:
+            if index < len(rows):
+                self.data_table.item(rows[index], tags=("balancebreak",))
+        if not result.ok:
+            messagebox.showwarning("Running Balance", result.message() + "\nThe rows are highlighted, please review them before saving.")
+
     def save_transaction(self):
         logger.logger.info("[transaction_pdf_upload] : Executing the SAVE operation (with loading)")
+        if getattr(self, "extracting", False):
+            messagebox.showwarning("Extraction in Progress", "Transactions are still being read from the PDF.\nPlease save once all transactions are loaded.")
+            return
         self.loading_popup = LoadingPopupClass(self.root, "Saving transaction...\nPlease wait.")
         self.root.update_idletasks()
 
@@ -474,18 +578,11 @@ class DocxUploader:
                     return
 
             static_info = {key: var.get() for key, var in self.static_info_vars.items()}
-            transactions = []
+            static_info["File Path"] = self.file_path_entry.get().strip()
+            # ✅ Grid rows straight into the column-wise batch (same column order as the extractor fields)
+            transactions = TransactionBatch(static_info.get("Statement Date", ""))
             for row_id in self.data_table.get_children():
-                values = self.data_table.item(row_id)['values']
-                transactions.append({
-                    "trn_pdf_date": values[0],
-                    "trn_pdf_description": values[1],
-                    "trn_pdf_description_others": values[2],
-                    "trn_pdf_ner": values[3],
-                    "trn_pdf_CR_Amount": values[4],
-                    "trn_pdf_DR_Amount": values[5],
-                    "trn_pdf_statementBalance": values[6],
-                })
+                transactions.append(*self.data_table.item(row_id)['values'][:7])
 
             trx_ins_stat = save_transactions_to_db(transactions, static_info)
 
@@ -493,6 +590,8 @@ class DocxUploader:
                 self.loading_popup.close()
                 if trx_ins_stat:
                     messagebox.showinfo("Success", "Transactions successfully saved into database.")
+                    if transactions.rejected:
+                        messagebox.showwarning("Rejected Transactions", transactions.rejected_message())
                     self.reset_data_trx()
                     logger.logger.info("[transaction_pdf_upload] : Transactions successfully saved into database")
                 else:
@@ -0,0 +1,352 @@
+# flake8: noqa: E501
+
+# virtual_grid.py
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import ttk, font as tkFont
+import logger
+import db_executor
+
+logger.logger.info("[virtual_grid] : Menu initiation")
+
+# ✅ Rows measured when estimating column widths
+WIDTH_SAMPLE_ROWS = 200
+
+# ✅ Cell text of rows whose page is still being fetched
+PLACEHOLDER = "…"
+
+
+def _sort_key(value):
+    """Typed sort key: empty last, numbers (also "1,234.50") as numbers, everything else as text"""
+    if value is None or value == "":
+        return (2, 0, "")
+    if isinstance(value, (int, float)):
+        return (0, value, "")
+    try:
+        return (0, float(str(value).replace(",", "")), "")
+    except (TypeError, ValueError):
+        pass
+    if hasattr(value, "isoformat"):
+        return (1, 0, value.isoformat())
+    return (1, 0, str(value).lower())
+
+
+class ListDataSource:
+    """In-memory rows behind a VirtualGrid"""
+
+    def __init__(self, rows=()):
+        self._rows = [list(r) for r in rows]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def rows(self, start, stop):
+        return self._rows[start:stop]
+
+    def row(self, index):
+        return self._rows[index]
+
+    def all_rows(self):
+        return self._rows
+
+    def set_row(self, index, values):
+        self._rows[index] = list(values)
+
+    def sort(self, column_index, reverse=False):
+        self._rows.sort(key=lambda r: _sort_key(r[column_index] if column_index < len(r) else None), reverse=reverse)
+
+    def sample(self, size=WIDTH_SAMPLE_ROWS):
+        step = max(len(self._rows) // size, 1)
+        return self._rows[::step][:size]
+
+
+class PagedDataSource:
+    """
+    Rows fetched page by page on demand, e.g. from the database.
+    fetch_page(offset, limit, order) returns rows; count() returns the total;
+    order is None or (column_index, reverse). Only the last few pages are kept in memory.
+    Once attached to a grid, pages are fetched on the DB worker pool: rows of a page still
+    in flight read as None (shown as placeholders) and the next page is prefetched.
+    """
+
+    def __init__(self, count, fetch_page, page_size=500, max_pages=8, total=None, first_page=None, order=None):
+        self._count = count
+        self._fetch_page = fetch_page
+        self._page_size = page_size
+        self._max_pages = max_pages
+        self._pages = OrderedDict()
+        self._loading = set()
+        self._generation = 0
+        self._widget = None
+        self._on_loaded = None
+        self._total = total
+        self._edits = {}
+        self.order = order
+        if first_page is not None:  # prefetched off the UI thread
+            self._pages[0] = [list(r) for r in first_page]
+
+    def __len__(self):
+        if self._total is None:
+            self._total = self._count()
+        return self._total
+
+    def attach(self, widget, on_loaded):
+        """Fetch further pages in the background; on_loaded(start, stop) runs on the Tk thread of widget"""
+        self._widget = widget
+        self._on_loaded = on_loaded
+
+    def _store(self, number, rows):
+        self._pages[number] = [list(r) for r in rows]
+        while len(self._pages) > self._max_pages:
+            self._pages.popitem(last=False)
+        return self._pages[number]
+
+    def _request(self, number):
+        """Start fetching a page on the DB worker unless it is cached, in flight or past the end"""
+        if number in self._pages or number in self._loading or number * self._page_size >= len(self):
+            return
+        self._loading.add(number)
+        generation = self._generation
+        offset, limit, order = number * self._page_size, self._page_size, self.order
+
+        def on_success(rows):
+            if generation != self._generation:
+                return  # re-sorted / invalidated meanwhile
+            self._loading.discard(number)
+            self._store(number, rows)
+            if self._on_loaded:
+                self._on_loaded(offset, offset + limit)
+
+        def on_error(e):
+            if generation == self._generation:
+                self._loading.discard(number)  # fetched again on the next render
+
+        db_executor.submit(self._widget, self._fetch_page, offset, limit, order, on_success=on_success, on_error=on_error)
+
+    def _page(self, number):
+        page = self._pages.get(number)
+        if page is not None:
+            self._pages.move_to_end(number)
+            return page
+        if self._widget is None:
+            return self._store(number, self._fetch_page(number * self._page_size, self._page_size, self.order))
+        self._request(number)
+        return None
+
+    def _row(self, index, missing):
+        if index in self._edits:
+            return self._edits[index]
+        page = self._page(index // self._page_size)
+        if page is None:
+            return None  # still loading
+        offset = index % self._page_size
+        return page[offset] if offset < len(page) else missing
+
+    def row(self, index):
+        return self._row(index, None)
+
+    def rows(self, start, stop):
+        """Rows of [start, stop): None for rows still loading, rows past a short last page are left out"""
+        stop = min(stop, len(self))
+        missing = object()
+        rows = [r for r in (self._row(i, missing) for i in range(start, stop)) if r is not missing]
+        if self._widget is not None and stop > start:
+            self._request((stop - 1) // self._page_size + 1)  # ✅ prefetch the page below the window
+        return rows
+
+    def set_row(self, index, values):
+        self._edits[index] = list(values)
+
+    def sort(self, column_index, reverse=False):
+        self.order = (column_index, reverse)
+        self.invalidate()
+
+    def invalidate(self):
+        """Drop cached pages (rows are fetched again on the next render)"""
+        self._generation += 1
+        self._pages.clear()
+        self._loading.clear()
+        self._edits.clear()
+
+    def sample(self, size=WIDTH_SAMPLE_ROWS):
+        return [r for r in self.rows(0, size) if r is not None]
+
+
+class VirtualGrid(tk.Frame):
+    """
+    Treeview that only holds the visible window of rows. Scrolling re-fills the same items
+    from the data source, selection is tracked by row index, widths are estimated from a sample
+    and header clicks sort through the data source.
+    """
+
+    def __init__(self, parent, columns, height=20, displaycolumns=None, row_tags=None, display=None, sortable=True, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.columns = tuple(columns)
+        self.height = height
+        self.row_tags = row_tags or (lambda values, index: ("evenrow" if index % 2 == 0 else "oddrow",))
+        self.display = display or (lambda row, index: row)  # source row → Treeview values
+        self.source = ListDataSource()
+        self.first = 0
+        self._selected = set()
+        self._sort_state = {}
+        self._rendering = False
+        self._font = tkFont.nametofont("TkDefaultFont")
+
+        self.tree = ttk.Treeview(self, columns=self.columns, displaycolumns=displaycolumns or self.columns,
+                                 show="headings", height=height, selectmode="extended")
+        self.vsb = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.vsb.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.tag_configure("evenrow", background="#f5f5f5")
+        self.tree.tag_configure("oddrow", background="#ffffff")
+        self.tree.tag_configure("loading", foreground="#999999")
+
+        if sortable:
+            for col in self.columns:
+                self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+        else:
+            for col in self.columns:
+                self.tree.heading(col, text=col)
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Up>", lambda e: self._on_key(-1))
+        self.tree.bind("<Down>", lambda e: self._on_key(1))
+        self.tree.bind("<Prior>", lambda e: self._on_key(-self.height))
+        self.tree.bind("<Next>", lambda e: self._on_key(self.height))
+
+    # ---------------------------------------------------------------- data
+    def set_source(self, source, autofit=True):
+        self.source = source
+        self.first = 0
+        self._selected.clear()
+        if hasattr(source, "attach"):
+            source.attach(self, lambda start, stop: self._on_rows_loaded(source, start, stop))
+        self.render()
+        if autofit:
+            self.autofit_columns()
+
+    def set_rows(self, rows, autofit=True):
+        self.set_source(ListDataSource(rows), autofit)
+
+    def __len__(self):
+        return len(self.source)
+
+    def row(self, index):
+        return self.source.row(index)
+
+    def update_row(self, index, values):
+        self.source.set_row(index, values)
+        if self.first <= index < self.first + self.height:
+            self.render()
+
+    def index_of(self, item_id):
+        """Row index of a visible Treeview item"""
+        return self.first + int(item_id)
+
+    def selected_indices(self):
+        return sorted(self._selected)
+
+    def selected_rows(self):
+        """Selected rows that are loaded (rows of a page still in flight are left out)"""
+        return [row for row in (self.source.row(i) for i in self.selected_indices()) if row is not None]
+
+    # ---------------------------------------------------------------- rendering
+    def render(self):
+        total = len(self.source)
+        self.first = max(0, min(self.first, max(total - self.height, 0)))
+        rows = self.source.rows(self.first, self.first + self.height)
+
+        self._rendering = True
+        try:
+            existing = self.tree.get_children()
+            for item_id in existing[len(rows):]:
+                self.tree.delete(item_id)
+            for offset, row in enumerate(rows):
+                index = self.first + offset
+                if row is None:  # page still loading
+                    values, tags = [PLACEHOLDER] * len(self.columns), ("loading",)
+                else:
+                    values = self.display(row, index)
+                    tags = self.row_tags(values, index)
+                if offset < len(existing):
+                    self.tree.item(str(offset), values=values, tags=tags)
+                else:
+                    self.tree.insert("", tk.END, iid=str(offset), values=values, tags=tags)
+            self.tree.selection_set([str(i - self.first) for i in self._selected if self.first <= i < self.first + len(rows)])
+        finally:
+            self._rendering = False
+
+        if total:
+            self.vsb.set(self.first / total, (self.first + len(rows)) / total)
+        else:
+            self.vsb.set(0, 1)
+
+    def _on_rows_loaded(self, source, start, stop):
+        """A background page arrived: re-render if it is still our source and the page is visible"""
+        if source is self.source and start < self.first + self.height and stop > self.first:
+            self.render()
+
+    def refresh(self, reset=False):
+        """Re-render after the source or the display state changed"""
+        if reset:
+            self.first = 0
+            self._selected.clear()
+        self.render()
+
+    def scroll(self, delta):
+        self.first += delta
+        self.render()
+
+    def _on_scrollbar(self, action, amount=None, unit=None):
+        if action == "moveto":
+            self.first = int(float(amount) * len(self.source))
+        elif action == "scroll":
+            self.first += int(amount) * (self.height if unit == "pages" else 1)
+        self.render()
+
+    def _on_mousewheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _on_key(self, delta):
+        if not len(self.source):
+            return "break"  # nothing to move to
+        focus = self.tree.focus()
+        index = (self.index_of(focus) if focus else self.first) + delta
+        index = max(0, min(index, len(self.source) - 1))
+        if index < self.first or index >= self.first + self.height:
+            self.first = index if delta < 0 else index - self.height + 1
+        self._selected = {index}
+        self.render()
+        self.tree.focus(str(index - self.first))
+        return "break"
+
+    def _on_select(self, event=None):
+        if self._rendering:
+            return
+        visible = range(self.first, self.first + len(self.tree.get_children()))
+        self._selected.difference_update(visible)
+        self._selected.update(self.index_of(i) for i in self.tree.selection())
+
+    # ---------------------------------------------------------------- columns
+    def sort_by(self, column):
+        reverse = self._sort_state.get(column, False)
+        self.source.sort(self.columns.index(column), reverse)
+        self._sort_state = {column: not reverse}
+        self._selected.clear()
+        self.first = 0
+        self.render()
+
+    def autofit_columns(self, padding=20, min_width=60, max_width=400):
+        """Column widths from the header and a sample of rows, not every row"""
+        sample = [self.display(row, index) for index, row in enumerate(self.source.sample())]
+        for idx, col in enumerate(self.columns):
+            width = self._font.measure(col)
+            for values in sample:
+                if idx < len(values):
+                    width = max(width, self._font.measure(str(values[idx])))
+            self.tree.column(col, width=max(min_width, min(width + padding, max_width)))